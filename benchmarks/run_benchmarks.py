@@ -0,0 +1,431 @@
+"""
+Benchmark suite for the data loading and analysis functions.
+
+Every case runs on seeded synthetic campaign data (see
+src/data_sourcing/synthetic_data.py) over a grid of rows x channel
+cardinality. Each grid point records the best wall time and the peak
+traced memory. Per-case scaling exponents are fitted on top, results are
+compared to a stored baseline, and the fast implementations are checked
+against their reference implementations on a small grid point.
+
+Usage:
+    python -m benchmarks.run_benchmarks                 # full grid, compare to baseline
+    python -m benchmarks.run_benchmarks --quick         # small grid
+    python -m benchmarks.run_benchmarks --save-baseline # store this run as the baseline
+"""
+from pathlib import Path
+import argparse
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+import pandas as pd
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.data_analysis.df_correlation_analysis import compute_correlations
+from src.data_analysis.df_multicollinearity_analysis import compute_vif, compute_vif_vectorized
+from src.data_analysis.df_ttest_anova_analysis import run_univariate_tests
+from src.data_preprocessing.df_clean import clean_data
+from src.data_preprocessing.df_feature_engineer import LOG_DATA_FE_COLUMNS, engineer_features
+from src.data_sourcing.import_export_data import get_data
+from src.data_sourcing.synthetic_data import generate_campaign_data, write_campaign_csv
+from src.instrumentation import configure_logging
+
+logger = logging.getLogger(__name__)
+
+BENCHMARK_DIR = Path(__file__).resolve().parent
+BASELINE_PATH = BENCHMARK_DIR / "baselines.json"
+RESULTS_PATH = BENCHMARK_DIR / "results" / "latest.csv"
+
+ROWS_GRID: List[int] = [1_000, 10_000, 100_000]
+CHANNELS_GRID: List[int] = [5, 17, 50]
+QUICK_ROWS_GRID: List[int] = [1_000, 5_000]
+QUICK_CHANNELS_GRID: List[int] = [5, 17]
+# Grid point used for the fast-vs-reference correctness checks (the references are slow)
+CHECK_ROWS, CHECK_CHANNELS = 2_000, 8
+
+CATEGORICAL_COLUMNS: List[str] = ["ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "SEASON", "MONTH"]
+QUANTITATIVE_COLUMNS: List[str] = ["COST", "FREE_TRIALS", "LOG_COST", "LOG_FREE_TRIALS", "COST_PER_FREE_TRIALS"]
+CORRELATION_COLUMNS: List[str] = ["CHANNEL", "CAMPAIGN_TYPE", "LOG_COST", "LOG_FREE_TRIALS", "COST_PER_FREE_TRIALS"]
+VIF_COLUMNS: List[str] = ["ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "MONTH", "LOG_COST", "COST_PER_FREE_TRIALS"]
+
+
+class BenchmarkData:
+    """
+    Synthetic inputs for one grid point, built once and shared by every case.
+
+    Attributes:
+        rows (int): Number of rows
+        channels (int): CHANNEL cardinality
+        csv_path (Path): The raw extract written as CSV
+        features (pd.DataFrame): The engineered feature table
+    """
+
+    def __init__(self, rows: int, channels: int, workdir: Path, seed: int = 42) -> None:
+        self.rows = rows
+        self.channels = channels
+        raw = generate_campaign_data(rows, n_channels=channels, seed=seed)
+        self.csv_path = write_campaign_csv(raw, workdir / f"campaign_{rows}_{channels}.csv")
+        cleaned, _ = clean_data(raw, outlier_columns=None)
+        self.features = engineer_features(cleaned, columns=LOG_DATA_FE_COLUMNS)
+
+
+def _max_abs_diff(
+    fast: pd.DataFrame,
+    reference: pd.DataFrame,
+    keys: Sequence[str],
+    values: Sequence[str]
+) -> float:
+    """Largest absolute difference of the value columns after aligning on the keys."""
+    merged = fast.merge(reference, on=list(keys), suffixes=("", "_ref"), how="outer", indicator=True)
+    if (merged["_merge"] != "both").any():
+        return float("inf")
+    diffs = [
+        np.nanmax(np.abs(merged[v].astype(float).to_numpy() - merged[f"{v}_ref"].astype(float).to_numpy()))
+        for v in values
+    ]
+    return float(max(diffs))
+
+
+def _get_data_cold(data: BenchmarkData) -> pd.DataFrame:
+    # An absolute filename resolves to itself under any configured base path
+    return get_data(str(data.csv_path), use_cache=False)
+
+
+def _get_data_cached(data: BenchmarkData) -> pd.DataFrame:
+    return get_data(str(data.csv_path), use_cache=True)
+
+
+def _correlations(data: BenchmarkData) -> pd.DataFrame:
+    return compute_correlations(
+        data.features[CORRELATION_COLUMNS], include_categorical=True,
+        cat_cols=["CHANNEL", "CAMPAIGN_TYPE"], sparse=True
+    )
+
+
+def _correlations_reference(data: BenchmarkData) -> pd.DataFrame:
+    return compute_correlations(
+        data.features[CORRELATION_COLUMNS], include_categorical=True,
+        cat_cols=["CHANNEL", "CAMPAIGN_TYPE"], engine="pairwise"
+    )
+
+
+def _vif(data: BenchmarkData) -> pd.DataFrame:
+    return compute_vif_vectorized(data.features[VIF_COLUMNS], sparse=True)
+
+
+def _vif_reference(data: BenchmarkData) -> pd.DataFrame:
+    return compute_vif(data.features[VIF_COLUMNS])
+
+
+def _anova(data: BenchmarkData) -> pd.DataFrame:
+    return run_univariate_tests(data.features, CATEGORICAL_COLUMNS, QUANTITATIVE_COLUMNS, "anova")
+
+
+def _anova_reference(data: BenchmarkData) -> pd.DataFrame:
+    return run_univariate_tests(data.features, CATEGORICAL_COLUMNS, QUANTITATIVE_COLUMNS, "anova", engine="loop")
+
+
+def _kruskal(data: BenchmarkData) -> pd.DataFrame:
+    return run_univariate_tests(data.features, CATEGORICAL_COLUMNS, QUANTITATIVE_COLUMNS, "kruskal")
+
+
+def _kruskal_reference(data: BenchmarkData) -> pd.DataFrame:
+    return run_univariate_tests(data.features, CATEGORICAL_COLUMNS, QUANTITATIVE_COLUMNS, "kruskal", engine="loop")
+
+
+def _check_get_data(data: BenchmarkData) -> float:
+    cold, cached = _get_data_cold(data), _get_data_cached(data)
+    return 0.0 if cold.equals(cached) else float("inf")
+
+
+def _check_correlations(data: BenchmarkData) -> float:
+    return _max_abs_diff(_correlations(data), _correlations_reference(data),
+                         ["Variable 1", "Variable 2"], ["Correlation"])
+
+
+def _check_vif(data: BenchmarkData) -> float:
+    fast, reference = _vif(data), _vif_reference(data)
+    # Relative difference: VIFs of near-collinear dummies are large
+    merged = fast.merge(reference, on="Feature", suffixes=("", "_ref"))
+    if len(merged) != len(reference):
+        return float("inf")
+    finite = np.isfinite(merged["VIF_ref"]) & (merged["VIF_ref"] < 1e6)
+    return float(np.max(np.abs(merged["VIF"][finite] / merged["VIF_ref"][finite] - 1.0)))
+
+
+def _check_univariate(fast: Callable, reference: Callable, label: str) -> Callable[[BenchmarkData], float]:
+    def check(data: BenchmarkData) -> float:
+        return _max_abs_diff(fast(data), reference(data), ["Categorical Variable", "Quantitative Variable"],
+                             [label, "p-value"])
+    return check
+
+
+# name -> (timed function, correctness check or None)
+CASES: Dict[str, Tuple[Callable[[BenchmarkData], Any], Optional[Callable[[BenchmarkData], float]]]] = {
+    "get_data_csv": (_get_data_cold, _check_get_data),
+    "get_data_cached": (_get_data_cached, None),
+    "compute_correlations": (_correlations, _check_correlations),
+    "compute_vif_vectorized": (_vif, _check_vif),
+    "run_univariate_tests_anova": (_anova, _check_univariate(_anova, _anova_reference, "F-statistic")),
+    "run_univariate_tests_kruskal": (_kruskal, _check_univariate(_kruskal, _kruskal_reference, "H-statistic")),
+}
+CHECK_TOLERANCE = 1e-6
+
+
+def measure(func: Callable[[], Any], repeats: int = 3) -> Tuple[float, float]:
+    """
+    Best wall time over repeats (after one warm-up run), then peak traced
+    memory of one extra run.
+
+    Memory is measured separately because tracemalloc slows allocation-heavy
+    code; numpy and pandas buffers are traced.
+
+    Args:
+        func: Zero-argument callable to measure
+        repeats: Timed runs
+
+    Returns:
+        Tuple: (seconds, peak MiB)
+    """
+    func()  # warm-up: imports, caches, lazily built lookup tables
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return min(timings), peak / 2 ** 20
+
+
+def run_benchmarks(
+    cases: Optional[Sequence[str]] = None,
+    rows_grid: Sequence[int] = ROWS_GRID,
+    channels_grid: Sequence[int] = CHANNELS_GRID,
+    repeats: int = 3,
+    seed: int = 42
+) -> pd.DataFrame:
+    """
+    Time and memory of every case at every rows x channels grid point.
+
+    Args:
+        cases: Case names (all of CASES if None)
+        rows_grid: Row counts
+        channels_grid: CHANNEL cardinalities
+        repeats: Timed runs per point (the best is kept)
+        seed: Seed of the synthetic data
+
+    Returns:
+        pd.DataFrame: Columns "Case", "Rows", "Channels", "Columns" (width of
+            the encoded design), "Seconds" and "Peak MiB"
+
+    Raises:
+        ValueError: If an unknown case is requested
+    """
+    cases = list(cases or CASES)
+    unknown = [c for c in cases if c not in CASES]
+    if unknown:
+        raise ValueError(f"Unknown cases: {unknown}. Must be among {list(CASES)}.")
+
+    records = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for rows in rows_grid:
+            for channels in channels_grid:
+                data = BenchmarkData(rows, channels, Path(workdir), seed)
+                n_columns = int(data.features[VIF_COLUMNS].nunique().sum())
+                for case in cases:
+                    func = CASES[case][0]
+                    seconds, peak = measure(lambda: func(data), repeats)
+                    records.append({"Case": case, "Rows": rows, "Channels": channels, "Columns": n_columns,
+                                    "Seconds": seconds, "Peak MiB": peak})
+                    logger.info(f"{case} rows={rows} channels={channels}: {seconds * 1000:.1f} ms, {peak:.1f} MiB")
+    return pd.DataFrame(records)
+
+
+def scaling_exponents(results: pd.DataFrame) -> pd.DataFrame:
+    """
+    Log-log slope of time and memory against rows, per case and cardinality
+    (1.0 = linear, 2.0 = quadratic).
+
+    Args:
+        results: Output of run_benchmarks
+
+    Returns:
+        pd.DataFrame: Columns "Case", "Channels", "Time Exponent" and "Memory Exponent"
+    """
+    records = []
+    for (case, channels), group in results.groupby(["Case", "Channels"]):
+        if group["Rows"].nunique() < 2:
+            continue
+        log_rows = np.log(group["Rows"].to_numpy(dtype=float))
+        records.append({
+            "Case": case,
+            "Channels": channels,
+            "Time Exponent": np.polyfit(log_rows, np.log(group["Seconds"].clip(lower=1e-9)), 1)[0],
+            "Memory Exponent": np.polyfit(log_rows, np.log(group["Peak MiB"].clip(lower=1e-9)), 1)[0],
+        })
+    return pd.DataFrame(records)
+
+
+def check_correctness(
+    cases: Optional[Sequence[str]] = None,
+    rows: int = CHECK_ROWS,
+    channels: int = CHECK_CHANNELS,
+    seed: int = 42
+) -> pd.DataFrame:
+    """
+    Compare every fast implementation to its reference on one small grid point.
+
+    Args:
+        cases: Case names (all with a check if None)
+        rows: Rows of the synthetic data
+        channels: CHANNEL cardinality
+        seed: Seed of the synthetic data
+
+    Returns:
+        pd.DataFrame: Columns "Case", "Max Diff" and "Correct"
+    """
+    records = []
+    with tempfile.TemporaryDirectory() as workdir:
+        data = BenchmarkData(rows, channels, Path(workdir), seed)
+        for case in cases or list(CASES):
+            check = CASES[case][1]
+            if check is None:
+                continue
+            diff = check(data)
+            records.append({"Case": case, "Max Diff": diff, "Correct": diff <= CHECK_TOLERANCE})
+    return pd.DataFrame(records)
+
+
+def _point_key(row: pd.Series) -> str:
+    return f"{row['Case']}|{int(row['Rows'])}|{int(row['Channels'])}"
+
+
+def machine_details() -> Dict[str, Any]:
+    """Platform, interpreter, CPU and library versions a timing depends on."""
+    return {
+        "platform": platform.platform(),
+        "python": platform.python_version(),
+        "processor": platform.processor() or platform.machine(),
+        "cpu_count": os.cpu_count(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+    }
+
+
+def save_baseline(results: pd.DataFrame, path: Path = BASELINE_PATH) -> Path:
+    """
+    Store a run as the baseline, with the machine it ran on.
+
+    Args:
+        results: Output of run_benchmarks
+        path: Baseline JSON file
+
+    Returns:
+        Path: The written file
+    """
+    baseline = {
+        "machine": machine_details(),
+        "results": {_point_key(row): {"Seconds": row["Seconds"], "Peak MiB": row["Peak MiB"]}
+                    for _, row in results.iterrows()},
+    }
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True))
+    logger.info(f"Saved baseline to: {path}")
+    return path
+
+
+def compare_to_baseline(
+    results: pd.DataFrame,
+    path: Path = BASELINE_PATH,
+    time_tolerance: float = 0.25,
+    memory_tolerance: float = 0.25,
+    min_seconds: float = 0.005
+) -> pd.DataFrame:
+    """
+    Flag grid points that got slower or bigger than the stored baseline.
+
+    Args:
+        results: Output of run_benchmarks
+        path: Baseline JSON file
+        time_tolerance: Allowed relative slowdown
+        memory_tolerance: Allowed relative peak-memory growth
+        min_seconds: Absolute slowdown below which timing noise is ignored
+
+    Returns:
+        pd.DataFrame: results with "Baseline Seconds", "Baseline Peak MiB",
+            "Time Ratio" and "Regression" columns (no flags where the
+            baseline has no entry; each such case is logged as a warning)
+    """
+    compared = results.copy()
+    stored, machine = {}, {}
+    if path.exists():
+        baseline = json.loads(path.read_text())
+        stored, machine = baseline["results"], baseline.get("machine", {})
+    else:
+        logger.warning(f"No baseline at {path}: regressions cannot be flagged. Run with --save-baseline first.")
+    current = machine_details()
+    differing = {k: (machine[k], current[k]) for k in machine if k in current and machine[k] != current[k]}
+    if differing:
+        logger.warning(f"Baseline was recorded on a different setup {differing}; timings may not be comparable.")
+    keys = compared.apply(_point_key, axis=1)
+    missing = int((~keys.isin(list(stored))).sum())
+    if stored and missing:
+        logger.warning(f"{missing} of {len(keys)} grid points have no baseline entry and are not compared.")
+    compared["Baseline Seconds"] = keys.map(lambda k: stored.get(k, {}).get("Seconds", np.nan))
+    compared["Baseline Peak MiB"] = keys.map(lambda k: stored.get(k, {}).get("Peak MiB", np.nan))
+    compared["Time Ratio"] = compared["Seconds"] / compared["Baseline Seconds"]
+    slower = (compared["Time Ratio"] > 1 + time_tolerance) & (
+        compared["Seconds"] - compared["Baseline Seconds"] > min_seconds
+    )
+    bigger = compared["Peak MiB"] > compared["Baseline Peak MiB"] * (1 + memory_tolerance)
+    compared["Regression"] = slower | bigger
+    return compared
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the data loading and analysis functions.")
+    parser.add_argument("--cases", nargs="*", choices=list(CASES), help="Cases to run (all by default)")
+    parser.add_argument("--quick", action="store_true", help="Use the small grid")
+    parser.add_argument("--repeats", type=int, default=3, help="Timed runs per grid point")
+    parser.add_argument("--save-baseline", action="store_true", help="Store this run as the baseline")
+    parser.add_argument("--skip-checks", action="store_true", help="Skip the correctness checks")
+    args = parser.parse_args(argv)
+    configure_logging()
+
+    rows_grid, channels_grid = (QUICK_ROWS_GRID, QUICK_CHANNELS_GRID) if args.quick else (ROWS_GRID, CHANNELS_GRID)
+    status = 0
+
+    if not args.skip_checks:
+        checks = check_correctness(args.cases)
+        print(checks.to_string(index=False))
+        if not checks["Correct"].all():
+            status = 1
+
+    results = run_benchmarks(args.cases, rows_grid, channels_grid, repeats=args.repeats)
+    RESULTS_PATH.parent.mkdir(parents=True, exist_ok=True)
+    results.to_csv(RESULTS_PATH, index=False)
+    print(scaling_exponents(results).to_string(index=False))
+
+    if args.save_baseline:
+        save_baseline(results)
+    else:
+        compared = compare_to_baseline(results)
+        print(compared[["Case", "Rows", "Channels", "Seconds", "Baseline Seconds", "Time Ratio",
+                        "Peak MiB", "Regression"]].to_string(index=False))
+        if compared["Regression"].any():
+            status = 1
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,14 +1,106 @@
 import pandas as pd
 from scipy.stats import spearmanr, pearsonr
+from scipy import stats
 import numpy as np
-from typing import List
+from scipy import sparse as sp
+from typing import List, Optional
+from src.data_analysis.df_polars_backend import design_matrix, is_polars, split_columns
+from src.data_analysis.df_sparse_encoding import pairwise_correlation_matrix, sparse_one_hot
+from src.instrumentation import instrument
 
+
+def _correlation_pvalues(corr: np.ndarray, n_obs: np.ndarray) -> np.ndarray:
+    """
+    Two-sided p-values for correlation coefficients using the t-distribution
+    with n - 2 degrees of freedom (the same test scipy uses for pearsonr/spearmanr).
+    """
+    dof = n_obs - 2
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t_stat = corr * np.sqrt(dof / ((1.0 - corr) * (1.0 + corr)))
+        p_values = 2 * stats.t.sf(np.abs(t_stat), dof)
+    p_values[dof <= 0] = np.nan
+    return p_values
+
+
+def _compute_correlations_matrix(
+    df: pd.DataFrame,
+    method: str,
+    indicators: Optional[sp.spmatrix] = None,
+    indicator_names: Optional[List[str]] = None
+) -> pd.DataFrame:
+    """
+    Vectorized engine behind compute_correlations: builds every coefficient and
+    p-value from matrix products instead of looping over column pairs.
+    Optional sparse indicator columns are appended after the columns of df.
+    """
+    values = df.to_numpy(dtype=float, na_value=np.nan)
+    columns = df.columns
+    if indicators is not None:
+        columns = columns.append(pd.Index(indicator_names))
+    n_dense = values.shape[1]
+    n_cols = len(columns)
+
+    if method == "pearson":
+        corr, n_obs = pairwise_correlation_matrix(values, indicators)
+    elif method == "spearman":
+        # Rank each column once; identical to spearmanr whenever the pair shares
+        # the same set of observed rows. Ranking a 0/1 indicator is an affine map,
+        # so sparse indicators enter the rank correlation unchanged.
+        ranks = df.rank(method="average").to_numpy(dtype=float, na_value=np.nan)
+        corr, n_obs = pairwise_correlation_matrix(ranks, indicators)
+    else:
+        raise ValueError("Unsupported correlation method. Choose 'pearson' or 'spearman'.")
+
+    p_values = _correlation_pvalues(corr, n_obs)
+
+    row_idx, col_idx = np.triu_indices(n_cols, k=1)
+    pair_corr = corr[row_idx, col_idx]
+    pair_p = p_values[row_idx, col_idx]
+    pair_n = n_obs[row_idx, col_idx]
+    errors = np.full(len(row_idx), None, dtype=object)
+
+    if method == "pearson":
+        # scipy.stats.pearsonr raises for fewer than two shared observations and
+        # returns p = 1 for exactly two
+        too_short = pair_n < 2
+        errors[too_short] = "`x` and `y` must have length at least 2."
+        pair_corr[too_short] = np.nan
+        pair_p[too_short] = np.nan
+        pair_p[(pair_n == 2) & ~np.isnan(pair_corr)] = 1.0
+    else:
+        # Ranks are only reusable when both columns are observed on the same rows;
+        # re-rank the remaining pairs on their shared rows
+        n_diag = np.diag(n_obs)
+        rerank = np.flatnonzero(
+            ((pair_n != n_diag[row_idx]) | (pair_n != n_diag[col_idx]))
+            & (col_idx < n_dense)
+        )
+        mask = ~np.isnan(values)
+        for k in rerank:
+            i, j = row_idx[k], col_idx[k]
+            common = mask[:, i] & mask[:, j]
+            corr_ij, p_ij = spearmanr(values[common, i], values[common, j])
+            pair_corr[k], pair_p[k] = corr_ij, p_ij
+
+    return pd.DataFrame({
+        "Variable 1": columns[row_idx],
+        "Variable 2": columns[col_idx],
+        "Correlation": pair_corr,
+        "p-value": pair_p,
+        "Method": method,
+        "Error": errors
+    })
+
+
+@instrument()
 def compute_correlations(
     df: pd.DataFrame,
     include_categorical: bool = False,
     cat_cols: List[str] = None,
     drop_first: bool = True,
-    sort_results: bool = True
+    sort_results: bool = True,
+    engine: str = "matrix",
+    sparse: bool = False
 ) -> pd.DataFrame:
     """
     Compute pairwise correlations (Pearson or Spearman) dynamically based on data type.
@@ -16,8 +108,10 @@ def compute_correlations(
 
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame, pl.DataFrame or pl.LazyFrame
         The input DataFrame containing numeric and/or categorical columns.
+        Polars input is projected and dummy-encoded in one lazy query and
+        requires the "matrix" engine.
     include_categorical : bool, optional
         Whether to one-hot encode categorical variables before computing correlations.
         If True, Spearman correlation is used. If False, Pearson correlation is used.
@@ -28,6 +122,14 @@ def compute_correlations(
     sort_results : bool, optional
         Whether to sort the results by absolute correlation value in descending order.
         Default is True.
+    engine : str, optional
+        "matrix" computes the full correlation and p-value matrices in one pass
+        with pairwise-complete NaN handling via mask matrices. "pairwise" runs
+        scipy's pearsonr/spearmanr once per column pair. Default is "matrix".
+    sparse : bool, optional
+        If include_categorical=True, encode cat_cols as sparse CSR indicators and
+        correlate them without building the dense dummy matrix. Only supported
+        by the "matrix" engine. Default is False.
 
     Returns
     -------
@@ -40,21 +142,85 @@ def compute_correlations(
         - "Method" (Pearson or Spearman)
         - "Error" (if any issues occur)
     """
+    if sparse and engine != "matrix":
+        raise ValueError("sparse=True is only supported with engine='matrix'.")
+    if is_polars(df):
+        if engine != "matrix":
+            raise ValueError(f"Unsupported engine for Polars input: {engine}. Must be 'matrix'.")
+        results_df = _compute_correlations_polars(df, include_categorical, cat_cols, drop_first, sparse)
+        return _sort_correlations(results_df) if sort_results else results_df
+
     # Step 1: Handle categorical variables if include_categorical=True
+    indicators, indicator_names = None, []
     if include_categorical:
         if len(cat_cols) > 0:
-            df = pd.get_dummies(df, columns=cat_cols, drop_first=drop_first)
+            if sparse:
+                indicators, indicator_names = sparse_one_hot(df, cat_cols, drop_first=drop_first)
+                df = df.drop(columns=cat_cols)
+            else:
+                df = pd.get_dummies(df, columns=cat_cols, drop_first=drop_first, dtype=float)
         method = "spearman"
     else:
         method = "pearson"
 
     # Step 2: Keep only numeric columns
     numeric_cols = df.select_dtypes(include=[np.number]).columns
-    if len(numeric_cols) < 2:
+    if len(numeric_cols) + len(indicator_names) < 2:
         raise ValueError("Not enough numeric columns to compute correlations.")
     df = df[numeric_cols]
 
     # Step 3: Compute correlations
+    if engine == "matrix":
+        results_df = _compute_correlations_matrix(df, method, indicators, indicator_names)
+    elif engine == "pairwise":
+        results_df = _compute_correlations_pairwise(df, method)
+    else:
+        raise ValueError(f"Unsupported engine: {engine}. Must be 'matrix' or 'pairwise'.")
+
+    # Step 4: Sort results by absolute correlation (if requested)
+    if sort_results:
+        return _sort_correlations(results_df)
+
+    return results_df.reset_index(drop=True)
+
+
+def _sort_correlations(results_df: pd.DataFrame) -> pd.DataFrame:
+    results_df["abs_correlation"] = results_df["Correlation"].abs()
+    results_df.sort_values(by="p-value", ascending=True, inplace=True)
+    results_df.drop(columns=["abs_correlation"], inplace=True)
+    return results_df.reset_index(drop=True)
+
+
+def _compute_correlations_polars(
+    df,
+    include_categorical: bool,
+    cat_cols: Optional[List[str]],
+    drop_first: bool,
+    sparse: bool
+) -> pd.DataFrame:
+    """
+    compute_correlations for a Polars DataFrame/LazyFrame: one lazy query
+    projects the numeric columns and encodes cat_cols (dense dummies or sparse
+    codes), and only that float design matrix is collected for the matrix engine.
+    """
+    encode = list(cat_cols or []) if include_categorical else []
+    numeric_cols, _, _ = split_columns(df)
+    numeric_cols = [c for c in numeric_cols if c not in encode]
+    values, names, indicators, indicator_names = design_matrix(
+        df, numeric_cols, encode, drop_first=drop_first, sparse=sparse
+    )
+    if len(names) + len(indicator_names) < 2:
+        raise ValueError("Not enough numeric columns to compute correlations.")
+    method = "spearman" if include_categorical else "pearson"
+    return _compute_correlations_matrix(
+        pd.DataFrame(values, columns=names, copy=False), method, indicators, indicator_names
+    ).reset_index(drop=True)
+
+
+def _compute_correlations_pairwise(df: pd.DataFrame, method: str) -> pd.DataFrame:
+    """
+    Reference engine behind compute_correlations: runs scipy once per column pair.
+    """
     results = []
     for i, col1 in enumerate(df.columns):
         for col2 in df.columns[i + 1:]:  # Avoid duplicate pairs (A, B) and (B, A)
@@ -89,13 +255,4 @@ def compute_correlations(
                     "Error": str(e)
                 })
 
-    # Step 4: Create a results DataFrame
-    results_df = pd.DataFrame(results)
-
-    # Step 5: Sort results by absolute correlation (if requested)
-    if sort_results:
-        results_df["abs_correlation"] = results_df["Correlation"].abs()
-        results_df.sort_values(by="p-value", ascending=True, inplace=True)
-        results_df.drop(columns=["abs_correlation"], inplace=True)
-
-    return results_df.reset_index(drop=True)
+    return pd.DataFrame(results)
@@ -1,6 +1,14 @@
 import pandas as pd
 
+from src.data_analysis.df_polars_backend import is_polars, schema_attributes
+from src.instrumentation import instrument
+
+@instrument()
 def get_data_attributes(df):
+    # Polars frames are classified from their schema without reading any rows
+    if is_polars(df):
+        return schema_attributes(df)
+
     # Initialize arrays to hold column names
     categories = {
         'categorical': [],
@@ -18,6 +26,10 @@ def get_data_attributes(df):
             categories['categorical'].append(column)
         elif pd.api.types.is_object_dtype(dtype):  # Treat booleans as categorical
             categories['categorical'].append(column)
+        elif isinstance(dtype, pd.CategoricalDtype):  # Preserved by Parquet/Feather
+            categories['categorical'].append(column)
+        elif pd.api.types.is_string_dtype(dtype):  # pandas' str dtype (the default text dtype in pandas 3)
+            categories['categorical'].append(column)
         elif pd.api.types.is_float_dtype(dtype):
             categories['numerical'].append(column)
         else:
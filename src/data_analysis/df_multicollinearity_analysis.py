@@ -1,13 +1,27 @@
 import pandas as pd
 import numpy as np
+from scipy import linalg
 from statsmodels.stats.outliers_influence import variance_inflation_factor
 import statsmodels.api as sm
+from typing import List, Tuple
+from src.data_analysis.df_polars_backend import design_matrix, is_polars, split_columns
+from src.data_analysis.df_sparse_encoding import pairwise_correlation_matrix, sparse_one_hot
+from src.instrumentation import instrument
 
+# Relative size of a pivoted-QR diagonal entry below which a column of the
+# correlation matrix is an exact linear combination of the others (VIF = inf)
+ALIAS_TOLERANCE: float = 1e-10
 
+
+@instrument()
 def compute_vif(data: pd.DataFrame, drop_constant: bool = True, drop_first: bool = True) -> pd.DataFrame:
     """
     Compute Variance Inflation Factor (VIF) for all numeric and one-hot encoded features.
+    Polars DataFrames/LazyFrames are encoded and filtered in one lazy query first.
     """
+    if is_polars(data):
+        data = _prepare_vif_frame(data, drop_first=drop_first)
+
     # Step 1: Make a copy of the data
     df = data.copy()
     # print("Initial DataFrame:")
@@ -68,34 +82,117 @@ def compute_vif(data: pd.DataFrame, drop_constant: bool = True, drop_first: bool
 
     return vif_df
 
-def compute_vif_vectorized(data: pd.DataFrame, drop_first: bool = True) -> pd.DataFrame:
+def _prepare_vif_frame(data: pd.DataFrame, drop_first: bool = True) -> pd.DataFrame:
     """
-    Compute Variance Inflation Factor (VIF) for all numeric and one-hot encoded features
-    using a vectorized approach via the inverse of the correlation matrix.
-
-    Parameters:
-        data (pd.DataFrame): The input DataFrame.
-        drop_first (bool): Whether to drop the first category during one-hot encoding.
-
-    Returns:
-        pd.DataFrame: A DataFrame with two columns: 'Feature' and 'VIF', sorted by VIF descending.
+    One-hot encode categorical columns, coerce everything to float and drop
+    rows containing NaN or infinite values.
     """
-    # Step 1: Copy the data
+    if is_polars(data):
+        values, names, _, _ = _polars_vif_design(data, drop_first=drop_first, sparse=False)
+        return pd.DataFrame(values, columns=names, copy=False)
+
     df = data.copy()
 
-    # Step 2: One-hot encode categorical variables (if any)
     cat_cols = df.select_dtypes(include=["object", "category", "bool"]).columns
     if len(cat_cols) > 0:
         df = pd.get_dummies(df, columns=cat_cols, drop_first=drop_first)
 
-    # Step 3: Ensure all features are numeric and handle non-numeric entries
     df = df.apply(pd.to_numeric, errors='coerce')
-
-    # Step 4: Replace infinite values and drop rows with NaNs
     df = df.replace([np.inf, -np.inf], np.nan).dropna()
 
-    # Ensure all values are floats (this helps with numerical stability)
-    df = df.astype(float)
+    return df.astype(float)
+
+def _polars_vif_design(data, drop_first: bool, sparse: bool) -> tuple:
+    """
+    The _prepare_vif_frame design for a Polars frame, built by one lazy query:
+    non-categorical columns as floats (in column order), dummies appended
+    after them, rows with a missing or infinite value dropped.
+    """
+    _, cat_cols, _ = split_columns(data)
+    value_cols = [c for c in data.lazy().collect_schema().names() if c not in cat_cols]
+    return design_matrix(data, value_cols, cat_cols, drop_first=drop_first, sparse=sparse, complete_rows=True)
+
+def _invert_correlation(corr_matrix: np.ndarray) -> np.ndarray:
+    """
+    Invert a correlation matrix, falling back to the pseudo-inverse if it is singular.
+    """
+    try:
+        return np.linalg.inv(corr_matrix)
+    except np.linalg.LinAlgError:
+        return np.linalg.pinv(corr_matrix)
+
+def _aliased_columns(corr_matrix: np.ndarray) -> np.ndarray:
+    """
+    Positions of the columns that make a correlation matrix rank deficient,
+    found by QR with column pivoting (the pivots past the numerical rank).
+    """
+    if corr_matrix.size == 0:
+        return np.array([], dtype=int)
+    _, r, pivots = linalg.qr(corr_matrix, mode="economic", pivoting=True)
+    diagonal = np.abs(np.diag(r))
+    rank = int(np.sum(diagonal > ALIAS_TOLERANCE * diagonal[0]))
+    return pivots[rank:]
+
+def _vif_correlation(
+    data: pd.DataFrame,
+    drop_first: bool = True,
+    sparse: bool = False
+) -> Tuple[List[str], np.ndarray]:
+    """
+    Build the feature names and correlation matrix used for VIF.
+
+    With sparse=True, categorical columns are encoded as CSR indicators and the
+    correlation matrix is assembled from sparse-dense products, so the dense
+    one-hot design matrix is never materialized.
+    """
+    if is_polars(data):
+        values, names, indicators, indicator_names = _polars_vif_design(data, drop_first=drop_first, sparse=sparse)
+        corr_matrix, _ = pairwise_correlation_matrix(values, indicators)
+        return names + indicator_names, corr_matrix
+
+    if not sparse:
+        df = _prepare_vif_frame(data, drop_first=drop_first)
+        corr_matrix, _ = pairwise_correlation_matrix(df.to_numpy())
+        return list(df.columns), corr_matrix
+
+    cat_cols = list(data.select_dtypes(include=["object", "category", "bool"]).columns)
+    numeric = data.drop(columns=cat_cols).apply(pd.to_numeric, errors='coerce')
+    numeric = numeric.replace([np.inf, -np.inf], np.nan).astype(float)
+    keep_rows = numeric.notna().all(axis=1).to_numpy()
+
+    indicators, indicator_names = sparse_one_hot(data.loc[keep_rows], cat_cols, drop_first=drop_first)
+    corr_matrix, _ = pairwise_correlation_matrix(numeric.to_numpy()[keep_rows], indicators)
+    return list(numeric.columns) + indicator_names, corr_matrix
+
+@instrument()
+def compute_vif_vectorized(
+    data: pd.DataFrame,
+    drop_first: bool = True,
+    sparse: bool = False
+) -> pd.DataFrame:
+    """
+    Compute Variance Inflation Factor (VIF) for all numeric and one-hot encoded features
+    using a vectorized approach via the inverse of the correlation matrix.
+
+    Parameters:
+        data (pd.DataFrame, pl.DataFrame or pl.LazyFrame): The input DataFrame. Polars
+            input is projected, dummy-encoded and filtered in one lazy query.
+        drop_first (bool): Whether to drop the first category during one-hot encoding.
+        sparse (bool): Encode categorical columns as sparse indicators and build the
+            correlation matrix without the dense one-hot design matrix.
+
+    Returns:
+        pd.DataFrame: A DataFrame with two columns: 'Feature' and 'VIF', sorted by VIF descending.
+    """
+    if sparse:
+        features, corr_values = _vif_correlation(data, drop_first=drop_first, sparse=True)
+        return pd.DataFrame({
+            "Feature": features,
+            "VIF": np.diag(_invert_correlation(corr_values))
+        }).sort_values(by="VIF", ascending=False).reset_index(drop=True)
+
+    # Steps 1-4: Copy, one-hot encode, coerce to float and drop rows with NaN/inf
+    df = _prepare_vif_frame(data, drop_first=drop_first)
 
     # (Optional) If you were previously adding a constant for regression,
     # you typically do NOT include the constant when computing VIF.
@@ -106,10 +203,7 @@ def compute_vif_vectorized(data: pd.DataFrame, drop_first: bool = True) -> pd.Da
 
     # Step 6: Invert the correlation matrix
     # If the matrix is nearly singular, use the pseudo-inverse
-    try:
-        inv_corr_matrix = np.linalg.inv(corr_matrix.values)
-    except np.linalg.LinAlgError:
-        inv_corr_matrix = np.linalg.pinv(corr_matrix.values)
+    inv_corr_matrix = _invert_correlation(corr_matrix.values)
 
     # Step 7: Extract VIFs from the diagonal of the inverse correlation matrix
     vif_values = np.diag(inv_corr_matrix)
@@ -121,3 +215,103 @@ def compute_vif_vectorized(data: pd.DataFrame, drop_first: bool = True) -> pd.Da
     }).sort_values(by="VIF", ascending=False).reset_index(drop=True)
 
     return vif_df
+
+@instrument()
+def prune_vif(
+    data: pd.DataFrame,
+    threshold: float = 10.0,
+    drop_first: bool = True,
+    refresh_every: int = 100,
+    sparse: bool = False
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Iteratively drop the feature with the highest VIF until every remaining
+    feature has a VIF below the threshold.
+
+    The inverse correlation matrix is inverted once. After each removal it is
+    downdated in place with the Schur complement
+
+        P' = P - P[:, k] P[k, :] / P[k, k]
+
+    which costs O(p^2) per step instead of a fresh O(p^3) inversion. Columns
+    that are exact linear combinations of others (e.g. SEASON next to MONTH
+    dummies) have an infinite VIF; they are found by a rank-revealing QR and
+    dropped first, so the matrix that is inverted is full rank.
+
+    Parameters:
+        data (pd.DataFrame, pl.DataFrame or pl.LazyFrame): The input DataFrame.
+        threshold (float): Stop once the largest VIF is below this value.
+        drop_first (bool): Whether to drop the first category during one-hot encoding.
+        refresh_every (int): Re-invert the remaining correlation matrix after this many
+            downdates to bound accumulated floating-point error.
+        sparse (bool): Encode categorical columns as sparse indicators and build the
+            correlation matrix without the dense one-hot design matrix.
+
+    Returns:
+        Tuple[pd.DataFrame, pd.DataFrame]:
+            - The pruning trace with columns 'Step', 'Feature', 'VIF' and
+              'Remaining Features', in the order features were dropped.
+            - The kept features with columns 'Feature' and 'VIF', sorted by VIF descending.
+    """
+    # Step 1: One-hot encode, drop rows with NaN/inf and correlate
+    features, full_corr = _vif_correlation(data, drop_first=drop_first, sparse=sparse)
+    features = np.asarray(features, dtype=object)
+
+    trace = []
+
+    # Step 2: Constant columns have no defined correlation, so drop them up front
+    constant = np.isnan(np.diag(full_corr))
+    active = ~constant
+    for feature in features[constant]:
+        trace.append({"Feature": feature, "VIF": np.inf})
+    full_corr = np.where(active[:, None] & active[None, :], full_corr, 0.0)
+
+    # Step 3: Aliased columns (exact collinearity) have an infinite VIF, drop them next
+    aliased = np.flatnonzero(active)[_aliased_columns(full_corr[np.ix_(active, active)])]
+    for k in aliased:
+        trace.append({"Feature": features[k], "VIF": np.inf})
+    active[aliased] = False
+
+    # Step 4: Invert the (now full rank) correlation matrix of the remaining columns once
+    inv_corr = np.zeros((len(features), len(features)))
+    inv_corr[np.ix_(active, active)] = _invert_correlation(full_corr[np.ix_(active, active)])
+
+    # Step 5: Drop the worst feature and downdate the inverse until all VIFs pass.
+    # A VIF is at least 1, so a non-finite or smaller value is numerical breakdown
+    # and counts as infinite
+    downdates = 0
+    while active.any():
+        active_idx = np.flatnonzero(active)
+        vifs = np.diag(inv_corr)[active_idx]
+        vifs = np.where(np.isfinite(vifs) & (vifs >= 1.0 - 1e-6), vifs, np.inf)
+        worst = np.argmax(vifs)
+        if vifs[worst] < threshold:
+            break
+
+        k = active_idx[worst]
+        trace.append({"Feature": features[k], "VIF": vifs[worst]})
+        active[k] = False
+        remaining = np.flatnonzero(active)
+
+        if downdates + 1 >= refresh_every or not np.isfinite(vifs[worst]):
+            # Periodic (or forced, for singular pivots) exact re-inversion
+            sub_inv = _invert_correlation(full_corr[np.ix_(remaining, remaining)])
+            downdates = 0
+        else:
+            pivot_col = inv_corr[remaining, k]
+            sub_inv = inv_corr[np.ix_(remaining, remaining)] - np.outer(pivot_col, pivot_col) / inv_corr[k, k]
+            downdates += 1
+        inv_corr[np.ix_(remaining, remaining)] = sub_inv
+
+    # Step 6: Format the trace and the surviving features
+    trace_df = pd.DataFrame(trace, columns=["Feature", "VIF"])
+    trace_df.insert(0, "Step", np.arange(1, len(trace_df) + 1))
+    trace_df["Remaining Features"] = len(features) - trace_df["Step"]
+
+    kept_idx = np.flatnonzero(active)
+    kept_df = pd.DataFrame({
+        "Feature": features[kept_idx],
+        "VIF": np.diag(inv_corr)[kept_idx]
+    }).sort_values(by="VIF", ascending=False).reset_index(drop=True)
+
+    return trace_df, kept_df
@@ -0,0 +1,264 @@
+import numpy as np
+from scipy import sparse as sp
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from src.data_analysis.df_sparse_encoding import _indicators_from_codes
+
+# Lazy backend for the data_analysis functions: each function builds one
+# Polars query (projection, NaN/null and infinity filtering, dummy encoding,
+# group aggregations), runs it on Polars' thread pool and returns only the
+# small arrays the statistics are computed from. polars is imported on first
+# use, so pandas-only callers never pay for it.
+
+
+def is_polars(data: Any) -> bool:
+    """Whether data is a Polars DataFrame or LazyFrame (checked without importing polars)."""
+    return type(data).__module__.startswith("polars.") and hasattr(data, "lazy")
+
+
+def _is_categorical(dtype: Any) -> bool:
+    """Dtypes the pandas code treats as categorical (object, category and bool)."""
+    import polars as pl
+    return dtype in (pl.String, pl.Boolean, pl.Object) or isinstance(dtype, (pl.Categorical, pl.Enum))
+
+
+def _float_expr(name: str, dtype: Any) -> Any:
+    """Column as Float64 with NaN turned into null, so NaN and null both mean missing."""
+    import polars as pl
+    expr = pl.col(name)
+    if dtype.is_temporal():
+        expr = expr.to_physical()
+    return expr.cast(pl.Float64).fill_nan(None)
+
+
+def schema_attributes(data: Any) -> Dict[str, List[str]]:
+    """
+    get_data_attributes for Polars input, read from the schema alone (no rows are scanned).
+
+    Parameters
+    ----------
+    data : pl.DataFrame or pl.LazyFrame
+        The input frame.
+
+    Returns
+    -------
+    dict
+        Column names under "categorical", "numerical", "miscellaneous" and
+        "boolean", classified like the pandas dtypes they convert to.
+    """
+    import polars as pl
+    categories = {'categorical': [], 'numerical': [], 'miscellaneous': [], 'boolean': []}
+    for column, dtype in data.lazy().collect_schema().items():
+        if dtype == pl.Boolean:
+            categories['boolean'].append(column)
+            categories['categorical'].append(column)
+        elif _is_categorical(dtype):
+            categories['categorical'].append(column)
+        elif dtype.is_float():
+            categories['numerical'].append(column)
+        else:
+            categories['miscellaneous'].append(column)
+    return categories
+
+
+def split_columns(data: Any) -> Tuple[List[str], List[str], List[str]]:
+    """
+    Column names of a Polars frame by role.
+
+    Returns
+    -------
+    tuple of list of str
+        - numeric : integer, float and decimal columns (pandas select_dtypes(number))
+        - categorical : string, categorical, enum and boolean columns
+        - other : everything else (dates, durations, nested types)
+    """
+    numeric, categorical, other = [], [], []
+    for column, dtype in data.lazy().collect_schema().items():
+        if _is_categorical(dtype):
+            categorical.append(column)
+        elif dtype.is_numeric():
+            numeric.append(column)
+        else:
+            other.append(column)
+    return numeric, categorical, other
+
+
+def category_levels(data: Any, cat_cols: Sequence[str]) -> Dict[str, List[Any]]:
+    """
+    Dummy levels per column in get_dummies order: all categories of an Enum,
+    otherwise the sorted observed values. One small query for all columns.
+    """
+    import polars as pl
+    lf = data.lazy()
+    schema = lf.collect_schema()
+    levels: Dict[str, List[Any]] = {}
+    observed = [c for c in cat_cols if not isinstance(schema[c], pl.Enum)]
+    if observed:
+        row = lf.select([pl.col(c).drop_nulls().unique().sort().implode() for c in observed]).collect()
+        levels.update({c: row[c][0].to_list() for c in observed})
+    for c in cat_cols:
+        if isinstance(schema[c], pl.Enum):
+            levels[c] = schema[c].categories.to_list()
+    return {c: levels[c] for c in cat_cols}
+
+
+def design_matrix(
+    data: Any,
+    numeric_cols: Sequence[str],
+    cat_cols: Sequence[str] = (),
+    drop_first: bool = True,
+    sparse: bool = False,
+    complete_rows: bool = False
+) -> Tuple[np.ndarray, List[str], Optional[sp.csr_matrix], List[str]]:
+    """
+    Materialize only the float design matrix an analysis needs, in one query.
+
+    The query projects the numeric columns (cast to float, NaN as missing),
+    encodes the categorical columns as dummy columns (or as integer codes
+    for a sparse indicator matrix) and optionally drops rows with a missing
+    or infinite numeric value, then collects once.
+
+    Parameters
+    ----------
+    data : pl.DataFrame or pl.LazyFrame
+        The input frame.
+    numeric_cols : sequence of str
+        Columns to keep as floats.
+    cat_cols : sequence of str, optional
+        Columns to one-hot encode, named and ordered as pd.get_dummies would.
+    drop_first : bool, optional
+        Whether to drop the first level of each categorical column. Default is True.
+    sparse : bool, optional
+        Return the dummies as a CSR matrix instead of dense columns. Default is False.
+    complete_rows : bool, optional
+        Drop rows with a missing or infinite numeric value. Default is False.
+
+    Returns
+    -------
+    tuple
+        - values : (n_rows, n_dense) float array, NaN where missing
+        - names : dense column names (numeric columns, then dense dummies)
+        - indicators : (n_rows, n_dummies) CSR matrix, or None unless sparse
+        - indicator_names : the sparse dummy names
+    """
+    import polars as pl
+    lf = data.lazy()
+    schema = lf.collect_schema()
+    levels = category_levels(lf, cat_cols)
+    first_kept = 1 if drop_first else 0
+
+    exprs = [_float_expr(c, schema[c]).alias(c) for c in numeric_cols]
+    names = list(numeric_cols)
+    for j, c in enumerate(cat_cols):
+        if sparse:
+            exprs.append(
+                pl.col(c).replace_strict(levels[c], list(range(len(levels[c]))), default=-1, return_dtype=pl.Int64)
+                .fill_null(-1).alias(f"__code_{j}")
+            )
+        else:
+            for level in levels[c][first_kept:]:
+                exprs.append((pl.col(c) == level).fill_null(False).cast(pl.Float64).alias(f"{c}_{level}"))
+                names.append(f"{c}_{level}")
+
+    query = lf.select(exprs)
+    if complete_rows and numeric_cols:
+        query = query.filter(pl.all_horizontal([pl.col(c).is_finite() for c in numeric_cols]))
+    frame = query.collect()
+
+    values = frame.select(names).to_numpy() if names else np.empty((frame.height, 0))
+    if not sparse:
+        return values.astype(float, copy=False), names, None, []
+    codes = [frame[f"__code_{j}"].to_numpy() for j in range(len(cat_cols))]
+    indicators, indicator_names = _indicators_from_codes(
+        codes, [levels[c] for c in cat_cols], cat_cols, frame.height, drop_first=drop_first
+    )
+    return values.astype(float, copy=False), names, indicators, indicator_names
+
+
+def group_statistics(
+    data: Any,
+    categorical_cols: Sequence[str],
+    quantitative_cols: Sequence[str],
+    ranks: bool = False
+) -> Iterator[Tuple[str, np.ndarray, np.ndarray, np.ndarray, np.ndarray, Optional[Tuple[np.ndarray, np.ndarray]]]]:
+    """
+    Per-group count, mean and centered sum of squares of every quantitative
+    column, for every categorical column, as Polars group-by aggregations.
+
+    One aggregation query per categorical column (plus, with ranks, the
+    Kruskal-Wallis rank sums and tie corrections) is collected with
+    collect_all, so the queries share the scan and run in parallel. Groups
+    are in order of first appearance, as with pd.factorize; rows with a
+    missing category are ignored.
+
+    Parameters
+    ----------
+    data : pl.DataFrame or pl.LazyFrame
+        The input frame.
+    categorical_cols : sequence of str
+        Grouping columns.
+    quantitative_cols : sequence of str
+        Numeric columns to summarize.
+    ranks : bool, optional
+        Whether to also compute rank sums and tie corrections. Default is False.
+
+    Yields
+    ------
+    tuple
+        (categorical column, group values, counts, means, sum of squares,
+        (rank sums, tie correction) or None); the arrays have shape
+        (n_groups, n_quant_cols) and the tie correction (n_quant_cols,),
+        matching _group_moments and _group_rank_sums.
+    """
+    import polars as pl
+    lf = data.lazy()
+    schema = lf.collect_schema()
+    quant = [f"__q{j}" for j in range(len(quantitative_cols))]
+    base = lf.select(
+        [pl.col(c) for c in dict.fromkeys(categorical_cols)]
+        + [_float_expr(q, schema[q]).alias(alias) for q, alias in zip(quantitative_cols, quant)]
+    )
+
+    queries = []
+    for cat_col in categorical_cols:
+        known = base.filter(pl.col(cat_col).is_not_null())
+        aggregations = []
+        for q in quant:
+            aggregations += [
+                pl.col(q).count().alias(f"{q}_count"),
+                pl.col(q).mean().alias(f"{q}_mean"),
+                ((pl.col(q) - pl.col(q).mean()) ** 2).sum().alias(f"{q}_sum_sq"),
+            ]
+        if ranks:
+            known = known.with_columns([pl.col(q).rank("average").alias(f"{q}_rank") for q in quant])
+            aggregations += [pl.col(f"{q}_rank").sum().alias(f"{q}_rank_sum") for q in quant]
+            # Tie sizes t per column; sum(t ** 3 - t) = sum(t ** 3) - n
+            ties = [
+                pl.col(q).drop_nulls().value_counts().struct.field("count").cast(pl.Float64).pow(3).sum()
+                .alias(f"{q}_cubes")
+                for q in quant
+            ] + [pl.col(q).count().alias(f"{q}_n") for q in quant]
+            queries.append(known.select(ties))
+        queries.append(known.group_by(cat_col, maintain_order=True).agg(aggregations))
+
+    results = pl.collect_all(queries)
+    step = 2 if ranks else 1
+    for i, cat_col in enumerate(categorical_cols):
+        groups = results[i * step + step - 1]
+
+        def block(suffix: str) -> np.ndarray:
+            columns = [f"{q}_{suffix}" for q in quant]
+            return groups.select(columns).to_numpy().astype(float).reshape(groups.height, len(quant))
+
+        counts, sum_sq = block("count"), block("sum_sq")
+        means = np.where(counts > 0, block("mean"), np.nan)
+        rank_stats = None
+        if ranks:
+            ties = results[i * step]
+            n_obs = np.array([ties[f"{q}_n"][0] for q in quant], dtype=float)
+            tie_sums = np.array([ties[f"{q}_cubes"][0] for q in quant], dtype=float) - n_obs
+            denominator = n_obs ** 3 - n_obs
+            with np.errstate(invalid="ignore", divide="ignore"):
+                tie_correction = np.where(denominator > 0, 1.0 - tie_sums / denominator, 0.0)
+            rank_stats = (np.nan_to_num(block("rank_sum")), tie_correction)
+        yield cat_col, groups[cat_col].to_numpy(), counts, means, np.nan_to_num(sum_sq), rank_stats
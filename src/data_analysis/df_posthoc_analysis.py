@@ -0,0 +1,269 @@
+import pandas as pd
+from scipy import stats
+import numpy as np
+import logging
+from typing import List, Optional, Sequence
+
+from joblib import Parallel, delayed
+
+from src.data_analysis.df_ttest_anova_analysis import _group_moments, _group_rank_sums
+from src.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+POSTHOC_TESTS: List[str] = ["tukey", "dunn", "welch"]
+CORRECTIONS: List[Optional[str]] = ["fdr_bh", "holm", "bonferroni", None]
+
+
+@instrument()
+def compute_group_summaries(
+    df: pd.DataFrame,
+    categorical_cols: list,
+    quantitative_cols: list
+) -> pd.DataFrame:
+    """
+    Per-group sufficient statistics for every categorical x quantitative pair.
+
+    Everything the post-hoc tests need is computed here in one pass per
+    categorical column (reusing the ANOVA/Kruskal helpers), so the test
+    battery itself never touches row-level data and the summaries can be
+    saved and re-tested later.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The dataset containing both categorical and quantitative columns.
+    categorical_cols : list
+        Categorical column names.
+    quantitative_cols : list
+        Numeric column names.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per (categorical variable, category, quantitative variable) with
+        columns "Count", "Mean", "Sum Sq" (centered), "Rank Sum" (ranks over all
+        rows with a known category) and "Tie Correction" (Kruskal-Wallis factor,
+        constant within a categorical x quantitative pair).
+    """
+    values = df[quantitative_cols].to_numpy(dtype=float, na_value=np.nan)
+    frames = []
+    for cat_col in categorical_cols:
+        codes, uniques = pd.factorize(df[cat_col], sort=True)
+        n_groups = len(uniques)
+        counts, means, sum_sq = _group_moments(codes, n_groups, values)
+        rank_sums, tie_correction = _group_rank_sums(codes, n_groups, values)
+        frames.append(pd.DataFrame({
+            "Categorical Variable": cat_col,
+            "Category": np.repeat(np.asarray(uniques, dtype=object), len(quantitative_cols)),
+            "Quantitative Variable": np.tile(np.asarray(quantitative_cols, dtype=object), n_groups),
+            "Count": counts.ravel().astype(int),
+            "Mean": means.ravel(),
+            "Sum Sq": sum_sq.ravel(),
+            "Rank Sum": rank_sums.ravel(),
+            "Tie Correction": np.tile(tie_correction, n_groups),
+        }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@instrument()
+def adjust_pvalues(p_values: np.ndarray, method: Optional[str] = "fdr_bh") -> np.ndarray:
+    """
+    Multiple-testing correction, ignoring NaN p-values.
+
+    Parameters
+    ----------
+    p_values : np.ndarray
+        Raw p-values.
+    method : str, optional
+        "fdr_bh" (Benjamini-Hochberg), "holm", "bonferroni" or None.
+
+    Returns
+    -------
+    np.ndarray
+        Adjusted p-values (same order; NaN stays NaN), matching
+        statsmodels.stats.multitest.multipletests.
+    """
+    if method not in CORRECTIONS:
+        raise ValueError(f"Unsupported correction: {method}. Must be one of {CORRECTIONS}.")
+    p_values = np.asarray(p_values, dtype=float)
+    adjusted = p_values.copy()
+    valid = ~np.isnan(p_values)
+    p = p_values[valid]
+    m = len(p)
+    if method is None or m == 0:
+        return adjusted
+
+    if method == "bonferroni":
+        result = p * m
+    else:
+        order = np.argsort(p, kind="mergesort")
+        ranked = p[order]
+        if method == "holm":
+            # Step-down: running maximum of (m - i) * p_(i)
+            stepped = np.maximum.accumulate((m - np.arange(m)) * ranked)
+        else:
+            # Step-up: running minimum from the largest p of m / i * p_(i)
+            stepped = np.minimum.accumulate((m / np.arange(1, m + 1) * ranked)[::-1])[::-1]
+        result = np.empty(m)
+        result[order] = stepped
+    adjusted[valid] = np.minimum(result, 1.0)
+    return adjusted
+
+
+def _pair_tests(
+    cat_col: str,
+    quant_col: str,
+    summary: pd.DataFrame,
+    tests: Sequence[str]
+) -> pd.DataFrame:
+    """All pairwise comparisons of one categorical x quantitative pair, from its group summaries."""
+    summary = summary[summary["Count"] > 0]
+    categories = summary["Category"].to_numpy()
+    counts = summary["Count"].to_numpy(dtype=float)
+    means = summary["Mean"].to_numpy()
+    sum_sq = summary["Sum Sq"].to_numpy()
+    n_groups = len(categories)
+    if n_groups < 2:
+        return pd.DataFrame()
+
+    first, second = np.triu_indices(n_groups, k=1)
+    n1, n2 = counts[first], counts[second]
+    mean_diff = means[second] - means[first]
+    n_total = counts.sum()
+    frames = []
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for test in tests:
+            if test == "tukey":
+                # Tukey-Kramer: pooled within-group variance, studentized range distribution
+                df_within = n_total - n_groups
+                mse = sum_sq.sum() / df_within
+                statistic = np.abs(mean_diff) / np.sqrt(mse / 2.0 * (1.0 / n1 + 1.0 / n2))
+                p_values = (
+                    stats.studentized_range.sf(statistic, n_groups, df_within)
+                    if df_within > 0 else np.full(len(first), np.nan)
+                )
+            elif test == "welch":
+                var1, var2 = sum_sq[first] / (n1 - 1), sum_sq[second] / (n2 - 1)
+                se1, se2 = var1 / n1, var2 / n2
+                statistic = mean_diff / np.sqrt(se1 + se2)
+                dof = (se1 + se2) ** 2 / (se1 ** 2 / (n1 - 1) + se2 ** 2 / (n2 - 1))
+                p_values = 2 * stats.t.sf(np.abs(statistic), dof)
+                statistic[(n1 < 2) | (n2 < 2)] = np.nan
+                p_values[(n1 < 2) | (n2 < 2)] = np.nan
+            else:
+                # Dunn: mean rank differences with the tie-corrected Kruskal-Wallis variance
+                mean_ranks = summary["Rank Sum"].to_numpy() / counts
+                tie_correction = summary["Tie Correction"].iloc[0]
+                variance = tie_correction * n_total * (n_total + 1) / 12.0 * (1.0 / n1 + 1.0 / n2)
+                statistic = (mean_ranks[second] - mean_ranks[first]) / np.sqrt(variance)
+                p_values = 2 * stats.norm.sf(np.abs(statistic))
+
+            frames.append(pd.DataFrame({
+                "Test": test,
+                "Categorical Variable": cat_col,
+                "Quantitative Variable": quant_col,
+                "Group 1": categories[first],
+                "Group 2": categories[second],
+                "Mean Diff": mean_diff,
+                "Statistic": statistic,
+                "p-value": p_values,
+            }))
+    return pd.concat(frames, ignore_index=True)
+
+
+@instrument()
+def run_posthoc_tests(
+    df: Optional[pd.DataFrame] = None,
+    categorical_cols: Optional[list] = None,
+    quantitative_cols: Optional[list] = None,
+    tests: Sequence[str] = ("tukey", "dunn", "welch"),
+    correction: Optional[str] = "fdr_bh",
+    alpha: float = 0.05,
+    summaries: Optional[pd.DataFrame] = None,
+    n_jobs: int = -1,
+    sort_results: bool = True
+) -> pd.DataFrame:
+    """
+    Pairwise post-hoc comparisons for every categorical x quantitative pair,
+    with multiple-testing correction across the whole battery.
+
+    The tests work from group summaries (see compute_group_summaries), so
+    the data is scanned once regardless of how many pairs are compared.
+    Categorical x quantitative pairs are independent and are split across a
+    process pool, one worker per core by default. The Tukey p-values
+    (studentized range integrals, roughly 10 ms per comparison) dominate the
+    cost: a 4 categorical x 4 quantitative sweep on log_data_fe has about
+    840 Tukey comparisons and takes 8-18 s on a single worker, against
+    under 0.2 s for Dunn and Welch alone.
+
+    Parameters
+    ----------
+    df : pd.DataFrame, optional
+        The dataset; not needed when summaries are given.
+    categorical_cols : list, optional
+        Categorical columns to test. Default is all in summaries.
+    quantitative_cols : list, optional
+        Quantitative columns to test. Default is all in summaries.
+    tests : sequence of str, optional
+        Any of "tukey" (Tukey-Kramer HSD), "dunn" (Dunn's rank test) and
+        "welch" (Welch's t-test). Default is all three.
+    correction : str, optional
+        "fdr_bh", "holm", "bonferroni" or None, applied per test type across
+        every comparison in the battery. Tukey p-values are already
+        simultaneous within a pair, so correcting them again is conservative.
+        Default is "fdr_bh".
+    alpha : float, optional
+        Significance level for the "Reject" column. Default is 0.05.
+    summaries : pd.DataFrame, optional
+        Precomputed compute_group_summaries output.
+    n_jobs : int, optional
+        Worker processes; -1 uses every core. Default is -1.
+    sort_results : bool, optional
+        Whether to sort by adjusted p-value ascending. Default is True.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns "Test", "Categorical Variable", "Quantitative Variable",
+        "Group 1", "Group 2", "Mean Diff" (Group 2 minus Group 1),
+        "Statistic", "p-value", "p-adj" and "Reject".
+    """
+    unknown = [t for t in tests if t not in POSTHOC_TESTS]
+    if unknown:
+        raise ValueError(f"Unsupported tests: {unknown}. Must be among {POSTHOC_TESTS}.")
+    if correction not in CORRECTIONS:
+        raise ValueError(f"Unsupported correction: {correction}. Must be one of {CORRECTIONS}.")
+
+    if summaries is None:
+        if df is None or categorical_cols is None or quantitative_cols is None:
+            raise ValueError("Pass either summaries or df with categorical_cols and quantitative_cols.")
+        summaries = compute_group_summaries(df, categorical_cols, quantitative_cols)
+    categorical_cols = categorical_cols or list(summaries["Categorical Variable"].unique())
+    quantitative_cols = quantitative_cols or list(summaries["Quantitative Variable"].unique())
+
+    selected = summaries[
+        summaries["Categorical Variable"].isin(categorical_cols)
+        & summaries["Quantitative Variable"].isin(quantitative_cols)
+    ]
+    groups = selected.groupby(["Categorical Variable", "Quantitative Variable"], sort=False)
+    logger.info(f"Running {list(tests)} over {groups.ngroups} categorical x quantitative pairs on {n_jobs} workers")
+    frames = Parallel(n_jobs=n_jobs)(
+        delayed(_pair_tests)(cat_col, quant_col, summary, list(tests))
+        for (cat_col, quant_col), summary in groups
+    )
+    frames = [frame for frame in frames if not frame.empty]
+    if not frames:
+        return pd.DataFrame(columns=["Test", "Categorical Variable", "Quantitative Variable", "Group 1",
+                                     "Group 2", "Mean Diff", "Statistic", "p-value", "p-adj", "Reject"])
+
+    results_df = pd.concat(frames, ignore_index=True)
+    results_df["p-adj"] = np.nan
+    for test, index in results_df.groupby("Test").groups.items():
+        results_df.loc[index, "p-adj"] = adjust_pvalues(results_df.loc[index, "p-value"].to_numpy(), correction)
+    results_df["Reject"] = results_df["p-adj"] < alpha
+
+    if sort_results:
+        results_df.sort_values("p-adj", ascending=True, na_position="last", inplace=True)
+    return results_df.reset_index(drop=True)
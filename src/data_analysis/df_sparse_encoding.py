@@ -0,0 +1,192 @@
+import warnings
+import pandas as pd
+import numpy as np
+from scipy import sparse as sp
+from typing import Any, List, Optional, Sequence, Tuple
+
+from src.instrumentation import instrument
+
+
+@instrument()
+def sparse_one_hot(
+    df: pd.DataFrame,
+    cat_cols: List[str],
+    drop_first: bool = True
+) -> Tuple[sp.csr_matrix, List[str]]:
+    """
+    One-hot encode categorical columns straight into a scipy CSR matrix.
+
+    Produces the same columns, names and column order as
+    ``pd.get_dummies(df[cat_cols], drop_first=drop_first)`` without ever
+    materializing the dense indicator matrix, so memory grows with the number
+    of non-zeros (one per row per categorical column) instead of rows x dummies.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    cat_cols : list of str
+        Columns to encode. Missing values become all-zero rows, as in get_dummies.
+    drop_first : bool, optional
+        Whether to drop the first level of each column. Default is True.
+
+    Returns
+    -------
+    tuple
+        - A (n_rows, n_dummies) CSR matrix of float64 indicators
+        - The dummy column names ("<column>_<level>")
+    """
+    codes, levels = [], []
+    for col in cat_cols:
+        # pd.Categorical orders levels the same way get_dummies does
+        categorical = pd.Categorical(df[col])
+        levels.append(list(categorical.categories))
+        codes.append(categorical.codes.astype(np.int64))
+    return _indicators_from_codes(codes, levels, cat_cols, len(df), drop_first=drop_first)
+
+
+def _indicators_from_codes(
+    codes: Sequence[np.ndarray],
+    levels: Sequence[List[Any]],
+    cat_cols: Sequence[str],
+    n_rows: int,
+    drop_first: bool = True
+) -> Tuple[sp.csr_matrix, List[str]]:
+    """
+    Build the sparse_one_hot output from integer level codes per column
+    (-1 for missing), so other backends can reuse the encoding.
+    """
+    row_blocks, col_blocks, names = [], [], []
+    offset = 0
+
+    for col, col_codes, col_levels in zip(cat_cols, codes, levels):
+        col_codes = np.asarray(col_codes, dtype=np.int64)
+        first_kept = 1 if drop_first else 0
+        kept_rows = np.flatnonzero(col_codes >= first_kept)
+        row_blocks.append(kept_rows)
+        col_blocks.append(col_codes[kept_rows] - first_kept + offset)
+
+        names.extend(f"{col}_{level}" for level in col_levels[first_kept:])
+        offset += max(len(col_levels) - first_kept, 0)
+
+    rows = np.concatenate(row_blocks) if row_blocks else np.empty(0, dtype=np.int64)
+    cols = np.concatenate(col_blocks) if col_blocks else np.empty(0, dtype=np.int64)
+    indicators = sp.csr_matrix(
+        (np.ones(len(rows)), (rows, cols)),
+        shape=(n_rows, offset)
+    )
+    return indicators, names
+
+
+@instrument()
+def pairwise_correlation_matrix(
+    dense: np.ndarray,
+    indicators: Optional[sp.spmatrix] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Compute the full Pearson correlation matrix in one pass using
+    pairwise-complete observations.
+
+    Columns are ordered as the dense block followed by the optional sparse
+    block. The sparse block is only touched through sparse-dense products, so
+    the combined (n_rows, n_cols) design matrix is never built.
+
+    Parameters
+    ----------
+    dense : np.ndarray
+        A 2D float array of shape (n_rows, n_dense). NaNs mark missing values.
+    indicators : scipy.sparse matrix, optional
+        A (n_rows, n_sparse) matrix without missing values, e.g. from sparse_one_hot.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        - corr : (n_cols, n_cols) correlation matrix (NaN where undefined)
+        - n_obs : (n_cols, n_cols) number of rows where both columns are present
+    """
+    mask = ~np.isnan(dense)
+    n_rows, n_dense = dense.shape
+
+    # Center every dense column on its own mean; this keeps the sums below well
+    # conditioned and does not change any correlation coefficient
+    filled = np.where(mask, dense, 0.0)
+    n_valid = mask.sum(axis=0)
+    col_means = filled.sum(axis=0) / np.maximum(n_valid, 1)
+    centered = np.where(mask, dense - col_means, 0.0)
+    sq_dense = (centered ** 2).sum(axis=0)
+    if n_rows:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+            constant = np.nanmax(dense, axis=0) == np.nanmin(dense, axis=0)
+    else:
+        constant = np.ones(n_dense, dtype=bool)
+
+    if mask.all():
+        # Fast path: no missing data, so every pair shares all rows
+        n_obs = np.full((n_dense, n_dense), float(n_rows))
+        cov = centered.T @ centered
+        var_x = np.broadcast_to(np.diag(cov)[:, None], cov.shape)
+        var_y = var_x.T
+        degenerate = constant[:, None] | constant[None, :]
+    else:
+        # Mask matrices give, for every (i, j) pair, sums restricted to
+        # the rows where both columns are observed
+        mask_f = mask.astype(float)
+        n_obs = mask_f.T @ mask_f
+        sum_x = centered.T @ mask_f
+        sum_y = sum_x.T
+        sq_x = (centered ** 2).T @ mask_f
+        sq_y = sq_x.T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            cov = centered.T @ centered - sum_x * sum_y / n_obs
+            var_x = sq_x - sum_x ** 2 / n_obs
+            var_y = sq_y - sum_y ** 2 / n_obs
+        # A column that is constant over the shared rows has no defined correlation
+        degenerate = (
+            (var_x <= 1e-12 * sq_x) | (var_y <= 1e-12 * sq_y)
+            | constant[:, None] | constant[None, :]
+        )
+
+    degenerate = degenerate | (n_obs < 2)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        corr = np.clip(cov / np.sqrt(var_x * var_y), -1.0, 1.0)
+    corr[degenerate] = np.nan
+
+    if indicators is None:
+        return corr, n_obs
+
+    # Sparse x sparse block: no missing values, so the Gram matrix suffices
+    indicators = sp.csc_matrix(indicators, dtype=float)
+    n_sparse = indicators.shape[1]
+    squared = indicators.multiply(indicators)
+    sparse_sums = np.asarray(indicators.sum(axis=0)).ravel()
+    sparse_sq = np.asarray(squared.sum(axis=0)).ravel()
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        sparse_means = sparse_sums / n_rows
+        cov_ss = (indicators.T @ indicators).toarray() - n_rows * np.outer(sparse_means, sparse_means)
+        var_s = np.diag(cov_ss).copy()
+        sparse_constant = var_s <= 1e-12 * sparse_sq
+        corr_ss = np.clip(cov_ss / np.sqrt(np.outer(var_s, var_s)), -1.0, 1.0)
+    corr_ss[sparse_constant[:, None] | sparse_constant[None, :]] = np.nan
+
+    # Dense x sparse block, restricted to the rows where each dense column is observed
+    mask_f = mask.astype(float)
+    n_ds = np.broadcast_to(n_valid[:, None].astype(float), (n_dense, n_sparse))
+    sum_x = centered.sum(axis=0)[:, None]
+    sum_y = np.asarray(indicators.T @ mask_f).T
+    sq_y = np.asarray(squared.T @ mask_f).T
+    cross = np.asarray(indicators.T @ centered).T
+    with np.errstate(invalid="ignore", divide="ignore"):
+        cov_ds = cross - sum_x * sum_y / n_ds
+        var_x_ds = sq_dense[:, None] - sum_x ** 2 / n_ds
+        var_y_ds = sq_y - sum_y ** 2 / n_ds
+        corr_ds = np.clip(cov_ds / np.sqrt(var_x_ds * var_y_ds), -1.0, 1.0)
+    corr_ds[constant[:, None] | (var_y_ds <= 1e-12 * sq_y) | (n_ds < 2)] = np.nan
+
+    full_corr = np.block([[corr, corr_ds], [corr_ds.T, corr_ss]])
+    full_n_obs = np.block([
+        [n_obs, n_ds],
+        [n_ds.T, np.full((n_sparse, n_sparse), float(n_rows))]
+    ])
+    return full_corr, full_n_obs
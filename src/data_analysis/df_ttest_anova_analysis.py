@@ -1,14 +1,227 @@
 import pandas as pd
 from scipy import stats
 import numpy as np
-import logging 
+import logging
+from typing import Tuple
 
+from src.data_analysis.df_polars_backend import group_statistics, is_polars
+from src.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+
+def _group_moments(
+    codes: np.ndarray,
+    n_groups: int,
+    values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Compute per-group count, mean and centered sum of squares for every
+    quantitative column at once.
+
+    Parameters
+    ----------
+    codes : np.ndarray
+        Integer group code per row (as returned by pd.factorize); -1 marks a missing category.
+    n_groups : int
+        Number of distinct groups.
+    values : np.ndarray
+        A 2D float array of shape (n_rows, n_quant_cols). NaNs are ignored.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        counts, means and sum of squared deviations, each of shape (n_groups, n_quant_cols).
+    """
+    n_cols = values.shape[1]
+    valid = ~np.isnan(values) & (codes >= 0)[:, None]
+    rows, cols = np.nonzero(valid)
+    # One flat key per (group, column) cell so a single bincount covers every column
+    keys = codes[rows] * n_cols + cols
+    observed = values[rows, cols]
+    size = n_groups * n_cols
+
+    counts = np.bincount(keys, minlength=size).reshape(n_groups, n_cols)
+    sums = np.bincount(keys, weights=observed, minlength=size).reshape(n_groups, n_cols)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        means = sums / counts
+
+    # Second pass on deviations from the group mean avoids the cancellation of sum(x^2) - sum(x)^2 / n
+    deviations = observed - means.ravel()[keys]
+    sum_sq = np.bincount(keys, weights=deviations ** 2, minlength=size).reshape(n_groups, n_cols)
+
+    return counts, means, sum_sq
+
+
+def _group_rank_sums(
+    codes: np.ndarray,
+    n_groups: int,
+    values: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rank every quantitative column once (over rows with a known category) and
+    sum the ranks per group.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        - rank_sums : (n_groups, n_quant_cols) sum of ranks per group
+        - tie_correction : (n_quant_cols,) the Kruskal-Wallis tie correction factor
+    """
+    masked = np.where((codes >= 0)[:, None], values, np.nan)
+    ranks = pd.DataFrame(masked).rank(method="average").to_numpy()
+    rank_counts, rank_means, _ = _group_moments(codes, n_groups, ranks)
+    rank_sums = np.where(rank_counts > 0, rank_means * rank_counts, 0.0)
+
+    tie_correction = np.empty(values.shape[1])
+    for j in range(values.shape[1]):
+        column = masked[:, j]
+        _, tie_counts = np.unique(column[~np.isnan(column)], return_counts=True)
+        n_obs = tie_counts.sum()
+        tie_counts = tie_counts.astype(float)
+        denominator = float(n_obs) ** 3 - n_obs
+        tie_correction[j] = (
+            1.0 - ((tie_counts ** 3 - tie_counts).sum() / denominator) if denominator > 0 else 0.0
+        )
+    return rank_sums, tie_correction
+
+
+def _group_statistics(
+    df: pd.DataFrame,
+    categorical_cols: list,
+    quantitative_cols: list,
+    ranks: bool = False
+):
+    """
+    Yield (categorical column, group values, counts, means, sum of squares,
+    rank statistics or None) per categorical column, factorizing each only once.
+    Polars input is aggregated by df_polars_backend.group_statistics instead.
+    """
+    if is_polars(df):
+        yield from group_statistics(df, categorical_cols, quantitative_cols, ranks=ranks)
+        return
+    values = df[quantitative_cols].to_numpy(dtype=float, na_value=np.nan)
+    for cat_col in categorical_cols:
+        codes, uniques = pd.factorize(df[cat_col])
+        n_groups = len(uniques)
+        counts, means, sum_sq = _group_moments(codes, n_groups, values)
+        rank_stats = _group_rank_sums(codes, n_groups, values) if ranks and n_groups >= 2 else None
+        yield cat_col, uniques, counts, means, sum_sq, rank_stats
+
+
+def _run_univariate_tests_groupby(
+    df: pd.DataFrame,
+    categorical_cols: list,
+    quantitative_cols: list,
+    test_type: str,
+    stat_label: str
+) -> list:
+    """
+    Closed-form ANOVA F / Kruskal-Wallis H across all quantitative columns,
+    from the per-group sufficient statistics of each categorical column.
+    """
+    results = []
+    statistics = _group_statistics(df, categorical_cols, quantitative_cols, ranks=test_type == "kruskal")
+
+    for cat_col, uniques, counts, means, sum_sq, rank_stats in statistics:
+        n_groups = len(uniques)
+
+        if n_groups < 2:
+            for quant_col in quantitative_cols:
+                results.append({
+                    "Categorical Variable": cat_col,
+                    "Quantitative Variable": quant_col,
+                    stat_label: None,
+                    "p-value": None,
+                    "Error": f"Need at least two groups; got {n_groups}."
+                })
+            continue
+
+        n_total = counts.sum(axis=0)
+        # scipy returns NaN as soon as any group is empty
+        has_empty_group = (counts == 0).any(axis=0)
+
+        with np.errstate(invalid="ignore", divide="ignore"):
+            if test_type == "anova":
+                grand_mean = np.nansum(means * counts, axis=0) / n_total
+                ss_between = np.nansum(counts * (means - grand_mean) ** 2, axis=0)
+                ss_within = sum_sq.sum(axis=0)
+                df_between = n_groups - 1
+                df_within = n_total - n_groups
+                statistic = (ss_between / df_between) / (ss_within / df_within)
+                statistic[df_within <= 0] = np.nan
+                p_values = stats.f.sf(statistic, df_between, df_within)
+            else:
+                rank_sums, tie_correction = rank_stats
+                statistic = (
+                    12.0 / (n_total * (n_total + 1)) * (rank_sums ** 2 / counts).sum(axis=0)
+                    - 3 * (n_total + 1)
+                ) / tie_correction
+                p_values = stats.chi2.sf(statistic, n_groups - 1)
+
+        statistic[has_empty_group] = np.nan
+        p_values[has_empty_group] = np.nan
+
+        for j, quant_col in enumerate(quantitative_cols):
+            results.append({
+                "Categorical Variable": cat_col,
+                "Quantitative Variable": quant_col,
+                stat_label: statistic[j],
+                "p-value": p_values[j],
+                "Error": None
+            })
+
+    return results
+
+
+def _run_one_sample_ttest_groupby(
+    df: pd.DataFrame,
+    categorical_cols: list,
+    quantitative_cols: list,
+    popmeans: np.ndarray,
+    alpha: float
+) -> list:
+    """
+    Closed-form one-sample t-tests for every category of every categorical column
+    against every quantitative column, factorizing each categorical column only once.
+    """
+    results = []
+
+    for cat_col, uniques, counts, means, sum_sq, _ in _group_statistics(df, categorical_cols, quantitative_cols):
+        with np.errstate(invalid="ignore", divide="ignore"):
+            dof = counts - 1
+            std_err = np.sqrt(sum_sq / dof / counts)
+            t_stats = (means - popmeans) / std_err
+            p_values = 2 * stats.t.sf(np.abs(t_stats), dof)
+        t_stats[dof < 1] = np.nan
+        p_values[dof < 1] = np.nan
+
+        for j, quant_col in enumerate(quantitative_cols):
+            for g, category_value in enumerate(uniques):
+                p_value = p_values[g, j]
+                results.append({
+                    "Categorical Variable": cat_col,
+                    "Category": category_value,
+                    "Quantitative Variable": quant_col,
+                    "Sample Size": int(counts[g, j]),
+                    "Sample Mean": means[g, j] if counts[g, j] > 0 else None,
+                    "T-statistic": t_stats[g, j],
+                    "p-value": p_value,
+                    "Decision": "Reject H0" if p_value < alpha else "Fail to Reject H0",
+                    "Error": None
+                })
+
+    return results
+
+
+@instrument()
 def run_univariate_tests(
     df: pd.DataFrame,
     categorical_cols: list,
     quantitative_cols: list,
     test_type: str = "anova",
-    sort_results: bool = True
+    sort_results: bool = True,
+    engine: str = "groupby"
 ) -> pd.DataFrame:
     """
     Run univariate tests (one-way ANOVA or Kruskal-Wallis) across all
@@ -16,8 +229,10 @@ def run_univariate_tests(
 
     Parameters
     ----------
-    df : pd.DataFrame
+    df : pd.DataFrame, pl.DataFrame or pl.LazyFrame
         The dataset containing both categorical and quantitative columns.
+        Polars input is aggregated lazily by the "groupby" engine; only the
+        per-group statistics are materialized.
     categorical_cols : list
         A list of column names in df that are categorical.
     quantitative_cols : list
@@ -27,6 +242,11 @@ def run_univariate_tests(
         Default is "anova".
     sort_results : bool, optional
         Whether to sort the final results by p-value ascending. Default is True.
+    engine : str, optional
+        "groupby" factorizes each categorical column once and computes the
+        statistics in closed form for all quantitative columns together.
+        "loop" calls scipy once per categorical x quantitative pair.
+        Default is "groupby".
 
     Returns
     -------
@@ -49,6 +269,34 @@ def run_univariate_tests(
     else:
         raise ValueError(f"Unsupported test_type: {test_type}. Must be 'anova' or 'kruskal'.")
 
+    if is_polars(df) and engine != "groupby":
+        raise ValueError(f"Unsupported engine for Polars input: {engine}. Must be 'groupby'.")
+    if engine == "groupby":
+        results = _run_univariate_tests_groupby(
+            df, categorical_cols, quantitative_cols, test_type.lower(), stat_label
+        )
+    elif engine == "loop":
+        results = _run_univariate_tests_loop(
+            df, categorical_cols, quantitative_cols, test_func, stat_label
+        )
+    else:
+        raise ValueError(f"Unsupported engine: {engine}. Must be 'groupby' or 'loop'.")
+
+    # Create DataFrame and optionally sort by p-value
+    results_df = pd.DataFrame(results)
+    if sort_results and "p-value" in results_df.columns:
+        results_df.sort_values("p-value", inplace=True, ascending=True)
+
+    return results_df.reset_index(drop=True)
+
+def _run_univariate_tests_loop(
+    df: pd.DataFrame,
+    categorical_cols: list,
+    quantitative_cols: list,
+    test_func,
+    stat_label: str
+) -> list:
+    """Reference implementation: one scipy call per categorical x quantitative pair."""
     results = []
 
     # Loop through each categorical x quantitative pairing
@@ -84,13 +332,9 @@ def run_univariate_tests(
                     "Error": str(e)
                 })
 
-    # Create DataFrame and optionally sort by p-value
-    results_df = pd.DataFrame(results)
-    if sort_results and "p-value" in results_df.columns:
-        results_df.sort_values("p-value", inplace=True, ascending=True)
-
-    return results_df.reset_index(drop=True)
+    return results
 
+@instrument()
 def run_one_sample_ttest(
     df: pd.DataFrame,
     categorical_cols: list,
@@ -99,7 +343,8 @@ def run_one_sample_ttest(
     popmean: int = 0,  # Hypothesize that the true mean number of free trials is X. Usually use a "value" decided by the business or the mean/median of the entire dataset.
     alpha: float = 0.05,
     sort_results: bool = True,
-    stat_type: str = "mean"
+    stat_type: str = "mean",
+    engine: str = "groupby"
 ) -> pd.DataFrame:
     """
     Perform a one-sample t-test on each group of each categorical/quantitative pair,
@@ -107,8 +352,9 @@ def run_one_sample_ttest(
 
     Parameters
     ----------
-    df : pd.DataFrame
-        The DataFrame containing your data.
+    df : pd.DataFrame, pl.DataFrame or pl.LazyFrame
+        The DataFrame containing your data. Polars input requires the
+        "groupby" engine.
     categorical_cols : list
         List of column names in df that are categorical.
     quantitative_cols : list
@@ -124,6 +370,10 @@ def run_one_sample_ttest(
     sort_results : bool, optional
         Whether to sort the final DataFrame by p-value in ascending order.
         Default is True.
+    engine : str, optional
+        "groupby" factorizes each categorical column once and computes every
+        group's t-statistic in closed form. "loop" calls scipy's ttest_1samp
+        once per category value. Default is "groupby".
 
     Returns
     -------
@@ -145,66 +395,78 @@ def run_one_sample_ttest(
             return popmean.get(col, 0)  # default to 0 if not found in dict
         return popmean  # if single float
 
-    one_sample_results = []
+    if is_polars(df) and engine != "groupby":
+        raise ValueError(f"Unsupported engine for Polars input: {engine}. Must be 'groupby'.")
+    if engine == "groupby":
+        if stat_type != "mean":
+            logger.warning(f"Unknown stat_type: {stat_type}. Defaulting to mean.")
+        popmeans = np.array([_get_popmean_for_col(col) for col in quantitative_cols], dtype=float)
+        one_sample_results = _run_one_sample_ttest_groupby(
+            df, categorical_cols, quantitative_cols, popmeans, alpha
+        )
+    elif engine == "loop":
+        one_sample_results = []
 
-    for cat_col in categorical_cols:
-        for quant_col in quantitative_cols:
-            # 1. Identify unique categories for this categorical variable
-            categories = df[cat_col].dropna().unique()
+        for cat_col in categorical_cols:
+            for quant_col in quantitative_cols:
+                # 1. Identify unique categories for this categorical variable
+                categories = df[cat_col].dropna().unique()
+
+                # 2. Group the data by category
+                for category_value in categories:
+                    data_array = df.loc[df[cat_col] == category_value, quant_col].dropna().values
 
-            # 2. Group the data by category
-            for category_value in categories:
-                data_array = df.loc[df[cat_col] == category_value, quant_col].dropna().values
-
-                # 3. Perform the one-sample t-test for this group vs. popmean
-                try:
-                    # If there's not enough data, stats.ttest_1samp can raise errors
-                    t_result = stats.ttest_1samp(
-                        data_array,
-                        _get_popmean_for_col(quant_col)
-                    )
-
-                    # Basic descriptive stats for context
-                    sample_size = len(data_array)
-
-                    if stat_type == "mean":
-                        sample_metric = data_array.mean() if sample_size > 0 else None
-                    else:
-                        logging.warning(f"Unknown stat_type: {stat_type}. Defaulting to mean.")
-                        #sample_metric = np.median(data_array) if sample_size > 0 else None
-
-                    # Determine reject/fail decision
-                    decision = (
-                        "Reject H0"
-                        if (t_result.pvalue is not None and t_result.pvalue < alpha)
-                        else "Fail to Reject H0"
-                    )
-
-                    one_sample_results.append({
-                        "Categorical Variable": cat_col,
-                        "Category": category_value,
-                        "Quantitative Variable": quant_col,
-                        "Sample Size": sample_size,
-                        "Sample Mean": sample_metric,
-                        "T-statistic": t_result.statistic,
-                        "p-value": t_result.pvalue,
-                        "Decision": decision,
-                        "Error": None
-                    })
-
-                except ValueError as e:
-                    # E.g. not enough data in the group
-                    one_sample_results.append({
-                        "Categorical Variable": cat_col,
-                        "Category": category_value,
-                        "Quantitative Variable": quant_col,
-                        "Sample Size": None,
-                        "Sample Stat": None,
-                        "T-statistic": None,
-                        "p-value": None,
-                        "Decision": "N/A",
-                        "Error": str(e)
-                    })
+                    # 3. Perform the one-sample t-test for this group vs. popmean
+                    try:
+                        # If there's not enough data, stats.ttest_1samp can raise errors
+                        t_result = stats.ttest_1samp(
+                            data_array,
+                            _get_popmean_for_col(quant_col)
+                        )
+
+                        # Basic descriptive stats for context
+                        sample_size = len(data_array)
+
+                        if stat_type == "mean":
+                            sample_metric = data_array.mean() if sample_size > 0 else None
+                        else:
+                            logger.warning(f"Unknown stat_type: {stat_type}. Defaulting to mean.")
+                            #sample_metric = np.median(data_array) if sample_size > 0 else None
+
+                        # Determine reject/fail decision
+                        decision = (
+                            "Reject H0"
+                            if (t_result.pvalue is not None and t_result.pvalue < alpha)
+                            else "Fail to Reject H0"
+                        )
+
+                        one_sample_results.append({
+                            "Categorical Variable": cat_col,
+                            "Category": category_value,
+                            "Quantitative Variable": quant_col,
+                            "Sample Size": sample_size,
+                            "Sample Mean": sample_metric,
+                            "T-statistic": t_result.statistic,
+                            "p-value": t_result.pvalue,
+                            "Decision": decision,
+                            "Error": None
+                        })
+
+                    except ValueError as e:
+                        # E.g. not enough data in the group
+                        one_sample_results.append({
+                            "Categorical Variable": cat_col,
+                            "Category": category_value,
+                            "Quantitative Variable": quant_col,
+                            "Sample Size": None,
+                            "Sample Stat": None,
+                            "T-statistic": None,
+                            "p-value": None,
+                            "Decision": "N/A",
+                            "Error": str(e)
+                        })
+    else:
+        raise ValueError(f"Unsupported engine: {engine}. Must be 'groupby' or 'loop'.")
 
     # Convert to DataFrame
     one_sample_results_df = pd.DataFrame(one_sample_results)
@@ -0,0 +1,321 @@
+import time
+import pandas as pd
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.data_sourcing.stream_data import normalize_column_name, RAW_DATE_FORMAT
+
+# Declarative schema of the cleaned campaign extract.
+# Each entry lists the dtype kind ("category", "float" or "datetime"), whether
+# nulls are allowed, and optional value bounds.
+CAMPAIGN_SCHEMA: Dict[str, Dict[str, Any]] = {
+    "REPORT_DATE": {"dtype": "datetime", "nullable": False},
+    "ATL_OR_DR": {"dtype": "category", "nullable": False},
+    "CAMPAIGN_TYPE": {"dtype": "category", "nullable": False},
+    "CHANNEL": {"dtype": "category", "nullable": False},
+    "COST": {"dtype": "float", "nullable": False, "min": 0},
+    "FREE_TRIALS": {"dtype": "float", "nullable": False, "min": 0},
+}
+
+OUTLIER_COLUMNS: List[str] = ["COST", "FREE_TRIALS"]
+
+
+def normalize_columns(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Normalize column names (strip BOM/whitespace, upper-case, spaces to underscores).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+
+    Returns
+    -------
+    pd.DataFrame
+        The same data with normalized column names.
+    """
+    return df.rename(columns=normalize_column_name)
+
+
+def coerce_dtypes(
+    df: pd.DataFrame,
+    schema: Dict[str, Dict[str, Any]] = CAMPAIGN_SCHEMA,
+    date_format: str = RAW_DATE_FORMAT
+) -> pd.DataFrame:
+    """
+    Convert every schema column to its declared dtype in one whole-column operation.
+    Values that cannot be converted become NaN/NaT.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    schema : dict, optional
+        Column specifications. Default is CAMPAIGN_SCHEMA.
+    date_format : str, optional
+        strptime format used for string date columns.
+
+    Returns
+    -------
+    pd.DataFrame
+        A DataFrame with coerced columns; columns outside the schema are untouched.
+    """
+    converted = {}
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        kind = spec["dtype"]
+        if kind == "float":
+            if not pd.api.types.is_float_dtype(series):
+                series = pd.to_numeric(series, errors="coerce").astype(float)
+        elif kind == "category":
+            if not isinstance(series.dtype, pd.CategoricalDtype):
+                series = series.astype("category")
+        elif kind == "datetime":
+            if not pd.api.types.is_datetime64_any_dtype(series):
+                series = pd.to_datetime(series, format=date_format, errors="coerce")
+        else:
+            raise ValueError(f"Unsupported dtype in schema for {col}: {kind}")
+        converted[col] = series
+    return df.assign(**converted)
+
+
+def validate_schema(
+    df: pd.DataFrame,
+    schema: Dict[str, Dict[str, Any]] = CAMPAIGN_SCHEMA,
+    check_values: bool = True
+) -> None:
+    """
+    Check a DataFrame against a declarative schema and fail fast with every
+    violation listed.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The DataFrame to check.
+    schema : dict, optional
+        Column specifications. Default is CAMPAIGN_SCHEMA.
+    check_values : bool, optional
+        Whether to check dtypes, nulls and bounds; if False only column
+        presence is checked. Default is True.
+
+    Raises
+    ------
+    ValueError
+        If any column is missing or violates its specification.
+    """
+    missing = [col for col in schema if col not in df.columns]
+    if missing:
+        raise ValueError(f"Schema validation failed: missing columns {missing}")
+    if not check_values:
+        return
+
+    dtype_checks: Dict[str, Callable[[pd.Series], bool]] = {
+        "float": pd.api.types.is_float_dtype,
+        "category": lambda s: isinstance(s.dtype, pd.CategoricalDtype),
+        "datetime": pd.api.types.is_datetime64_any_dtype,
+    }
+
+    errors = []
+    for col, spec in schema.items():
+        series = df[col]
+        if not dtype_checks[spec["dtype"]](series):
+            errors.append(f"{col}: expected {spec['dtype']}, got {series.dtype}")
+            continue
+        if not spec.get("nullable", True):
+            n_null = int(series.isna().sum())
+            if n_null:
+                errors.append(f"{col}: {n_null} null values")
+        if "min" in spec:
+            n_low = int((series < spec["min"]).sum())
+            if n_low:
+                errors.append(f"{col}: {n_low} values below {spec['min']}")
+        if "max" in spec:
+            n_high = int((series > spec["max"]).sum())
+            if n_high:
+                errors.append(f"{col}: {n_high} values above {spec['max']}")
+        if "allowed" in spec:
+            n_bad = int((~series.isin(spec["allowed"]) & series.notna()).sum())
+            if n_bad:
+                errors.append(f"{col}: {n_bad} values outside {spec['allowed']}")
+
+    if errors:
+        raise ValueError("Schema validation failed:\n  " + "\n  ".join(errors))
+
+
+def drop_invalid_rows(
+    df: pd.DataFrame,
+    schema: Dict[str, Dict[str, Any]] = CAMPAIGN_SCHEMA
+) -> pd.DataFrame:
+    """
+    Drop rows with nulls in non-nullable columns or values outside declared bounds.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame (already coerced).
+    schema : dict, optional
+        Column specifications. Default is CAMPAIGN_SCHEMA.
+
+    Returns
+    -------
+    pd.DataFrame
+        The valid rows.
+    """
+    keep = np.ones(len(df), dtype=bool)
+    for col, spec in schema.items():
+        if col not in df.columns:
+            continue
+        series = df[col]
+        if not spec.get("nullable", True):
+            keep &= series.notna().to_numpy()
+        if "min" in spec:
+            keep &= ~(series < spec["min"]).to_numpy()
+        if "max" in spec:
+            keep &= ~(series > spec["max"]).to_numpy()
+    return df.loc[keep]
+
+
+def filter_outliers(
+    df: pd.DataFrame,
+    columns: Sequence[str] = OUTLIER_COLUMNS,
+    method: str = "iqr",
+    k: float = 1.5,
+    lower_quantile: float = 0.01,
+    upper_quantile: float = 0.99,
+    log_scale: bool = True
+) -> pd.DataFrame:
+    """
+    Drop rows that are outliers in any of the given columns, using bounds
+    computed once over the whole column.
+
+    "COST_PER_FREE_TRIALS" may be listed even if the column does not exist
+    yet; it is then derived as COST / FREE_TRIALS for the check only.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    columns : sequence of str, optional
+        Columns to check. Default is ["COST", "FREE_TRIALS"].
+    method : str, optional
+        "iqr" keeps values within [Q1 - k*IQR, Q3 + k*IQR]; "quantile" keeps
+        values within [lower_quantile, upper_quantile]. Default is "iqr".
+    k : float, optional
+        IQR multiplier. Default is 1.5.
+    lower_quantile, upper_quantile : float, optional
+        Bounds for the "quantile" method.
+    log_scale : bool, optional
+        Compute bounds on log1p of the values, which suits these right-skewed
+        measures. Default is True (this reproduces filtered_data_fe.csv).
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows inside the bounds of every column.
+    """
+    if method not in ("iqr", "quantile"):
+        raise ValueError(f"Unsupported method: {method}. Must be 'iqr' or 'quantile'.")
+
+    values = np.empty((len(df), len(columns)))
+    for j, col in enumerate(columns):
+        if col == "COST_PER_FREE_TRIALS" and col not in df.columns:
+            with np.errstate(divide="ignore", invalid="ignore"):
+                values[:, j] = df["COST"].to_numpy(dtype=float) / df["FREE_TRIALS"].to_numpy(dtype=float)
+        else:
+            values[:, j] = df[col].to_numpy(dtype=float)
+    if log_scale:
+        with np.errstate(divide="ignore", invalid="ignore"):
+            values = np.log1p(values)
+
+    if method == "iqr":
+        q1, q3 = np.nanquantile(values, [0.25, 0.75], axis=0)
+        lower, upper = q1 - k * (q3 - q1), q3 + k * (q3 - q1)
+    else:
+        lower, upper = np.nanquantile(values, [lower_quantile, upper_quantile], axis=0)
+
+    keep = ((values >= lower) & (values <= upper)).all(axis=1)
+    return df.loc[keep]
+
+
+def clean_data(
+    df: pd.DataFrame,
+    schema: Dict[str, Dict[str, Any]] = CAMPAIGN_SCHEMA,
+    dedup_subset: Optional[List[str]] = None,
+    outlier_columns: Optional[Sequence[str]] = OUTLIER_COLUMNS,
+    outlier_method: str = "iqr",
+    outlier_k: float = 1.5,
+    log_scale: bool = True
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Run the full cleaning stage: normalize names, check the schema columns,
+    coerce dtypes, drop invalid rows and duplicates, filter outliers and
+    validate the result.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The raw campaign extract (any header spelling, any dtypes).
+    schema : dict, optional
+        Column specifications. Default is CAMPAIGN_SCHEMA.
+    dedup_subset : list of str, optional
+        Columns identifying duplicates. Default is all columns.
+    outlier_columns : sequence of str, optional
+        Columns for filter_outliers; None skips outlier filtering.
+    outlier_method : str, optional
+        "iqr" or "quantile". Default is "iqr".
+    outlier_k : float, optional
+        IQR multiplier. Default is 1.5.
+    log_scale : bool, optional
+        Whether outlier bounds are computed on log1p values. Default is True.
+
+    Returns
+    -------
+    tuple of pd.DataFrame
+        - The cleaned data with a fresh RangeIndex.
+        - A report with columns "Step", "Rows In", "Rows Out", "Rows Dropped"
+          and "Seconds", one row per step.
+
+    Raises
+    ------
+    ValueError
+        If required columns are missing, or the cleaned data violates the schema.
+    """
+    def check_columns(d: pd.DataFrame) -> pd.DataFrame:
+        validate_schema(d, schema, check_values=False)
+        return d
+
+    def check_schema(d: pd.DataFrame) -> pd.DataFrame:
+        validate_schema(d, schema)
+        return d
+
+    steps: List[Tuple[str, Callable[[pd.DataFrame], pd.DataFrame]]] = [
+        ("normalize_columns", normalize_columns),
+        ("check_columns", check_columns),
+        ("coerce_dtypes", lambda d: coerce_dtypes(d, schema)),
+        ("drop_invalid_rows", lambda d: drop_invalid_rows(d, schema)),
+        ("drop_duplicates", lambda d: d.drop_duplicates(subset=dedup_subset)),
+    ]
+    if outlier_columns:
+        steps.append((
+            "filter_outliers",
+            lambda d: filter_outliers(d, outlier_columns, method=outlier_method,
+                                      k=outlier_k, log_scale=log_scale)
+        ))
+    steps.append(("validate_schema", check_schema))
+
+    report = []
+    for name, step in steps:
+        rows_in = len(df)
+        start = time.perf_counter()
+        df = step(df)
+        report.append({
+            "Step": name,
+            "Rows In": rows_in,
+            "Rows Out": len(df),
+            "Rows Dropped": rows_in - len(df),
+            "Seconds": time.perf_counter() - start
+        })
+
+    return df.reset_index(drop=True), pd.DataFrame(report)
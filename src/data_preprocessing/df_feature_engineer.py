@@ -0,0 +1,725 @@
+from pathlib import Path
+import hashlib
+import logging
+import pandas as pd
+import numpy as np
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.data_sourcing.import_export_data import CACHE_DIRNAME, DataStore
+
+logger = logging.getLogger(__name__)
+
+MONTH_NAMES: List[str] = [
+    "January", "February", "March", "April", "May", "June",
+    "July", "August", "September", "October", "November", "December"
+]
+SEASON_NAMES: List[str] = ["Winter", "Spring", "Summer", "Fall"]
+# Season of each calendar month (index 0 = January)
+MONTH_TO_SEASON: List[str] = [
+    "Winter", "Winter", "Spring", "Spring", "Spring", "Summer",
+    "Summer", "Summer", "Fall", "Fall", "Fall", "Winter"
+]
+
+CROSS_FEATURES: List[Tuple[str, str]] = [("CHANNEL", "ATL_OR_DR"), ("CHANNEL", "CAMPAIGN_TYPE")]
+LOG_FEATURES: List[str] = ["COST", "FREE_TRIALS", "COST_PER_FREE_TRIALS", "COST_BY_FREE_TRIALS"]
+AGGREGATE_CATEGORIES: List[str] = ["CHANNEL", "ATL_OR_DR", "CAMPAIGN_TYPE"]
+AGGREGATE_NUMERICALS: List[str] = ["FREE_TRIALS", "COST_PER_FREE_TRIALS", "COST"]
+
+TIME_SERIES_GROUPS: List[List[str]] = [["CHANNEL"]]
+TIME_SERIES_METRICS: List[str] = ["FREE_TRIALS", "COST"]
+
+HOLIDAY_COUNTRY = "US"
+HOLIDAY_WINDOW_DAYS = 3
+
+# In-process copies of holiday calendars, keyed like their on-disk cache files
+_HOLIDAY_CALENDARS: Dict[str, pd.DataFrame] = {}
+
+# Column layout of data/processed/log_data_fe.csv
+LOG_DATA_FE_COLUMNS: List[str] = [
+    "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "COST", "FREE_TRIALS",
+    "HOLIDAY_FLAG", "LAG_3_HOLIDAY_FLAG", "LEAD_3_HOLIDAY_FLAG", "SEASON", "MONTH",
+    "CHANNEL_ATL_OR_DR", "CHANNEL_CAMPAIGN_TYPE", "COST_PER_FREE_TRIALS", "COST_BY_FREE_TRIALS",
+    "LOG_COST", "LOG_FREE_TRIALS", "LOG_COST_PER_FREE_TRIALS", "LOG_COST_BY_FREE_TRIALS"
+]
+
+
+def add_month_season_features(df: pd.DataFrame, date_col: str = "REPORT_DATE") -> pd.DataFrame:
+    """
+    Add MONTH (month name) and SEASON as ordered categoricals derived from a date column.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame with a datetime (or parseable) date column.
+    date_col : str, optional
+        The date column. Default is "REPORT_DATE".
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with MONTH and SEASON columns added.
+    """
+    month_idx = pd.to_datetime(df[date_col]).dt.month.to_numpy() - 1
+
+    season_codes = np.array([SEASON_NAMES.index(s) for s in MONTH_TO_SEASON])[month_idx]
+    return df.assign(
+        MONTH=pd.Categorical.from_codes(month_idx, categories=MONTH_NAMES, ordered=True),
+        SEASON=pd.Categorical.from_codes(season_codes, categories=SEASON_NAMES, ordered=True)
+    )
+
+
+def _cross_categorical(left: pd.Series, right: pd.Series, sep: str = "_") -> pd.Categorical:
+    """
+    Combine two columns into a "<left><sep><right>" categorical using integer
+    codes, so the string labels are built once per level pair instead of per row.
+    """
+    left_cat = pd.Categorical(left)
+    right_cat = pd.Categorical(right)
+    n_right = len(right_cat.categories)
+
+    codes = left_cat.codes.astype(np.int64) * n_right + right_cat.codes
+    codes[(left_cat.codes < 0) | (right_cat.codes < 0)] = -1
+
+    used = np.unique(codes[codes >= 0])
+    labels = [
+        f"{left_cat.categories[c // n_right]}{sep}{right_cat.categories[c % n_right]}"
+        for c in used
+    ]
+    new_codes = np.full(len(codes), -1, dtype=np.int64)
+    new_codes[codes >= 0] = np.searchsorted(used, codes[codes >= 0])
+    return pd.Categorical.from_codes(new_codes, categories=labels)
+
+
+def add_cross_features(
+    df: pd.DataFrame,
+    pairs: Sequence[Tuple[str, str]] = CROSS_FEATURES
+) -> pd.DataFrame:
+    """
+    Add categorical cross features such as CHANNEL_ATL_OR_DR ("paid social_DR - Direct Response").
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    pairs : sequence of (str, str), optional
+        Column pairs to cross. Default is CHANNEL x ATL_OR_DR and CHANNEL x CAMPAIGN_TYPE.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with one "<A>_<B>" column per pair.
+    """
+    return df.assign(**{
+        f"{left}_{right}": _cross_categorical(df[left], df[right])
+        for left, right in pairs
+    })
+
+
+def add_ratio_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add COST_PER_FREE_TRIALS (COST / FREE_TRIALS) and COST_BY_FREE_TRIALS (COST * FREE_TRIALS).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame with COST and FREE_TRIALS.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with both ratio features added.
+    """
+    cost = df["COST"].to_numpy(dtype=float)
+    free_trials = df["FREE_TRIALS"].to_numpy(dtype=float)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return df.assign(
+            COST_PER_FREE_TRIALS=cost / free_trials,
+            COST_BY_FREE_TRIALS=cost * free_trials
+        )
+
+
+def add_log_features(df: pd.DataFrame, columns: Sequence[str] = LOG_FEATURES) -> pd.DataFrame:
+    """
+    Add LOG_<col> = log1p(col) for each column.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    columns : sequence of str, optional
+        Columns to transform. Default is LOG_FEATURES.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with the LOG_* columns added.
+    """
+    values = np.log1p(df[list(columns)].to_numpy(dtype=float))
+    return df.assign(**{f"LOG_{col}": values[:, j] for j, col in enumerate(columns)})
+
+
+def _group_statistics(
+    df: pd.DataFrame,
+    keys: List[str],
+    numericals: List[str],
+    stats: Sequence[str]
+) -> Dict[Tuple[str, str], np.ndarray]:
+    """
+    Run one groupby over `keys` that computes every statistic for every
+    numerical column, and broadcast the results back to row order.
+
+    Returns
+    -------
+    dict
+        Maps (numerical, stat) to a per-row float array.
+    """
+    grouped = df.groupby(keys, observed=True, sort=False, dropna=False)
+    group_ids = grouped.ngroup().to_numpy()
+    table = grouped[numericals].agg(list(stats))
+
+    # ngroup numbers groups in the same order the aggregation table lists them
+    values = table.to_numpy(dtype=float)[group_ids]
+    return {col: values[:, j] for j, col in enumerate(table.columns)}
+
+
+def add_group_aggregate_features(
+    df: pd.DataFrame,
+    categories: Sequence[str] = AGGREGATE_CATEGORIES,
+    numericals: Sequence[str] = AGGREGATE_NUMERICALS,
+    time_key: str = "MONTH",
+    include_median: bool = True,
+    include_ratio: bool = True
+) -> pd.DataFrame:
+    """
+    Add per-(category, MONTH) aggregate features for every numerical column:
+
+    - AVG_{num}_BY_{cat}_MONTH
+    - MEDIAN_{num}_BY_{cat}_MONTH
+    - {num}_OVER_AVG_{num}_BY_{cat}_MONTH
+
+    Each (category, time_key) grouping is computed once for all numerical
+    columns and statistics.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    categories : sequence of str, optional
+        Grouping columns. Default is CHANNEL, ATL_OR_DR and CAMPAIGN_TYPE.
+    numericals : sequence of str, optional
+        Columns to aggregate. Default is FREE_TRIALS, COST_PER_FREE_TRIALS and COST.
+    time_key : str, optional
+        Second grouping key. Default is "MONTH".
+    include_median : bool, optional
+        Whether to add the MEDIAN_* features. Default is True.
+    include_ratio : bool, optional
+        Whether to add the *_OVER_AVG_* features. Default is True.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with the aggregate features added.
+    """
+    numericals = list(numericals)
+    stats = ["mean", "median"] if include_median else ["mean"]
+    new_columns: Dict[str, np.ndarray] = {}
+
+    for category in categories:
+        results = _group_statistics(df, [category, time_key], numericals, stats)
+        for numerical in numericals:
+            avg_name = f"AVG_{numerical}_BY_{category}_{time_key}"
+            new_columns[avg_name] = results[(numerical, "mean")]
+            if include_median:
+                new_columns[f"MEDIAN_{numerical}_BY_{category}_{time_key}"] = results[(numerical, "median")]
+            if include_ratio:
+                with np.errstate(divide="ignore", invalid="ignore"):
+                    new_columns[f"{numerical}_OVER_{avg_name}"] = (
+                        df[numerical].to_numpy(dtype=float) / new_columns[avg_name]
+                    )
+
+    return df.assign(**new_columns)
+
+
+def add_normalized_by_month_features(
+    df: pd.DataFrame,
+    numericals: Sequence[str] = ("FREE_TRIALS", "COST_PER_FREE_TRIALS", "COST_BY_FREE_TRIALS"),
+    time_key: str = "MONTH"
+) -> pd.DataFrame:
+    """
+    Add NORMALIZE_{num}_BY_MONTH = value / mean value in that MONTH, from a
+    single groupby over time_key.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    numericals : sequence of str, optional
+        Columns to normalize.
+    time_key : str, optional
+        Grouping column. Default is "MONTH".
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with the NORMALIZE_* features added.
+    """
+    numericals = list(numericals)
+    means = _group_statistics(df, [time_key], numericals, ["mean"])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return df.assign(**{
+            f"NORMALIZE_{col}_BY_{time_key}": df[col].to_numpy(dtype=float) / means[(col, "mean")]
+            for col in numericals
+        })
+
+
+def super_bowl_sundays(years: Iterable[int]) -> List[pd.Timestamp]:
+    """
+    Super Bowl Sunday for each year: the second Sunday of February (its date
+    since the 2022 season). Used as an extra marketing holiday on top of the
+    federal calendar.
+
+    Parameters
+    ----------
+    years : iterable of int
+        Calendar years.
+
+    Returns
+    -------
+    list of pd.Timestamp
+        One date per year.
+    """
+    firsts = [pd.Timestamp(year, 2, 1) for year in years]
+    # First Sunday on or after Feb 1 (Week(weekday=6) would skip a Sunday Feb 1), plus a week
+    return [first + pd.Timedelta(days=(6 - first.weekday()) % 7 + 7) for first in firsts]
+
+
+def build_holiday_calendar(
+    start_year: int,
+    end_year: int,
+    country: str = HOLIDAY_COUNTRY,
+    window_days: int = HOLIDAY_WINDOW_DAYS,
+    extra_holidays: Optional[Callable[[Iterable[int]], List[pd.Timestamp]]] = super_bowl_sundays
+) -> pd.DataFrame:
+    """
+    Build a daily holiday table covering start_year..end_year.
+
+    The `holidays` package is queried once for the whole range; the windowed
+    flags are then computed with a cumulative sum over the daily series.
+
+    Columns (matching data/processed/log_data_fe.csv):
+        - HOLIDAY_FLAG: the date is a holiday
+        - LAG_{n}_HOLIDAY_FLAG: a holiday falls within the n days after the date
+        - LEAD_{n}_HOLIDAY_FLAG: a holiday fell within the n days before the date
+
+    Parameters
+    ----------
+    start_year, end_year : int
+        First and last calendar year (inclusive).
+    country : str, optional
+        Country code for holidays.country_holidays. Default is "US".
+    window_days : int, optional
+        Window length n for the lag/lead flags. Default is 3.
+    extra_holidays : callable, optional
+        Returns additional holiday dates for a range of years. Default is
+        super_bowl_sundays; pass None for the official calendar only.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per day, indexed by date.
+    """
+    import holidays
+
+    # Pad by one year on each side so windows at the range edges are complete
+    years = range(start_year - 1, end_year + 2)
+    dates = pd.date_range(f"{years[0]}-01-01", f"{years[-1]}-12-31", freq="D")
+
+    holiday_dates = pd.to_datetime(list(holidays.country_holidays(country, years=years).keys()))
+    if extra_holidays is not None:
+        holiday_dates = holiday_dates.append(pd.DatetimeIndex(extra_holidays(years)))
+    is_holiday = dates.isin(holiday_dates)
+
+    # count[i] = number of holidays strictly before dates[i]
+    n = window_days
+    count = np.concatenate([[0], np.cumsum(is_holiday)])
+    padded = np.concatenate([count, np.full(n, count[-1])])
+    after = padded[np.arange(len(dates)) + 1 + n] - count[1:len(dates) + 1]
+    before = count[:len(dates)] - count[np.maximum(np.arange(len(dates)) - n, 0)]
+
+    calendar = pd.DataFrame({
+        "HOLIDAY_FLAG": is_holiday,
+        f"LAG_{n}_HOLIDAY_FLAG": after > 0,
+        f"LEAD_{n}_HOLIDAY_FLAG": before > 0,
+    }, index=pd.DatetimeIndex(dates, name="DATE"))
+
+    return calendar.loc[f"{start_year}-01-01":f"{end_year}-12-31"]
+
+
+def get_holiday_calendar(
+    start_year: int,
+    end_year: int,
+    country: str = HOLIDAY_COUNTRY,
+    window_days: int = HOLIDAY_WINDOW_DAYS,
+    extra_holidays: Optional[Callable[[Iterable[int]], List[pd.Timestamp]]] = super_bowl_sundays,
+    cache_dir: Optional[Path] = None,
+    env: str = "development"
+) -> pd.DataFrame:
+    """
+    Return the holiday table for a year range, building it at most once.
+
+    Calendars are kept in memory for the process and cached on disk as Parquet
+    in the processed-data cache directory, keyed by every parameter. An
+    extra_holidays callable is keyed by the dates it returns for the range,
+    not by its name, so two different callables never share a calendar.
+
+    Parameters
+    ----------
+    start_year, end_year, country, window_days, extra_holidays
+        See build_holiday_calendar.
+    cache_dir : Path, optional
+        Directory for the cached calendar. Default is the processed-data
+        directory's CACHE_DIRNAME folder.
+    env : str, optional
+        Environment used to resolve the default cache directory.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per day, indexed by date.
+    """
+    extra_dates = "none"
+    if extra_holidays is not None:
+        # Same padded year range as build_holiday_calendar queries
+        extra = pd.DatetimeIndex(extra_holidays(range(start_year - 1, end_year + 2)))
+        extra_dates = ",".join(extra.sort_values().strftime("%Y-%m-%d"))
+    key_source = f"{country}|{start_year}|{end_year}|{window_days}|{extra_dates}"
+    key = f"holiday_calendar_{hashlib.sha256(key_source.encode()).hexdigest()[:16]}"
+
+    calendar = _HOLIDAY_CALENDARS.get(key)
+    if calendar is not None:
+        return calendar
+
+    if cache_dir is None:
+        cache_dir = DataStore(env).base_path("processed_data") / CACHE_DIRNAME
+    cache_path = Path(cache_dir) / f"{key}.parquet"
+
+    if cache_path.exists():
+        calendar = pd.read_parquet(cache_path)
+    else:
+        calendar = build_holiday_calendar(start_year, end_year, country, window_days, extra_holidays)
+        try:
+            cache_path.parent.mkdir(parents=True, exist_ok=True)
+            calendar.to_parquet(cache_path)
+        except (ImportError, OSError, ValueError) as e:
+            logger.warning(f"Could not cache holiday calendar {cache_path}: {e}")
+
+    _HOLIDAY_CALENDARS[key] = calendar
+    return calendar
+
+
+def add_holiday_features(
+    df: pd.DataFrame,
+    date_col: str = "REPORT_DATE",
+    country: str = HOLIDAY_COUNTRY,
+    window_days: int = HOLIDAY_WINDOW_DAYS,
+    extra_holidays: Optional[Callable[[Iterable[int]], List[pd.Timestamp]]] = super_bowl_sundays,
+    cache_dir: Optional[Path] = None,
+    env: str = "development"
+) -> pd.DataFrame:
+    """
+    Add HOLIDAY_FLAG and the windowed LAG_/LEAD_ holiday flags by joining on a
+    precomputed daily calendar (positional lookup, no per-row holiday queries).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    date_col : str, optional
+        The date column. Default is "REPORT_DATE".
+    country, window_days, extra_holidays, cache_dir, env
+        See get_holiday_calendar.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with the holiday flag columns added.
+    """
+    dates = pd.to_datetime(df[date_col]).dt.normalize()
+    calendar = get_holiday_calendar(
+        dates.min().year, dates.max().year, country, window_days, extra_holidays, cache_dir, env
+    )
+
+    # The calendar is one contiguous row per day, so a day offset is a row position
+    offsets = ((dates - calendar.index[0]) // pd.Timedelta(days=1)).to_numpy()
+    flags = calendar.to_numpy()[offsets]
+    return df.assign(**{col: flags[:, j] for j, col in enumerate(calendar.columns)})
+
+
+def _sorted_group_blocks(
+    df: pd.DataFrame,
+    keys: Sequence[str],
+    date_col: str
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Sort rows once by (group, date) so every group is one contiguous block.
+
+    Ties on the date keep the original row order.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        - order : row positions in (group, date) order
+        - block_start : for each sorted row, the sorted position where its group starts
+    """
+    dates = pd.to_datetime(df[date_col]).to_numpy(dtype="datetime64[ns]").view(np.int64)
+    if keys:
+        codes = df.groupby(list(keys), observed=True, sort=False, dropna=False).ngroup().to_numpy()
+    else:
+        codes = np.zeros(len(df), dtype=np.int64)
+    # lexsort is stable, so rows sharing a (group, date) stay in input order
+    order = np.lexsort((dates, codes))
+
+    sorted_codes = codes[order]
+    is_start = np.ones(len(df), dtype=bool)
+    is_start[1:] = sorted_codes[1:] != sorted_codes[:-1]
+    block_start = np.maximum.accumulate(np.where(is_start, np.arange(len(df)), 0))
+    return order, block_start
+
+
+def _time_series_block_features(
+    values: np.ndarray,
+    block_start: np.ndarray,
+    lags: Sequence[int],
+    windows: Sequence[int],
+    min_periods: int
+) -> Dict[Tuple[str, int], np.ndarray]:
+    """
+    Lag, growth and trailing-window features for (group, date)-sorted values.
+
+    All metrics are handled together as the columns of `values`; each window
+    sum is a difference of two cumulative sums clipped at the group start.
+
+    Returns
+    -------
+    dict
+        Maps (feature, length) to an (n_rows, n_metrics) array, with feature in
+        "PREV", "GROWTH", "ROLLING_MEAN" and "ROLLING_SUM".
+    """
+    n_rows = len(values)
+    position = np.arange(n_rows)
+    offset = position - block_start
+    results: Dict[Tuple[str, int], np.ndarray] = {}
+
+    for lag in lags:
+        prev = np.full(values.shape, np.nan)
+        has_prev = offset >= lag
+        prev[has_prev] = values[position[has_prev] - lag]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            results[("PREV", lag)] = prev
+            results[("GROWTH", lag)] = (values - prev) / prev
+
+    if windows:
+        observed = ~np.isnan(values)
+        cum_sum = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(np.where(observed, values, 0.0), axis=0)])
+        cum_count = np.vstack([np.zeros((1, values.shape[1])), np.cumsum(observed, axis=0)])
+        for window in windows:
+            first = np.maximum(position - window + 1, block_start)
+            window_sum = cum_sum[position + 1] - cum_sum[first]
+            window_count = cum_count[position + 1] - cum_count[first]
+            enough = window_count >= min_periods
+            with np.errstate(divide="ignore", invalid="ignore"):
+                results[("ROLLING_MEAN", window)] = np.where(enough, window_sum / window_count, np.nan)
+            results[("ROLLING_SUM", window)] = np.where(enough, window_sum, np.nan)
+
+    return results
+
+
+def add_time_series_features(
+    df: pd.DataFrame,
+    group_keys: Sequence[Sequence[str]] = TIME_SERIES_GROUPS,
+    metrics: Sequence[str] = TIME_SERIES_METRICS,
+    lags: Sequence[int] = (1,),
+    windows: Sequence[int] = (3,),
+    date_col: str = "REPORT_DATE",
+    min_periods: int = 1
+) -> pd.DataFrame:
+    """
+    Add per-group lag, growth and rolling features, ordered by date within each group:
+
+    - PREV_{k}_{metric}_BY_{keys}: value k rows earlier in the group
+    - GROWTH_{k}_{metric}_BY_{keys}: (value - previous) / previous
+    - ROLLING_{w}_MEAN_{metric}_BY_{keys}: mean of the last w rows (current included)
+    - ROLLING_{w}_SUM_{metric}_BY_{keys}: sum of the last w rows (current included)
+
+    Each grouping is sorted once and every metric, lag and window is computed
+    over its contiguous group blocks; results are returned in the input row order.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The input DataFrame.
+    group_keys : sequence of sequence of str, optional
+        One entry per grouping, e.g. [["CHANNEL"], ["CHANNEL", "CAMPAIGN_TYPE"]].
+        An empty entry treats all rows as one series. Default is [["CHANNEL"]].
+    metrics : sequence of str, optional
+        Numerical columns. Default is FREE_TRIALS and COST.
+    lags : sequence of int, optional
+        Row offsets for the PREV/GROWTH features. Default is (1,).
+    windows : sequence of int, optional
+        Window lengths for the ROLLING features. Default is (3,).
+    date_col : str, optional
+        The date column. Default is "REPORT_DATE".
+    min_periods : int, optional
+        Non-missing values a window needs to produce a value. Default is 1.
+
+    Returns
+    -------
+    pd.DataFrame
+        A copy with the time-series features added.
+    """
+    metrics = list(metrics)
+    values = df[metrics].to_numpy(dtype=float)
+    names: List[str] = []
+    blocks: List[np.ndarray] = []
+
+    for keys in group_keys:
+        order, block_start = _sorted_group_blocks(df, keys, date_col)
+        results = _time_series_block_features(values[order], block_start, lags, windows, min_periods)
+        suffix = f"_BY_{'_'.join(keys)}" if keys else ""
+
+        for (feature, length), sorted_values in results.items():
+            # Scatter the sorted results back to the input row order, one metric per row
+            unsorted = np.empty(sorted_values.shape[::-1])
+            unsorted[:, order] = sorted_values.T
+            blocks.append(unsorted)
+            for metric in metrics:
+                if feature.startswith("ROLLING"):
+                    names.append(f"ROLLING_{length}_{feature.split('_')[1]}_{metric}{suffix}")
+                else:
+                    names.append(f"{feature}_{length}_{metric}{suffix}")
+
+    if not names:
+        return df.copy()
+    features = pd.DataFrame(np.vstack(blocks).T, columns=names, index=df.index)
+    return pd.concat([df.drop(columns=[c for c in names if c in df.columns]), features], axis=1)
+
+
+def append_time_series_features(
+    history: pd.DataFrame,
+    new_rows: pd.DataFrame,
+    group_keys: Sequence[Sequence[str]] = TIME_SERIES_GROUPS,
+    metrics: Sequence[str] = TIME_SERIES_METRICS,
+    lags: Sequence[int] = (1,),
+    windows: Sequence[int] = (3,),
+    date_col: str = "REPORT_DATE",
+    min_periods: int = 1
+) -> pd.DataFrame:
+    """
+    Compute the time-series features for newly appended report dates only.
+
+    Only the last max(lags, windows - 1) rows of each group in `history` are
+    used as context, so existing features are neither recomputed nor changed.
+    The result equals the tail of add_time_series_features run on the
+    concatenated data.
+
+    Parameters
+    ----------
+    history : pd.DataFrame
+        Rows already processed (the metric, key and date columns are used).
+    new_rows : pd.DataFrame
+        Rows to add; none may be dated before the last history date of its group.
+    group_keys, metrics, lags, windows, date_col, min_periods
+        See add_time_series_features.
+
+    Returns
+    -------
+    pd.DataFrame
+        `new_rows` with the time-series features added, in its own row order.
+
+    Raises
+    ------
+    ValueError
+        If a new row predates the history of its group.
+    """
+    context = max(max(lags, default=0), max(windows, default=1) - 1)
+    columns = list(dict.fromkeys([date_col, *metrics, *(k for keys in group_keys for k in keys)]))
+    combined = pd.concat([history[columns], new_rows[columns]], ignore_index=True)
+    is_new = np.arange(len(combined)) >= len(history)
+
+    keep = is_new.copy()
+    for keys in group_keys:
+        order, block_start = _sorted_group_blocks(combined, keys, date_col)
+        sorted_new = is_new[order]
+
+        # A history row sorted after a new row in the same group means the
+        # new row predates existing history
+        first_new = np.full(len(combined), len(combined))
+        np.minimum.at(first_new, block_start[sorted_new], np.flatnonzero(sorted_new))
+        if (~sorted_new & (np.arange(len(combined)) > first_new[block_start])).any():
+            raise ValueError(f"New rows predate existing history for grouping {list(keys)}")
+
+        # Keep the `context` history rows just before each group's first new row
+        rows_before = first_new[block_start] - np.arange(len(combined))
+        keep[order[~sorted_new & (rows_before >= 1) & (rows_before <= context)]] = True
+
+    features = add_time_series_features(
+        combined.loc[keep], group_keys, metrics, lags, windows, date_col, min_periods
+    )
+    added = features.columns[len(columns):]
+    result = features.loc[is_new[keep]]
+    return new_rows.assign(**{col: result[col].to_numpy() for col in added})
+
+
+def engineer_features(
+    df: pd.DataFrame,
+    date_col: str = "REPORT_DATE",
+    include_holidays: bool = True,
+    include_aggregates: bool = False,
+    include_time_series: bool = False,
+    columns: Optional[List[str]] = None,
+    env: str = "development"
+) -> pd.DataFrame:
+    """
+    Build the modeling features from the cleaned campaign data.
+
+    Adds the holiday flags, MONTH/SEASON, the CHANNEL cross features, the
+    cost ratios and their LOG_* transforms, and optionally the
+    per-(category, MONTH) aggregates and per-CHANNEL time-series features.
+    Categorical outputs keep category dtype, so the result can be saved to
+    Parquet/Feather with its types intact.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Cleaned data (see df_clean.clean_data).
+    date_col : str, optional
+        The date column. Default is "REPORT_DATE".
+    include_holidays : bool, optional
+        Whether to add add_holiday_features. Default is True.
+    include_aggregates : bool, optional
+        Whether to add add_group_aggregate_features and
+        add_normalized_by_month_features. Default is False.
+    include_time_series : bool, optional
+        Whether to add add_time_series_features. Default is False.
+    columns : list of str, optional
+        Columns to return, in order (e.g. LOG_DATA_FE_COLUMNS). Default is all.
+    env : str, optional
+        Environment whose processed-data directory caches the holiday calendar.
+
+    Returns
+    -------
+    pd.DataFrame
+        The feature table.
+    """
+    if include_holidays:
+        df = add_holiday_features(df, date_col=date_col, env=env)
+    df = add_month_season_features(df, date_col=date_col)
+    df = add_cross_features(df)
+    df = add_ratio_features(df)
+    df = add_log_features(df)
+    if include_aggregates:
+        df = add_group_aggregate_features(df)
+        df = add_normalized_by_month_features(df)
+    if include_time_series:
+        df = add_time_series_features(df, date_col=date_col)
+    return df if columns is None else df[columns]
@@ -0,0 +1,413 @@
+from pathlib import Path
+import hashlib
+import json
+import logging
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from src.data_sourcing.import_export_data import CACHE_DIRNAME, DataStore, get_config_manager
+
+logger = logging.getLogger(__name__)
+
+SPLIT_METHODS: List[str] = ["random", "stratified", "grouped", "time"]
+SPLIT_CONFIG_KEY = "hyperparameters.train_test_split"
+
+Fold = Tuple[np.ndarray, np.ndarray]
+
+# In-process copies of computed splits, keyed like their on-disk cache files
+_SPLIT_CACHE: Dict[str, List[Fold]] = {}
+
+
+def data_fingerprint(df: pd.DataFrame, columns: Optional[Sequence[str]] = None) -> str:
+    """
+    Hash the content, index and column names of a DataFrame.
+
+    Uses pandas' vectorized row hashing, so fingerprinting costs one pass over
+    the data and no serialization.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to fingerprint.
+    columns : sequence of str, optional
+        Only hash these columns (e.g. the ones a split depends on). Default is all.
+
+    Returns
+    -------
+    str
+        A hex digest that changes whenever the hashed data changes.
+    """
+    data = df if columns is None else df[list(columns)]
+    digest = hashlib.sha256()
+    digest.update(json.dumps([str(c) for c in data.columns]).encode())
+    digest.update(pd.util.hash_pandas_object(data, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def _index_dtype(n_rows: int) -> type:
+    """Smallest integer dtype that can hold every row position."""
+    return np.int32 if n_rows < np.iinfo(np.int32).max else np.int64
+
+
+def _sized_test_count(n_rows: int, test_size: float) -> int:
+    """Number of test rows for a fraction (0 < test_size < 1) or an absolute count."""
+    n_test = int(np.ceil(test_size * n_rows)) if test_size < 1 else int(test_size)
+    if not 0 < n_test < n_rows:
+        raise ValueError(f"test_size={test_size} leaves an empty train or test set for {n_rows} rows")
+    return n_test
+
+
+def random_split(n_rows: int, test_size: float = 0.2, random_state: Optional[int] = 42) -> Fold:
+    """
+    Shuffle row positions and hold out the first test_size share.
+
+    Parameters
+    ----------
+    n_rows : int
+        Number of rows.
+    test_size : float, optional
+        Test fraction (or row count if >= 1). Default is 0.2.
+    random_state : int, optional
+        Seed. Default is 42.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Sorted train and test row positions.
+    """
+    n_test = _sized_test_count(n_rows, test_size)
+    permutation = np.random.default_rng(random_state).permutation(n_rows).astype(_index_dtype(n_rows))
+    return np.sort(permutation[n_test:]), np.sort(permutation[:n_test])
+
+
+def stratified_split(
+    labels: np.ndarray,
+    test_size: float = 0.2,
+    random_state: Optional[int] = 42
+) -> Fold:
+    """
+    Hold out the same share of every stratum, e.g. every CHANNEL.
+
+    Each stratum contributes round(test_size * stratum size) test rows, with
+    the rounding remainder assigned to the largest fractional parts so the
+    total matches random_split.
+
+    Parameters
+    ----------
+    labels : np.ndarray
+        One stratum label per row.
+    test_size : float, optional
+        Test fraction (or row count if >= 1). Default is 0.2.
+    random_state : int, optional
+        Seed. Default is 42.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Sorted train and test row positions.
+    """
+    n_rows = len(labels)
+    n_test = _sized_test_count(n_rows, test_size)
+    codes, _ = pd.factorize(labels, use_na_sentinel=False)
+    counts = np.bincount(codes)
+
+    # Largest-remainder allocation of the test rows across strata
+    exact = counts * n_test / n_rows
+    per_stratum = np.floor(exact).astype(np.int64)
+    remainder = n_test - per_stratum.sum()
+    per_stratum[np.argsort(per_stratum - exact, kind="stable")[:remainder]] += 1
+
+    # Random order within each stratum: sort by (stratum, random key)
+    rng = np.random.default_rng(random_state)
+    order = np.lexsort((rng.random(n_rows), codes))
+    starts = np.concatenate([[0], np.cumsum(counts)[:-1]])
+    rank_in_stratum = np.arange(n_rows) - starts[codes[order]]
+    is_test = np.zeros(n_rows, dtype=bool)
+    is_test[order] = rank_in_stratum < per_stratum[codes[order]]
+
+    positions = np.arange(n_rows, dtype=_index_dtype(n_rows))
+    return positions[~is_test], positions[is_test]
+
+
+def grouped_split(
+    groups: np.ndarray,
+    test_size: float = 0.2,
+    random_state: Optional[int] = 42
+) -> Fold:
+    """
+    Hold out whole groups so no group appears in both train and test.
+
+    Groups are shuffled and added to the test set until it holds at least
+    test_size of the rows.
+
+    Parameters
+    ----------
+    groups : np.ndarray
+        One group label per row (e.g. campaign identifiers).
+    test_size : float, optional
+        Target test fraction (or row count if >= 1). Default is 0.2.
+    random_state : int, optional
+        Seed. Default is 42.
+
+    Returns
+    -------
+    tuple of np.ndarray
+        Sorted train and test row positions.
+
+    Raises
+    ------
+    ValueError
+        If there are fewer than two groups.
+    """
+    n_rows = len(groups)
+    n_test = _sized_test_count(n_rows, test_size)
+    codes, uniques = pd.factorize(groups, use_na_sentinel=False)
+    if len(uniques) < 2:
+        raise ValueError("grouped_split needs at least two groups")
+
+    counts = np.bincount(codes)
+    shuffled = np.random.default_rng(random_state).permutation(len(uniques))
+    # Take groups until the test share is reached, always leaving one for training
+    n_test_groups = min(int(np.searchsorted(np.cumsum(counts[shuffled]), n_test)) + 1, len(uniques) - 1)
+    is_test = np.isin(codes, shuffled[:n_test_groups])
+
+    positions = np.arange(n_rows, dtype=_index_dtype(n_rows))
+    return positions[~is_test], positions[is_test]
+
+
+def time_series_splits(
+    dates: np.ndarray,
+    n_splits: int = 5,
+    test_size: Optional[float] = None,
+    gap: int = 0
+) -> List[Fold]:
+    """
+    Forward-chaining splits over distinct report dates.
+
+    Every fold trains on all dates before its test window, and all rows of
+    one date land on the same side. With n_splits=1 this is a single
+    "train on the past, test on the last test_size of dates" split.
+
+    Parameters
+    ----------
+    dates : np.ndarray
+        One date per row.
+    n_splits : int, optional
+        Number of folds. Default is 5.
+    test_size : float, optional
+        Share (or count if >= 1) of distinct dates per test window. Default is
+        1 / (n_splits + 1) of the dates.
+    gap : int, optional
+        Distinct dates left out between train and test. Default is 0.
+
+    Returns
+    -------
+    list of tuple of np.ndarray
+        Train and test row positions per fold, oldest test window first.
+
+    Raises
+    ------
+    ValueError
+        If there are not enough distinct dates for the requested folds.
+    """
+    date_codes, unique_dates = pd.factorize(pd.to_datetime(dates), sort=True)
+    n_dates = len(unique_dates)
+    if test_size is None:
+        window = n_dates // (n_splits + 1)
+    else:
+        window = int(np.ceil(test_size * n_dates)) if test_size < 1 else int(test_size)
+    if window < 1 or n_dates - n_splits * window - gap < 1:
+        raise ValueError(f"{n_dates} distinct dates are too few for {n_splits} splits")
+
+    # Rows sorted by date once; each fold is then two contiguous slices
+    order = np.argsort(date_codes, kind="stable").astype(_index_dtype(len(dates)))
+    date_starts = np.searchsorted(date_codes[order], np.arange(n_dates + 1))
+
+    folds = []
+    for test_start in range(n_dates - n_splits * window, n_dates, window):
+        train_end = date_starts[test_start - gap]
+        test_rows = order[date_starts[test_start]:date_starts[test_start + window]]
+        folds.append((np.sort(order[:train_end]), np.sort(test_rows)))
+    return folds
+
+
+def _split_settings(env: str, overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge hyperparameters.train_test_split from the config with explicit arguments."""
+    settings = {
+        "method": "random",
+        "test_size": 0.2,
+        "random_state": 42,
+        "stratify_column": "CHANNEL",
+        "group_column": None,
+        "date_column": "REPORT_DATE",
+        "n_splits": 1,
+        "gap": 0,
+    }
+    settings.update(get_config_manager(env).get(SPLIT_CONFIG_KEY, {}) or {})
+    settings.update({k: v for k, v in overrides.items() if v is not None})
+    if settings["method"] not in SPLIT_METHODS:
+        raise ValueError(f"Unsupported split method: {settings['method']}. Must be one of {SPLIT_METHODS}.")
+    return settings
+
+
+def get_split_indices(
+    df: pd.DataFrame,
+    method: Optional[str] = None,
+    test_size: Optional[float] = None,
+    random_state: Optional[int] = None,
+    stratify_column: Optional[str] = None,
+    group_column: Optional[str] = None,
+    date_column: Optional[str] = None,
+    n_splits: Optional[int] = None,
+    gap: Optional[int] = None,
+    env: str = "development",
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None
+) -> List[Fold]:
+    """
+    Compute (or reuse) train/test row positions for a DataFrame.
+
+    Unset arguments come from hyperparameters.train_test_split in the
+    environment's config. Splits are keyed by the split settings and a
+    fingerprint of the columns the split depends on, kept in memory and saved
+    as compressed int32 arrays in the processed-data cache directory, so
+    repeated experiments get identical splits without reshuffling.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to split. Only its length and the key column are read.
+    method : str, optional
+        "random", "stratified" (by stratify_column), "grouped" (by
+        group_column) or "time" (forward-chaining on date_column).
+    test_size : float, optional
+        Test fraction (or count if >= 1); for "time", of distinct dates per
+        test window. For "time" with n_splits > 1 only an explicit test_size
+        is used; otherwise each window is 1 / (n_splits + 1) of the dates.
+    random_state : int, optional
+        Seed for the shuffled methods.
+    stratify_column : str, optional
+        Column for "stratified". Config default is "CHANNEL".
+    group_column : str, optional
+        Column for "grouped".
+    date_column : str, optional
+        Column for "time". Config default is "REPORT_DATE".
+    n_splits : int, optional
+        Number of forward-chaining folds for "time". Default is 1.
+    gap : int, optional
+        Distinct dates skipped between train and test for "time". Default is 0.
+    env : str, optional
+        Environment whose config supplies defaults.
+    use_cache : bool, optional
+        Whether to reuse cached splits. Default is True.
+    cache_dir : Path, optional
+        Directory for cached splits. Default is the processed-data
+        directory's CACHE_DIRNAME/splits folder.
+
+    Returns
+    -------
+    list of tuple of np.ndarray
+        Sorted train and test row positions; one fold except for "time".
+
+    Raises
+    ------
+    ValueError
+        If the method is unknown, its key column is missing, or the split
+        would leave an empty side.
+    """
+    settings = _split_settings(env, {
+        "method": method, "test_size": test_size, "random_state": random_state,
+        "stratify_column": stratify_column, "group_column": group_column,
+        "date_column": date_column, "n_splits": n_splits, "gap": gap,
+    })
+    method = settings["method"]
+    key_column = {
+        "stratified": settings["stratify_column"],
+        "grouped": settings["group_column"],
+        "time": settings["date_column"],
+    }.get(method)
+    if method != "random" and key_column not in df.columns:
+        raise ValueError(f"Split method '{method}' needs a column present in the data, got {key_column!r}")
+
+    relevant = {k: settings[k] for k in ("method", "test_size", "random_state")}
+    if method == "time":
+        # The configured test_size describes a single holdout; several folds
+        # take their window from an explicit test_size or from n_splits
+        if settings["n_splits"] > 1:
+            relevant["test_size"] = test_size
+        relevant.update(n_splits=settings["n_splits"], gap=settings["gap"])
+    fingerprint = data_fingerprint(df, [key_column] if key_column else [])
+    key_source = json.dumps({**relevant, "column": key_column, "rows": len(df), "data": fingerprint}, sort_keys=True)
+    key = f"split_{hashlib.sha256(key_source.encode()).hexdigest()[:16]}"
+
+    if use_cache and key in _SPLIT_CACHE:
+        return _SPLIT_CACHE[key]
+
+    if cache_dir is None:
+        cache_dir = DataStore(env).base_path("processed_data") / CACHE_DIRNAME / "splits"
+    cache_path = Path(cache_dir) / f"{key}.npz"
+
+    if use_cache and cache_path.exists():
+        with np.load(cache_path) as stored:
+            folds = [(stored[f"train_{i}"], stored[f"test_{i}"]) for i in range(len(stored.files) // 2)]
+    else:
+        if method == "random":
+            folds = [random_split(len(df), settings["test_size"], settings["random_state"])]
+        elif method == "stratified":
+            folds = [stratified_split(df[key_column].to_numpy(), settings["test_size"], settings["random_state"])]
+        elif method == "grouped":
+            folds = [grouped_split(df[key_column].to_numpy(), settings["test_size"], settings["random_state"])]
+        else:
+            folds = time_series_splits(
+                df[key_column].to_numpy(), settings["n_splits"], relevant["test_size"], settings["gap"]
+            )
+        if use_cache:
+            try:
+                cache_path.parent.mkdir(parents=True, exist_ok=True)
+                arrays = {}
+                for i, (train, test) in enumerate(folds):
+                    arrays[f"train_{i}"], arrays[f"test_{i}"] = train, test
+                np.savez_compressed(cache_path, **arrays)
+            except OSError as e:
+                logger.warning(f"Could not cache split {cache_path}: {e}")
+
+    if use_cache:
+        _SPLIT_CACHE[key] = folds
+    return folds
+
+
+def split_data(
+    df: pd.DataFrame,
+    target: Optional[str] = None,
+    fold: int = -1,
+    **kwargs: Any
+) -> Tuple[pd.DataFrame, ...]:
+    """
+    Config-driven replacement for the notebooks' train_test_split call.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        The data to split.
+    target : str, optional
+        If given, return (X_train, X_test, y_train, y_test) like
+        sklearn.model_selection.train_test_split; otherwise (train, test).
+    fold : int, optional
+        Which fold to use for multi-fold "time" splits. Default is the last.
+    **kwargs
+        Passed to get_split_indices (method, test_size, env, ...).
+
+    Returns
+    -------
+    tuple of pd.DataFrame / pd.Series
+        The selected rows, taken by position.
+    """
+    train_idx, test_idx = get_split_indices(df, **kwargs)[fold]
+    train, test = df.take(train_idx), df.take(test_idx)
+    if target is None:
+        return train, test
+    return (
+        train.drop(columns=target), test.drop(columns=target),
+        train[target], test[target]
+    )
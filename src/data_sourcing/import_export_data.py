@@ -1,16 +1,35 @@
 from pathlib import Path
+import hashlib
+import json
 import logging
+import threading
 import yaml
 import pandas as pd
-from typing import Optional, Union, Dict, Any
+from typing import Optional, Union, Dict, Any, List, Tuple
 
-# Configure logging once at module level
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s'
-)
+from src.instrumentation import instrument
+
+# Library module: log through a named logger and leave handler/level setup to
+# the application (see src.instrumentation.configure_logging)
 logger = logging.getLogger(__name__)
 
+# Columnar sidecars for CSV sources live next to the data in this directory
+CACHE_DIRNAME = ".cache"
+_FINGERPRINT_KEY = b"source_fingerprint"
+# CSV text columns with at most this share of distinct values load as category
+CATEGORY_MAX_UNIQUE_FRACTION = 0.5
+
+Filters = Union[List[Tuple[str, str, Any]], List[List[Tuple[str, str, Any]]]]
+
+# Process-wide caches: parsed YAML keyed by config path (invalidated on mtime
+# change), and one shared ConfigManager per environment
+_CONFIG_CACHE: Dict[Path, Tuple[int, Dict[str, Any]]] = {}
+_CONFIG_MANAGERS: Dict[str, "ConfigManager"] = {}
+_DATA_STORES: Dict[str, "DataStore"] = {}
+_PROJECT_ROOT: Optional[Path] = None
+_CONFIG_LOCK = threading.Lock()
+_MISSING = object()
+
 class ConfigManager:
     """
     Centralized configuration manager to handle YAML configuration files.
@@ -37,20 +56,25 @@ class ConfigManager:
 
     def _determine_project_root(self) -> Path:
         """
-        Determine the project root directory.
+        Determine the project root directory. Resolved once per process.
 
         Returns:
             Path: Project root directory
         """
+        global _PROJECT_ROOT
+        if _PROJECT_ROOT is not None:
+            return _PROJECT_ROOT
+
         try:
-            return Path(__file__).resolve().parents[2]
+            _PROJECT_ROOT = Path(__file__).resolve().parents[2]
         except NameError:
             current_path = Path().resolve()
             while not (current_path / "configs").exists():
                 if current_path == current_path.parent:
                     raise FileNotFoundError("Could not find project root with configs directory")
                 current_path = current_path.parent
-            return current_path
+            _PROJECT_ROOT = current_path
+        return _PROJECT_ROOT
 
     def _get_config_path(self, env: str) -> Path:
         """
@@ -71,11 +95,34 @@ class ConfigManager:
         """
         Load configuration from YAML file.
 
+        The parsed YAML is shared process-wide and only re-parsed when the
+        file's modification time changes.
+
         Returns:
             Dict: Configuration data
         """
-        with open(self.config_path, "r", encoding="utf-8") as f:
-            return yaml.safe_load(f)
+        mtime_ns = self.config_path.stat().st_mtime_ns
+        with _CONFIG_LOCK:
+            cached = _CONFIG_CACHE.get(self.config_path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+
+            with open(self.config_path, "r", encoding="utf-8") as f:
+                config = yaml.safe_load(f) or {}
+            _CONFIG_CACHE[self.config_path] = (mtime_ns, config)
+            return config
+
+    def refresh(self) -> bool:
+        """
+        Reload the configuration if the YAML file changed on disk.
+
+        Returns:
+            bool: True if a new configuration was loaded
+        """
+        config = self._load_config()
+        changed = config is not self.config
+        self.config = config
+        return changed
 
     def get(self, key: str, default: Any = None) -> Any:
         """
@@ -90,23 +137,416 @@ class ConfigManager:
         """
         value = self.config
         for k in key.split('.'):
-            value = value.get(k, default)
-            if value is None:
-                break
+            if not isinstance(value, dict):
+                return default
+            value = value.get(k, _MISSING)
+            if value is _MISSING:
+                return default
         return value
 
+def get_config_manager(env: str = "development") -> ConfigManager:
+    """
+    Return the process-wide ConfigManager for an environment.
+
+    The manager is created once per environment; later calls only stat the
+    YAML file and reload it if its modification time changed.
+
+    Args:
+        env: Environment name
+
+    Returns:
+        ConfigManager: Shared configuration manager
+    """
+    manager = _CONFIG_MANAGERS.get(env)
+    if manager is None:
+        manager = ConfigManager(env)
+        with _CONFIG_LOCK:
+            manager = _CONFIG_MANAGERS.setdefault(env, manager)
+    else:
+        manager.refresh()
+    return manager
+
+def _file_fingerprint(file_path: Path, with_hash: bool = True) -> Dict[str, Any]:
+    """
+    Describe a source file by size, modification time and (optionally) content hash.
+
+    Args:
+        file_path: File to fingerprint
+        with_hash: Whether to hash the file contents (one sequential read)
+
+    Returns:
+        Dict: Fingerprint with "size", "mtime_ns" and "sha256" keys
+    """
+    stat = file_path.stat()
+    fingerprint = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": None}
+    if with_hash:
+        digest = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+        fingerprint["sha256"] = digest.hexdigest()
+    return fingerprint
+
+def _cache_is_fresh(source_path: Path, cache_path: Path) -> bool:
+    """
+    Check whether a columnar sidecar still matches its CSV source.
+
+    The size and mtime are compared first; the content hash is only computed
+    when the mtime moved but the size did not (e.g. after a git checkout).
+
+    Args:
+        source_path: The CSV file
+        cache_path: Its Parquet sidecar
+
+    Returns:
+        bool: True if the sidecar can be reused
+    """
+    if not cache_path.exists():
+        return False
+
+    import pyarrow.parquet as pq
+
+    try:
+        metadata = pq.read_schema(cache_path).metadata or {}
+        cached = json.loads(metadata[_FINGERPRINT_KEY])
+    except (OSError, ValueError, KeyError):
+        return False
+
+    current = _file_fingerprint(source_path, with_hash=False)
+    if current["size"] != cached["size"]:
+        return False
+    if current["mtime_ns"] == cached["mtime_ns"]:
+        return True
+    current = _file_fingerprint(source_path)
+    if current["sha256"] != cached["sha256"]:
+        return False
+    # Same content under a new mtime: record it, so later reads skip the hash
+    _retag_cache(cache_path, current)
+    return True
+
+def _retag_cache(cache_path: Path, fingerprint: Dict[str, Any]) -> None:
+    """
+    Replace the source fingerprint stored in a Parquet sidecar's metadata.
+
+    Failures are logged and ignored; the sidecar stays valid either way.
+
+    Args:
+        cache_path: The sidecar
+        fingerprint: The source's current fingerprint
+    """
+    try:
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(cache_path)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_FINGERPRINT_KEY] = json.dumps(fingerprint).encode()
+        tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        tmp_path.replace(cache_path)
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not update columnar cache {cache_path}: {e}")
+
+def _write_cache(dataframe: pd.DataFrame, source_path: Path, cache_path: Path) -> None:
+    """
+    Write a Parquet sidecar for a CSV source, tagged with the source fingerprint.
+
+    Failures are logged and ignored; the cache is an optimization only.
+
+    Args:
+        dataframe: The parsed CSV contents
+        source_path: The CSV file
+        cache_path: Where to write the sidecar
+    """
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        table = pa.Table.from_pandas(dataframe, preserve_index=False)
+        metadata = dict(table.schema.metadata or {})
+        metadata[_FINGERPRINT_KEY] = json.dumps(_file_fingerprint(source_path)).encode()
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = cache_path.with_suffix(cache_path.suffix + ".tmp")
+        pq.write_table(table.replace_schema_metadata(metadata), tmp_path)
+        tmp_path.replace(cache_path)
+    except (ImportError, OSError, ValueError, TypeError) as e:
+        logger.warning(f"Could not write columnar cache {cache_path}: {e}")
+
+def _apply_filters(dataframe: pd.DataFrame, filters: Optional[Filters]) -> pd.DataFrame:
+    """
+    Apply pyarrow-style filters to an in-memory DataFrame.
+
+    Args:
+        dataframe: Data to filter
+        filters: A list of (column, op, value) tuples combined with AND, or a list of
+            such lists combined with OR. Supported ops: ==, =, !=, <, <=, >, >=, in, not in
+
+    Returns:
+        pd.DataFrame: The matching rows
+    """
+    if not filters:
+        return dataframe
+
+    clauses = filters if isinstance(filters[0], list) else [filters]
+    keep = pd.Series(False, index=dataframe.index)
+    for clause in clauses:
+        clause_mask = pd.Series(True, index=dataframe.index)
+        for column, op, value in clause:
+            series = dataframe[column]
+            if op in ("==", "="):
+                clause_mask &= series == value
+            elif op == "!=":
+                clause_mask &= series != value
+            elif op == "<":
+                clause_mask &= series < value
+            elif op == "<=":
+                clause_mask &= series <= value
+            elif op == ">":
+                clause_mask &= series > value
+            elif op == ">=":
+                clause_mask &= series >= value
+            elif op == "in":
+                clause_mask &= series.isin(value)
+            elif op == "not in":
+                clause_mask &= ~series.isin(value)
+            else:
+                raise ValueError(f"Unsupported filter operator: {op}")
+        keep |= clause_mask
+    return dataframe.loc[keep].reset_index(drop=True)
+
+def _categorize_strings(dataframe: pd.DataFrame) -> pd.DataFrame:
+    """
+    Convert low-cardinality text columns of a parsed CSV to category dtype,
+    so CSV reads (and their sidecars) return the dtypes Parquet preserves.
+
+    Args:
+        dataframe: Output of pd.read_csv
+
+    Returns:
+        pd.DataFrame: The frame with repetitive string columns as category
+    """
+    max_unique = max(int(len(dataframe) * CATEGORY_MAX_UNIQUE_FRACTION), 1)
+    text_cols = dataframe.select_dtypes(include=["object", "string"]).columns
+    categorical = [c for c in text_cols if dataframe[c].nunique() <= max_unique]
+    return dataframe.astype({c: "category" for c in categorical}) if categorical else dataframe
+
+def _filter_columns(columns: Optional[List[str]], filters: Optional[Filters]) -> Optional[List[str]]:
+    """The projected columns plus any column the filters need (all if columns is None)."""
+    if columns is None or not filters:
+        return columns
+    clauses = filters if isinstance(filters[0], list) else [filters]
+    extra = [c for clause in clauses for c, _, _ in clause if c not in columns]
+    return list(columns) + list(dict.fromkeys(extra))
+
+def _read_file(
+    file_path: Path,
+    columns: Optional[List[str]] = None,
+    filters: Optional[Filters] = None,
+    use_cache: bool = True
+) -> pd.DataFrame:
+    """
+    Read a CSV, Parquet or Feather file with column projection and row filters.
+
+    CSV files are served from a Parquet sidecar in CACHE_DIRNAME when use_cache
+    is True; the sidecar is (re)built whenever the CSV changes. Repetitive text
+    columns of a CSV load as category, cached or not (see _categorize_strings). Filters on CSV
+    and Feather data are applied in pandas after the read (see _apply_filters),
+    so a CSV returns the same rows with or without its sidecar.
+
+    Args:
+        file_path: File to read
+        columns: Columns to load (all if None)
+        filters: Row filters, see _apply_filters
+        use_cache: Whether to use the columnar sidecar for CSV files
+
+    Returns:
+        pd.DataFrame: Loaded data
+    """
+    suffix = file_path.suffix.lower()
+
+    if suffix == ".parquet":
+        return pd.read_parquet(file_path, columns=columns, filters=filters or None)
+    if suffix == ".feather":
+        # Feather has no predicate pushdown, so read the filter columns as well
+        df = _apply_filters(pd.read_feather(file_path, columns=_filter_columns(columns, filters)), filters)
+        return df if columns is None else df[columns]
+
+    if use_cache:
+        cache_path = file_path.parent / CACHE_DIRNAME / f"{file_path.name}.parquet"
+        if _cache_is_fresh(file_path, cache_path):
+            logger.debug(f"Reading columnar cache: {cache_path}")
+            # Project, but filter in pandas: pyarrow pushdown treats nulls
+            # differently from the first (uncached) read
+            df = pd.read_parquet(cache_path, columns=_filter_columns(columns, filters))
+        else:
+            df = _categorize_strings(pd.read_csv(file_path))
+            _write_cache(df, file_path, cache_path)
+    else:
+        df = _categorize_strings(pd.read_csv(file_path))
+
+    df = _apply_filters(df, filters)
+    return df if columns is None else df[columns]
+
+class DataStore:
+    """
+    Reusable handle on the configured data directories of one environment.
+
+    Base paths are resolved from the configuration once and kept, so repeated
+    loads and saves (e.g. in a notebook loop) do no further config or
+    directory work. Call refresh() after editing the YAML file.
+
+    Attributes:
+        env (str): Environment name
+        config_manager (ConfigManager): Configuration backing this store
+    """
+
+    def __init__(self, env: str = "development") -> None:
+        """
+        Initialize the data store.
+
+        Args:
+            env: Environment name (e.g., "development", "production")
+        """
+        self.env = env
+        self.config_manager = get_config_manager(env)
+        self._base_paths: Dict[str, Path] = {}
+        self._created_dirs: set = set()
+
+    def refresh(self) -> None:
+        """
+        Reload the configuration if it changed and forget resolved paths.
+        """
+        if self.config_manager.refresh():
+            self._base_paths.clear()
+            self._created_dirs.clear()
+
+    def base_path(self, data_type: str) -> Path:
+        """
+        Resolve the directory configured for a data type.
+
+        Args:
+            data_type: Type of data (raw_data, processed_data, etc.)
+
+        Returns:
+            Path: Absolute directory path
+
+        Raises:
+            KeyError: If data_type is not found in config
+        """
+        base_path = self._base_paths.get(data_type)
+        if base_path is None:
+            relative = self.config_manager.get(f"paths.{data_type}")
+            if relative is None:
+                raise KeyError(f"Missing configuration for paths.{data_type}")
+            base_path = self.config_manager.project_root / relative
+            self._base_paths[data_type] = base_path
+        return base_path
+
+    def load(
+        self,
+        filename: str,
+        data_type: str = "raw_data",
+        columns: Optional[List[str]] = None,
+        filters: Optional[Filters] = None,
+        use_cache: bool = True
+    ) -> pd.DataFrame:
+        """
+        Load a data file from a configured directory. See get_data.
+
+        Raises:
+            FileNotFoundError: If the data file cannot be found
+        """
+        file_path = self.base_path(data_type) / filename
+
+        logger.debug(f"Loading data from: {file_path}")
+
+        if not file_path.exists():
+            raise FileNotFoundError(f"File not found: {file_path}")
+
+        return _read_file(file_path, columns=columns, filters=filters, use_cache=use_cache)
+
+    def save(
+        self,
+        dataframe: pd.DataFrame,
+        filename: str,
+        data_type: str = "processed_data"
+    ) -> Path:
+        """
+        Save a DataFrame to a configured directory. See save_data.
+
+        Returns:
+            Path: The written file
+
+        Raises:
+            ValueError: If input validation fails
+            KeyError: If data_type is not found in config
+        """
+        # Input validation
+        if not isinstance(dataframe, pd.DataFrame):
+            raise ValueError("dataframe must be a pandas DataFrame")
+        if not isinstance(filename, str) or not filename.strip():
+            raise ValueError("filename must be a non-empty string")
+
+        base_path = self.base_path(data_type)
+
+        # Ensure directory exists (once per store) and save file
+        if base_path not in self._created_dirs:
+            base_path.mkdir(parents=True, exist_ok=True)
+            self._created_dirs.add(base_path)
+        file_path = base_path / filename
+        suffix = file_path.suffix.lower()
+        if suffix == ".parquet":
+            dataframe.to_parquet(file_path, index=False)
+        elif suffix == ".feather":
+            dataframe.reset_index(drop=True).to_feather(file_path)
+        else:
+            dataframe.to_csv(file_path, index=False)
+
+        logger.info(
+            f"Data saved successfully!\n"
+            f"Environment: {self.env}\n"
+            f"Data Type: {data_type}\n"
+            f"File Path: {file_path}\n"
+            f"Rows Saved: {len(dataframe)}"
+        )
+        return file_path
+
+def _default_store(env: str) -> DataStore:
+    """
+    Return the shared DataStore behind get_data/save_data for an environment,
+    refreshed if its YAML file changed.
+    """
+    store = _DATA_STORES.get(env)
+    if store is None:
+        store = _DATA_STORES.setdefault(env, DataStore(env))
+    else:
+        store.refresh()
+    return store
+
+@instrument()
 def get_data(
     filename: str,
     data_type: str = "raw_data",
-    env: str = "development"
+    env: str = "development",
+    columns: Optional[List[str]] = None,
+    filters: Optional[Filters] = None,
+    use_cache: bool = True
 ) -> pd.DataFrame:
     """
     Load a data file dynamically based on the configuration.
 
+    The format is chosen from the file extension (.csv, .parquet, .feather).
+    CSV files are transparently cached as Parquet on first read and the cache is
+    reused while the CSV's size/mtime (or content hash) is unchanged.
+
     Args:
         filename: Name of the data file
         data_type: Type of data (raw_data, processed_data, etc.)
         env: Environment (development, production, etc.)
+        columns: Columns to load (all if None)
+        filters: Row filters as (column, op, value) tuples, ANDed; a list of such
+            lists is ORed. Pushed down to the reader for Parquet files; applied
+            in pandas for CSV and Feather files, cached or not.
+        use_cache: Whether to use the columnar cache for CSV files
 
     Returns:
         pd.DataFrame: Loaded data
@@ -114,17 +554,11 @@ def get_data(
     Raises:
         FileNotFoundError: If the data file cannot be found
     """
-    config_manager = ConfigManager(env)
-    base_path = config_manager.project_root / config_manager.get(f"paths.{data_type}")
-    file_path = base_path / filename
-
-    logger.debug(f"Loading data from: {file_path}")
-
-    if not file_path.exists():
-        raise FileNotFoundError(f"File not found: {file_path}")
-
-    return pd.read_csv(file_path)
+    return _default_store(env).load(
+        filename, data_type=data_type, columns=columns, filters=filters, use_cache=use_cache
+    )
 
+@instrument()
 def save_data(
     dataframe: pd.DataFrame,
     filename: str,
@@ -134,6 +568,9 @@ def save_data(
     """
     Save a DataFrame to a specified location based on the configuration.
 
+    The format is chosen from the file extension. Parquet and Feather keep
+    category, bool and datetime dtypes; anything else is written as CSV.
+
     Args:
         dataframe: The DataFrame to save
         filename: Name of the output file
@@ -144,27 +581,4 @@ def save_data(
         ValueError: If input validation fails
         KeyError: If data_type is not found in config
     """
-    # Input validation
-    if not isinstance(dataframe, pd.DataFrame):
-        raise ValueError("dataframe must be a pandas DataFrame")
-    if not isinstance(filename, str) or not filename.strip():
-        raise ValueError("filename must be a non-empty string")
-
-    config_manager = ConfigManager(env)
-    base_path = config_manager.project_root / config_manager.get(f"paths.{data_type}")
-
-    if base_path is None:
-        raise KeyError(f"Missing configuration for paths.{data_type}")
-
-    # Ensure directory exists and save file
-    base_path.mkdir(parents=True, exist_ok=True)
-    file_path = base_path / filename
-    dataframe.to_csv(file_path, index=False)
-
-    logger.info(
-        f"Data saved successfully!\n"
-        f"Environment: {env}\n"
-        f"Data Type: {data_type}\n"
-        f"File Path: {file_path}\n"
-        f"Rows Saved: {len(dataframe)}"
-    )
\ No newline at end of file
+    _default_store(env).save(dataframe, filename, data_type=data_type)
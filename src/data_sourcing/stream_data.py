@@ -0,0 +1,157 @@
+from pathlib import Path
+import re
+import logging
+import pandas as pd
+from pandas.api.types import union_categoricals
+from typing import Optional, Dict, Any, List, Iterable, Iterator
+
+from src.data_sourcing.import_export_data import DataStore
+
+logger = logging.getLogger(__name__)
+
+# Compact dtypes for the campaign extract, keyed by normalized column name
+RAW_DTYPES: Dict[str, Any] = {
+    "ATL_OR_DR": "category",
+    "CAMPAIGN_TYPE": "category",
+    "CHANNEL": "category",
+    "COST": "float32",
+    "FREE_TRIALS": "float32",
+}
+DATE_COLUMNS: List[str] = ["REPORT_DATE"]
+RAW_DATE_FORMAT = "%m/%d/%Y"
+
+
+def normalize_column_name(name: str) -> str:
+    """
+    Normalize a raw header: strip BOMs and surrounding whitespace, upper-case,
+    and collapse inner spaces/hyphens to underscores.
+
+    Args:
+        name: Raw column header (e.g. "FREE TRIALS", "CAMPAIGN_TYPE ")
+
+    Returns:
+        str: Normalized name (e.g. "FREE_TRIALS", "CAMPAIGN_TYPE")
+    """
+    name = name.replace("\ufeff", "").strip().upper()
+    return re.sub(r"[\s\-]+", "_", name)
+
+
+def _raw_header(file_path: Path) -> List[str]:
+    """
+    Read only the header row of a CSV file.
+
+    Args:
+        file_path: CSV file
+
+    Returns:
+        List[str]: Raw column names, as written in the file
+    """
+    return list(pd.read_csv(file_path, nrows=0, encoding="utf-8-sig").columns)
+
+
+def iter_raw_chunks(
+    filename: str = "data.csv",
+    data_type: str = "raw_data",
+    env: str = "development",
+    chunksize: int = 100_000,
+    columns: Optional[List[str]] = None,
+    categories: Optional[Dict[str, List[str]]] = None,
+    date_format: str = RAW_DATE_FORMAT,
+    store: Optional[DataStore] = None
+) -> Iterator[pd.DataFrame]:
+    """
+    Stream a raw campaign CSV as typed, header-normalized chunks.
+
+    Each chunk has normalized column names, categorical dimensions, float32
+    measures and a parsed REPORT_DATE, so only one chunk is held in memory at a
+    time. Downstream steps can consume the iterator chunk by chunk, e.g.
+    ``(clean(chunk) for chunk in iter_raw_chunks())``.
+
+    Args:
+        filename: Name of the raw data file
+        data_type: Type of data directory
+        env: Environment name
+        chunksize: Rows per chunk
+        columns: Normalized column names to load (all if None)
+        categories: Known levels per categorical column. When given, every chunk
+            shares the same CategoricalDtype and chunks concatenate without
+            falling back to object dtype.
+        date_format: strptime format of the date columns
+        store: DataStore to resolve paths with (defaults to one for env)
+
+    Yields:
+        pd.DataFrame: One typed chunk per iteration
+
+    Raises:
+        FileNotFoundError: If the data file cannot be found
+        KeyError: If a requested column is not in the file
+    """
+    store = store or DataStore(env)
+    file_path = store.base_path(data_type) / filename
+    if not file_path.exists():
+        raise FileNotFoundError(f"File not found: {file_path}")
+
+    # Map raw headers to normalized names so dtypes and projection use the clean names
+    raw_columns = _raw_header(file_path)
+    rename = {raw: normalize_column_name(raw) for raw in raw_columns}
+    normalized_to_raw = {norm: raw for raw, norm in rename.items()}
+
+    if columns is not None:
+        missing = [c for c in columns if c not in normalized_to_raw]
+        if missing:
+            raise KeyError(f"Columns not found in {file_path.name}: {missing}")
+        usecols = [normalized_to_raw[c] for c in columns]
+    else:
+        usecols = raw_columns
+
+    dtypes = {}
+    for raw in usecols:
+        norm = rename[raw]
+        if categories and norm in categories:
+            dtypes[raw] = pd.CategoricalDtype(categories[norm])
+        elif norm in RAW_DTYPES:
+            dtypes[raw] = RAW_DTYPES[norm]
+
+    logger.debug(f"Streaming {file_path} in chunks of {chunksize} rows")
+
+    reader = pd.read_csv(
+        file_path,
+        usecols=usecols,
+        dtype=dtypes,
+        encoding="utf-8-sig",
+        chunksize=chunksize
+    )
+    with reader:
+        for chunk in reader:
+            chunk = chunk.rename(columns=rename)
+            for col in DATE_COLUMNS:
+                if col in chunk.columns:
+                    chunk[col] = pd.to_datetime(chunk[col], format=date_format)
+            yield chunk
+
+
+def concat_chunks(chunks: Iterable[pd.DataFrame]) -> pd.DataFrame:
+    """
+    Concatenate typed chunks, unifying per-chunk categorical levels so the
+    result keeps category dtype instead of decaying to object.
+
+    Args:
+        chunks: Chunks as produced by iter_raw_chunks (or a downstream step)
+
+    Returns:
+        pd.DataFrame: All chunks stacked with a fresh RangeIndex
+    """
+    chunks = list(chunks)
+    if not chunks:
+        return pd.DataFrame()
+
+    cat_cols = [
+        col for col in chunks[0].columns
+        if isinstance(chunks[0][col].dtype, pd.CategoricalDtype)
+    ]
+    dtypes = {
+        col: pd.CategoricalDtype(union_categoricals([chunk[col] for chunk in chunks]).categories)
+        for col in cat_cols
+    }
+    # astype returns new frames, so the caller's chunks keep their own dtypes
+    return pd.concat([chunk.astype(dtypes) for chunk in chunks], ignore_index=True)
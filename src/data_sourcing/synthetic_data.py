@@ -0,0 +1,132 @@
+from pathlib import Path
+import logging
+import pandas as pd
+import numpy as np
+from typing import List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Header of data/raw/data.csv, spelled as in the extract (trailing space included)
+RAW_COLUMNS: List[str] = ["REPORT_DATE", "ATL_OR_DR", "CAMPAIGN_TYPE ", "CHANNEL", "COST", "FREE TRIALS"]
+
+# Levels seen in the extract; larger cardinalities add synthetic levels after these
+CHANNELS: List[str] = [
+    "paid social", "youtube", "display", "app", "ott", "bvod", "online display",
+    "cinema", "ooh", "partnership", "tv", "print", "digital audio", "olv", "ctv",
+    "radio", "pmax"
+]
+CAMPAIGN_TYPES: List[str] = ["Title", "Brand", "Launch", "Promotion"]
+ATL_OR_DR_LEVELS: List[str] = ["ATL - Above The Line", "DR - Direct Response"]
+
+
+def _levels(known: List[str], n_levels: int, prefix: str) -> np.ndarray:
+    """The first n_levels known levels, padded with "<prefix>_<i>" names."""
+    extra = [f"{prefix}_{i}" for i in range(len(known) + 1, n_levels + 1)]
+    return np.array((known + extra)[:n_levels], dtype=object)
+
+
+def _zipf_weights(n_levels: int, rng: np.random.Generator, exponent: float = 0.8) -> np.ndarray:
+    """Skewed level frequencies (a few large channels, a long tail), shuffled."""
+    weights = 1.0 / np.arange(1, n_levels + 1) ** exponent
+    return rng.permutation(weights / weights.sum())
+
+
+def generate_campaign_data(
+    n_rows: int = 14_108,
+    n_channels: int = len(CHANNELS),
+    n_campaign_types: int = 3,
+    start_date: str = "2022-06-01",
+    end_date: str = "2024-05-01",
+    seed: Optional[int] = 42,
+    raw_format: bool = True
+) -> pd.DataFrame:
+    """
+    Synthesize campaign rows with the schema of data/raw/data.csv.
+
+    Channels have skewed frequencies and are each run as ATL, DR or both, as
+    in the extract, so the CHANNEL x ATL_OR_DR and CHANNEL x CAMPAIGN_TYPE
+    cross features have realistic, partly empty cardinality. COST is log-normal
+    with a few zero-cost rows; FREE_TRIALS follows a per-channel log-log
+    response to cost plus noise. The same seed always gives the same rows.
+
+    Args:
+        n_rows: Number of rows
+        n_channels: Number of CHANNEL levels (real names first, then "channel_<i>")
+        n_campaign_types: Number of CAMPAIGN_TYPE levels (Title, Brand, Launch,
+            Promotion, then "type_<i>")
+        start_date: First REPORT_DATE
+        end_date: Last REPORT_DATE
+        seed: Random seed
+        raw_format: If True, use the raw header spelling and m/d/Y date strings
+            (as read from data.csv); if False, normalized names and typed columns
+            (as returned by df_clean.clean_data)
+
+    Returns:
+        pd.DataFrame: The synthetic extract
+
+    Raises:
+        ValueError: If a cardinality is below 1
+    """
+    if n_channels < 1 or n_campaign_types < 1:
+        raise ValueError("n_channels and n_campaign_types must be at least 1")
+    rng = np.random.default_rng(seed)
+
+    channels = _levels(CHANNELS, n_channels, "channel")
+    campaign_types = _levels(CAMPAIGN_TYPES, n_campaign_types, "type")
+    channel = rng.choice(n_channels, size=n_rows, p=_zipf_weights(n_channels, rng))
+    campaign_type = rng.choice(n_campaign_types, size=n_rows, p=_zipf_weights(n_campaign_types, rng, 1.5))
+
+    # Each channel runs as ATL only, DR only or both (the split drawn per row)
+    channel_mode = rng.choice(3, size=n_channels, p=[0.6, 0.2, 0.2])
+    mixed_draw = rng.integers(0, 2, size=n_rows)
+    atl_or_dr = np.where(channel_mode[channel] == 2, mixed_draw, channel_mode[channel])
+
+    start, end = pd.Timestamp(start_date), pd.Timestamp(end_date)
+    days = rng.integers(0, (end - start).days + 1, size=n_rows)
+    dates = start + pd.to_timedelta(days, unit="D")
+
+    cost = np.round(rng.lognormal(mean=8.0, sigma=1.6, size=n_rows), 2)
+    cost[rng.random(n_rows) < 0.002] = 0.0
+    intercept = rng.normal(10.0, 0.6, size=n_channels)
+    slope = rng.uniform(0.0, 0.3, size=n_channels)
+    log_trials = intercept[channel] + slope[channel] * (np.log1p(cost) - 8.0) + rng.normal(0, 0.8, size=n_rows)
+    free_trials = np.round(np.maximum(np.expm1(log_trials), 500.0), 2)
+
+    if raw_format:
+        report_date = (
+            dates.month.astype(str) + "/" + dates.day.astype(str) + "/" + dates.year.astype(str)
+        ).to_numpy()
+        columns = RAW_COLUMNS
+    else:
+        report_date = dates
+        columns = ["REPORT_DATE", "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "COST", "FREE_TRIALS"]
+
+    df = pd.DataFrame({
+        columns[0]: report_date,
+        columns[1]: np.array(ATL_OR_DR_LEVELS, dtype=object)[atl_or_dr],
+        columns[2]: campaign_types[campaign_type],
+        columns[3]: channels[channel],
+        columns[4]: cost,
+        columns[5]: free_trials,
+    })
+    if not raw_format:
+        df = df.astype({c: "category" for c in columns[1:4]})
+    return df
+
+
+def write_campaign_csv(df: pd.DataFrame, file_path: Union[str, Path]) -> Path:
+    """
+    Write a synthetic extract the way data.csv is stored (UTF-8 with BOM).
+
+    Args:
+        df: Output of generate_campaign_data(raw_format=True)
+        file_path: Destination CSV
+
+    Returns:
+        Path: The written file
+    """
+    file_path = Path(file_path)
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    df.to_csv(file_path, index=False, encoding="utf-8-sig")
+    logger.debug(f"Wrote {len(df)} synthetic rows to {file_path}")
+    return file_path
@@ -0,0 +1,410 @@
+"""
+Lightweight instrumentation for the data, analysis, training and scoring stages.
+
+Decorate a function with @instrument() (or wrap a block in `with track(name):`)
+to record wall time, CPU time, resident memory and the row/column counts of
+its input and output. Recording is off by default; a disabled decorator
+costs one attribute check per call. Turn it on with enable() or the
+CAMPAIGN_INSTRUMENTATION environment variable:
+
+    CAMPAIGN_INSTRUMENTATION=metrics.jsonl   # or metrics.csv, otel, memory
+
+For a single slow call, profile_call() (or profile_next()) writes a cProfile
+dump, or a py-spy flame graph when py-spy is installed.
+"""
+from contextlib import contextmanager
+from pathlib import Path
+import cProfile
+import csv
+import functools
+import io
+import json
+import logging
+import os
+import pstats
+import shutil
+import subprocess
+import sys
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Set, Tuple, Union
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+logger = logging.getLogger(__name__)
+
+ENV_VARIABLE = "CAMPAIGN_INSTRUMENTATION"
+LOG_FORMAT = "%(asctime)s - %(levelname)s - %(message)s"
+
+RECORD_FIELDS: List[str] = [
+    "name", "start_time", "wall_seconds", "cpu_seconds", "rss_mb", "peak_rss_mb", "peak_rss_delta_mb",
+    "rows_in", "cols_in", "rows_out", "cols_out", "thread", "error",
+]
+
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """
+    Attach the project's log format to the root logger, for scripts and
+    notebooks. Library modules only create named loggers and never configure
+    logging on import.
+
+    Args:
+        level: Root log level
+    """
+    logging.basicConfig(level=level, format=LOG_FORMAT)
+
+
+class MemorySink:
+    """Keeps records in a list (see records())."""
+
+    def __init__(self) -> None:
+        self.records: List[Dict[str, Any]] = []
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self.records.append(record)
+
+    def close(self) -> None:
+        pass
+
+
+class JSONLinesSink:
+    """Appends one JSON object per record to a local file."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self._file.write(json.dumps(record, default=str) + "\n")
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class CSVSink:
+    """Appends one row per record to a local CSV file (header written once)."""
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        write_header = not self.path.exists() or self.path.stat().st_size == 0
+        self._file = open(self.path, "a", newline="", encoding="utf-8")
+        self._writer = csv.DictWriter(self._file, fieldnames=RECORD_FIELDS, extrasaction="ignore")
+        if write_header:
+            self._writer.writeheader()
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        self._writer.writerow(record)
+        self._file.flush()
+
+    def close(self) -> None:
+        self._file.close()
+
+
+class OpenTelemetrySink:
+    """
+    Emits every record as a finished OpenTelemetry span, with the metrics as
+    span attributes. Uses the globally configured tracer provider; when none
+    is set up, a console exporter is installed so spans are visible.
+    """
+
+    def __init__(self, service_name: str = "campaign-analytics") -> None:
+        from opentelemetry import trace
+        from opentelemetry.sdk.resources import Resource
+        from opentelemetry.sdk.trace import TracerProvider
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter, SimpleSpanProcessor
+
+        if not isinstance(trace.get_tracer_provider(), TracerProvider):
+            provider = TracerProvider(resource=Resource.create({"service.name": service_name}))
+            provider.add_span_processor(SimpleSpanProcessor(ConsoleSpanExporter()))
+            trace.set_tracer_provider(provider)
+        self._tracer = trace.get_tracer(__name__)
+
+    def emit(self, record: Dict[str, Any]) -> None:
+        start_ns = int(record["start_time"] * 1e9)
+        span = self._tracer.start_span(record["name"], start_time=start_ns)
+        for key, value in record.items():
+            if key not in ("name", "start_time") and value is not None:
+                span.set_attribute(f"campaign.{key}", value)
+        span.end(end_time=start_ns + int(record["wall_seconds"] * 1e9))
+
+    def close(self) -> None:
+        pass
+
+
+class _State:
+    """Process-wide switch, sinks and one-shot profiling requests."""
+
+    def __init__(self) -> None:
+        self.enabled = False
+        self.sinks: List[Any] = []
+        self.profile_names: Set[str] = set()
+        self.profile_dir = Path("profiles")
+        self.lock = threading.Lock()
+
+
+_STATE = _State()
+
+
+def _make_sink(sink: Union[str, Path, Any]) -> Any:
+    """Build a sink from "memory", "otel" or a .jsonl/.json/.csv path; sink objects pass through."""
+    if not isinstance(sink, (str, Path)):
+        return sink
+    if str(sink) == "memory":
+        return MemorySink()
+    if str(sink) in ("otel", "opentelemetry"):
+        return OpenTelemetrySink()
+    suffix = Path(sink).suffix.lower()
+    if suffix == ".csv":
+        return CSVSink(sink)
+    if suffix in (".jsonl", ".json"):
+        return JSONLinesSink(sink)
+    raise ValueError(f"Unsupported sink: {sink}. Must be 'memory', 'otel' or a .jsonl/.json/.csv path.")
+
+
+def enable(sinks: Sequence[Union[str, Path, Any]] = ("memory",)) -> None:
+    """
+    Start recording instrumented calls.
+
+    Args:
+        sinks: "memory", "otel", .jsonl/.csv file paths, or objects with
+            emit(record) and close()
+    """
+    with _STATE.lock:
+        for sink in _STATE.sinks:
+            sink.close()
+        _STATE.sinks = [_make_sink(s) for s in sinks]
+        _STATE.enabled = True
+
+
+def disable() -> None:
+    """Stop recording and close the sinks."""
+    with _STATE.lock:
+        _STATE.enabled = False
+        for sink in _STATE.sinks:
+            sink.close()
+        _STATE.sinks = []
+
+
+def is_enabled() -> bool:
+    return _STATE.enabled
+
+
+def records() -> List[Dict[str, Any]]:
+    """Records held by the memory sinks, oldest first."""
+    return [r for sink in _STATE.sinks if isinstance(sink, MemorySink) for r in sink.records]
+
+
+def _shape(obj: Any) -> Tuple[Optional[int], Optional[int]]:
+    """Row and column counts of a DataFrame/array/sparse matrix, or of the first one in a tuple."""
+    if isinstance(obj, (tuple, list)) and obj and not hasattr(obj, "shape"):
+        obj = next((o for o in obj if hasattr(o, "shape")), None)
+    shape = getattr(obj, "shape", None)
+    if not shape:
+        return None, None
+    return int(shape[0]), int(shape[1]) if len(shape) > 1 else None
+
+
+def _rss_mb() -> Tuple[Optional[float], Optional[float]]:
+    """(current RSS, process peak RSS) in MiB."""
+    peak = None
+    if resource is not None:
+        # ru_maxrss is in KiB on Linux and bytes on macOS
+        scale = 1 if sys.platform == "darwin" else 1024
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 2 ** 20
+    try:
+        import psutil
+        current = psutil.Process().memory_info().rss / 2 ** 20
+    except ImportError:
+        current = None
+    return current, peak
+
+
+class Span:
+    """Measurements of one tracked call; set_shape() records counts inside a with block."""
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.rows_in = self.cols_in = self.rows_out = self.cols_out = None
+
+    def set_input(self, obj: Any) -> None:
+        self.rows_in, self.cols_in = _shape(obj)
+
+    def set_shape(self, obj: Any) -> None:
+        self.rows_out, self.cols_out = _shape(obj)
+
+
+@contextmanager
+def track(name: str, data: Any = None) -> Iterator[Span]:
+    """
+    Record one block: `with track("vif", data=df) as span: ...; span.set_shape(result)`.
+
+    Args:
+        name: Record name
+        data: Input whose shape is recorded as rows_in/cols_in
+
+    Yields:
+        Span: Call set_shape(result) on it to record output counts
+    """
+    span = Span(name)
+    if not _STATE.enabled:
+        yield span
+        return
+    span.set_input(data)
+    _, peak_before = _rss_mb()
+    start_time, wall_start, cpu_start = time.time(), time.perf_counter(), time.thread_time()
+    error = None
+    try:
+        yield span
+    except BaseException as e:
+        error = f"{type(e).__name__}: {e}"
+        raise
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.thread_time() - cpu_start
+        rss, peak = _rss_mb()
+        _emit({
+            "name": name,
+            "start_time": start_time,
+            "wall_seconds": wall,
+            "cpu_seconds": cpu,
+            "rss_mb": rss,
+            "peak_rss_mb": peak,
+            "peak_rss_delta_mb": None if peak is None else peak - peak_before,
+            "rows_in": span.rows_in,
+            "cols_in": span.cols_in,
+            "rows_out": span.rows_out,
+            "cols_out": span.cols_out,
+            "thread": threading.current_thread().name,
+            "error": error,
+        })
+
+
+def _emit(record: Dict[str, Any]) -> None:
+    with _STATE.lock:
+        for sink in _STATE.sinks:
+            try:
+                sink.emit(record)
+            except Exception as e:  # a broken sink must not break the instrumented code
+                logger.warning(f"Instrumentation sink {type(sink).__name__} failed: {e}")
+
+
+def instrument(name: Optional[str] = None) -> Callable[[Callable], Callable]:
+    """
+    Decorator recording every call of a function (see track).
+
+    The input shape is taken from the first argument with a shape (e.g. the
+    DataFrame), the output shape from the return value. While disabled, the
+    wrapper only checks one flag before calling through.
+
+    Args:
+        name: Record name. Default is "<module>.<qualname>".
+    """
+    def decorator(func: Callable) -> Callable:
+        record_name = name or f"{func.__module__}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            if not _STATE.enabled and not _STATE.profile_names:
+                return func(*args, **kwargs)
+            if record_name in _STATE.profile_names:
+                _STATE.profile_names.discard(record_name)
+                return profile_call(func, *args, output=_STATE.profile_dir / f"{record_name}.prof", **kwargs)
+            data = next((a for a in list(args) + list(kwargs.values()) if hasattr(a, "shape")), None)
+            with track(record_name, data) as span:
+                result = func(*args, **kwargs)
+                span.set_shape(result)
+            return result
+
+        wrapper.instrumented_name = record_name
+        return wrapper
+    return decorator
+
+
+def profile_next(name: Union[str, Callable], output_dir: Union[str, Path] = "profiles") -> None:
+    """
+    Profile only the next call of an instrumented function with cProfile.
+
+    Args:
+        name: The function (or its record name, e.g. "src.data_sourcing.import_export_data.get_data")
+        output_dir: Where "<name>.prof" is written
+    """
+    _STATE.profile_dir = Path(output_dir)
+    _STATE.profile_names.add(getattr(name, "instrumented_name", name))
+
+
+def profile_call(
+    func: Callable,
+    *args: Any,
+    output: Union[str, Path, None] = None,
+    tool: str = "cprofile",
+    top: int = 20,
+    **kwargs: Any
+) -> Any:
+    """
+    Run one call under a profiler and write the profile to disk.
+
+    "cprofile" writes a .prof file (open with snakeviz or pstats) and logs the
+    top functions by cumulative time. "py-spy" samples this process from a
+    py-spy subprocess (native code included) and writes an SVG flame graph;
+    it needs py-spy on PATH and ptrace permission.
+
+    Args:
+        func: Function to call
+        *args: Positional arguments for func
+        output: Output file. Default is "profiles/<function name>.prof" (or .svg)
+        tool: "cprofile" or "py-spy"
+        top: Number of functions to log (cProfile only)
+        **kwargs: Keyword arguments for func
+
+    Returns:
+        Any: The return value of func
+
+    Raises:
+        ValueError: If the tool is unknown
+        RuntimeError: If py-spy is requested but not installed
+    """
+    name = getattr(func, "__qualname__", "call")
+    if tool == "cprofile":
+        output = Path(output or Path("profiles") / f"{name}.prof")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        profiler = cProfile.Profile()
+        try:
+            return profiler.runcall(func, *args, **kwargs)
+        finally:
+            profiler.dump_stats(output)
+            summary = io.StringIO()
+            pstats.Stats(profiler, stream=summary).sort_stats("cumulative").print_stats(top)
+            logger.info(f"Wrote profile of {name} to {output}\n{summary.getvalue()}")
+    if tool == "py-spy":
+        executable = shutil.which("py-spy")
+        if executable is None:
+            raise RuntimeError("py-spy is not installed; pip install py-spy or use tool='cprofile'")
+        output = Path(output or Path("profiles") / f"{name}.svg")
+        output.parent.mkdir(parents=True, exist_ok=True)
+        sampler = subprocess.Popen(
+            [executable, "record", "--pid", str(os.getpid()), "--native", "--output", str(output)],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        try:
+            return func(*args, **kwargs)
+        finally:
+            sampler.send_signal(2)  # SIGINT makes py-spy write the flame graph and exit
+            sampler.wait(timeout=60)
+            logger.info(f"Wrote py-spy flame graph of {name} to {output}")
+    raise ValueError(f"Unsupported tool: {tool}. Must be 'cprofile' or 'py-spy'.")
+
+
+def _enable_from_environment() -> None:
+    """Honor CAMPAIGN_INSTRUMENTATION=<sink>[,<sink>...] at import time."""
+    value = os.environ.get(ENV_VARIABLE, "").strip()
+    if value and value.lower() not in ("0", "false", "off"):
+        sinks = ["memory"] if value.lower() in ("1", "true", "on") else [s.strip() for s in value.split(",")]
+        enable(sinks)
+
+
+_enable_from_environment()
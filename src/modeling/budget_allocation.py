@@ -0,0 +1,557 @@
+import logging
+import pandas as pd
+import numpy as np
+from typing import Any, List, Optional, Sequence, Union
+
+from src.instrumentation import instrument
+from src.modeling.model_training import TARGET_DERIVED_COLUMNS
+from src.scoring.evaluate_model import SEGMENT_COLUMNS
+
+logger = logging.getLogger(__name__)
+
+SOLVERS: List[str] = ["convex", "greedy"]
+PERIOD_COLUMN = "MONTH"
+# Elasticities are clipped below 1 so every response curve is concave and
+# the allocation has a unique optimum
+MAX_ELASTICITY: float = 0.95
+GREEDY_STEPS: int = 10_000
+COST_MULTIPLIERS: np.ndarray = np.geomspace(0.25, 4.0, 9)
+
+Bound = Union[float, np.ndarray, pd.Series, None]
+
+
+def _group_codes(df: pd.DataFrame, columns: Sequence[str]) -> tuple:
+    """Row codes (-1 for missing keys) and the sorted key frame of a groupby."""
+    grouped = df.groupby(list(columns), observed=True, sort=True)
+    return grouped.ngroup().to_numpy(), grouped.size().index.to_frame(index=False)
+
+
+def _curve_frame(
+    keys: pd.DataFrame,
+    units: np.ndarray,
+    spend: np.ndarray,
+    elasticity: np.ndarray,
+    intercept: np.ndarray,
+    free_trials: Optional[np.ndarray],
+    max_elasticity: float
+) -> pd.DataFrame:
+    curves = keys.copy()
+    curves["Units"] = units.astype(int)
+    curves["Current Spend"] = spend
+    curves["Elasticity"] = np.clip(elasticity, 0.0, max_elasticity)
+    curves["Intercept"] = intercept
+    if free_trials is not None:
+        curves["Free Trials"] = free_trials
+    curves["Expected Free Trials"] = response(curves, spend)
+    return curves
+
+
+@instrument()
+def fit_response_curves(
+    df: pd.DataFrame,
+    segment_columns: Sequence[str] = SEGMENT_COLUMNS,
+    period_column: Optional[str] = PERIOD_COLUMN,
+    cost_column: str = "COST",
+    target_column: str = "FREE_TRIALS",
+    shrinkage: float = 20.0,
+    max_elasticity: float = MAX_ELASTICITY
+) -> pd.DataFrame:
+    """
+    Fit log-log cost -> free-trial response curves per segment x period cell.
+
+    Each campaign row is one unit with log1p(FREE_TRIALS) = a + b * log1p(COST).
+    The elasticity b is estimated per segment (within-segment least squares)
+    and shrunk towards the pooled within-segment elasticity, so segments with
+    few rows or little cost variation borrow strength. The intercept a is set
+    per cell (segment x period) so the curve passes through the cell's
+    observed spend and free trials, which carries the seasonality.
+    All sums are accumulated with bincount, so the fit is a single pass
+    however many cells there are.
+
+    A cell with u units and total spend C is assumed to spread C evenly over
+    its units, so its expected free trials are u * expm1(a + b * log1p(C / u)).
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Processed rows (e.g. log_data_fe) with the segment, period, cost and
+        target columns.
+    segment_columns : sequence of str, optional
+        Columns defining a segment. Default is CHANNEL, CAMPAIGN_TYPE and ATL_OR_DR.
+    period_column : str, optional
+        Column splitting segments into cells, e.g. "MONTH"; None for one cell
+        per segment. Default is "MONTH".
+    cost_column : str, optional
+        Spend column. Default is "COST".
+    target_column : str, optional
+        Outcome column. Default is "FREE_TRIALS".
+    shrinkage : float, optional
+        Weight of the pooled elasticity, in rows of average cost variation.
+        0 disables shrinkage. Default is 20.
+    max_elasticity : float, optional
+        Upper clip of the elasticities (below 1 keeps the curves concave).
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per cell with the key columns, "Units", "Current Spend",
+        "Elasticity", "Intercept", "Free Trials" (observed) and "Expected
+        Free Trials" (the curve at current spend).
+    """
+    segment_columns = list(segment_columns)
+    cell_columns = segment_columns + ([period_column] if period_column else [])
+    cost = df[cost_column].to_numpy(dtype=float, na_value=np.nan)
+    target = df[target_column].to_numpy(dtype=float, na_value=np.nan)
+    segment_codes, _ = _group_codes(df, segment_columns)
+    cell_codes, keys = _group_codes(df, cell_columns)
+    valid = (segment_codes >= 0) & (cell_codes >= 0) & np.isfinite(cost) & np.isfinite(target)
+    valid &= (cost >= 0) & (target >= 0)
+    segment_codes, cell_codes = segment_codes[valid], cell_codes[valid]
+    cost, target = cost[valid], target[valid]
+    x, y = np.log1p(cost), np.log1p(target)
+    n_segments, n_cells = segment_codes.max() + 1, len(keys)
+
+    # Within-segment slopes from centered sums
+    n_seg = np.bincount(segment_codes, minlength=n_segments).astype(float)
+    mean_x = np.bincount(segment_codes, weights=x, minlength=n_segments) / np.maximum(n_seg, 1)
+    mean_y = np.bincount(segment_codes, weights=y, minlength=n_segments) / np.maximum(n_seg, 1)
+    dx, dy = x - mean_x[segment_codes], y - mean_y[segment_codes]
+    sxx = np.bincount(segment_codes, weights=dx * dx, minlength=n_segments)
+    sxy = np.bincount(segment_codes, weights=dx * dy, minlength=n_segments)
+    pooled = sxy.sum() / sxx.sum() if sxx.sum() > 0 else 0.0
+    with np.errstate(invalid="ignore", divide="ignore"):
+        own = np.where(sxx > 0, sxy / sxx, pooled)
+        prior = shrinkage * sxx.sum() / len(x)
+        weight = np.where(sxx > 0, sxx / (sxx + prior), 0.0)
+    elasticity = np.clip(weight * own + (1.0 - weight) * pooled, 0.0, max_elasticity)
+
+    # Cell intercepts anchor each curve at the cell's observed spend and free
+    # trials (a log-space mean would understate totals by Jensen's inequality)
+    cell_segment = np.zeros(n_cells, dtype=np.int64)
+    cell_segment[cell_codes] = segment_codes
+    units = np.bincount(cell_codes, minlength=n_cells).astype(float)
+    cell_cost = np.bincount(cell_codes, weights=cost, minlength=n_cells)
+    cell_target = np.bincount(cell_codes, weights=target, minlength=n_cells)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        intercept = (
+            np.log1p(cell_target / units) - elasticity[cell_segment] * np.log1p(cell_cost / units)
+        )
+    logger.info(
+        f"Fitted response curves for {n_cells} cells in {n_segments} segments "
+        f"(pooled elasticity {pooled:.3f})"
+    )
+    return _curve_frame(
+        keys.loc[units > 0].reset_index(drop=True),
+        units[units > 0],
+        cell_cost[units > 0],
+        elasticity[cell_segment][units > 0],
+        intercept[units > 0],
+        cell_target[units > 0],
+        max_elasticity,
+    )
+
+
+@instrument()
+def response_curves_from_model(
+    model: Any,
+    df: pd.DataFrame,
+    segment_columns: Sequence[str] = SEGMENT_COLUMNS,
+    period_column: Optional[str] = PERIOD_COLUMN,
+    cost_multipliers: Sequence[float] = COST_MULTIPLIERS,
+    target_transform: Optional[str] = "log1p",
+    batch_size: int = 200_000,
+    max_elasticity: float = MAX_ELASTICITY
+) -> pd.DataFrame:
+    """
+    Response curves implied by a trained model, in the layout of fit_response_curves.
+
+    Every row is re-scored with COST (and LOG_COST) scaled by each multiplier,
+    everything else held at its observed value, in batched predict calls of
+    up to batch_size rows. The cell elasticity is the least-squares slope of
+    log1p(predicted free trials) on log1p(cost) within rows, pooled over the
+    cell's rows; the intercept makes the curve pass through the cell's total
+    predicted free trials at observed spend.
+
+    Parameters
+    ----------
+    model : estimator
+        Fitted pipeline taking the processed feature columns.
+    df : pd.DataFrame
+        Processed rows with the model's input columns.
+    segment_columns : sequence of str, optional
+        Columns defining a segment. Default is CHANNEL, CAMPAIGN_TYPE and ATL_OR_DR.
+    period_column : str, optional
+        Column splitting segments into cells. Default is "MONTH".
+    cost_multipliers : sequence of float, optional
+        Spend scalings to score (1.0 is always added). Default is 9 points
+        from 0.25x to 4x.
+    target_transform : str, optional
+        "log1p" if the model predicts LOG_FREE_TRIALS, None if it predicts
+        FREE_TRIALS. Default is "log1p".
+    batch_size : int, optional
+        Rows per predict call. Default is 200,000.
+    max_elasticity : float, optional
+        Upper clip of the elasticities.
+
+    Returns
+    -------
+    pd.DataFrame
+        Same columns as fit_response_curves ("Free Trials" only when the
+        rows carry FREE_TRIALS).
+
+    Raises
+    ------
+    ValueError
+        If target_transform is unsupported, or the model takes a column
+        derived from FREE_TRIALS (held fixed, it would pin the response to
+        the observed outcome).
+    """
+    if target_transform not in ("log1p", None):
+        raise ValueError(f"Unsupported target_transform: {target_transform}. Must be one of ['log1p', None].")
+    leaked = [c for c in getattr(model, "feature_names_in_", []) if c in TARGET_DERIVED_COLUMNS]
+    if leaked:
+        raise ValueError(f"Model inputs {leaked} are derived from FREE_TRIALS. "
+                         f"Retrain it without TARGET_DERIVED_COLUMNS.")
+    segment_columns = list(segment_columns)
+    cell_columns = segment_columns + ([period_column] if period_column else [])
+    cell_codes, keys = _group_codes(df, cell_columns)
+    df = df.loc[cell_codes >= 0]
+    cell_codes = cell_codes[cell_codes >= 0]
+    cost = df["COST"].to_numpy(dtype=float)
+    multipliers = np.union1d(np.asarray(cost_multipliers, dtype=float), [1.0])
+    observed_point = int(np.flatnonzero(multipliers == 1.0)[0])
+    n_rows, n_points, n_cells = len(df), len(multipliers), len(keys)
+
+    x = np.log1p(np.outer(cost, multipliers))
+    y = np.empty((n_rows, n_points))
+    for j, multiplier in enumerate(multipliers):
+        for start in range(0, n_rows, batch_size):
+            batch = df.iloc[start:start + batch_size].copy()
+            batch["COST"] = cost[start:start + batch_size] * multiplier
+            if "LOG_COST" in batch.columns:
+                batch["LOG_COST"] = x[start:start + batch_size, j]
+            y[start:start + batch_size, j] = model.predict(batch)
+    if target_transform is None:
+        y = np.log1p(np.maximum(y, 0.0))
+
+    dx = x - x.mean(axis=1, keepdims=True)
+    dy = y - y.mean(axis=1, keepdims=True)
+    sxx = np.bincount(cell_codes, weights=(dx * dx).sum(axis=1), minlength=n_cells)
+    sxy = np.bincount(cell_codes, weights=(dx * dy).sum(axis=1), minlength=n_cells)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        elasticity = np.clip(np.where(sxx > 0, sxy / sxx, 0.0), 0.0, max_elasticity)
+    units = np.bincount(cell_codes, minlength=n_cells).astype(float)
+    # Anchor each curve at the cell's total predicted free trials at observed spend
+    cell_cost = np.bincount(cell_codes, weights=cost, minlength=n_cells)
+    predicted = np.bincount(cell_codes, weights=np.expm1(y[:, observed_point]), minlength=n_cells)
+    intercept = np.log1p(np.maximum(predicted, 0.0) / units) - elasticity * np.log1p(cell_cost / units)
+    observed = (
+        np.bincount(cell_codes, weights=df["FREE_TRIALS"].to_numpy(dtype=float), minlength=n_cells)
+        if "FREE_TRIALS" in df.columns else None
+    )
+    logger.info(f"Derived response curves for {n_cells} cells from {n_rows * n_points} model predictions")
+    return _curve_frame(
+        keys, units, cell_cost, elasticity, intercept, observed, max_elasticity
+    )
+
+
+def response(curves: pd.DataFrame, spend: np.ndarray) -> np.ndarray:
+    """
+    Expected free trials of each cell at the given spend.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        Output of fit_response_curves or response_curves_from_model.
+    spend : np.ndarray
+        Spend per cell, shape (n_cells,) or (n_scenarios, n_cells).
+
+    Returns
+    -------
+    np.ndarray
+        Free trials, same shape as spend.
+    """
+    units = curves["Units"].to_numpy(dtype=float)
+    per_unit = np.log1p(np.asarray(spend, dtype=float) / units)
+    return units * np.expm1(curves["Intercept"].to_numpy() + curves["Elasticity"].to_numpy() * per_unit)
+
+
+def marginal_response(curves: pd.DataFrame, spend: np.ndarray) -> np.ndarray:
+    """
+    Free trials per extra dollar in each cell at the given spend.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        Output of fit_response_curves or response_curves_from_model.
+    spend : np.ndarray
+        Spend per cell, shape (n_cells,) or (n_scenarios, n_cells).
+
+    Returns
+    -------
+    np.ndarray
+        Derivative of response with respect to spend, same shape as spend.
+    """
+    units = curves["Units"].to_numpy(dtype=float)
+    elasticity = curves["Elasticity"].to_numpy()
+    log_growth = np.log1p(np.asarray(spend, dtype=float) / units)
+    return elasticity * np.exp(curves["Intercept"].to_numpy() + (elasticity - 1.0) * log_growth)
+
+
+def _bounds(curves: pd.DataFrame, min_spend: Bound, max_spend: Bound) -> tuple:
+    n_cells = len(curves)
+    lower = np.broadcast_to(np.asarray(0.0 if min_spend is None else min_spend, dtype=float), (n_cells,)).copy()
+    upper = np.broadcast_to(np.asarray(np.inf if max_spend is None else max_spend, dtype=float), (n_cells,)).copy()
+    if np.any(lower < 0) or np.any(upper < lower):
+        raise ValueError("Spend bounds must satisfy 0 <= min_spend <= max_spend")
+    return lower, upper
+
+
+def _solve_convex(
+    curves: pd.DataFrame,
+    budget: float,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    n_iterations: int = 200
+) -> np.ndarray:
+    """
+    Exact continuous optimum: equalize marginal returns (KKT) by bisecting
+    on the log of the common marginal return, with the closed-form inverse
+    of the marginal response for every cell at once.
+    """
+    units = curves["Units"].to_numpy(dtype=float)
+    intercept = curves["Intercept"].to_numpy()
+    elasticity = curves["Elasticity"].to_numpy()
+    active = elasticity > 0
+    log_b = np.log(np.where(active, elasticity, 1.0))
+
+    def spend_at(log_lambda: float) -> np.ndarray:
+        with np.errstate(over="ignore"):
+            log_growth = (log_lambda - intercept - log_b) / (elasticity - 1.0)
+            spend = units * np.expm1(np.maximum(log_growth, 0.0))
+        return np.where(active, np.clip(spend, lower, upper), lower)
+
+    log_marginal_at_lower = np.log(np.maximum(marginal_response(curves, lower), 1e-300))
+    high = log_marginal_at_lower[active].max() if active.any() else 0.0
+    low = high - 100.0
+    for _ in range(n_iterations):
+        middle = 0.5 * (low + high)
+        if spend_at(middle).sum() > budget:
+            low = middle
+        else:
+            high = middle
+    spend = spend_at(high)
+    # Hand the bisection remainder to the cells still below their upper bound
+    room = np.where(active, upper - spend, 0.0)
+    remainder = budget - spend.sum()
+    if remainder > 0 and np.isfinite(room).all() and room.sum() > 0:
+        spend += room * min(remainder / room.sum(), 1.0)
+    elif remainder > 0 and (room > 0).any():
+        spend += np.minimum(room, remainder / (room > 0).sum()) * (room > 0)
+    return spend
+
+
+def _solve_greedy(
+    curves: pd.DataFrame,
+    budget: float,
+    lower: np.ndarray,
+    upper: np.ndarray,
+    step: Optional[float]
+) -> np.ndarray:
+    """
+    Marginal-return greedy in fixed spend steps: repeatedly fund the step
+    with the largest gain. For concave curves the step gains fall with the
+    step count, so the greedy result is "all steps whose gain clears a
+    threshold"; the threshold and the per-cell step counts are found by
+    nested vectorized bisection instead of popping steps one at a time.
+    """
+    free = budget - lower.sum()
+    step = step or free / GREEDY_STEPS
+    n_steps = int(np.floor(free / step + 1e-9))
+    capacity = np.minimum(np.floor((upper - lower) / step + 1e-9), n_steps).astype(np.int64)
+
+    def gain(k: np.ndarray) -> np.ndarray:
+        """Gain of each cell's (k+1)-th step."""
+        return response(curves, lower + (k + 1) * step) - response(curves, lower + k * step)
+
+    def steps_above(threshold: float) -> np.ndarray:
+        low, high = np.zeros_like(capacity), capacity.copy()
+        while np.any(low < high):
+            middle = (low + high + 1) // 2
+            funded = gain(np.maximum(middle - 1, 0)) >= threshold
+            low = np.where(funded, middle, low)
+            high = np.where(funded, high, middle - 1)
+        return low
+
+    counts = np.zeros_like(capacity)
+    if n_steps > 0 and capacity.sum() > 0:
+        # Invariant: at most n_steps steps have a gain >= high
+        low, high = 0.0, float(np.nextafter(gain(np.zeros_like(capacity)).max(), np.inf))
+        for _ in range(60):
+            middle = 0.5 * (low + high)
+            candidate = steps_above(middle)
+            if candidate.sum() > n_steps:
+                low = middle
+            else:
+                high, counts = middle, candidate
+        # Steps tied at the threshold: fund the best next steps one per cell per round
+        remaining = n_steps - counts.sum()
+        while remaining > 0:
+            next_gain = np.where(counts < capacity, gain(counts), -np.inf)
+            open_cells = np.flatnonzero(np.isfinite(next_gain))
+            if len(open_cells) == 0:
+                break
+            take = min(remaining, len(open_cells))
+            best = open_cells[np.argsort(-next_gain[open_cells], kind="stable")[:take]]
+            counts[best] += 1
+            remaining -= take
+    return lower + counts * step
+
+
+@instrument()
+def allocate_budget(
+    curves: pd.DataFrame,
+    budget: Optional[float] = None,
+    method: str = "convex",
+    min_spend: Bound = None,
+    max_spend: Bound = None,
+    step: Optional[float] = None
+) -> pd.DataFrame:
+    """
+    Split a budget across cells to maximize expected free trials.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        Output of fit_response_curves or response_curves_from_model.
+    budget : float, optional
+        Total spend to allocate. Default is the current total spend.
+    method : str, optional
+        "convex" for the exact continuous optimum (marginal returns equalized
+        across funded cells), or "greedy" for the discrete marginal-return
+        greedy in spend steps of `step`. Default is "convex".
+    min_spend : float or array-like, optional
+        Per-cell lower bound (scalar or one value per cell). Default is 0.
+    max_spend : float or array-like, optional
+        Per-cell upper bound, e.g. 2 * curves["Current Spend"]. Default is
+        unbounded.
+    step : float, optional
+        Spend increment of the greedy solver. Default is the allocable
+        budget / 10,000.
+
+    Returns
+    -------
+    pd.DataFrame
+        The curves with "Optimal Spend", "Optimal Free Trials" and
+        "Marginal Return" (free trials per extra dollar at the optimum) added.
+
+    Raises
+    ------
+    ValueError
+        If the method is unknown or the bounds cannot meet the budget.
+    """
+    if method not in SOLVERS:
+        raise ValueError(f"Unsupported method: {method}. Must be one of {SOLVERS}.")
+    budget = float(curves["Current Spend"].sum() if budget is None else budget)
+    lower, upper = _bounds(curves, min_spend, max_spend)
+    if lower.sum() > budget:
+        raise ValueError(f"Minimum spends ({lower.sum():.2f}) exceed the budget ({budget:.2f})")
+
+    if upper.sum() <= budget:
+        spend = upper
+        logger.warning("Budget covers every cell's maximum spend; allocating the maximums")
+    elif method == "convex":
+        spend = _solve_convex(curves, budget, lower, upper)
+    else:
+        spend = _solve_greedy(curves, budget, lower, upper, step)
+
+    allocation = curves.copy()
+    allocation["Optimal Spend"] = spend
+    allocation["Optimal Free Trials"] = response(curves, spend)
+    allocation["Marginal Return"] = marginal_response(curves, spend)
+    logger.info(
+        f"Allocated {spend.sum():,.2f} over {len(curves)} cells ({method}): expected free trials "
+        f"{allocation['Expected Free Trials'].sum():,.0f} -> {allocation['Optimal Free Trials'].sum():,.0f}"
+    )
+    return allocation
+
+
+def multiplier_grid(values: Sequence[float], n_groups: int) -> np.ndarray:
+    """
+    Every combination of spend multipliers across groups.
+
+    Parameters
+    ----------
+    values : sequence of float
+        Multipliers to try per group, e.g. [0.5, 1.0, 1.5].
+    n_groups : int
+        Number of groups (e.g. channels); the grid has len(values) ** n_groups rows.
+
+    Returns
+    -------
+    np.ndarray
+        Shape (len(values) ** n_groups, n_groups).
+    """
+    values = np.asarray(values, dtype=float)
+    index = np.indices((len(values),) * n_groups).reshape(n_groups, -1).T
+    return values[index]
+
+
+@instrument()
+def evaluate_scenarios(
+    curves: pd.DataFrame,
+    multipliers: np.ndarray,
+    by: Optional[str] = None,
+    base_spend: Optional[np.ndarray] = None,
+    max_chunk_elements: int = 5_000_000
+) -> pd.DataFrame:
+    """
+    Expected totals of many what-if spend scenarios.
+
+    A scenario scales the base spend of every cell by a multiplier, either
+    per cell or per level of `by` (e.g. one multiplier per CHANNEL). Scenarios
+    are evaluated in chunks of at most max_chunk_elements scenario x cell
+    values with the closed-form curves, so millions of scenarios never
+    materialize a full spend matrix.
+
+    Parameters
+    ----------
+    curves : pd.DataFrame
+        Output of fit_response_curves or response_curves_from_model.
+    multipliers : np.ndarray
+        Shape (n_scenarios, n_levels of `by`) or (n_scenarios, n_cells).
+        See multiplier_grid for full grids.
+    by : str, optional
+        Curve column the multipliers refer to; None for one per cell.
+    base_spend : np.ndarray, optional
+        Spend per cell the multipliers apply to. Default is "Current Spend".
+    max_chunk_elements : int, optional
+        Upper bound on scenarios x cells held in memory at once.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per scenario: the multipliers (columns named after the levels
+        of `by`), "Total Spend" and "Expected Free Trials".
+    """
+    multipliers = np.atleast_2d(np.asarray(multipliers, dtype=float))
+    base = curves["Current Spend"].to_numpy(dtype=float) if base_spend is None else np.asarray(base_spend, dtype=float)
+    if by is None:
+        codes, levels = np.arange(len(curves)), [f"Cell {i}" for i in range(len(curves))]
+    else:
+        codes, levels = pd.factorize(curves[by], sort=True)
+        levels = list(levels)
+    if multipliers.shape[1] != len(levels):
+        raise ValueError(f"multipliers has {multipliers.shape[1]} columns, expected {len(levels)}")
+
+    n_scenarios = len(multipliers)
+    totals = np.empty(n_scenarios)
+    chunk = max(1, max_chunk_elements // len(curves))
+    for start in range(0, n_scenarios, chunk):
+        spend = base * multipliers[start:start + chunk][:, codes]
+        totals[start:start + chunk] = response(curves, spend).sum(axis=1)
+
+    scenarios = pd.DataFrame(multipliers, columns=levels)
+    scenarios["Total Spend"] = multipliers @ np.bincount(codes, weights=base, minlength=len(levels))
+    scenarios["Expected Free Trials"] = totals
+    return scenarios
@@ -0,0 +1,378 @@
+import logging
+import os
+import time
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import optuna
+from joblib import Parallel, delayed, hash as joblib_hash, parallel_config
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import get_scorer
+from sklearn.pipeline import Pipeline
+from threadpoolctl import threadpool_limits
+
+from src.data_sourcing.import_export_data import DataStore, get_config_manager
+from src.instrumentation import instrument
+from src.modeling.model_training import (
+    CATEGORICAL_COLUMNS,
+    DENSE_INPUT_FAMILIES,
+    MODEL_FAMILIES,
+    NUMERICAL_COLUMNS,
+    TRAINING_CONFIG_KEY,
+    _to_dense,
+    build_preprocessor,
+    fit_final_model,
+    prepare_cv_folds,
+    transformer_memory,
+)
+
+logger = logging.getLogger(__name__)
+
+SELECTION_CONFIG_KEY = "hyperparameters.model_selection"
+STUDY_DB_FILENAME = "optuna_studies.db"
+PRUNERS: List[str] = ["median", "successive_halving", "hyperband", "none"]
+
+# Search space per family: name -> ("int" | "float", low, high, log) or ("categorical", choices)
+# Bounds cover the notebooks' grids (DEFAULT_PARAM_GRIDS in model_training)
+SEARCH_SPACES: Dict[str, Dict[str, Tuple[Any, ...]]] = {
+    "xgb": {
+        "n_estimators": ("int", 50, 400, True),
+        "learning_rate": ("float", 0.01, 0.3, True),
+        "max_depth": ("int", 3, 8, False),
+        "min_child_weight": ("float", 1.0, 10.0, True),
+        "subsample": ("float", 0.6, 1.0, False),
+        "colsample_bytree": ("float", 0.6, 1.0, False),
+    },
+    "rf": {
+        "n_estimators": ("int", 50, 200, True),
+        "max_depth": ("categorical", [10, 20, None]),
+        "min_samples_split": ("int", 2, 10, False),
+        "min_samples_leaf": ("int", 1, 4, False),
+        "max_features": ("categorical", [1.0, "sqrt", 0.5]),
+    },
+}
+
+
+def _suggest_params(trial: optuna.Trial, space: Dict[str, Tuple[Any, ...]]) -> Dict[str, Any]:
+    """Draw one hyperparameter set from a SEARCH_SPACES entry."""
+    params = {}
+    for name, spec in space.items():
+        if spec[0] == "int":
+            params[name] = trial.suggest_int(name, spec[1], spec[2], log=spec[3])
+        elif spec[0] == "float":
+            params[name] = trial.suggest_float(name, spec[1], spec[2], log=spec[3])
+        elif spec[0] == "categorical":
+            params[name] = trial.suggest_categorical(name, spec[1])
+        else:
+            raise ValueError(f"Unsupported search space type for {name}: {spec[0]}")
+    return params
+
+
+def _make_pruner(name: str) -> optuna.pruners.BasePruner:
+    """Fold-level pruner by name."""
+    if name == "median":
+        return optuna.pruners.MedianPruner(n_startup_trials=5, n_warmup_steps=0)
+    if name == "successive_halving":
+        return optuna.pruners.SuccessiveHalvingPruner()
+    if name == "hyperband":
+        return optuna.pruners.HyperbandPruner(min_resource=1)
+    if name == "none":
+        return optuna.pruners.NopPruner()
+    raise ValueError(f"Unsupported pruner: {name}. Must be one of {PRUNERS}.")
+
+
+def _objective(
+    family: str,
+    space: Dict[str, Tuple[Any, ...]],
+    folds: List[Tuple[Any, Any, np.ndarray, np.ndarray]],
+    scoring: str,
+    n_threads: int,
+    random_state: int
+):
+    """
+    Build the Optuna objective: mean validation score over the CV folds,
+    reported after every fold so weak trials stop before fitting the rest.
+    """
+    scorer = get_scorer(scoring)
+
+    def objective(trial: optuna.Trial) -> float:
+        params = _suggest_params(trial, space)
+        scores = []
+        with threadpool_limits(limits=n_threads):
+            for step, (X_train, X_valid, y_train, y_valid) in enumerate(folds):
+                model = MODEL_FAMILIES[family](params, n_threads, random_state)
+                model.fit(X_train, y_train)
+                scores.append(scorer(model, X_valid, y_valid))
+                trial.report(float(np.mean(scores)), step)
+                if trial.should_prune():
+                    raise optuna.TrialPruned()
+        trial.set_user_attr("fold_scores", [float(s) for s in scores])
+        return float(np.mean(scores))
+
+    return objective
+
+
+def _run_study(
+    study_name: str,
+    storage: Optional[str],
+    pruner: str,
+    seed: Optional[int],
+    objective_args: Tuple[Any, ...],
+    n_trials: Optional[int],
+    timeout: Optional[float]
+) -> None:
+    """
+    Optimize a (possibly shared) study until the trial or wall-clock budget is spent.
+    Runs in a worker process when trials are parallelized.
+    """
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    study = optuna.load_study(
+        study_name=study_name,
+        storage=storage,
+        sampler=optuna.samplers.TPESampler(seed=seed),
+        pruner=_make_pruner(pruner),
+    )
+    finished_states = (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+    callbacks = []
+    if n_trials is not None:
+        # Trials already in the store count towards the budget, so a resumed
+        # search (or a sibling worker) stops at the same total
+        done = len(study.get_trials(deepcopy=False, states=finished_states))
+        if done >= n_trials:
+            return
+        callbacks.append(optuna.study.MaxTrialsCallback(n_trials, states=finished_states))
+        n_trials -= done
+    study.optimize(
+        _objective(*objective_args),
+        n_trials=n_trials,
+        timeout=timeout,
+        callbacks=callbacks,
+        catch=(ValueError,),
+    )
+
+
+def _study_fingerprint(
+    X: pd.DataFrame,
+    y: pd.Series,
+    space: Dict[str, Tuple[Any, ...]],
+    preprocessor: ColumnTransformer,
+    cv: int,
+    scoring: str
+) -> str:
+    """
+    Short hash of everything a stored trial's score depends on besides its
+    params: the training data and target, the feature columns, the search
+    space, the preprocessing and the CV scoring.
+    """
+    return joblib_hash((X, y, y.name, list(X.columns), space, preprocessor, cv, scoring))[:12]
+
+
+def default_storage(env: str = "development") -> str:
+    """
+    SQLite URL of the local study store in the models directory.
+
+    Parameters
+    ----------
+    env : str, optional
+        Environment used to resolve the models directory.
+
+    Returns
+    -------
+    str
+        A "sqlite:///..." storage URL.
+    """
+    models_dir = DataStore(env).base_path("models")
+    models_dir.mkdir(parents=True, exist_ok=True)
+    return f"sqlite:///{(models_dir / STUDY_DB_FILENAME).resolve()}"
+
+
+@instrument()
+def search_models(
+    X: pd.DataFrame,
+    y: pd.Series,
+    families: Optional[Sequence[str]] = None,
+    search_spaces: Optional[Dict[str, Dict[str, Tuple[Any, ...]]]] = None,
+    preprocessor: Optional[ColumnTransformer] = None,
+    n_trials: Optional[int] = None,
+    timeout: Optional[float] = None,
+    pruner: Optional[str] = None,
+    cv: Optional[int] = None,
+    scoring: Optional[str] = None,
+    n_jobs: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    random_state: Optional[int] = None,
+    storage: Optional[str] = "default",
+    study_prefix: str = "campaign",
+    refit: bool = True,
+    use_cache: bool = True,
+    env: str = "development"
+) -> Tuple[pd.DataFrame, Dict[str, Pipeline]]:
+    """
+    Budgeted hyperparameter search per model family with fold-level pruning.
+
+    A TPE sampler proposes candidates; after every CV fold the running mean
+    score is reported and the pruner (median, successive halving or
+    hyperband) stops trials that fall behind, so most weak candidates cost
+    one fold instead of cv. Preprocessing is fitted once per fold and cached
+    exactly as in model_training.train_models.
+
+    Studies live in a SQLite store, one per family and search setup
+    ("<study_prefix>_<family>_<fingerprint>", the fingerprint hashing the
+    data, target, features, search space, preprocessing and scoring):
+    rerunning the same call resumes an interrupted search and stops once the
+    store holds n_trials finished trials, while a changed setup starts a
+    fresh study instead of reusing stale trials. With n_jobs > 1, that many worker
+    processes share the study through the store.
+
+    Unset arguments come from hyperparameters.model_selection, then
+    hyperparameters.training, in the environment's config.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Training features (see model_training.prepare_training_data).
+    y : pd.Series
+        Training target.
+    families : sequence of str, optional
+        Model families to search. Default is the config's families.
+    search_spaces : dict, optional
+        Space per family in the SEARCH_SPACES format. Default is SEARCH_SPACES.
+    preprocessor : ColumnTransformer, optional
+        Unfitted preprocessor. Default is model_training.build_preprocessor().
+    n_trials : int, optional
+        Trial budget per family (completed + pruned). Config default is 30.
+    timeout : float, optional
+        Wall-clock budget per family in seconds. Default is no limit.
+    pruner : str, optional
+        "median", "successive_halving", "hyperband" or "none". Config default is "median".
+    cv : int, optional
+        Number of (unshuffled) K-fold splits. Config default is 3.
+    scoring : str, optional
+        sklearn scorer name to maximize. Config default is "neg_mean_squared_error".
+    n_jobs : int, optional
+        Parallel trial workers (processes); -1 uses every core divided by
+        threads_per_worker. Config default is 1.
+    threads_per_worker : int, optional
+        Native threads per worker. Config default is 1.
+    random_state : int, optional
+        Seed for the sampler and the models. Config default is 42.
+    storage : str, optional
+        Optuna storage URL. "default" uses default_storage(env); None keeps
+        the study in memory (no resume, single worker).
+    study_prefix : str, optional
+        Prefix of the study names. Default is "campaign".
+    refit : bool, optional
+        Whether to refit the best trial of each family on all of X.
+    use_cache : bool, optional
+        Whether to cache fitted folds on disk. Default is True.
+    env : str, optional
+        Environment whose config supplies defaults.
+
+    Returns
+    -------
+    tuple
+        - trials : one row per finished trial with "Family", "Trial",
+          "State", "Score", "Params", "Folds Fitted" and "Seconds", best first
+          within each family
+        - best_models : fitted best Pipeline per family (empty if refit=False)
+
+    Raises
+    ------
+    ValueError
+        If no budget is given or a family has no search space.
+    """
+    config = get_config_manager(env)
+    settings = {**(config.get(TRAINING_CONFIG_KEY, {}) or {}), **(config.get(SELECTION_CONFIG_KEY, {}) or {})}
+    families = list(families or settings.get("families") or SEARCH_SPACES)
+    search_spaces = search_spaces or SEARCH_SPACES
+    n_trials = n_trials if n_trials is not None else settings.get("n_trials")
+    timeout = timeout if timeout is not None else settings.get("timeout")
+    pruner = pruner or settings.get("pruner", "median")
+    cv = cv or settings.get("cv", 3)
+    scoring = scoring or settings.get("scoring", "neg_mean_squared_error")
+    threads_per_worker = threads_per_worker or settings.get("threads_per_worker", 1)
+    n_jobs = n_jobs or settings.get("n_jobs", 1)
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) // threads_per_worker, 1)
+    random_state = settings.get("random_state", 42) if random_state is None else random_state
+    if n_trials is None and timeout is None:
+        raise ValueError("search_models needs a budget: n_trials, timeout or both")
+    missing = [f for f in families if f not in search_spaces]
+    if missing:
+        raise ValueError(f"No search space for families: {missing}")
+    if storage == "default":
+        storage = default_storage(env)
+    if storage is None and n_jobs > 1:
+        logger.warning("Parallel trials need a shared storage; running with n_jobs=1")
+        n_jobs = 1
+
+    preprocessor = preprocessor or build_preprocessor(
+        [c for c in CATEGORICAL_COLUMNS if c in X.columns],
+        [c for c in NUMERICAL_COLUMNS if c in X.columns]
+    )
+    memory = transformer_memory(use_cache, env=env)
+    folds = prepare_cv_folds(X, y, preprocessor, cv, memory)
+
+    rows = []
+    best_models: Dict[str, Pipeline] = {}
+    for family in families:
+        family_folds = folds
+        if family in DENSE_INPUT_FAMILIES:
+            family_folds = [(_to_dense(a), _to_dense(b), c, d) for a, b, c, d in folds]
+
+        fingerprint = _study_fingerprint(X, y, search_spaces[family], preprocessor, cv, scoring)
+        study_name = f"{study_prefix}_{family}_{fingerprint}"
+        study = optuna.create_study(
+            study_name=study_name, storage=storage, direction="maximize", load_if_exists=True
+        )
+        objective_args = (family, search_spaces[family], family_folds, scoring, threads_per_worker, random_state)
+
+        start = time.perf_counter()
+        if n_jobs > 1:
+            with parallel_config(backend="loky", inner_max_num_threads=threads_per_worker):
+                Parallel(n_jobs=n_jobs)(
+                    delayed(_run_study)(study_name, storage, pruner, random_state + worker,
+                                        objective_args, n_trials, timeout)
+                    for worker in range(n_jobs)
+                )
+        elif storage is None:
+            # In-memory studies cannot be reloaded by name, so optimize this one directly
+            study.sampler = optuna.samplers.TPESampler(seed=random_state)
+            study.pruner = _make_pruner(pruner)
+            remaining = None if n_trials is None else max(n_trials - len(study.trials), 0)
+            study.optimize(_objective(*objective_args), n_trials=remaining, timeout=timeout, catch=(ValueError,))
+        else:
+            _run_study(study_name, storage, pruner, random_state, objective_args, n_trials, timeout)
+        logger.info(f"{study_name}: {time.perf_counter() - start:.1f}s")
+
+        if storage is not None:
+            study = optuna.load_study(study_name=study_name, storage=storage)
+        finished = [
+            t for t in study.trials
+            if t.state in (optuna.trial.TrialState.COMPLETE, optuna.trial.TrialState.PRUNED)
+        ]
+        for t in finished:
+            rows.append({
+                "Family": family,
+                "Trial": t.number,
+                "State": t.state.name,
+                "Score": t.value if t.value is not None else list(t.intermediate_values.values())[-1],
+                "Params": t.params,
+                "Folds Fitted": len(t.intermediate_values),
+                "Seconds": t.duration.total_seconds() if t.duration else np.nan,
+            })
+
+        if refit and any(t.state == optuna.trial.TrialState.COMPLETE for t in finished):
+            best_models[family] = fit_final_model(
+                family, study.best_params, X, y, preprocessor, memory, threads_per_worker, random_state
+            )
+
+    trials = pd.DataFrame(rows, columns=["Family", "Trial", "State", "Score", "Params", "Folds Fitted", "Seconds"])
+    trials["Completed"] = trials["State"] == "COMPLETE"
+    trials = (
+        trials.sort_values(["Family", "Completed", "Score"], ascending=[True, False, False], kind="stable")
+        .drop(columns="Completed")
+        .reset_index(drop=True)
+    )
+    return trials, best_models
@@ -0,0 +1,428 @@
+from pathlib import Path
+import logging
+import os
+import time
+import pandas as pd
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from joblib import Memory, Parallel, delayed, parallel_config
+from sklearn.base import BaseEstimator, clone
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import get_scorer
+from sklearn.model_selection import KFold, ParameterGrid
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+from threadpoolctl import threadpool_limits
+
+from src.data_sourcing.import_export_data import CACHE_DIRNAME, DataStore, get_config_manager
+from src.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+TRAINING_CONFIG_KEY = "hyperparameters.training"
+PARAM_GRIDS_CONFIG_KEY = "hyperparameters.param_grids"
+
+# Feature layout used by the modeling notebooks (log_data_fe.csv)
+CATEGORICAL_COLUMNS: List[str] = [
+    "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "HOLIDAY_FLAG",
+    "LAG_3_HOLIDAY_FLAG", "LEAD_3_HOLIDAY_FLAG", "SEASON",
+    "CHANNEL_ATL_OR_DR", "CHANNEL_CAMPAIGN_TYPE", "MONTH"
+]
+NUMERICAL_COLUMNS: List[str] = ["LOG_COST", "COST"]
+# Ratios computed from FREE_TRIALS: known only after the outcome, so they are
+# never model inputs (they leak the target into the features)
+TARGET_DERIVED_COLUMNS: List[str] = [
+    "COST_PER_FREE_TRIALS", "COST_BY_FREE_TRIALS",
+    "LOG_COST_PER_FREE_TRIALS", "LOG_COST_BY_FREE_TRIALS"
+]
+
+# Hyperparameter grids of the baseline notebook, used when the config has none
+DEFAULT_PARAM_GRIDS: Dict[str, Dict[str, List[Any]]] = {
+    "xgb": {
+        "n_estimators": [50, 100, 200],
+        "learning_rate": [0.01, 0.1, 0.2],
+        "max_depth": [3, 5, 7],
+    },
+    "rf": {
+        "n_estimators": [50, 100, 200],
+        "max_depth": [10, 20, None],
+        "min_samples_split": [2, 5, 10],
+        "min_samples_leaf": [1, 2, 4],
+    },
+}
+
+
+def _make_xgb(params: Dict[str, Any], n_threads: int, random_state: int) -> BaseEstimator:
+    from xgboost import XGBRegressor
+    return XGBRegressor(random_state=random_state, n_jobs=n_threads, **params)
+
+
+def _make_rf(params: Dict[str, Any], n_threads: int, random_state: int) -> BaseEstimator:
+    from sklearn.ensemble import RandomForestRegressor
+    return RandomForestRegressor(random_state=random_state, n_jobs=n_threads, **params)
+
+
+# Model families by short name; each factory builds an estimator that uses
+# exactly n_threads threads
+MODEL_FAMILIES: Dict[str, Callable[[Dict[str, Any], int, int], BaseEstimator]] = {
+    "xgb": _make_xgb,
+    "rf": _make_rf,
+}
+# Families that fit far faster on dense input than on the preprocessor's
+# sparse output (sklearn forests re-sort sparse columns at every split)
+DENSE_INPUT_FAMILIES = {"rf"}
+
+
+def build_preprocessor(
+    categorical_columns: Sequence[str] = CATEGORICAL_COLUMNS,
+    numerical_columns: Sequence[str] = NUMERICAL_COLUMNS,
+    drop: Optional[str] = None
+) -> ColumnTransformer:
+    """
+    The notebooks' preprocessing: scale numerical columns, one-hot encode
+    categorical ones (unknown levels ignored).
+
+    Parameters
+    ----------
+    categorical_columns : sequence of str, optional
+        Columns to one-hot encode. Default is CATEGORICAL_COLUMNS.
+    numerical_columns : sequence of str, optional
+        Columns to standardize. Default is NUMERICAL_COLUMNS.
+    drop : str, optional
+        OneHotEncoder drop strategy, e.g. "first" for linear models. Default
+        is None (keep every level).
+
+    Returns
+    -------
+    ColumnTransformer
+        An unfitted preprocessor.
+    """
+    return ColumnTransformer(transformers=[
+        ("num", StandardScaler(), list(numerical_columns)),
+        ("cat", OneHotEncoder(handle_unknown="ignore", drop=drop), list(categorical_columns)),
+    ])
+
+
+def prepare_training_data(
+    df: pd.DataFrame,
+    target: Optional[str] = None,
+    env: str = "development"
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """
+    Select the model inputs and target from a feature table.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Feature table, e.g. log_data_fe.csv.
+    target : str, optional
+        Target column. Default is hyperparameters.training.target ("FREE_TRIALS").
+    env : str, optional
+        Environment whose config supplies defaults.
+
+    Returns
+    -------
+    tuple
+        - X : the CATEGORICAL_COLUMNS and NUMERICAL_COLUMNS present in df
+        - y : the target
+    """
+    target = target or get_config_manager(env).get(f"{TRAINING_CONFIG_KEY}.target", "FREE_TRIALS")
+    features = [c for c in CATEGORICAL_COLUMNS + NUMERICAL_COLUMNS if c in df.columns]
+    return df[features], df[target]
+
+
+def _fit_transform_fold(
+    preprocessor: ColumnTransformer,
+    X_train: pd.DataFrame,
+    X_valid: Optional[pd.DataFrame]
+) -> Tuple[Any, Any, ColumnTransformer]:
+    """
+    Fit the preprocessor on one training fold and transform both sides.
+    Wrapped with joblib.Memory, so identical folds are read back from disk.
+    """
+    fitted = clone(preprocessor).fit(X_train)
+    X_valid_t = fitted.transform(X_valid) if X_valid is not None else None
+    return fitted.transform(X_train), X_valid_t, fitted
+
+
+def _to_dense(matrix: Any) -> np.ndarray:
+    """Densify a scipy sparse matrix; dense input is returned unchanged."""
+    return matrix.toarray() if hasattr(matrix, "toarray") else matrix
+
+
+def transformer_memory(
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    env: str = "development"
+) -> Memory:
+    """
+    joblib.Memory for fitted preprocessing folds.
+
+    Parameters
+    ----------
+    use_cache : bool, optional
+        If False, returns a pass-through Memory that caches nothing.
+    cache_dir : Path, optional
+        Cache location. Default is the models directory's
+        CACHE_DIRNAME/transformers folder.
+    env : str, optional
+        Environment used to resolve the default location.
+
+    Returns
+    -------
+    Memory
+        The transformer cache.
+    """
+    if use_cache and cache_dir is None:
+        cache_dir = DataStore(env).base_path("models") / CACHE_DIRNAME / "transformers"
+    return Memory(location=cache_dir if use_cache else None, verbose=0)
+
+
+def prepare_cv_folds(
+    X: pd.DataFrame,
+    y: pd.Series,
+    preprocessor: ColumnTransformer,
+    cv: int,
+    memory: Memory
+) -> List[Tuple[Any, Any, np.ndarray, np.ndarray]]:
+    """
+    Fit the preprocessor once per (unshuffled) K-fold split and transform both sides.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Training features.
+    y : pd.Series
+        Training target.
+    preprocessor : ColumnTransformer
+        Unfitted preprocessor.
+    cv : int
+        Number of folds.
+    memory : Memory
+        Cache for fitted folds (see transformer_memory).
+
+    Returns
+    -------
+    list of tuple
+        (X_train, X_valid, y_train, y_valid) per fold, features transformed.
+    """
+    fit_transform = memory.cache(_fit_transform_fold)
+    start = time.perf_counter()
+    y_values = np.asarray(y)
+    folds = []
+    for train_idx, valid_idx in KFold(n_splits=cv).split(X):
+        X_train_t, X_valid_t, _ = fit_transform(preprocessor, X.iloc[train_idx], X.iloc[valid_idx])
+        folds.append((X_train_t, X_valid_t, y_values[train_idx], y_values[valid_idx]))
+    logger.info(f"Preprocessed {cv} folds in {time.perf_counter() - start:.2f}s")
+    return folds
+
+
+@instrument()
+def fit_final_model(
+    family: str,
+    params: Dict[str, Any],
+    X: pd.DataFrame,
+    y: pd.Series,
+    preprocessor: ColumnTransformer,
+    memory: Memory,
+    n_threads: int = 1,
+    random_state: int = 42
+) -> Pipeline:
+    """
+    Fit one model family on all training rows behind a (cached) fitted preprocessor.
+
+    Parameters
+    ----------
+    family : str
+        Key of MODEL_FAMILIES.
+    params : dict
+        Model hyperparameters.
+    X, y
+        Training features and target.
+    preprocessor : ColumnTransformer
+        Unfitted preprocessor.
+    memory : Memory
+        Cache for the fitted preprocessor (see transformer_memory).
+    n_threads : int, optional
+        Native threads for fitting. Default is 1.
+    random_state : int, optional
+        Model seed. Default is 42.
+
+    Returns
+    -------
+    Pipeline
+        Fitted Pipeline([("preprocessor", ...), ("model", ...)]).
+    """
+    X_full_t, _, fitted_preprocessor = memory.cache(_fit_transform_fold)(preprocessor, X, None)
+    model = MODEL_FAMILIES[family](params, n_threads, random_state)
+    with threadpool_limits(limits=n_threads):
+        model.fit(_to_dense(X_full_t) if family in DENSE_INPUT_FAMILIES else X_full_t, np.asarray(y))
+    return Pipeline([("preprocessor", fitted_preprocessor), ("model", model)])
+
+
+def _candidate_grid(param_grids: Dict[str, Dict[str, List[Any]]]) -> List[Tuple[str, Dict[str, Any]]]:
+    """Expand every family's grid; notebook-style "model__" prefixes are accepted."""
+    candidates = []
+    for family, grid in param_grids.items():
+        if family not in MODEL_FAMILIES:
+            raise ValueError(f"Unknown model family: {family}. Must be one of {list(MODEL_FAMILIES)}.")
+        grid = {key.split("__")[-1]: values for key, values in grid.items()}
+        candidates.extend((family, params) for params in ParameterGrid(grid))
+    return candidates
+
+
+def _evaluate_candidate(
+    family: str,
+    params: Dict[str, Any],
+    folds: List[Tuple[Any, Any, np.ndarray, np.ndarray]],
+    scoring: str,
+    n_threads: int,
+    random_state: int
+) -> Dict[str, Any]:
+    """
+    Fit and score one candidate on every preprocessed fold, inside a worker
+    whose native thread pools (BLAS, OpenMP) are capped at n_threads.
+    """
+    scorer = get_scorer(scoring)
+    scores, fit_times = [], []
+    with threadpool_limits(limits=n_threads):
+        for X_train, X_valid, y_train, y_valid in folds:
+            model = MODEL_FAMILIES[family](params, n_threads, random_state)
+            start = time.perf_counter()
+            model.fit(X_train, y_train)
+            fit_times.append(time.perf_counter() - start)
+            scores.append(scorer(model, X_valid, y_valid))
+    return {
+        "Family": family,
+        "Params": params,
+        "Mean Score": float(np.mean(scores)),
+        "Std Score": float(np.std(scores)),
+        "Fold Scores": scores,
+        "Mean Fit Time": float(np.mean(fit_times)),
+    }
+
+
+@instrument()
+def train_models(
+    X: pd.DataFrame,
+    y: pd.Series,
+    families: Optional[Sequence[str]] = None,
+    param_grids: Optional[Dict[str, Dict[str, List[Any]]]] = None,
+    preprocessor: Optional[ColumnTransformer] = None,
+    cv: Optional[int] = None,
+    scoring: Optional[str] = None,
+    n_jobs: Optional[int] = None,
+    threads_per_worker: Optional[int] = None,
+    random_state: Optional[int] = None,
+    refit: bool = True,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    env: str = "development"
+) -> Tuple[pd.DataFrame, Dict[str, Pipeline]]:
+    """
+    Grid-search every model family with shared, cached preprocessing.
+
+    Equivalent to one GridSearchCV per family over a
+    Pipeline([("preprocessor", ...), ("model", ...)]), except that:
+
+    - the preprocessor is fitted once per CV fold (not once per fold and
+      candidate), and the fitted folds are cached on disk with joblib.Memory
+      so re-runs on the same data skip preprocessing entirely;
+    - candidates of all families are spread over one process pool, each
+      worker limited to threads_per_worker native threads so XGBoost/BLAS
+      thread pools do not oversubscribe the machine.
+
+    Unset arguments come from hyperparameters.training and
+    hyperparameters.param_grids in the environment's config.
+
+    Parameters
+    ----------
+    X : pd.DataFrame
+        Training features (see prepare_training_data).
+    y : pd.Series
+        Training target.
+    families : sequence of str, optional
+        Model families to train (keys of MODEL_FAMILIES). Default is every
+        family in param_grids if given, else the config's families.
+    param_grids : dict, optional
+        Grid per family. Default is the config's, else DEFAULT_PARAM_GRIDS.
+    preprocessor : ColumnTransformer, optional
+        Unfitted preprocessor. Default is build_preprocessor().
+    cv : int, optional
+        Number of (unshuffled) K-fold splits. Config default is 3.
+    scoring : str, optional
+        sklearn scorer name. Config default is "neg_mean_squared_error".
+    n_jobs : int, optional
+        Worker processes; -1 uses every core divided by threads_per_worker.
+    threads_per_worker : int, optional
+        Native threads per worker. Config default is 1.
+    random_state : int, optional
+        Seed passed to every model. Config default is 42.
+    refit : bool, optional
+        Whether to refit the best candidate of each family on all of X.
+    use_cache : bool, optional
+        Whether to cache fitted folds on disk. Default is True.
+    cache_dir : Path, optional
+        joblib.Memory location. Default is the models directory's
+        CACHE_DIRNAME/transformers folder.
+    env : str, optional
+        Environment whose config supplies defaults.
+
+    Returns
+    -------
+    tuple
+        - results : one row per candidate with "Family", "Params",
+          "Mean Score", "Std Score", "Fold Scores", "Mean Fit Time" and
+          "Rank" (within its family), best first
+        - best_models : fitted best Pipeline per family (empty if refit=False)
+    """
+    config = get_config_manager(env)
+    settings = config.get(TRAINING_CONFIG_KEY, {}) or {}
+    cv = cv or settings.get("cv", 3)
+    scoring = scoring or settings.get("scoring", "neg_mean_squared_error")
+    threads_per_worker = threads_per_worker or settings.get("threads_per_worker", 1)
+    n_jobs = n_jobs or settings.get("n_jobs", -1)
+    random_state = settings.get("random_state", 42) if random_state is None else random_state
+    if n_jobs < 0:
+        n_jobs = max((os.cpu_count() or 1) // threads_per_worker, 1)
+
+    if param_grids is None:
+        param_grids = config.get(PARAM_GRIDS_CONFIG_KEY) or DEFAULT_PARAM_GRIDS
+        families = families or settings.get("families") or list(param_grids)
+    families = families or list(param_grids)
+    candidates = _candidate_grid({family: param_grids[family] for family in families})
+    preprocessor = preprocessor or build_preprocessor(
+        [c for c in CATEGORICAL_COLUMNS if c in X.columns],
+        [c for c in NUMERICAL_COLUMNS if c in X.columns]
+    )
+
+    memory = transformer_memory(use_cache, cache_dir, env)
+    folds = prepare_cv_folds(X, y, preprocessor, cv, memory)
+    dense_folds = folds
+    if DENSE_INPUT_FAMILIES & set(families):
+        dense_folds = [(_to_dense(a), _to_dense(b), c, d) for a, b, c, d in folds]
+
+    logger.info(f"Training {len(candidates)} candidates x {cv} folds on {n_jobs} workers "
+                f"({threads_per_worker} threads each)")
+    with parallel_config(backend="loky", inner_max_num_threads=threads_per_worker):
+        rows = Parallel(n_jobs=n_jobs)(
+            delayed(_evaluate_candidate)(
+                family, params, dense_folds if family in DENSE_INPUT_FAMILIES else folds,
+                scoring, threads_per_worker, random_state
+            )
+            for family, params in candidates
+        )
+
+    results = pd.DataFrame(rows)
+    results["Rank"] = results.groupby("Family")["Mean Score"].rank(ascending=False, method="min").astype(int)
+    results = results.sort_values(["Family", "Rank"], kind="stable").reset_index(drop=True)
+
+    best_models: Dict[str, Pipeline] = {}
+    if refit:
+        for family, best in results.groupby("Family").first().iterrows():
+            best_models[family] = fit_final_model(
+                family, best["Params"], X, y, preprocessor, memory, threads_per_worker, random_state
+            )
+
+    return results, best_models
@@ -0,0 +1,250 @@
+import logging
+import pandas as pd
+import numpy as np
+from scipy import sparse as sp
+from typing import Any, Iterable, List, Optional
+
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+
+logger = logging.getLogger(__name__)
+
+METHODS: List[str] = ["auto", "randomized", "incremental", "truncated"]
+VARIANCE_THRESHOLD: float = 0.95
+MAX_COMPONENTS: int = 200
+BATCH_SIZE: int = 10_000
+
+
+def select_n_components(explained_variance_ratio: np.ndarray, variance_threshold: float) -> int:
+    """
+    Smallest number of leading components whose cumulative explained variance
+    reaches the threshold (all of them if it is never reached).
+
+    Parameters
+    ----------
+    explained_variance_ratio : np.ndarray
+        Per-component share of the total variance, in decreasing order.
+    variance_threshold : float
+        Target cumulative share, e.g. 0.95.
+
+    Returns
+    -------
+    int
+        The number of components to keep.
+    """
+    cumulative = np.cumsum(explained_variance_ratio)
+    return int(min(np.searchsorted(cumulative, variance_threshold - 1e-12) + 1, len(cumulative)))
+
+
+class DimensionalityReducer(BaseEstimator, TransformerMixin):
+    """
+    Project wide (one-hot / interaction) feature matrices onto their leading
+    principal components.
+
+    Three back ends, all fitted up to max_components and then cut to the
+    fewest components that explain variance_threshold of the total variance:
+
+    - "randomized": PCA with the randomized SVD solver (dense input).
+    - "incremental": IncrementalPCA fitted in mini-batches, so the full
+      matrix never has to be dense at once; partial_fit also accepts chunks
+      of a streamed feature matrix.
+    - "truncated": TruncatedSVD, which works on sparse input directly but
+      does not center the data.
+    - "auto" picks "truncated" for sparse and "randomized" for dense input.
+
+    transform computes (X - mean) @ components.T as X @ components.T minus a
+    constant row, so centered projections of sparse input are never densified.
+
+    Parameters
+    ----------
+    n_components : int, optional
+        Fixed number of components; overrides variance_threshold.
+    variance_threshold : float, optional
+        Cumulative explained variance to keep. Default is 0.95.
+    method : str, optional
+        One of METHODS. Default is "auto".
+    max_components : int, optional
+        Components fitted before selection. Default is 200.
+    batch_size : int, optional
+        Rows per IncrementalPCA batch. Default is 10,000.
+    random_state : int, optional
+        Seed for the randomized solvers. Default is 42.
+
+    Attributes
+    ----------
+    components_ : np.ndarray
+        (n_components_, n_features) kept components.
+    mean_ : np.ndarray
+        Per-feature mean subtracted before projecting (zeros for "truncated").
+    explained_variance_ratio_ : np.ndarray
+        Share of total variance of every kept component.
+    n_components_ : int
+        Number of kept components.
+    method_ : str
+        The back end used.
+    """
+
+    def __init__(
+        self,
+        n_components: Optional[int] = None,
+        variance_threshold: float = VARIANCE_THRESHOLD,
+        method: str = "auto",
+        max_components: int = MAX_COMPONENTS,
+        batch_size: int = BATCH_SIZE,
+        random_state: Optional[int] = 42
+    ) -> None:
+        self.n_components = n_components
+        self.variance_threshold = variance_threshold
+        self.method = method
+        self.max_components = max_components
+        self.batch_size = batch_size
+        self.random_state = random_state
+
+    def _resolve_method(self, X: Any) -> str:
+        if self.method not in METHODS:
+            raise ValueError(f"Unsupported method: {self.method}. Must be one of {METHODS}.")
+        if self.method == "auto":
+            return "truncated" if sp.issparse(X) else "randomized"
+        return self.method
+
+    def _n_fit_components(self, n_rows: int, n_features: int) -> int:
+        n_fit = self.n_components if self.n_components is not None else self.max_components
+        limit = n_features - 1 if self.method_ == "truncated" else min(n_rows, n_features)
+        return max(1, min(n_fit, limit))
+
+    def _make_estimator(self, n_fit: int) -> Any:
+        if self.method_ == "randomized":
+            return PCA(n_components=n_fit, svd_solver="randomized", random_state=self.random_state)
+        if self.method_ == "incremental":
+            return IncrementalPCA(n_components=n_fit, batch_size=self.batch_size)
+        return TruncatedSVD(n_components=n_fit, algorithm="randomized", random_state=self.random_state)
+
+    def _select(self) -> "DimensionalityReducer":
+        """Cut the fitted components to n_components or the variance threshold."""
+        ratio = self.estimator_.explained_variance_ratio_
+        if self.n_components is not None:
+            keep = min(self.n_components, len(ratio))
+        else:
+            keep = select_n_components(ratio, self.variance_threshold)
+            if ratio.sum() < self.variance_threshold:
+                logger.warning(f"{len(ratio)} components explain {ratio.sum():.3f} of the variance, "
+                               f"below variance_threshold={self.variance_threshold}; raise max_components")
+        self.components_ = self.estimator_.components_[:keep]
+        self.explained_variance_ratio_ = ratio[:keep]
+        mean = getattr(self.estimator_, "mean_", None)
+        self.mean_ = np.zeros(self.components_.shape[1]) if mean is None else mean
+        self.offset_ = self.mean_ @ self.components_.T
+        self.n_components_ = keep
+        return self
+
+    def fit(self, X: Any, y: Any = None) -> "DimensionalityReducer":
+        """Fit the back end on X and select the number of components."""
+        self.method_ = self._resolve_method(X)
+        if sp.issparse(X) and self.method_ == "randomized":
+            X = X.toarray()
+        self.estimator_ = self._make_estimator(self._n_fit_components(*X.shape))
+        if self.method_ == "incremental" and sp.issparse(X):
+            # Densify one batch at a time instead of the whole matrix
+            for start in range(0, X.shape[0], self.batch_size):
+                self.estimator_.partial_fit(X[start:start + self.batch_size].toarray())
+        else:
+            self.estimator_.fit(X)
+        self._select()
+        logger.info(f"{self.method_} reduction: {X.shape[1]} features -> {self.n_components_} components "
+                    f"({self.explained_variance_ratio_.sum():.3f} of variance)")
+        return self
+
+    def partial_fit(self, X: Any, y: Any = None) -> "DimensionalityReducer":
+        """
+        Update an IncrementalPCA fit with one chunk of rows.
+
+        The first chunk fixes the number of fitted components, so it should
+        hold at least max_components rows. Component selection is redone after
+        every chunk, so the reducer can transform at any point.
+        """
+        if not hasattr(self, "estimator_"):
+            if self.method not in ("auto", "incremental"):
+                raise ValueError(f"partial_fit needs method='incremental', got {self.method!r}")
+            self.method_ = "incremental"
+            self.estimator_ = self._make_estimator(self._n_fit_components(*X.shape))
+        self.estimator_.partial_fit(X.toarray() if sp.issparse(X) else np.asarray(X))
+        return self._select()
+
+    def transform(self, X: Any) -> np.ndarray:
+        """
+        Project X onto the kept components.
+
+        Returns
+        -------
+        np.ndarray
+            (n_rows, n_components_) dense matrix.
+        """
+        check_is_fitted(self, "components_")
+        projected = X @ self.components_.T
+        return np.asarray(projected) - self.offset_
+
+    def get_feature_names_out(self, input_features: Optional[Any] = None) -> np.ndarray:
+        """Component names "PC1", "PC2", ... as in the notebooks."""
+        check_is_fitted(self, "components_")
+        return np.array([f"PC{i + 1}" for i in range(self.n_components_)], dtype=object)
+
+
+def fit_reducer_on_chunks(
+    chunks: Iterable[pd.DataFrame],
+    features: Any,
+    reducer: Optional[DimensionalityReducer] = None
+) -> DimensionalityReducer:
+    """
+    Fit an incremental reducer on a streamed feature matrix.
+
+    Each chunk (e.g. from stream_data.iter_raw_chunks after feature
+    engineering) is run through an already fitted features transformer and
+    passed to partial_fit, so only one chunk's matrix is in memory at a time.
+
+    Parameters
+    ----------
+    chunks : iterable of pd.DataFrame
+        Raw-column chunks.
+    features : Any
+        Fitted preprocessor or InteractionFeatures.
+    reducer : DimensionalityReducer, optional
+        Unfitted reducer. Default is DimensionalityReducer(method="incremental").
+
+    Returns
+    -------
+    DimensionalityReducer
+        The fitted reducer.
+    """
+    reducer = clone(reducer) if reducer is not None else DimensionalityReducer(method="incremental")
+    n_rows = 0
+    for chunk in chunks:
+        reducer.partial_fit(features.transform(chunk))
+        n_rows += len(chunk)
+    logger.info(f"Incremental reduction fitted on {n_rows} rows: {reducer.n_components_} components "
+                f"({reducer.explained_variance_ratio_.sum():.3f} of variance)")
+    return reducer
+
+
+def with_reduction(preprocessor: Any, reducer: Optional[DimensionalityReducer] = None) -> Pipeline:
+    """
+    Chain a preprocessor (or InteractionFeatures) with a reducer.
+
+    The result can be passed as `preprocessor` to model_training.train_models
+    and model_selection.search_models, so every CV fold fits the reduction on
+    its own training rows and the grid search trains on the components.
+
+    Parameters
+    ----------
+    preprocessor : Any
+        Unfitted ColumnTransformer or InteractionFeatures.
+    reducer : DimensionalityReducer, optional
+        Unfitted reducer. Default is DimensionalityReducer().
+
+    Returns
+    -------
+    Pipeline
+        Pipeline([("features", preprocessor), ("reduce", reducer)]).
+    """
+    return Pipeline([("features", preprocessor), ("reduce", reducer or DimensionalityReducer())])
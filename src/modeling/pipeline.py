@@ -0,0 +1,241 @@
+import pandas as pd
+import numpy as np
+from scipy import sparse as sp
+from typing import Any, Dict, List, Optional, Sequence
+
+from sklearn.base import BaseEstimator, TransformerMixin, clone
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.utils.validation import check_is_fitted
+
+from src.modeling.model_training import CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS, build_preprocessor
+
+INTERACTION_NUMERICALS: List[str] = ["LOG_COST"]
+INTERACTION_CATEGORICALS: List[str] = ["CHANNEL"]
+
+
+class InteractionFeatures(BaseEstimator, TransformerMixin):
+    """
+    Preprocess campaign data and append numerical x categorical interaction terms.
+
+    Wraps a ColumnTransformer with a "num" (scaled numerical) and a "cat"
+    (OneHotEncoder) part. For every numerical feature and every level of every
+    interaction categorical it adds the column value * [row has that level],
+    including the level dropped by drop="first" (the reference category), so
+    a linear model gets a separate slope for every level.
+
+    Everything that depends on names is resolved once in fit: output feature
+    names, the positions of the numerical and indicator columns, and the
+    reference level of each categorical. transform then works purely on the
+    sparse encoder output: each row's level is read from the indicator
+    non-zeros and all interaction columns are built in one sparse COO
+    construction, so the cost scales with nnz and no DataFrame is created.
+
+    Parameters
+    ----------
+    preprocessor : ColumnTransformer, optional
+        Unfitted preprocessor with "num" and "cat" transformers. Default is
+        model_training.build_preprocessor(drop="first") over the model columns
+        present in X.
+    numerical_features : sequence of str, optional
+        Original numerical columns to interact. Default is ["LOG_COST"].
+    categorical_features : sequence of str, optional
+        Original categorical columns to interact. Default is ["CHANNEL"].
+    include_reference : bool, optional
+        Whether to add interactions for dropped reference levels. Default is True.
+
+    Attributes
+    ----------
+    preprocessor_ : ColumnTransformer
+        The fitted preprocessor.
+    feature_names_out_ : np.ndarray
+        Preprocessor output names followed by "<num>_x_<cat>_<level>" names.
+    n_interactions_ : int
+        Number of interaction columns.
+    feature_names_in_ : np.ndarray
+        Input column names seen by the preprocessor.
+    """
+
+    def __init__(
+        self,
+        preprocessor: Optional[ColumnTransformer] = None,
+        numerical_features: Sequence[str] = INTERACTION_NUMERICALS,
+        categorical_features: Sequence[str] = INTERACTION_CATEGORICALS,
+        include_reference: bool = True
+    ) -> None:
+        self.preprocessor = preprocessor
+        self.numerical_features = numerical_features
+        self.categorical_features = categorical_features
+        self.include_reference = include_reference
+
+    def fit(self, X: pd.DataFrame, y: Any = None) -> "InteractionFeatures":
+        """
+        Fit the preprocessor and precompute the interaction layout and names.
+
+        Raises
+        ------
+        ValueError
+            If an interaction column is not handled by the preprocessor's
+            "num" or "cat" transformer.
+        """
+        preprocessor = self.preprocessor
+        if preprocessor is None:
+            preprocessor = build_preprocessor(
+                [c for c in CATEGORICAL_COLUMNS if c in X.columns],
+                [c for c in NUMERICAL_COLUMNS if c in X.columns],
+                drop="first"
+            )
+        self.preprocessor_ = clone(preprocessor).fit(X, y)
+        self.feature_names_in_ = self.preprocessor_.feature_names_in_
+        self.n_features_in_ = self.preprocessor_.n_features_in_
+        base_names = self.preprocessor_.get_feature_names_out()
+
+        num_columns = list(self.preprocessor_.named_transformers_["num"].feature_names_in_)
+        encoder = self.preprocessor_.named_transformers_["cat"]
+        cat_columns = list(encoder.feature_names_in_)
+        num_start = self.preprocessor_.output_indices_["num"].start
+        cat_start = self.preprocessor_.output_indices_["cat"].start
+
+        missing = [c for c in self.numerical_features if c not in num_columns]
+        missing += [c for c in self.categorical_features if c not in cat_columns]
+        if missing:
+            raise ValueError(f"Interaction columns not handled by the preprocessor: {missing}")
+
+        self.numerical_index_ = np.array(
+            [num_start + num_columns.index(c) for c in self.numerical_features], dtype=np.int64
+        )
+
+        # Indicator columns of each encoded categorical, in encoder output order
+        drop_idx = getattr(encoder, "drop_idx_", None)
+        indicator_start = cat_start
+        groups: Dict[str, Dict[str, Any]] = {}
+        for i, column in enumerate(cat_columns):
+            levels = list(encoder.categories_[i])
+            dropped = None if drop_idx is None or drop_idx[i] is None else int(drop_idx[i])
+            kept = np.array([k for k in range(len(levels)) if k != dropped], dtype=np.int64)
+            groups[column] = {"start": indicator_start, "kept": kept, "levels": levels, "dropped": dropped}
+            indicator_start += len(kept)
+
+        # Interaction columns: for each numerical, for each categorical, one per
+        # level in category order (the reference level only if requested)
+        self.layouts_ = []
+        interaction_names = []
+        offset = 0
+        for j, numerical in enumerate(self.numerical_features):
+            for column in self.categorical_features:
+                group = groups[column]
+                n_levels = len(group["levels"])
+                # Maps a row's level code to its interaction column (-1 = no column)
+                level_to_column = np.arange(offset, offset + n_levels)
+                if group["dropped"] is not None and not self.include_reference:
+                    level_to_column[group["dropped"]] = -1
+                    level_to_column[group["dropped"] + 1:] -= 1
+                n_columns = int((level_to_column >= 0).sum())
+                interaction_names.extend(
+                    f"{numerical}_x_{column}_{level}"
+                    for k, level in enumerate(group["levels"]) if level_to_column[k] >= 0
+                )
+                self.layouts_.append({
+                    "numerical": j,
+                    "start": group["start"],
+                    "kept": group["kept"],
+                    "dropped": group["dropped"],
+                    "level_to_column": level_to_column,
+                })
+                offset += n_columns
+
+        self.n_interactions_ = offset
+        self.feature_names_out_ = np.concatenate([base_names, np.array(interaction_names, dtype=object)])
+        return self
+
+    def _level_codes(self, base: sp.csr_matrix, layout: Dict[str, Any]) -> np.ndarray:
+        """
+        Level index of every row for one categorical, read from its indicator
+        non-zeros. Rows without an indicator get the dropped level (or -1 when
+        no level was dropped, i.e. an unknown category).
+        """
+        block = base[:, layout["start"]:layout["start"] + len(layout["kept"])].tocoo()
+        default = -1 if layout["dropped"] is None else layout["dropped"]
+        codes = np.full(base.shape[0], default, dtype=np.int64)
+        codes[block.row] = layout["kept"][block.col]
+        return codes
+
+    def transform(self, X: pd.DataFrame) -> sp.csr_matrix:
+        """
+        Preprocess X and append the interaction columns.
+
+        Returns
+        -------
+        scipy.sparse.csr_matrix
+            (n_rows, len(feature_names_out_)) feature matrix.
+        """
+        check_is_fitted(self, "feature_names_out_")
+        base = sp.csr_matrix(self.preprocessor_.transform(X))
+        n_rows = base.shape[0]
+        if not self.n_interactions_:
+            return base
+
+        numerical_values = base[:, self.numerical_index_].toarray()
+        rows, cols, vals = [], [], []
+        codes_cache: Dict[int, np.ndarray] = {}
+        for layout in self.layouts_:
+            codes = codes_cache.get(layout["start"])
+            if codes is None:
+                codes = codes_cache[layout["start"]] = self._level_codes(base, layout)
+            valid = codes >= 0
+            columns = layout["level_to_column"][codes[valid]]
+            keep = columns >= 0
+            rows.append(np.flatnonzero(valid)[keep])
+            cols.append(columns[keep])
+            vals.append(numerical_values[rows[-1], layout["numerical"]])
+
+        interactions = sp.csr_matrix(
+            (np.concatenate(vals), (np.concatenate(rows), np.concatenate(cols))),
+            shape=(n_rows, self.n_interactions_)
+        )
+        return sp.hstack([base, interactions], format="csr")
+
+    def get_feature_names_out(self, input_features: Optional[Sequence[str]] = None) -> np.ndarray:
+        """Output feature names, precomputed in fit."""
+        check_is_fitted(self, "feature_names_out_")
+        return self.feature_names_out_
+
+
+def build_pipeline(
+    model: BaseEstimator,
+    numerical_features: Sequence[str] = INTERACTION_NUMERICALS,
+    categorical_features: Sequence[str] = INTERACTION_CATEGORICALS,
+    include_reference: bool = True,
+    preprocessor: Optional[ColumnTransformer] = None,
+    reducer: Optional[BaseEstimator] = None
+) -> Pipeline:
+    """
+    Pipeline([("features", InteractionFeatures(...)), ("model", model)]),
+    with an optional ("reduce", reducer) step in between.
+
+    Parameters
+    ----------
+    model : BaseEstimator
+        Unfitted regressor.
+    numerical_features, categorical_features, include_reference, preprocessor
+        See InteractionFeatures.
+    reducer : BaseEstimator, optional
+        Unfitted dimensionality reduction step, e.g. pca.DimensionalityReducer().
+
+    Returns
+    -------
+    Pipeline
+        An unfitted pipeline; after fit, feature names are available from
+        pipeline[:-1].get_feature_names_out().
+    """
+    steps = [
+        ("features", InteractionFeatures(
+            preprocessor=preprocessor,
+            numerical_features=numerical_features,
+            categorical_features=categorical_features,
+            include_reference=include_reference
+        )),
+    ]
+    if reducer is not None:
+        steps.append(("reduce", reducer))
+    return Pipeline(steps + [("model", model)])
@@ -0,0 +1,447 @@
+"""
+End-to-end pipeline runner: raw data -> cleaned data -> features ->
+analysis reports / models -> scores, as a DAG of content-addressed stages.
+
+Usage:
+    python -m src.run_pipeline --env development
+    python -m src.run_pipeline --env development --stages vif correlations --force
+    python -m src.run_pipeline --env development --metrics metrics.jsonl
+"""
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from pathlib import Path
+import argparse
+import hashlib
+import inspect
+import json
+import logging
+import sys
+import time
+import pandas as pd
+from types import ModuleType
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.data_analysis import df_correlation_analysis, df_multicollinearity_analysis
+from src.data_preprocessing import df_clean, df_feature_engineer, df_train_test_split
+from src.data_sourcing.import_export_data import CACHE_DIRNAME, DataStore, _file_fingerprint, get_config_manager
+from src.instrumentation import configure_logging, enable, track
+from src.modeling import model_training
+from src.scoring import evaluate_model, score_model
+
+logger = logging.getLogger(__name__)
+
+PIPELINE_CONFIG_KEY = "pipeline"
+MANIFEST_FILENAME = "pipeline_manifest.json"
+
+# Stage settings used where configs/<env>.yaml has no pipeline.stages.<name> entry
+DEFAULT_STAGE_SETTINGS: Dict[str, Dict[str, Any]] = {
+    "clean": {
+        "input": "data.csv",
+        "output": "clean_data.parquet",
+        "report": "clean_report.csv",
+        "outlier_columns": None,
+    },
+    "features": {
+        "output": "log_data_fe.parquet",
+        "include_holidays": True,
+        "columns": df_feature_engineer.LOG_DATA_FE_COLUMNS,
+    },
+    "correlations": {
+        "output": "correlation_report.csv",
+        "include_categorical": False,
+    },
+    "vif": {
+        "output": "vif_report.csv",
+        "sparse": True,
+    },
+    "train": {
+        "target": None,
+        "param_grids": None,
+        "results": "training_results.csv",
+        "model_filename": "{family}_best_model.pkl",
+    },
+    "score": {
+        "output": "scored_data.csv",
+        "evaluation": "model_evaluation.csv",
+        "n_bootstrap": 1000,
+    },
+}
+
+
+class Stage:
+    """
+    One node of the pipeline DAG.
+
+    Attributes:
+        name (str): Stage name, also its key in the manifest
+        run (Callable): run(settings, store, env) -> output paths
+        deps (list): Upstream stage names
+        inputs (Callable): inputs(settings, store) -> files the stage reads
+        config_keys (list): Config sections (besides its own settings) it depends on
+        modules (list): Modules whose source is part of its code version
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable[[Dict[str, Dict[str, Any]], DataStore, str], List[Path]],
+        deps: Sequence[str],
+        inputs: Callable[[Dict[str, Dict[str, Any]], DataStore], List[Path]],
+        config_keys: Sequence[str] = (),
+        modules: Sequence[ModuleType] = ()
+    ) -> None:
+        self.name = name
+        self.run = run
+        self.deps = list(deps)
+        self.inputs = inputs
+        self.config_keys = list(config_keys)
+        self.modules = list(modules)
+
+    def code_version(self) -> str:
+        """Hash of the stage function and the source files of the modules it calls."""
+        digest = hashlib.sha256(inspect.getsource(self.run).encode())
+        for module in self.modules:
+            digest.update(Path(inspect.getsourcefile(module)).read_bytes())
+        return digest.hexdigest()
+
+
+def _processed(store: DataStore, filename: str) -> Path:
+    return store.base_path("processed_data") / filename
+
+
+def _run_clean(settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> List[Path]:
+    stage = settings["clean"]
+    raw = store.load(stage["input"], data_type="raw_data")
+    cleaned, report = df_clean.clean_data(raw, outlier_columns=stage["outlier_columns"])
+    return [store.save(cleaned, stage["output"]), store.save(report, stage["report"])]
+
+
+def _run_features(settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> List[Path]:
+    stage = settings["features"]
+    cleaned = store.load(settings["clean"]["output"], data_type="processed_data")
+    features = df_feature_engineer.engineer_features(
+        cleaned, include_holidays=stage["include_holidays"], columns=stage["columns"], env=env
+    )
+    return [store.save(features, stage["output"])]
+
+
+def _load_features(settings: Dict[str, Dict[str, Any]], store: DataStore) -> pd.DataFrame:
+    return store.load(settings["features"]["output"], data_type="processed_data")
+
+
+def _model_data(
+    settings: Dict[str, Dict[str, Any]], features: pd.DataFrame, env: str
+) -> Tuple[pd.DataFrame, pd.Series]:
+    """Training inputs and target, restricted to the columns available at scoring time."""
+    X, y = model_training.prepare_training_data(features, settings["train"]["target"], env=env)
+    return X[[c for c in X.columns if c in score_model.SCORING_FEATURE_COLUMNS]], y
+
+
+def _target_transform(y: pd.Series) -> Optional[str]:
+    """Back-transform reporting a LOG_* target's metrics in original units."""
+    return "log1p" if str(y.name).startswith("LOG_") else None
+
+
+def _run_correlations(settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> List[Path]:
+    stage = settings["correlations"]
+    features = _load_features(settings, store)
+    columns = (
+        model_training.NUMERICAL_COLUMNS + model_training.TARGET_DERIVED_COLUMNS + ["LOG_FREE_TRIALS", "FREE_TRIALS"]
+    )
+    if stage["include_categorical"]:
+        columns = model_training.CATEGORICAL_COLUMNS + columns
+    report = df_correlation_analysis.compute_correlations(
+        features[[c for c in columns if c in features.columns]],
+        include_categorical=stage["include_categorical"],
+        cat_cols=[c for c in model_training.CATEGORICAL_COLUMNS if c in columns],
+        sparse=stage["include_categorical"]
+    )
+    return [store.save(report, stage["output"])]
+
+
+def _run_vif(settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> List[Path]:
+    stage = settings["vif"]
+    X, _ = _model_data(settings, _load_features(settings, store), env)
+    report = df_multicollinearity_analysis.compute_vif_vectorized(X, sparse=stage["sparse"])
+    return [store.save(report, stage["output"])]
+
+
+def _run_train(settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> List[Path]:
+    stage = settings["train"]
+    features = _load_features(settings, store)
+    X, y = _model_data(settings, features, env)
+    train, _ = df_train_test_split.split_data(features, env=env)
+    results, best_models = model_training.train_models(
+        X.loc[train.index], y.loc[train.index], param_grids=stage["param_grids"], env=env
+    )
+    outputs = [store.save(results.assign(Params=results["Params"].astype(str)), stage["results"])]
+    for family, model in best_models.items():
+        outputs.append(score_model.save_model(model, stage["model_filename"].format(family=family), env))
+    return outputs
+
+
+def _run_score(settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> List[Path]:
+    stage = settings["score"]
+    features = _load_features(settings, store)
+    X, y = _model_data(settings, features, env)
+    _, test = df_train_test_split.split_data(features, env=env)
+    X_test, y_test = X.loc[test.index], y.loc[test.index]
+
+    predictions = {}
+    for model_path in _model_paths(settings, store):
+        family = model_path.stem.split("_")[0]
+        predictions[family] = score_model.ModelScorer(model_path, env).predict(X_test, derive_features=False)
+    scored = test.assign(**{f"PREDICTED_{family.upper()}": values for family, values in predictions.items()})
+    evaluation = evaluate_model.evaluate_models(
+        y_test.to_numpy(), predictions, segments=test, n_bootstrap=stage["n_bootstrap"],
+        target_transform=_target_transform(y_test)
+    )
+    return [store.save(scored, stage["output"]), store.save(evaluation, stage["evaluation"])]
+
+
+def _model_paths(settings: Dict[str, Dict[str, Any]], store: DataStore) -> List[Path]:
+    pattern = settings["train"]["model_filename"].format(family="*")
+    return sorted(store.base_path("models").glob(pattern))
+
+
+STAGES: Dict[str, Stage] = {
+    "clean": Stage(
+        "clean", _run_clean, deps=[],
+        inputs=lambda s, store: [store.base_path("raw_data") / s["clean"]["input"]],
+        modules=[df_clean]
+    ),
+    "features": Stage(
+        "features", _run_features, deps=["clean"],
+        inputs=lambda s, store: [_processed(store, s["clean"]["output"])],
+        modules=[df_feature_engineer]
+    ),
+    "correlations": Stage(
+        "correlations", _run_correlations, deps=["features"],
+        inputs=lambda s, store: [_processed(store, s["features"]["output"])],
+        modules=[df_correlation_analysis]
+    ),
+    "vif": Stage(
+        "vif", _run_vif, deps=["features"],
+        inputs=lambda s, store: [_processed(store, s["features"]["output"])],
+        config_keys=[model_training.TRAINING_CONFIG_KEY],
+        modules=[df_multicollinearity_analysis, model_training, score_model]
+    ),
+    "train": Stage(
+        "train", _run_train, deps=["features"],
+        inputs=lambda s, store: [_processed(store, s["features"]["output"])],
+        config_keys=[model_training.TRAINING_CONFIG_KEY, model_training.PARAM_GRIDS_CONFIG_KEY,
+                     df_train_test_split.SPLIT_CONFIG_KEY],
+        modules=[model_training, score_model, df_train_test_split]
+    ),
+    "score": Stage(
+        "score", _run_score, deps=["train"],
+        inputs=lambda s, store: [_processed(store, s["features"]["output"])] + _model_paths(s, store),
+        config_keys=[model_training.TRAINING_CONFIG_KEY, df_train_test_split.SPLIT_CONFIG_KEY],
+        modules=[model_training, score_model, evaluate_model, df_train_test_split]
+    ),
+}
+
+
+def resolve_settings(env: str = "development") -> Dict[str, Dict[str, Any]]:
+    """
+    Stage settings for an environment: DEFAULT_STAGE_SETTINGS overlaid with
+    the pipeline.stages section of configs/<env>.yaml.
+
+    Args:
+        env: Environment name
+
+    Returns:
+        Dict: Settings per stage name
+    """
+    configured = get_config_manager(env).get(f"{PIPELINE_CONFIG_KEY}.stages", {}) or {}
+    return {name: {**defaults, **(configured.get(name) or {})} for name, defaults in DEFAULT_STAGE_SETTINGS.items()}
+
+
+def _stage_key(stage: Stage, settings: Dict[str, Dict[str, Any]], store: DataStore, env: str) -> str:
+    """Hash of the stage's code version, its config and the content of every file it reads."""
+    config = get_config_manager(env)
+    inputs = {}
+    for path in stage.inputs(settings, store):
+        inputs[path.name] = _file_fingerprint(path)["sha256"] if path.exists() else None
+    source = {
+        "stage": stage.name,
+        "code": stage.code_version(),
+        "settings": settings[stage.name],
+        "config": {key: config.get(key) for key in stage.config_keys},
+        "inputs": inputs,
+    }
+    return hashlib.sha256(json.dumps(source, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def _manifest_path(store: DataStore) -> Path:
+    return store.base_path("processed_data") / CACHE_DIRNAME / MANIFEST_FILENAME
+
+
+def _load_manifest(path: Path) -> Dict[str, Any]:
+    try:
+        return json.loads(path.read_text())
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_manifest(path: Path, manifest: Dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(path.suffix + ".tmp")
+    tmp_path.write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    tmp_path.replace(path)
+
+
+def _output_record(path: Path) -> Dict[str, Any]:
+    """Manifest entry of one stage output: its path and content fingerprint."""
+    return {"path": str(path), **_file_fingerprint(path)}
+
+
+def _is_current(entry: Optional[Dict[str, Any]], key: str) -> bool:
+    """
+    A stage can be skipped if it last ran with the same key and its outputs
+    are untouched: same size and mtime, or (when the mtime moved) same sha256.
+    """
+    if not entry or entry.get("key") != key:
+        return False
+    for output in entry.get("outputs", []):
+        path = Path(output["path"])
+        if not path.exists() or "sha256" not in output:
+            return False
+        current = _file_fingerprint(path, with_hash=False)
+        if current["size"] != output["size"]:
+            return False
+        if current["mtime_ns"] != output["mtime_ns"] and _file_fingerprint(path)["sha256"] != output["sha256"]:
+            return False
+    return True
+
+
+def _with_ancestors(names: Sequence[str]) -> List[str]:
+    """The requested stages plus everything upstream, in STAGES (topological) order."""
+    unknown = [n for n in names if n not in STAGES]
+    if unknown:
+        raise ValueError(f"Unknown stages: {unknown}. Must be among {list(STAGES)}.")
+    needed = set()
+    pending = list(names)
+    while pending:
+        name = pending.pop()
+        if name not in needed:
+            needed.add(name)
+            pending.extend(STAGES[name].deps)
+    return [name for name in STAGES if name in needed]
+
+
+def run_pipeline(
+    env: str = "development",
+    stages: Optional[Sequence[str]] = None,
+    force: bool = False,
+    max_workers: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Run the pipeline DAG, skipping stages whose inputs, code and config are unchanged.
+
+    Each stage's key hashes its code version (stage function and module
+    sources), its settings and config sections, and the content of the
+    files it reads, which are its upstream stages' outputs. A stage whose key
+    matches the manifest and whose outputs are byte-for-byte unchanged is skipped.
+    A stage that reruns but writes identical outputs leaves its downstream
+    keys unchanged, so they are skipped too. Stages whose dependencies are done run
+    concurrently on a thread pool (e.g. the VIF and correlation reports next
+    to training).
+
+    Args:
+        env: Environment whose configs/<env>.yaml drives the run
+        stages: Stages to bring up to date, with their upstream stages (all if None)
+        force: Rerun the requested stages (not their upstream stages) even if current
+        max_workers: Concurrent stages (default pipeline.max_workers, else 2)
+
+    Returns:
+        pd.DataFrame: One row per stage with "Stage", "Status" ("ran",
+            "skipped", "failed" or "blocked"), "Key", "Seconds" and "Outputs"
+
+    Raises:
+        ValueError: If an unknown stage is requested
+        RuntimeError: If any stage failed (after the manifest is saved)
+    """
+    store = DataStore(env)
+    settings = resolve_settings(env)
+    requested = list(stages or STAGES)
+    selected = _with_ancestors(requested)
+    max_workers = max_workers or get_config_manager(env).get(f"{PIPELINE_CONFIG_KEY}.max_workers", 2)
+
+    manifest_path = _manifest_path(store)
+    manifest = _load_manifest(manifest_path)
+    report: Dict[str, Dict[str, Any]] = {}
+
+    def execute(name: str) -> Dict[str, Any]:
+        stage = STAGES[name]
+        key = _stage_key(stage, settings, store, env)
+        if not (force and name in requested) and _is_current(manifest.get(name), key):
+            logger.info(f"Stage {name}: up to date, skipped")
+            return {"Status": "skipped", "Key": key, "Seconds": 0.0, "Outputs": manifest[name]["outputs"]}
+        logger.info(f"Stage {name}: running")
+        start = time.perf_counter()
+        with track(f"stage.{name}"):
+            paths = stage.run(settings, store, env)
+        outputs = [_output_record(p) for p in paths]
+        seconds = time.perf_counter() - start
+        logger.info(f"Stage {name}: done in {seconds:.2f}s")
+        return {"Status": "ran", "Key": key, "Seconds": seconds, "Outputs": outputs}
+
+    remaining = list(selected)
+    running: Dict[Future, str] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while remaining or running:
+            for name in list(remaining):
+                statuses = [report.get(dep, {}).get("Status") for dep in STAGES[name].deps if dep in selected]
+                if any(status in ("failed", "blocked") for status in statuses):
+                    report[name] = {"Status": "blocked", "Key": None, "Seconds": 0.0, "Outputs": []}
+                    remaining.remove(name)
+                elif all(status in ("ran", "skipped") for status in statuses):
+                    running[executor.submit(execute, name)] = name
+                    remaining.remove(name)
+            if not running:
+                continue
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name = running.pop(future)
+                try:
+                    report[name] = future.result()
+                    manifest[name] = {"key": report[name]["Key"], "outputs": report[name]["Outputs"]}
+                except Exception as e:
+                    logger.error(f"Stage {name} failed: {e}")
+                    report[name] = {"Status": "failed", "Key": None, "Seconds": 0.0, "Outputs": [], "Error": e}
+                    manifest.pop(name, None)
+            _save_manifest(manifest_path, manifest)
+
+    report_df = pd.DataFrame([
+        {"Stage": name, "Status": report[name]["Status"], "Key": report[name]["Key"],
+         "Seconds": report[name]["Seconds"], "Outputs": [o["path"] for o in report[name]["Outputs"]]}
+        for name in selected
+    ])
+    failed = {name: report[name]["Error"] for name in selected if report[name]["Status"] == "failed"}
+    if failed:
+        raise RuntimeError(f"Pipeline stages failed: {failed}")
+    return report_df
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Run the campaign pipeline DAG.")
+    parser.add_argument("--env", default="development", help="Environment (configs/<env>.yaml)")
+    parser.add_argument("--stages", nargs="*", choices=list(STAGES), help="Stages to bring up to date")
+    parser.add_argument("--force", action="store_true", help="Rerun the requested stages even if current")
+    parser.add_argument("--max-workers", type=int, default=None, help="Concurrent stages")
+    parser.add_argument("--metrics", nargs="*", help="Record timings/memory to these sinks (.jsonl, .csv, otel)")
+    args = parser.parse_args(argv)
+    configure_logging()
+    if args.metrics:
+        enable(args.metrics)
+    try:
+        report = run_pipeline(args.env, args.stages, force=args.force, max_workers=args.max_workers)
+    except RuntimeError as e:
+        logger.error(str(e))
+        return 1
+    print(report[["Stage", "Status", "Seconds"]].to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,269 @@
+import logging
+import warnings
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from src.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+METRICS: List[str] = ["MSE", "RMSE", "MAE", "R2"]
+SEGMENT_COLUMNS: List[str] = ["CHANNEL", "CAMPAIGN_TYPE", "ATL_OR_DR"]
+
+# Inverse of the target transforms used in the feature table (LOG_* = log1p)
+TARGET_TRANSFORMS = {
+    None: lambda values: values,
+    "log1p": np.expm1,
+}
+
+
+def back_transform(values: np.ndarray, target_transform: Optional[str] = None) -> np.ndarray:
+    """
+    Map targets or predictions back to the original scale, e.g. LOG_FREE_TRIALS
+    predictions to FREE_TRIALS with target_transform="log1p".
+
+    Parameters
+    ----------
+    values : np.ndarray
+        Values on the model's scale.
+    target_transform : str, optional
+        None or "log1p". Default is None (no change).
+
+    Returns
+    -------
+    np.ndarray
+        Float values on the original scale.
+    """
+    if target_transform not in TARGET_TRANSFORMS:
+        raise ValueError(f"Unsupported target_transform: {target_transform}. "
+                         f"Must be one of {list(TARGET_TRANSFORMS)}.")
+    return TARGET_TRANSFORMS[target_transform](np.asarray(values, dtype=float))
+
+
+def _metrics_from_sums(
+    count: np.ndarray,
+    sum_sq_error: np.ndarray,
+    sum_abs_error: np.ndarray,
+    sum_y: np.ndarray,
+    sum_y_sq: np.ndarray
+) -> Dict[str, np.ndarray]:
+    """MSE, RMSE, MAE and R2 from per-sample sufficient statistics (any array shape)."""
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mse = sum_sq_error / count
+        total_ss = sum_y_sq - sum_y ** 2 / count
+        r2 = np.where(total_ss > 0, 1.0 - sum_sq_error / total_ss, np.nan)
+        return {"MSE": mse, "RMSE": np.sqrt(mse), "MAE": sum_abs_error / count, "R2": r2}
+
+
+def regression_metrics(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    target_transform: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Compute MSE, RMSE, MAE and R2 in one pass.
+
+    Parameters
+    ----------
+    y_true, y_pred : array-like
+        Observed and predicted values.
+    target_transform : str, optional
+        Back-transform applied to both first (see back_transform).
+
+    Returns
+    -------
+    dict
+        Keys "mse", "rmse", "mae" and "r2", as in the notebooks.
+    """
+    y = back_transform(y_true, target_transform)
+    error = back_transform(y_pred, target_transform) - y
+    metrics = _metrics_from_sums(
+        np.float64(len(y)), np.sum(error ** 2), np.sum(np.abs(error)), np.sum(y), np.sum(y ** 2)
+    )
+    return {name.lower(): float(value) for name, value in metrics.items()}
+
+
+def evaluate_model(
+    y_true: np.ndarray,
+    y_pred: np.ndarray,
+    model_name: str = "Model",
+    target_transform: Optional[str] = None
+) -> Dict[str, float]:
+    """
+    Drop-in replacement for the notebooks' evaluate_model: log and return the metrics.
+
+    The notebook version printed its metrics; this one logs them at INFO
+    through the module logger and returns them. src modules leave logging
+    setup to the application, so call src.instrumentation.configure_logging()
+    (as the notebooks do) to see the log line, or display the returned dict.
+
+    Parameters
+    ----------
+    y_true, y_pred : array-like
+        Observed and predicted values.
+    model_name : str, optional
+        Label for the log line.
+    target_transform : str, optional
+        Back-transform applied to both first (see back_transform).
+
+    Returns
+    -------
+    dict
+        Keys "mse", "rmse", "mae" and "r2".
+    """
+    metrics = regression_metrics(y_true, y_pred, target_transform)
+    logger.info(f"{model_name} Results: MSE: {metrics['mse']:.4f}, RMSE: {metrics['rmse']:.4f}, "
+                f"MAE: {metrics['mae']:.4f}, R2 Score: {metrics['r2']:.4f}")
+    return metrics
+
+
+def _grouped_sums(
+    keys: np.ndarray,
+    n_keys: int,
+    weights: Sequence[Optional[np.ndarray]]
+) -> List[np.ndarray]:
+    """Sum each weight array (None = count) per key with one bincount each."""
+    return [np.bincount(keys, weights=w, minlength=n_keys) for w in weights]
+
+
+@instrument()
+def evaluate_models(
+    y_true: np.ndarray,
+    predictions: Mapping[str, np.ndarray],
+    segments: Optional[pd.DataFrame] = None,
+    segment_columns: Optional[Sequence[str]] = None,
+    n_bootstrap: int = 1000,
+    confidence: float = 0.95,
+    target_transform: Optional[str] = None,
+    random_state: Optional[int] = 42,
+    max_chunk_elements: int = 5_000_000
+) -> pd.DataFrame:
+    """
+    Compare several models overall and per segment, with bootstrap confidence intervals.
+
+    One (n_bootstrap, n_rows) resample-index matrix is drawn (in chunks of
+    resamples) and shared by every model and every segment column. For each
+    resample the metrics follow from five sufficient statistics (count,
+    sum of squared and absolute errors, sum of y and y**2) accumulated per
+    (resample, segment) with bincount, so no Python loop runs over resamples
+    or rows, and groupings are factorized once for all models.
+
+    Parameters
+    ----------
+    y_true : array-like
+        Observed values, on the same scale as the predictions.
+    predictions : mapping of str to array-like
+        Predictions per model name, aligned with y_true.
+    segments : pd.DataFrame, optional
+        Rows aligned with y_true holding the segment columns.
+    segment_columns : sequence of str, optional
+        Columns of `segments` to break metrics down by. Default is
+        CHANNEL, CAMPAIGN_TYPE and ATL_OR_DR (those present).
+    n_bootstrap : int, optional
+        Number of bootstrap resamples; 0 skips the intervals. Default is 1000.
+    confidence : float, optional
+        Confidence level of the percentile intervals. Default is 0.95.
+    target_transform : str, optional
+        Back-transform applied to targets and predictions first, e.g. "log1p"
+        for LOG_FREE_TRIALS models.
+    random_state : int, optional
+        Seed for the resamples. Default is 42.
+    max_chunk_elements : int, optional
+        Upper bound on resamples x rows held in memory at once.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns "Model", "Segment", "Level", "N", "Metric", "Value",
+        "CI Lower" and "CI Upper"; overall rows have Segment and Level "ALL".
+        Pivot on "Model" to compare models side by side.
+    """
+    y = back_transform(y_true, target_transform)
+    n_rows = len(y)
+    models = list(predictions)
+    abs_errors, sq_errors = {}, {}
+    for model in models:
+        pred = back_transform(predictions[model], target_transform)
+        if len(pred) != n_rows:
+            raise ValueError(f"Predictions for {model} have {len(pred)} rows, expected {n_rows}")
+        error = pred - y
+        abs_errors[model], sq_errors[model] = np.abs(error), error ** 2
+
+    # Factorize every grouping once; "ALL" is a single group
+    if segments is not None and segment_columns is None:
+        segment_columns = [c for c in SEGMENT_COLUMNS if c in segments.columns]
+    groupings = [("ALL", np.zeros(n_rows, dtype=np.int64), np.array(["ALL"], dtype=object))]
+    for column in segment_columns or []:
+        codes, levels = pd.factorize(segments[column], sort=True)
+        groupings.append((column, codes.astype(np.int64), np.asarray(levels, dtype=object)))
+
+    # Point estimates: one bincount per statistic per grouping
+    point: Dict[str, Dict[str, Dict[str, np.ndarray]]] = {}
+    counts: Dict[str, np.ndarray] = {}
+    for name, codes, levels in groupings:
+        valid = codes >= 0
+        count, sum_y, sum_y_sq = _grouped_sums(codes[valid], len(levels), [None, y[valid], y[valid] ** 2])
+        counts[name] = count
+        point[name] = {}
+        for model in models:
+            sse, sae = _grouped_sums(codes[valid], len(levels), [sq_errors[model][valid], abs_errors[model][valid]])
+            point[name][model] = _metrics_from_sums(count, sse, sae, sum_y, sum_y_sq)
+
+    # Bootstrap: (resample, group) keys from the shared index matrix
+    boot: Dict[str, Dict[str, Dict[str, List[np.ndarray]]]] = {
+        name: {model: {m: [] for m in METRICS} for model in models} for name, _, _ in groupings
+    }
+    if n_bootstrap > 0:
+        rng = np.random.default_rng(random_state)
+        chunk = max(1, min(n_bootstrap, max_chunk_elements // max(n_rows, 1)))
+        for first in range(0, n_bootstrap, chunk):
+            n_chunk = min(chunk, n_bootstrap - first)
+            index = rng.integers(0, n_rows, size=(n_chunk, n_rows))
+            y_boot = y[index].ravel()
+            model_boot = {
+                model: (sq_errors[model][index].ravel(), abs_errors[model][index].ravel()) for model in models
+            }
+            resample = np.repeat(np.arange(n_chunk), n_rows)
+            for name, codes, levels in groupings:
+                n_levels = len(levels)
+                boot_codes = codes[index].ravel()
+                valid = boot_codes >= 0
+                keys = resample[valid] * n_levels + boot_codes[valid]
+                n_keys = n_chunk * n_levels
+                shape = (n_chunk, n_levels)
+                count, sum_y, sum_y_sq = (
+                    s.reshape(shape) for s in _grouped_sums(keys, n_keys, [None, y_boot[valid], y_boot[valid] ** 2])
+                )
+                for model in models:
+                    sse, sae = (
+                        s.reshape(shape) for s in _grouped_sums(
+                            keys, n_keys, [model_boot[model][0][valid], model_boot[model][1][valid]]
+                        )
+                    )
+                    for metric, values in _metrics_from_sums(count, sse, sae, sum_y, sum_y_sq).items():
+                        boot[name][model][metric].append(values)
+
+    alpha = (1.0 - confidence) / 2.0
+    rows = []
+    for name, _, levels in groupings:
+        for model in models:
+            for metric in METRICS:
+                lower = upper = np.full(len(levels), np.nan)
+                if n_bootstrap > 0:
+                    samples = np.vstack(boot[name][model][metric])
+                    with warnings.catch_warnings():
+                        warnings.simplefilter("ignore", RuntimeWarning)  # segments absent from a resample
+                        lower, upper = np.nanquantile(samples, [alpha, 1.0 - alpha], axis=0)
+                for j, level in enumerate(levels):
+                    rows.append({
+                        "Model": model,
+                        "Segment": name,
+                        "Level": level,
+                        "N": int(counts[name][j]),
+                        "Metric": metric,
+                        "Value": float(point[name][model][metric][j]),
+                        "CI Lower": float(lower[j]),
+                        "CI Upper": float(upper[j]),
+                    })
+    return pd.DataFrame(rows)
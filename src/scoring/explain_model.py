@@ -0,0 +1,432 @@
+from pathlib import Path
+import hashlib
+import json
+import logging
+import pickle
+import pandas as pd
+import numpy as np
+from scipy import sparse as sp
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from joblib import Parallel, delayed, parallel_config
+from sklearn.compose import ColumnTransformer
+from sklearn.metrics import check_scoring
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from threadpoolctl import threadpool_limits
+
+from src.data_preprocessing.df_train_test_split import data_fingerprint
+from src.data_sourcing.import_export_data import CACHE_DIRNAME, DataStore, get_config_manager
+from src.instrumentation import instrument
+from src.modeling.model_training import TRAINING_CONFIG_KEY
+from src.modeling.pipeline import InteractionFeatures
+
+logger = logging.getLogger(__name__)
+
+# Tree models TreeSHAP is used for; XGBoost uses its native implementation
+TREE_MODELS: List[str] = [
+    "XGBRegressor",
+    "RandomForestRegressor",
+    "ExtraTreesRegressor",
+    "GradientBoostingRegressor",
+    "DecisionTreeRegressor",
+]
+
+# Results already computed in this process, keyed like their on-disk cache files
+_EXPLAIN_CACHE: Dict[str, pd.DataFrame] = {}
+
+
+def model_hash(model: Any) -> str:
+    """
+    Hash a fitted model (or Pipeline) by its pickled state.
+
+    Parameters
+    ----------
+    model : Any
+        Fitted estimator or Pipeline.
+
+    Returns
+    -------
+    str
+        A hex digest that changes whenever the fitted state changes.
+    """
+    return hashlib.sha256(pickle.dumps(model, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def _split_pipeline(model: Any) -> Tuple[Optional[Any], Any]:
+    """(fitted transformer or None, final estimator) of a model or Pipeline."""
+    if isinstance(model, Pipeline):
+        transformer = model[:-1] if len(model) > 2 else model[0]
+        return transformer, model[-1]
+    return None, model
+
+
+def _column_transformer_groups(preprocessor: ColumnTransformer) -> np.ndarray:
+    """Original column behind every output column of a fitted ColumnTransformer."""
+    groups = np.empty(len(preprocessor.get_feature_names_out()), dtype=object)
+    for name, transformer, columns in preprocessor.transformers_:
+        if transformer == "drop" or name not in preprocessor.output_indices_:
+            continue
+        output = preprocessor.output_indices_[name]
+        if output.stop == output.start:
+            continue
+        columns = list(preprocessor.feature_names_in_[columns] if np.issubdtype(np.asarray(columns).dtype, np.integer)
+                       else columns)
+        if isinstance(transformer, Pipeline):
+            transformer = transformer[-1]
+        if isinstance(transformer, OneHotEncoder):
+            drop_idx = getattr(transformer, "drop_idx_", None)
+            sizes = [
+                len(categories) - (0 if drop_idx is None or drop_idx[i] is None else 1)
+                for i, categories in enumerate(transformer.categories_)
+            ]
+            groups[output] = np.repeat(np.array(columns, dtype=object), sizes)
+        elif output.stop - output.start == len(columns):
+            groups[output] = columns
+        else:
+            groups[output] = name
+    return groups
+
+
+def feature_groups(transformer: Any, feature_names: Optional[Sequence[str]] = None) -> np.ndarray:
+    """
+    Map every model input column to the original column it was derived from.
+
+    One-hot columns map to their source column (all CHANNEL dummies to
+    "CHANNEL"); InteractionFeatures columns map to "<num>_x_<cat>".
+
+    Parameters
+    ----------
+    transformer : Any
+        Fitted ColumnTransformer, InteractionFeatures or preprocessing Pipeline,
+        or None when the model is fit on raw columns.
+    feature_names : sequence of str, optional
+        Column names used when transformer is None.
+
+    Returns
+    -------
+    np.ndarray
+        One group label per model input column.
+    """
+    if isinstance(transformer, Pipeline):
+        transformer = transformer[-1]
+    if transformer is None:
+        return np.asarray(feature_names, dtype=object)
+    if isinstance(transformer, ColumnTransformer):
+        return _column_transformer_groups(transformer)
+    if isinstance(transformer, InteractionFeatures):
+        base = _column_transformer_groups(transformer.preprocessor_)
+        interactions = [
+            f"{transformer.numerical_features[layout['numerical']]}_x_{column}"
+            for layout, column in zip(
+                transformer.layouts_,
+                list(transformer.categorical_features) * len(transformer.numerical_features)
+            )
+            for _ in range(int((layout["level_to_column"] >= 0).sum()))
+        ]
+        return np.concatenate([base, np.array(interactions, dtype=object)])
+    return np.asarray(transformer.get_feature_names_out(), dtype=object)
+
+
+def _cache_path(kind: str, key: str, cache_dir: Optional[Path], env: str) -> Path:
+    if cache_dir is None:
+        cache_dir = DataStore(env).base_path("models") / CACHE_DIRNAME / "explain"
+    return Path(cache_dir) / f"{kind}_{key}.parquet"
+
+
+def _cache_key(model: Any, X: pd.DataFrame, y: Optional[Any], settings: Dict[str, Any]) -> str:
+    """Key from the model hash, the data fingerprint and the method settings."""
+    parts = {"model": model_hash(model), "X": data_fingerprint(X), **settings}
+    if y is not None:
+        parts["y"] = data_fingerprint(pd.DataFrame({"y": np.asarray(y)}))
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()[:16]
+
+
+def _cached(kind: str, key: str, use_cache: bool, cache_dir: Optional[Path], env: str) -> Optional[pd.DataFrame]:
+    if not use_cache:
+        return None
+    if key in _EXPLAIN_CACHE:
+        return _EXPLAIN_CACHE[key]
+    path = _cache_path(kind, key, cache_dir, env)
+    if path.exists():
+        _EXPLAIN_CACHE[key] = pd.read_parquet(path)
+        logger.info(f"Loaded cached {kind} from: {path}")
+        return _EXPLAIN_CACHE[key]
+    return None
+
+
+def _store(kind: str, key: str, result: pd.DataFrame, use_cache: bool, cache_dir: Optional[Path], env: str) -> None:
+    _EXPLAIN_CACHE[key] = result
+    if not use_cache:
+        return
+    path = _cache_path(kind, key, cache_dir, env)
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        result.to_parquet(path)
+    except (ImportError, OSError, ValueError) as e:
+        logger.warning(f"Could not cache {kind} {path}: {e}")
+
+
+def _permuted_block(Xt: Any, columns: np.ndarray, permutation: np.ndarray) -> Any:
+    """Xt with the given columns row-permuted together; other columns untouched."""
+    if sp.issparse(Xt):
+        mask = np.zeros(Xt.shape[1])
+        mask[columns] = 1.0
+        Xt = sp.csr_matrix(Xt)
+        permuted = (Xt @ sp.diags(1.0 - mask) + Xt[permutation] @ sp.diags(mask)).tocsr()
+        permuted.eliminate_zeros()  # stored zeros would read as values, not missing, in XGBoost
+        return permuted
+    permuted = np.array(Xt, copy=True)
+    permuted[:, columns] = Xt[permutation][:, columns]
+    return permuted
+
+
+def _permutation_scores(
+    estimator: Any,
+    scorer: Any,
+    X: Any,
+    y: np.ndarray,
+    group: Any,
+    n_repeats: int,
+    seed: np.random.SeedSequence,
+    n_threads: int
+) -> np.ndarray:
+    """Scores after n_repeats shuffles of one group (a column block or a raw column)."""
+    rng = np.random.default_rng(seed)
+    scores = np.empty(n_repeats)
+    with threadpool_limits(limits=n_threads):
+        for i in range(n_repeats):
+            permutation = rng.permutation(X.shape[0])
+            if isinstance(X, pd.DataFrame):
+                permuted = X.copy(deep=False)
+                permuted[group] = X[group].to_numpy()[permutation]
+            else:
+                permuted = _permuted_block(X, group, permutation)
+            scores[i] = scorer(estimator, permuted, y)
+    return scores
+
+
+@instrument()
+def permutation_importance(
+    model: Any,
+    X: pd.DataFrame,
+    y: Any,
+    columns: Optional[Sequence[str]] = None,
+    n_repeats: int = 10,
+    scoring: Optional[str] = None,
+    n_jobs: Optional[int] = None,
+    random_state: Optional[int] = 42,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    env: str = "development"
+) -> pd.DataFrame:
+    """
+    Permutation importance per original column, across a worker pool.
+
+    All model inputs derived from one original column are shuffled together,
+    so CHANNEL gets one importance instead of one per dummy. When the model is
+    a Pipeline behind a ColumnTransformer (every output depends on a single
+    input column), X is preprocessed once and only the column blocks are
+    permuted; otherwise the raw column is permuted and the whole model is
+    rerun. Groups run in parallel with one native thread per worker, each
+    from its own seed, so results do not depend on n_jobs. Results are cached
+    by model hash, data fingerprint and settings.
+
+    Parameters
+    ----------
+    model : Any
+        Fitted estimator or Pipeline.
+    X : pd.DataFrame
+        Evaluation features (raw columns for a Pipeline).
+    y : array-like
+        Evaluation target.
+    columns : sequence of str, optional
+        Original columns to evaluate. Default is all groups.
+    n_repeats : int, optional
+        Shuffles per column. Default is 10.
+    scoring : str, optional
+        sklearn scorer name. Default is hyperparameters.training.scoring.
+    n_jobs : int, optional
+        Worker processes. Default is hyperparameters.training.n_jobs.
+    random_state : int, optional
+        Seed. Default is 42.
+    use_cache : bool, optional
+        Whether to reuse results in memory and on disk. Default is True.
+    cache_dir : Path, optional
+        Cache location. Default is the models directory's CACHE_DIRNAME/explain folder.
+    env : str, optional
+        Environment used for config defaults and cache location.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns "Feature", "Importance Mean", "Importance Std" and "Rank",
+        sorted by decreasing importance (drop in score when shuffled).
+
+    Raises
+    ------
+    ValueError
+        If a requested column is not a feature group of the model.
+    """
+    config = get_config_manager(env).get(TRAINING_CONFIG_KEY, {}) or {}
+    scoring = scoring or config.get("scoring", "neg_mean_squared_error")
+    n_jobs = n_jobs if n_jobs is not None else config.get("n_jobs", -1)
+    settings = {"columns": list(columns) if columns else None, "n_repeats": n_repeats,
+                "scoring": scoring, "random_state": random_state}
+
+    key = _cache_key(model, X, y, {"kind": "permutation", **settings})
+    cached = _cached("permutation", key, use_cache, cache_dir, env)
+    if cached is not None:
+        return cached
+
+    transformer, estimator = _split_pipeline(model)
+    y = np.asarray(y)
+    if isinstance(transformer, ColumnTransformer):
+        # Preprocess once; permute the output block of each original column
+        data = transformer.transform(X)
+        labels = feature_groups(transformer)
+        names = list(dict.fromkeys(labels))
+        groups = {name: np.flatnonzero(labels == name) for name in names}
+        target = estimator
+    else:
+        data, target = X, model
+        names = list(X.columns)
+        groups = {name: name for name in names}
+
+    if columns is not None:
+        unknown = [c for c in columns if c not in groups]
+        if unknown:
+            raise ValueError(f"Unknown feature groups: {unknown}. Must be among {names}.")
+        names = list(columns)
+
+    scorer = check_scoring(target, scoring=scoring)
+    baseline = scorer(target, data, y)
+    seeds = np.random.SeedSequence(random_state).spawn(len(names))
+    with parallel_config(backend="loky", inner_max_num_threads=1):
+        scores = Parallel(n_jobs=n_jobs)(
+            delayed(_permutation_scores)(target, scorer, data, y, groups[name], n_repeats, seed, 1)
+            for name, seed in zip(names, seeds)
+        )
+
+    importances = baseline - np.vstack(scores)
+    result = pd.DataFrame({
+        "Feature": names,
+        "Importance Mean": importances.mean(axis=1),
+        "Importance Std": importances.std(axis=1),
+    }).sort_values("Importance Mean", ascending=False, ignore_index=True)
+    result["Rank"] = np.arange(1, len(result) + 1)
+
+    _store("permutation", key, result, use_cache, cache_dir, env)
+    return result
+
+
+def _tree_contributions(estimator: Any, Xt: Any) -> Tuple[np.ndarray, float]:
+    """
+    TreeSHAP values (n_rows, n_features) and expected value of a tree model.
+
+    XGBoost models use the booster's native TreeSHAP (pred_contribs), which
+    needs no extra dependency; other tree models go through shap.TreeExplainer.
+    """
+    if type(estimator).__module__.startswith("xgboost"):
+        import xgboost as xgb
+        matrix = xgb.DMatrix(Xt, missing=np.nan if estimator.missing is None else estimator.missing)
+        contributions = estimator.get_booster().predict(matrix, pred_contribs=True)
+        return contributions[:, :-1], float(contributions[0, -1])
+    try:
+        import shap
+    except ImportError as e:
+        raise ImportError(f"shap is required for TreeSHAP on {type(estimator).__name__} models") from e
+    explainer = shap.TreeExplainer(estimator)
+    values = explainer.shap_values(Xt.toarray() if sp.issparse(Xt) else Xt, check_additivity=False)
+    return np.asarray(values), float(np.ravel(explainer.expected_value)[0])
+
+
+@instrument()
+def shap_values(
+    model: Any,
+    X: pd.DataFrame,
+    grouped: bool = True,
+    use_cache: bool = True,
+    cache_dir: Optional[Path] = None,
+    env: str = "development"
+) -> pd.DataFrame:
+    """
+    TreeSHAP values for a tree model or a Pipeline ending in one.
+
+    SHAP values are additive, so grouped values (one column per original
+    feature) are the sums over each group's one-hot columns. Results are
+    cached by model hash and data fingerprint.
+
+    Parameters
+    ----------
+    model : Any
+        Fitted tree model or Pipeline whose last step is one (see TREE_MODELS).
+    X : pd.DataFrame
+        Rows to explain (raw columns for a Pipeline).
+    grouped : bool, optional
+        Sum per original column (True) or keep one column per model input.
+    use_cache : bool, optional
+        Whether to reuse results in memory and on disk. Default is True.
+    cache_dir : Path, optional
+        Cache location. Default is the models directory's CACHE_DIRNAME/explain folder.
+    env : str, optional
+        Environment used for the cache location.
+
+    Returns
+    -------
+    pd.DataFrame
+        One row per row of X and one column per feature (group), plus
+        "Expected Value"; each row sums to the model's raw prediction.
+
+    Raises
+    ------
+    ValueError
+        If the final estimator is not a supported tree model.
+    """
+    transformer, estimator = _split_pipeline(model)
+    if type(estimator).__name__ not in TREE_MODELS:
+        raise ValueError(f"Unsupported model for TreeSHAP: {type(estimator).__name__}. "
+                         f"Must be one of {TREE_MODELS}.")
+
+    key = _cache_key(model, X, None, {"kind": "shap", "grouped": grouped})
+    cached = _cached("shap", key, use_cache, cache_dir, env)
+    if cached is not None:
+        return cached
+
+    Xt = transformer.transform(X) if transformer is not None else X
+    values, expected = _tree_contributions(estimator, Xt)
+    labels = feature_groups(transformer, list(X.columns))
+    if grouped:
+        names = list(dict.fromkeys(labels))
+        codes = pd.Index(names).get_indexer(labels)
+        # (n_features, n_groups) indicator; one matrix product sums every group
+        indicator = np.zeros((len(codes), len(names)))
+        indicator[np.arange(len(codes)), codes] = 1.0
+        values = values @ indicator
+    else:
+        names = list(transformer.get_feature_names_out()) if transformer is not None else list(X.columns)
+
+    result = pd.DataFrame(values, columns=[str(name) for name in names], index=X.index)
+    result["Expected Value"] = expected
+    _store("shap", key, result, use_cache, cache_dir, env)
+    return result
+
+
+def shap_importance(shap_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Mean absolute SHAP value per feature.
+
+    Parameters
+    ----------
+    shap_df : pd.DataFrame
+        Output of shap_values.
+
+    Returns
+    -------
+    pd.DataFrame
+        Columns "Feature", "Mean Abs SHAP" and "Rank", sorted by decreasing importance.
+    """
+    values = shap_df.drop(columns="Expected Value").abs().mean()
+    result = values.sort_values(ascending=False).rename_axis("Feature").reset_index(name="Mean Abs SHAP")
+    result["Rank"] = np.arange(1, len(result) + 1)
+    return result
@@ -0,0 +1,421 @@
+from datetime import date, datetime
+from pathlib import Path
+import logging
+import math
+import pickle
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Mapping, Optional, Tuple, Union
+
+from sklearn.compose import ColumnTransformer
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder, StandardScaler
+
+from src.data_preprocessing.df_clean import coerce_dtypes, normalize_columns
+from src.data_preprocessing.df_feature_engineer import (
+    CROSS_FEATURES,
+    MONTH_NAMES,
+    MONTH_TO_SEASON,
+    add_cross_features,
+    add_holiday_features,
+    add_month_season_features,
+    get_holiday_calendar,
+)
+from src.data_sourcing.import_export_data import DataStore
+from src.data_sourcing.stream_data import RAW_DATE_FORMAT
+from src.instrumentation import instrument
+
+logger = logging.getLogger(__name__)
+
+# Columns a scoring request provides; every other model input is derived from them
+SCORING_INPUT_COLUMNS: List[str] = ["ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "COST", "REPORT_DATE"]
+# Model inputs build_scoring_features can supply (the inputs plus what it derives)
+SCORING_FEATURE_COLUMNS: List[str] = [
+    "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "HOLIDAY_FLAG", "LAG_3_HOLIDAY_FLAG",
+    "LEAD_3_HOLIDAY_FLAG", "SEASON", "MONTH", "CHANNEL_ATL_OR_DR", "CHANNEL_CAMPAIGN_TYPE",
+    "COST", "LOG_COST"
+]
+
+# Loaded models keyed by (path, mtime), so repeated loads reuse the object
+_MODEL_CACHE: Dict[Tuple[Path, int], Any] = {}
+
+
+def save_model(model: Any, filename: str, env: str = "development") -> Path:
+    """
+    Pickle a fitted model into the configured models directory.
+
+    Parameters
+    ----------
+    model : Any
+        Fitted estimator or Pipeline.
+    filename : str
+        File name, e.g. "xgb_best_model.pkl".
+    env : str, optional
+        Environment whose models directory is used.
+
+    Returns
+    -------
+    Path
+        The written file.
+    """
+    file_path = DataStore(env).base_path("models") / filename
+    file_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_path, "wb") as f:
+        pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+    logger.info(f"Saved model to: {file_path}")
+    return file_path
+
+
+def load_model(filename: Union[str, Path], env: str = "development") -> Any:
+    """
+    Unpickle a model once per process; later calls return the same object
+    unless the file changed on disk.
+
+    Parameters
+    ----------
+    filename : str or Path
+        File name in the models directory, or an absolute path.
+    env : str, optional
+        Environment whose models directory is used.
+
+    Returns
+    -------
+    Any
+        The fitted model.
+
+    Raises
+    ------
+    FileNotFoundError
+        If the model file does not exist.
+    """
+    file_path = Path(filename)
+    if not file_path.is_absolute():
+        file_path = DataStore(env).base_path("models") / file_path
+    if not file_path.exists():
+        raise FileNotFoundError(f"Model not found: {file_path}")
+
+    key = (file_path.resolve(), file_path.stat().st_mtime_ns)
+    model = _MODEL_CACHE.get(key)
+    if model is None:
+        with open(file_path, "rb") as f:
+            model = pickle.load(f)
+        _MODEL_CACHE[key] = model
+        logger.info(f"Loaded model from: {file_path}")
+    return model
+
+
+def build_scoring_features(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Derive the model inputs available at scoring time from raw campaign rows.
+
+    Adds the holiday flags, MONTH/SEASON, the CHANNEL cross features and
+    LOG_COST. Measures that need the outcome (FREE_TRIALS and its ratios) are
+    not derived; models scored here must not depend on them unless the rows
+    already carry them.
+
+    Parameters
+    ----------
+    df : pd.DataFrame
+        Rows with SCORING_INPUT_COLUMNS (any header spelling).
+
+    Returns
+    -------
+    pd.DataFrame
+        The rows with the derived feature columns added.
+    """
+    df = coerce_dtypes(normalize_columns(df))
+    df = add_holiday_features(df)
+    df = add_month_season_features(df)
+    df = add_cross_features(df)
+    return df.assign(LOG_COST=np.log1p(df["COST"].to_numpy(dtype=float)))
+
+
+def _parse_date(value: Any) -> date:
+    """Accept date/datetime/Timestamp objects, ISO strings and the raw m/d/Y format."""
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    if isinstance(value, np.datetime64):
+        return pd.Timestamp(value).date()
+    try:
+        return date.fromisoformat(str(value))
+    except ValueError:
+        return datetime.strptime(str(value), RAW_DATE_FORMAT).date()
+
+
+class ModelScorer:
+    """
+    Serve predictions from a fitted Pipeline([preprocessor, model]).
+
+    On construction the preprocessor is compiled into lookup tables: each
+    scaled numerical column becomes an (index, mean, scale) entry and each
+    one-hot categorical a dict from level to output column (unknown levels
+    map to no column, as with handle_unknown="ignore"). predict_one uses them
+    to fill a preallocated feature vector from a plain dict, with no pandas
+    or sklearn validation on the request path, and calls the trees directly.
+    predict scores whole frames with the same tables, vectorized.
+
+    Pipelines whose preprocessing cannot be compiled (anything other than a
+    ColumnTransformer of StandardScaler / OneHotEncoder / passthrough) are
+    still served, through the pipeline itself.
+
+    Attributes
+    ----------
+    pipeline : Pipeline
+        The fitted pipeline.
+    estimator : BaseEstimator
+        Its final step.
+    input_columns : list of str
+        Original columns the pipeline reads.
+    compiled : bool
+        Whether the lookup-table fast path is available.
+    """
+
+    def __init__(self, model: Union[Pipeline, str, Path], env: str = "development") -> None:
+        """
+        Initialize the scorer.
+
+        Parameters
+        ----------
+        model : Pipeline, str or Path
+            A fitted pipeline, or a model file for load_model.
+        env : str, optional
+            Environment used to resolve model files.
+        """
+        self.pipeline = load_model(model, env) if isinstance(model, (str, Path)) else model
+        self.estimator = self.pipeline[-1]
+        preprocessor = self.pipeline[0] if len(self.pipeline) == 2 else None
+        self.input_columns = [str(c) for c in getattr(self.pipeline, "feature_names_in_", [])]
+        self._holiday_days: Dict[int, np.ndarray] = {}
+        self.compiled = isinstance(preprocessor, ColumnTransformer) and self._compile(preprocessor)
+        self._tree_predictors = self._compile_estimator()
+
+    def _compile(self, preprocessor: ColumnTransformer) -> bool:
+        """Build the numerical and categorical lookup tables; False if unsupported."""
+        numerical: List[Tuple[str, int, float, float]] = []
+        categorical: List[Tuple[str, Dict[Any, int], np.ndarray, np.ndarray]] = []
+
+        for name, transformer, columns in preprocessor.transformers_:
+            if transformer == "drop" or len(columns) == 0:
+                continue
+            start = preprocessor.output_indices_[name].start
+            columns = [preprocessor.feature_names_in_[c] if isinstance(c, (int, np.integer)) else c
+                       for c in columns]
+            if transformer == "passthrough":
+                numerical.extend((col, start + j, 0.0, 1.0) for j, col in enumerate(columns))
+            elif isinstance(transformer, StandardScaler):
+                means = transformer.mean_ if transformer.with_mean else np.zeros(len(columns))
+                scales = transformer.scale_ if transformer.with_std else np.ones(len(columns))
+                numerical.extend(
+                    (col, start + j, float(means[j]), float(scales[j])) for j, col in enumerate(columns)
+                )
+            elif isinstance(transformer, OneHotEncoder) and not getattr(transformer, "_infrequent_enabled", False):
+                drop_idx = transformer.drop_idx_
+                offset = start
+                for i, col in enumerate(columns):
+                    levels = transformer.categories_[i]
+                    dropped = None if drop_idx is None or drop_idx[i] is None else int(drop_idx[i])
+                    level_columns = np.full(len(levels), -1, dtype=np.int64)
+                    kept = [k for k in range(len(levels)) if k != dropped]
+                    level_columns[kept] = np.arange(offset, offset + len(kept))
+                    lookup = {_level_key(level): int(c) for level, c in zip(levels, level_columns) if c >= 0}
+                    categorical.append((col, lookup, np.asarray(levels), level_columns))
+                    offset += len(kept)
+            else:
+                logger.info(f"Cannot compile transformer {name!r} ({type(transformer).__name__}); "
+                            "using the pipeline for scoring")
+                return False
+
+        self._numerical = numerical
+        self._categorical = categorical
+        self._n_features = len(preprocessor.get_feature_names_out())
+        # sklearn emits a sparse matrix when most outputs are zero; XGBoost reads
+        # absent sparse entries as missing, so zeros must become NaN for it
+        self._zeros_missing = bool(getattr(preprocessor, "sparse_output_", False)) and _is_xgboost(self.estimator)
+        return True
+
+    def _compile_estimator(self) -> Optional[List[Any]]:
+        """Low-level trees of a fitted sklearn forest regressor, for direct single-row calls."""
+        if type(self.estimator).__name__ not in ("RandomForestRegressor", "ExtraTreesRegressor"):
+            return None
+        if self.estimator.n_outputs_ != 1:
+            return None
+        return [t.tree_ for t in self.estimator.estimators_]
+
+    def _holiday_flags(self, day: date) -> np.ndarray:
+        """HOLIDAY_FLAG, LAG_3_HOLIDAY_FLAG and LEAD_3_HOLIDAY_FLAG of one date."""
+        table = self._holiday_days.get(day.year)
+        if table is None:
+            table = self._holiday_days[day.year] = get_holiday_calendar(day.year, day.year).to_numpy()
+        return table[day.timetuple().tm_yday - 1]
+
+    def _record_features(self, record: Mapping[str, Any]) -> Dict[str, Any]:
+        """Derive the scoring features of one raw request without pandas."""
+        day = _parse_date(record["REPORT_DATE"])
+        flags = self._holiday_flags(day)
+        features = dict(record)
+        features.update(
+            HOLIDAY_FLAG=bool(flags[0]),
+            LAG_3_HOLIDAY_FLAG=bool(flags[1]),
+            LEAD_3_HOLIDAY_FLAG=bool(flags[2]),
+            MONTH=MONTH_NAMES[day.month - 1],
+            SEASON=MONTH_TO_SEASON[day.month - 1],
+            LOG_COST=math.log1p(float(record["COST"])),
+        )
+        for left, right in CROSS_FEATURES:
+            features[f"{left}_{right}"] = f"{record[left]}_{record[right]}"
+        return features
+
+    def predict_one(self, record: Mapping[str, Any]) -> float:
+        """
+        Predict one campaign row.
+
+        Parameters
+        ----------
+        record : mapping
+            SCORING_INPUT_COLUMNS values, e.g. {"ATL_OR_DR": ..., "CAMPAIGN_TYPE": ...,
+            "CHANNEL": ..., "COST": 1200.0, "REPORT_DATE": "2024-03-01"}. Extra
+            keys supply any other model input directly.
+
+        Returns
+        -------
+        float
+            The prediction.
+
+        Raises
+        ------
+        KeyError
+            If a model input is neither given nor derivable.
+        """
+        features = self._record_features(record)
+        if not self.compiled:
+            frame = pd.DataFrame([{c: features[c] for c in self.input_columns}])
+            return float(self.pipeline.predict(frame)[0])
+
+        x = np.zeros(self._n_features)
+        for col, index, mean, scale in self._numerical:
+            x[index] = (float(features[col]) - mean) / scale
+        for col, lookup, _, _ in self._categorical:
+            index = lookup.get(_level_key(features[col]))
+            if index is not None:
+                x[index] = 1.0
+        return float(self._predict_matrix(x[None, :], single=True)[0])
+
+    def _encode_frame(self, features: pd.DataFrame) -> np.ndarray:
+        """Vectorized version of the predict_one encoding for a whole frame."""
+        x = np.zeros((len(features), self._n_features), dtype=np.float32)
+        for col, index, mean, scale in self._numerical:
+            x[:, index] = (features[col].to_numpy(dtype=float) - mean) / scale
+        rows = np.arange(len(features))
+        for col, _, levels, level_columns in self._categorical:
+            values = features[col]
+            if pd.api.types.is_bool_dtype(values) or levels.dtype == bool:
+                values = values.astype(bool)
+            codes = pd.Index(levels).get_indexer(values)
+            columns = np.where(codes >= 0, level_columns[codes], -1)
+            hit = columns >= 0
+            x[rows[hit], columns[hit]] = 1.0
+        return x
+
+    def _predict_matrix(self, x: np.ndarray, single: bool = False) -> np.ndarray:
+        """Run the final estimator on an encoded matrix."""
+        if self._zeros_missing:
+            x = np.where(x == 0, np.nan, x)
+        if single and self._tree_predictors is not None:
+            # Skips the forest's input validation and joblib dispatch
+            x32 = x.astype(np.float32)
+            total = sum(tree.predict(x32).ravel()[0] for tree in self._tree_predictors)
+            return np.array([total / len(self._tree_predictors)])
+        if _is_xgboost(self.estimator):
+            return self.estimator.get_booster().inplace_predict(x)
+        return self.estimator.predict(x)
+
+    @instrument()
+    def predict(self, df: pd.DataFrame, derive_features: bool = True) -> np.ndarray:
+        """
+        Predict many campaign rows at once.
+
+        Parameters
+        ----------
+        df : pd.DataFrame
+            Raw rows with SCORING_INPUT_COLUMNS, or model-ready features when
+            derive_features is False.
+        derive_features : bool, optional
+            Whether to run build_scoring_features first. Default is True.
+
+        Returns
+        -------
+        np.ndarray
+            One prediction per row.
+        """
+        features = build_scoring_features(df) if derive_features else df
+        if not self.compiled:
+            return self.pipeline.predict(features[self.input_columns])
+        return self._predict_matrix(self._encode_frame(features))
+
+    @instrument()
+    def score_file(
+        self,
+        filename: str,
+        data_type: str = "raw_data",
+        output: Optional[str] = None,
+        output_type: str = "processed_data",
+        chunksize: int = 500_000,
+        prediction_column: str = "PREDICTED_FREE_TRIALS",
+        env: str = "development"
+    ) -> pd.DataFrame:
+        """
+        Score every row of a CSV or Parquet file.
+
+        CSV files are streamed in chunks (see stream_data.iter_raw_chunks);
+        Parquet/Feather files are read in one columnar pass.
+
+        Parameters
+        ----------
+        filename : str
+            Input file in the data_type directory.
+        data_type : str, optional
+            Directory of the input file. Default is "raw_data".
+        output : str, optional
+            If given, the scored rows are also saved under this file name.
+        output_type : str, optional
+            Directory for the output file. Default is "processed_data".
+        chunksize : int, optional
+            Rows per CSV chunk. Default is 500,000.
+        prediction_column : str, optional
+            Name of the prediction column. Default is "PREDICTED_FREE_TRIALS".
+        env : str, optional
+            Environment used to resolve paths.
+
+        Returns
+        -------
+        pd.DataFrame
+            The input columns plus the prediction column.
+        """
+        from src.data_sourcing.stream_data import concat_chunks, iter_raw_chunks
+
+        store = DataStore(env)
+        if filename.endswith(".csv"):
+            chunks = iter_raw_chunks(filename, data_type=data_type, chunksize=chunksize, store=store)
+        else:
+            chunks = [store.load(filename, data_type=data_type)]
+
+        scored = []
+        for chunk in chunks:
+            chunk = normalize_columns(chunk)
+            scored.append(chunk.assign(**{prediction_column: self.predict(chunk)}))
+        result = concat_chunks(scored)
+
+        if output is not None:
+            store.save(result, output, data_type=output_type)
+        return result
+
+
+def _is_xgboost(estimator: Any) -> bool:
+    return type(estimator).__module__.startswith("xgboost")
+
+
+def _level_key(value: Any) -> Any:
+    """Normalize numpy scalars so lookups match plain Python request values."""
+    return value.item() if isinstance(value, np.generic) else value
@@ -0,0 +1,64 @@
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+# Make `src` importable when pytest is run from any directory
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch):
+    """A throwaway project root with configs/test.yaml and empty config/data-store caches."""
+    from src.data_sourcing import import_export_data
+
+    (tmp_path / "configs").mkdir()
+    config = {
+        "paths": {"raw_data": "data/raw", "processed_data": "data/processed", "models": "artifacts/models"},
+        "training": {"n_jobs": 0, "grid": {}, "enabled": False, "name": ""},
+    }
+    (tmp_path / "configs" / "test.yaml").write_text(yaml.safe_dump(config))
+    monkeypatch.setattr(import_export_data, "_PROJECT_ROOT", tmp_path)
+    monkeypatch.setattr(import_export_data, "_CONFIG_CACHE", {})
+    monkeypatch.setattr(import_export_data, "_CONFIG_MANAGERS", {})
+    monkeypatch.setattr(import_export_data, "_DATA_STORES", {})
+    return tmp_path
+
+
+@pytest.fixture
+def campaign_features():
+    """A small log_data_fe-style feature table with a known cost -> free-trial response."""
+    import numpy as np
+    import pandas as pd
+
+    rng = np.random.default_rng(12)
+    n = 400
+    channel = rng.choice(["tv", "app", "radio", "search"], size=n)
+    atl_or_dr = np.where(np.isin(channel, ["tv", "radio"]), "ATL", "DR")
+    campaign_type = rng.choice(["Brand", "Title"], size=n)
+    dates = pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D")
+    month = dates.month_name()
+    season = np.array(["Winter", "Spring", "Summer", "Fall"])[(dates.month.to_numpy() % 12) // 3]
+    cost = rng.gamma(2.0, 200.0, size=n)
+    level = pd.Series(channel).map({"tv": 1.0, "app": 0.5, "radio": 0.0, "search": 0.8}).to_numpy()
+    trials = np.expm1(level + 0.6 * np.log1p(cost) + rng.normal(0, 0.3, size=n))
+    return pd.DataFrame({
+        "REPORT_DATE": dates,
+        "ATL_OR_DR": atl_or_dr,
+        "CAMPAIGN_TYPE": campaign_type,
+        "CHANNEL": channel,
+        "COST": cost,
+        "FREE_TRIALS": trials,
+        "HOLIDAY_FLAG": rng.random(n) < 0.05,
+        "LAG_3_HOLIDAY_FLAG": rng.random(n) < 0.1,
+        "LEAD_3_HOLIDAY_FLAG": rng.random(n) < 0.1,
+        "SEASON": season,
+        "MONTH": month,
+        "CHANNEL_ATL_OR_DR": pd.Series(channel) + "_" + atl_or_dr,
+        "CHANNEL_CAMPAIGN_TYPE": pd.Series(channel) + "_" + campaign_type,
+        "COST_PER_FREE_TRIALS": cost / trials,
+        "LOG_COST": np.log1p(cost),
+        "LOG_FREE_TRIALS": np.log1p(trials),
+        "LOG_COST_PER_FREE_TRIALS": np.log1p(cost / trials),
+    })
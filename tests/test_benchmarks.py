@@ -0,0 +1,60 @@
+import logging
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks import run_benchmarks as rb
+
+
+def _results(seconds_scale=1.0):
+    rows = np.array([1_000, 10_000, 100_000] * 2)
+    return pd.DataFrame({
+        "Case": ["vif"] * 3 + ["anova"] * 3,
+        "Rows": rows,
+        "Channels": 5,
+        "Columns": 20,
+        "Seconds": np.r_[rows[:3] ** 2 * 1e-9, rows[3:] * 1e-6] * seconds_scale,
+        "Peak MiB": np.r_[rows[:3] * 1e-3, np.full(3, 4.0)],
+    })
+
+
+def test_scaling_exponents():
+    exponents = rb.scaling_exponents(_results()).set_index("Case")
+    assert exponents.loc["vif", "Time Exponent"] == pytest.approx(2.0)
+    assert exponents.loc["anova", "Time Exponent"] == pytest.approx(1.0)
+    assert exponents.loc["anova", "Memory Exponent"] == pytest.approx(0.0, abs=1e-9)
+
+
+def test_regressions_are_flagged_against_the_baseline(tmp_path, caplog):
+    path = rb.save_baseline(_results(), tmp_path / "baselines.json")
+    slower = _results(seconds_scale=2.0)
+    with caplog.at_level(logging.WARNING):
+        compared = rb.compare_to_baseline(slower, path)
+    assert not caplog.records
+    # Doubling is a regression only where the slowdown exceeds min_seconds
+    expected = (slower["Seconds"] - _results()["Seconds"]) > 0.005
+    assert compared["Regression"].tolist() == expected.tolist()
+    assert not rb.compare_to_baseline(_results(), path)["Regression"].any()
+
+
+def test_missing_or_foreign_baselines_warn(tmp_path, caplog, monkeypatch):
+    with caplog.at_level(logging.WARNING):
+        compared = rb.compare_to_baseline(_results(), tmp_path / "missing.json")
+    assert "No baseline" in caplog.text
+    assert compared["Baseline Seconds"].isna().all() and not compared["Regression"].any()
+
+    path = rb.save_baseline(_results().iloc[:3], tmp_path / "baselines.json")
+    current = rb.machine_details()
+    monkeypatch.setattr(rb, "machine_details", lambda: {**current, "cpu_count": -1})
+    caplog.clear()
+    with caplog.at_level(logging.WARNING):
+        rb.compare_to_baseline(_results(), path)
+    assert "different setup" in caplog.text
+    assert "3 of 6 grid points have no baseline entry" in caplog.text
+
+
+def test_fast_paths_agree_with_references():
+    checks = rb.check_correctness(rows=600, channels=5)
+    assert len(checks) > 0
+    assert checks["Correct"].all(), checks
@@ -0,0 +1,152 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.optimize import minimize
+from sklearn.compose import ColumnTransformer
+from sklearn.linear_model import LinearRegression
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+
+from src.modeling.budget_allocation import (
+    allocate_budget,
+    evaluate_scenarios,
+    fit_response_curves,
+    marginal_response,
+    multiplier_grid,
+    response,
+    response_curves_from_model,
+)
+
+
+@pytest.fixture
+def curves(campaign_features):
+    return fit_response_curves(campaign_features, segment_columns=["CHANNEL"], period_column="SEASON")
+
+
+def test_curves_match_per_segment_regressions(campaign_features):
+    curves = fit_response_curves(campaign_features, segment_columns=["CHANNEL"], period_column=None, shrinkage=0)
+    for _, cell in curves.iterrows():
+        rows = campaign_features[campaign_features["CHANNEL"] == cell["CHANNEL"]]
+        slope = np.polyfit(np.log1p(rows["COST"]), np.log1p(rows["FREE_TRIALS"]), 1)[0]
+        assert cell["Elasticity"] == pytest.approx(slope)
+        assert cell["Units"] == len(rows)
+    # Each curve passes through its cell's observed totals
+    np.testing.assert_allclose(curves["Expected Free Trials"], curves["Free Trials"])
+
+
+def test_shrinkage_pulls_elasticities_together(campaign_features):
+    own = fit_response_curves(campaign_features, ["CHANNEL"], None, shrinkage=0)["Elasticity"]
+    shrunk = fit_response_curves(campaign_features, ["CHANNEL"], None, shrinkage=1_000)["Elasticity"]
+    assert shrunk.std() < own.std()
+
+
+def test_marginal_response_is_the_derivative(curves):
+    spend = curves["Current Spend"].to_numpy()
+    h = 1e-3
+    numeric = (response(curves, spend + h) - response(curves, spend - h)) / (2 * h)
+    np.testing.assert_allclose(marginal_response(curves, spend), numeric, rtol=1e-5)
+
+
+def test_convex_solution_matches_a_generic_optimizer(curves):
+    budget = curves["Current Spend"].sum()
+    upper = 1.5 * curves["Current Spend"].to_numpy()
+    allocation = allocate_budget(curves, budget, max_spend=upper)
+    spend = allocation["Optimal Spend"].to_numpy()
+    assert spend.sum() == pytest.approx(budget)
+    assert np.all(spend <= upper * (1 + 1e-9))
+
+    reference = minimize(
+        lambda s: -response(curves, s).sum() / 1e4, curves["Current Spend"].to_numpy(),
+        bounds=list(zip(np.zeros(len(curves)), upper)),
+        constraints=[{"type": "eq", "fun": lambda s: (s.sum() - budget) / budget}],
+        method="SLSQP", options={"maxiter": 500, "ftol": 1e-12},
+    )
+    assert allocation["Optimal Free Trials"].sum() >= -reference.fun * 1e4 * (1 - 1e-6)
+    assert allocation["Optimal Free Trials"].sum() > allocation["Expected Free Trials"].sum()
+
+    # KKT: cells strictly inside their bounds share one marginal return
+    interior = (spend > 1e-6) & (spend < upper * (1 - 1e-6))
+    marginal = allocation.loc[interior, "Marginal Return"]
+    assert marginal.max() == pytest.approx(marginal.min(), rel=1e-4)
+
+
+def _greedy_reference(curves, budget, step, upper):
+    counts = np.zeros(len(curves), dtype=int)
+    capacity = np.floor(upper / step + 1e-9).astype(int)
+    for _ in range(int(np.floor(budget / step + 1e-9))):
+        gains = response(curves, (counts + 1) * step) - response(curves, counts * step)
+        gains[counts >= capacity] = -np.inf
+        if not np.isfinite(gains).any():
+            break
+        counts[np.argmax(gains)] += 1
+    return counts * step
+
+
+def test_greedy_matches_step_by_step_greedy(curves):
+    budget = curves["Current Spend"].sum()
+    step = budget / 300
+    upper = 2 * curves["Current Spend"].to_numpy()
+    greedy = allocate_budget(curves, budget, method="greedy", step=step, max_spend=upper)
+    np.testing.assert_allclose(greedy["Optimal Spend"], _greedy_reference(curves, budget, step, upper))
+
+    convex = allocate_budget(curves, budget, max_spend=upper)
+    assert greedy["Optimal Free Trials"].sum() == pytest.approx(convex["Optimal Free Trials"].sum(), rel=1e-3)
+
+
+def test_bounds_are_respected_and_validated(curves):
+    n = len(curves)
+    budget = curves["Current Spend"].sum()
+    floor = np.full(n, budget / (2 * n))
+    for method in ["convex", "greedy"]:
+        allocation = allocate_budget(curves, budget, method=method, min_spend=floor)
+        assert np.all(allocation["Optimal Spend"] >= floor - 1e-9)
+
+    capped = allocate_budget(curves, budget, max_spend=budget / (2 * n))
+    np.testing.assert_allclose(capped["Optimal Spend"], budget / (2 * n))
+
+    with pytest.raises(ValueError, match="exceed the budget"):
+        allocate_budget(curves, budget, min_spend=budget)
+    with pytest.raises(ValueError, match="Spend bounds"):
+        allocate_budget(curves, budget, min_spend=2.0, max_spend=1.0)
+    with pytest.raises(ValueError, match="Unsupported method"):
+        allocate_budget(curves, budget, method="genetic")
+
+
+def test_scenarios_match_direct_evaluation(curves):
+    grid = multiplier_grid([0.5, 1.0, 2.0], curves["CHANNEL"].nunique())
+    assert grid.shape == (3 ** 4, 4)
+    scenarios = evaluate_scenarios(curves, grid, by="CHANNEL", max_chunk_elements=50)
+
+    levels = sorted(curves["CHANNEL"].unique())
+    for i in [0, 17, 80]:
+        factor = curves["CHANNEL"].map(dict(zip(levels, grid[i]))).to_numpy()
+        spend = curves["Current Spend"].to_numpy() * factor
+        assert scenarios["Expected Free Trials"].iloc[i] == pytest.approx(response(curves, spend).sum())
+        assert scenarios["Total Spend"].iloc[i] == pytest.approx(spend.sum())
+    assert list(scenarios.columns[:4]) == levels
+
+    with pytest.raises(ValueError, match="expected 4"):
+        evaluate_scenarios(curves, np.ones((2, 3)), by="CHANNEL")
+
+
+def _log_linear_model(campaign_features, columns):
+    encoder = ColumnTransformer([("cat", OneHotEncoder(), ["CHANNEL"])], remainder="passthrough")
+    model = Pipeline([("features", encoder), ("model", LinearRegression())])
+    return model.fit(campaign_features[columns], campaign_features["LOG_FREE_TRIALS"])
+
+
+def test_model_curves_recover_the_model_elasticity(campaign_features):
+    model = _log_linear_model(campaign_features, ["CHANNEL", "LOG_COST"])
+    curves = response_curves_from_model(model, campaign_features[["CHANNEL", "SEASON", "LOG_COST", "COST"]],
+                                        segment_columns=["CHANNEL"], period_column="SEASON")
+    slope = model.named_steps["model"].coef_[-1]
+    np.testing.assert_allclose(curves["Elasticity"], slope)
+    assert "Free Trials" not in curves.columns
+
+
+def test_model_curves_reject_target_derived_inputs(campaign_features):
+    model = _log_linear_model(campaign_features, ["CHANNEL", "LOG_COST", "COST_PER_FREE_TRIALS"])
+    with pytest.raises(ValueError, match="derived from FREE_TRIALS"):
+        response_curves_from_model(model, campaign_features, segment_columns=["CHANNEL"])
+    with pytest.raises(ValueError, match="Unsupported target_transform"):
+        response_curves_from_model(model, campaign_features, target_transform="log")
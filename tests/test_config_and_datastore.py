@@ -0,0 +1,79 @@
+import os
+
+import pandas as pd
+import pytest
+import yaml
+
+from src.data_sourcing import import_export_data
+from src.data_sourcing.import_export_data import (
+    ConfigManager, DataStore, get_config_manager, get_data, save_data
+)
+
+
+def _rewrite_config(project, config):
+    path = project / "configs" / "test.yaml"
+    mtime_ns = path.stat().st_mtime_ns
+    path.write_text(yaml.safe_dump(config))
+    os.utime(path, ns=(mtime_ns + 10**9, mtime_ns + 10**9))
+
+
+def test_get_returns_falsy_values_and_defaults_for_missing_keys(project):
+    config = ConfigManager("test")
+    assert config.get("training.n_jobs") == 0
+    assert config.get("training.grid") == {}
+    assert config.get("training.enabled") is False
+    assert config.get("training.name") == ""
+    assert config.get("training.missing", "fallback") == "fallback"
+    assert config.get("training.n_jobs.deeper", "fallback") == "fallback"
+    assert config.get("nothing.here") is None
+
+
+def test_yaml_is_parsed_once_and_reloaded_after_edit(project):
+    first = get_config_manager("test")
+    assert get_config_manager("test") is first
+    assert ConfigManager("test").config is first.config
+
+    _rewrite_config(project, {"paths": {"raw_data": "elsewhere"}})
+    assert get_config_manager("test").get("paths.raw_data") == "elsewhere"
+    assert not first.refresh()
+
+
+def test_missing_environment_raises(project):
+    with pytest.raises(FileNotFoundError):
+        ConfigManager("production")
+
+
+def test_data_store_round_trip(project):
+    store = DataStore("test")
+    df = pd.DataFrame({"CHANNEL": pd.Categorical(["tv", "radio"]), "COST": [1.5, 2.5]})
+    path = store.save(df, "frame.parquet")
+    assert path == project / "data" / "processed" / "frame.parquet"
+    pd.testing.assert_frame_equal(store.load("frame.parquet", data_type="processed_data"), df)
+
+
+def test_get_data_and_save_data_share_a_store(project):
+    df = pd.DataFrame({"COST": [1.0, 2.0, 3.0]})
+    save_data(df, "frame.csv", env="test")
+    loaded = get_data("frame.csv", data_type="processed_data", env="test", filters=[("COST", ">", 1.5)])
+    assert loaded["COST"].tolist() == [2.0, 3.0]
+    assert list(import_export_data._DATA_STORES) == ["test"]
+
+
+def test_data_store_errors(project):
+    store = DataStore("test")
+    with pytest.raises(KeyError, match="paths.scores"):
+        store.base_path("scores")
+    with pytest.raises(FileNotFoundError):
+        store.load("missing.csv")
+    with pytest.raises(ValueError):
+        store.save([1, 2, 3], "frame.csv")
+    with pytest.raises(ValueError):
+        store.save(pd.DataFrame({"a": [1]}), "  ")
+
+
+def test_data_store_refresh_picks_up_new_paths(project):
+    store = DataStore("test")
+    assert store.base_path("raw_data") == project / "data" / "raw"
+    _rewrite_config(project, {"paths": {"raw_data": "moved"}})
+    store.refresh()
+    assert store.base_path("raw_data") == project / "moved"
@@ -0,0 +1,92 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing.df_clean import (
+    CAMPAIGN_SCHEMA, clean_data, coerce_dtypes, filter_outliers, normalize_columns, validate_schema
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+@pytest.fixture
+def raw_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "﻿REPORT_DATE": ["6/9/2023", "8/29/2023", "8/29/2023", "bad date", "1/2/2024", "1/3/2024"],
+        "ATL_OR_DR": ["DR", "DR", "DR", "ATL", "ATL", "DR"],
+        "CAMPAIGN_TYPE ": ["Title", "Title", "Title", "Brand", "Brand", "Promo"],
+        "CHANNEL": ["app", "tv", "tv", "tv", "radio", "app"],
+        "COST": ["10.5", "20", "20", "5", "-1", "7"],
+        "FREE TRIALS": [1.0, 2.0, 2.0, 3.0, 4.0, np.nan],
+    })
+
+
+def test_clean_data_drops_invalid_and_duplicate_rows(raw_frame):
+    cleaned, report = clean_data(raw_frame, outlier_columns=None)
+    # Rows 3 (bad date), 4 (negative cost) and 5 (missing trials) are invalid; row 2 duplicates row 1
+    assert len(cleaned) == 2
+    assert cleaned["COST"].tolist() == [10.5, 20.0]
+    validate_schema(cleaned)
+
+    steps = report.set_index("Step")
+    assert steps.loc["drop_invalid_rows", "Rows Dropped"] == 3
+    assert steps.loc["drop_duplicates", "Rows Dropped"] == 1
+    assert (report["Rows In"] - report["Rows Out"] == report["Rows Dropped"]).all()
+    assert "filter_outliers" not in set(report["Step"])
+
+
+def test_coerce_dtypes_follows_the_schema(raw_frame):
+    coerced = coerce_dtypes(normalize_columns(raw_frame))
+    assert pd.api.types.is_datetime64_any_dtype(coerced["REPORT_DATE"])
+    assert pd.isna(coerced.loc[3, "REPORT_DATE"])
+    assert isinstance(coerced["CHANNEL"].dtype, pd.CategoricalDtype)
+    assert coerced["COST"].dtype == float
+
+
+def test_validate_schema_lists_every_violation():
+    df = pd.DataFrame({
+        "REPORT_DATE": pd.to_datetime(["2023-01-01", None]),
+        "ATL_OR_DR": ["DR", "ATL"],
+        "CAMPAIGN_TYPE": pd.Categorical(["a", "b"]),
+        "CHANNEL": pd.Categorical(["tv", "app"]),
+        "COST": [1.0, -2.0],
+        "FREE_TRIALS": [1.0, 2.0],
+    })
+    with pytest.raises(ValueError) as excinfo:
+        validate_schema(df)
+    message = str(excinfo.value)
+    assert "REPORT_DATE: 1 null values" in message
+    assert "ATL_OR_DR: expected category" in message
+    assert "COST: 1 values below 0" in message
+
+
+def test_missing_columns_fail_fast(raw_frame):
+    with pytest.raises(ValueError, match="missing columns \\['CHANNEL'\\]"):
+        clean_data(raw_frame.drop(columns="CHANNEL"))
+
+
+def test_filter_outliers_iqr_matches_reference():
+    rng = np.random.default_rng(7)
+    df = pd.DataFrame({"COST": rng.lognormal(3, 1, size=1000), "FREE_TRIALS": rng.lognormal(2, 1, size=1000)})
+    df.loc[0, "COST"] = 1e9
+    kept = filter_outliers(df, log_scale=True)
+
+    logged = np.log1p(df)
+    q1, q3 = logged.quantile(0.25), logged.quantile(0.75)
+    inside = ((logged >= q1 - 1.5 * (q3 - q1)) & (logged <= q3 + 1.5 * (q3 - q1))).all(axis=1)
+    assert kept.index.equals(df.index[inside])
+    assert 0 not in kept.index
+
+    with pytest.raises(ValueError, match="Unsupported method"):
+        filter_outliers(df, method="zscore")
+
+
+@pytest.mark.skipif(not (DATA_DIR / "raw" / "data.csv").exists(), reason="raw extract not available")
+def test_reproduces_filtered_data_fe_row_count():
+    raw = pd.read_csv(DATA_DIR / "raw" / "data.csv", encoding="utf-8-sig")
+    cleaned, _ = clean_data(raw)
+    reference = pd.read_csv(DATA_DIR / "processed" / "filtered_data_fe.csv")
+    assert len(cleaned) == len(reference)
+    assert set(CAMPAIGN_SCHEMA) <= set(cleaned.columns)
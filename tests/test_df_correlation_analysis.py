@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy.stats import pearsonr, spearmanr
+
+from src.data_analysis.df_correlation_analysis import compute_correlations
+
+
+@pytest.fixture
+def numeric_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=200)
+    df = pd.DataFrame({
+        "x": x,
+        "y": 0.6 * x + rng.normal(size=200),
+        "z": rng.exponential(size=200),
+        "ties": rng.integers(0, 4, size=200).astype(float),
+    })
+    df.loc[[3, 17, 50], "y"] = np.nan
+    df.loc[[8, 90], "z"] = np.nan
+    return df
+
+
+def _by_pair(results: pd.DataFrame) -> pd.DataFrame:
+    return results.set_index(["Variable 1", "Variable 2"]).sort_index()
+
+
+def test_matrix_engine_matches_pairwise_pearson(numeric_frame):
+    fast = _by_pair(compute_correlations(numeric_frame))
+    reference = _by_pair(compute_correlations(numeric_frame, engine="pairwise"))
+    np.testing.assert_allclose(fast["Correlation"], reference["Correlation"], rtol=1e-10)
+    np.testing.assert_allclose(fast["p-value"], reference["p-value"], rtol=1e-8)
+    assert (fast["Method"] == "pearson").all()
+
+
+def test_matrix_engine_matches_scipy_with_missing_values(numeric_frame):
+    results = _by_pair(compute_correlations(numeric_frame, sort_results=False))
+    common = numeric_frame[["y", "z"]].dropna()
+    r, p = pearsonr(common["y"], common["z"])
+    assert results.loc[("y", "z"), "Correlation"] == pytest.approx(r, rel=1e-10)
+    assert results.loc[("y", "z"), "p-value"] == pytest.approx(p, rel=1e-8)
+
+
+def test_spearman_with_categorical_matches_pairwise(numeric_frame):
+    df = numeric_frame.assign(group=np.where(numeric_frame["x"] > 0, "a", "b"))
+    fast = _by_pair(compute_correlations(df, include_categorical=True, cat_cols=["group"]))
+    reference = _by_pair(compute_correlations(df, include_categorical=True, cat_cols=["group"], engine="pairwise"))
+    np.testing.assert_allclose(fast["Correlation"], reference["Correlation"], rtol=1e-10, atol=1e-12)
+    assert (fast["Method"] == "spearman").all()
+    common = df[["x", "y"]].dropna()
+    assert fast.loc[("x", "y"), "Correlation"] == pytest.approx(spearmanr(common["x"], common["y"])[0], rel=1e-10)
+
+
+def test_results_are_sorted_by_p_value(numeric_frame):
+    p_values = compute_correlations(numeric_frame)["p-value"].to_numpy()
+    assert np.all(np.diff(p_values) >= 0)
+
+
+def test_too_few_shared_observations_reported_as_error():
+    df = pd.DataFrame({"a": [1.0, np.nan, 3.0, np.nan], "b": [np.nan, 2.0, np.nan, 4.0]})
+    row = compute_correlations(df).iloc[0]
+    assert np.isnan(row["Correlation"])
+    assert row["Error"] is not None
+
+
+def test_errors():
+    with pytest.raises(ValueError, match="Not enough numeric columns"):
+        compute_correlations(pd.DataFrame({"a": [1.0, 2.0, 3.0]}))
+    with pytest.raises(ValueError, match="Unsupported engine"):
+        compute_correlations(pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [3.0, 1.0, 2.0]}), engine="loop")
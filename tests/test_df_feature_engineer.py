@@ -0,0 +1,90 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing.df_clean import clean_data
+from src.data_preprocessing.df_feature_engineer import (
+    LOG_DATA_FE_COLUMNS, add_cross_features, add_group_aggregate_features,
+    add_month_season_features, add_normalized_by_month_features, engineer_features
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+HOLIDAY_COLUMNS = ["HOLIDAY_FLAG", "LAG_3_HOLIDAY_FLAG", "LEAD_3_HOLIDAY_FLAG"]
+
+
+@pytest.fixture
+def campaigns() -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    n = 600
+    return pd.DataFrame({
+        "REPORT_DATE": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 365, size=n), unit="D"),
+        "ATL_OR_DR": pd.Categorical(rng.choice(["ATL", "DR"], size=n)),
+        "CAMPAIGN_TYPE": pd.Categorical(rng.choice(["Brand", "Title", "Promo"], size=n)),
+        "CHANNEL": pd.Categorical(rng.choice(["tv", "app", "radio", "search"], size=n)),
+        "COST": rng.gamma(2.0, 100.0, size=n),
+        "FREE_TRIALS": rng.gamma(2.0, 20.0, size=n),
+    })
+
+
+def test_month_and_season(campaigns):
+    df = add_month_season_features(campaigns)
+    months = campaigns["REPORT_DATE"].dt.month_name()
+    assert (df["MONTH"].astype(str) == months).all()
+    assert df["MONTH"].cat.ordered and df["SEASON"].cat.ordered
+    assert set(df.loc[months == "December", "SEASON"]) == {"Winter"}
+    assert set(df.loc[months == "July", "SEASON"]) == {"Summer"}
+
+
+def test_cross_features_match_string_concatenation(campaigns):
+    df = add_cross_features(campaigns)
+    expected = campaigns["CHANNEL"].astype(str) + "_" + campaigns["ATL_OR_DR"].astype(str)
+    assert (df["CHANNEL_ATL_OR_DR"].astype(str) == expected).all()
+    assert isinstance(df["CHANNEL_CAMPAIGN_TYPE"].dtype, pd.CategoricalDtype)
+
+
+def test_group_aggregates_match_groupby_transform(campaigns):
+    df = engineer_features(campaigns, include_aggregates=True)
+    for category in ["CHANNEL", "ATL_OR_DR", "CAMPAIGN_TYPE"]:
+        grouped = df.groupby([category, "MONTH"], observed=True)
+        for numerical in ["FREE_TRIALS", "COST_PER_FREE_TRIALS", "COST"]:
+            avg = grouped[numerical].transform("mean")
+            np.testing.assert_allclose(df[f"AVG_{numerical}_BY_{category}_MONTH"], avg, rtol=1e-12)
+            np.testing.assert_allclose(
+                df[f"MEDIAN_{numerical}_BY_{category}_MONTH"], grouped[numerical].transform("median"), rtol=1e-12
+            )
+            np.testing.assert_allclose(
+                df[f"{numerical}_OVER_AVG_{numerical}_BY_{category}_MONTH"], df[numerical] / avg, rtol=1e-12
+            )
+    month_mean = df.groupby("MONTH", observed=True)["COST_BY_FREE_TRIALS"].transform("mean")
+    np.testing.assert_allclose(df["NORMALIZE_COST_BY_FREE_TRIALS_BY_MONTH"], df["COST_BY_FREE_TRIALS"] / month_mean)
+
+
+def test_aggregate_options_control_the_output_columns(campaigns):
+    df = add_month_season_features(campaigns)
+    slim = add_group_aggregate_features(df, categories=["CHANNEL"], numericals=["COST"],
+                                        include_median=False, include_ratio=False)
+    assert list(slim.columns[len(df.columns):]) == ["AVG_COST_BY_CHANNEL_MONTH"]
+    normalized = add_normalized_by_month_features(df, numericals=["COST"])
+    assert list(normalized.columns[len(df.columns):]) == ["NORMALIZE_COST_BY_MONTH"]
+
+
+def test_ratio_and_log_features(campaigns):
+    df = engineer_features(campaigns)
+    np.testing.assert_allclose(df["COST_PER_FREE_TRIALS"], campaigns["COST"] / campaigns["FREE_TRIALS"])
+    np.testing.assert_allclose(df["LOG_COST_BY_FREE_TRIALS"], np.log1p(campaigns["COST"] * campaigns["FREE_TRIALS"]))
+
+
+@pytest.mark.skipif(not (DATA_DIR / "raw" / "data.csv").exists(), reason="raw extract not available")
+def test_reproduces_log_data_fe():
+    # log_data_fe.csv is built from the full extract, before outlier filtering
+    cleaned, _ = clean_data(pd.read_csv(DATA_DIR / "raw" / "data.csv", encoding="utf-8-sig"), outlier_columns=None)
+    features = engineer_features(cleaned)
+    reference = pd.read_csv(DATA_DIR / "processed" / "log_data_fe.csv")
+    columns = [c for c in LOG_DATA_FE_COLUMNS if c not in HOLIDAY_COLUMNS]
+    for col in columns:
+        if pd.api.types.is_numeric_dtype(reference[col]):
+            np.testing.assert_allclose(features[col].to_numpy(float), reference[col].to_numpy(float), rtol=1e-9)
+        else:
+            assert (features[col].astype(str).to_numpy() == reference[col].astype(str).to_numpy()).all(), col
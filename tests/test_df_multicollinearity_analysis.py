@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_analysis.df_multicollinearity_analysis import compute_vif_vectorized, prune_vif
+
+
+@pytest.fixture
+def collinear_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(2)
+    n = 400
+    a = rng.normal(size=n)
+    b = rng.normal(size=n)
+    return pd.DataFrame({
+        "a": a,
+        "b": b,
+        "a_noisy": a + 0.05 * rng.normal(size=n),
+        "ab_mix": a + b + 0.1 * rng.normal(size=n),
+        "c": rng.normal(size=n),
+        "d": 0.5 * b + rng.normal(size=n),
+    })
+
+
+def _naive_prune(data: pd.DataFrame, threshold: float) -> list:
+    """Reference: recompute every VIF from scratch after each drop."""
+    dropped = []
+    remaining = data.copy()
+    while remaining.shape[1] > 0:
+        vifs = compute_vif_vectorized(remaining)
+        if vifs["VIF"].iloc[0] < threshold:
+            break
+        worst = vifs["Feature"].iloc[0]
+        dropped.append(worst)
+        remaining = remaining.drop(columns=worst)
+    return dropped
+
+
+def test_prune_vif_matches_naive_recompute(collinear_frame):
+    trace, kept = prune_vif(collinear_frame, threshold=5.0)
+    assert list(trace["Feature"]) == _naive_prune(collinear_frame, 5.0)
+
+    expected = compute_vif_vectorized(collinear_frame[list(kept["Feature"])])
+    np.testing.assert_allclose(
+        kept.set_index("Feature")["VIF"].sort_index(),
+        expected.set_index("Feature")["VIF"].sort_index(),
+        rtol=1e-8,
+    )
+    assert (kept["VIF"] < 5.0).all()
+
+
+def test_downdates_agree_with_frequent_refresh(collinear_frame):
+    trace, kept = prune_vif(collinear_frame, threshold=1.5, refresh_every=100)
+    trace_ref, kept_ref = prune_vif(collinear_frame, threshold=1.5, refresh_every=1)
+    assert list(trace["Feature"]) == list(trace_ref["Feature"])
+    np.testing.assert_allclose(trace["VIF"], trace_ref["VIF"], rtol=1e-8)
+    np.testing.assert_allclose(kept["VIF"], kept_ref["VIF"], rtol=1e-8)
+
+
+def test_trace_columns_and_step_counts(collinear_frame):
+    trace, kept = prune_vif(collinear_frame, threshold=5.0)
+    assert list(trace.columns) == ["Step", "Feature", "VIF", "Remaining Features"]
+    assert list(trace["Step"]) == list(range(1, len(trace) + 1))
+    assert list(trace["Remaining Features"]) == [collinear_frame.shape[1] - s for s in trace["Step"]]
+    assert len(trace) + len(kept) == collinear_frame.shape[1]
+
+
+def test_aliased_and_constant_columns_dropped_as_infinite(collinear_frame):
+    df = collinear_frame.assign(
+        a_plus_b=collinear_frame["a"] + collinear_frame["b"],
+        constant=1.0,
+    )
+    trace, kept = prune_vif(df, threshold=10.0)
+    infinite = trace.loc[np.isinf(trace["VIF"]), "Feature"]
+    assert "constant" in set(infinite)
+    # Exactly one of a, b, a_plus_b must go as an exact alias
+    assert len(set(infinite) & {"a", "b", "a_plus_b"}) == 1
+    assert np.isfinite(kept["VIF"]).all()
+    assert (kept["VIF"] >= 1.0 - 1e-8).all()
+    assert (kept["VIF"] < 10.0).all()
+
+
+def test_categorical_dummies_are_aliased_with_a_coarser_grouping():
+    rng = np.random.default_rng(3)
+    month = rng.integers(1, 13, size=500)
+    df = pd.DataFrame({
+        "MONTH": pd.Categorical(month.astype(str)),
+        "SEASON": pd.Categorical(np.array(["W", "W", "S", "S", "S", "U", "U", "U", "F", "F", "F", "W"])[month - 1]),
+        "COST": rng.normal(size=500),
+    })
+    trace, kept = prune_vif(df, threshold=10.0)
+    assert np.isinf(trace["VIF"]).sum() >= 3
+    assert np.isfinite(kept["VIF"]).all()
+    assert "COST" in set(kept["Feature"])
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+pl = pytest.importorskip("polars")
+
+from src.data_analysis.df_correlation_analysis import compute_correlations
+from src.data_analysis.df_dataAttribute_analysis import get_data_attributes
+from src.data_analysis.df_multicollinearity_analysis import compute_vif_vectorized, prune_vif
+from src.data_analysis.df_ttest_anova_analysis import run_one_sample_ttest, run_univariate_tests
+
+
+@pytest.fixture
+def frame() -> pd.DataFrame:
+    rng = np.random.default_rng(8)
+    n = 500
+    df = pd.DataFrame({
+        "CHANNEL": rng.choice(["tv", "radio", "search", "app"], size=n),
+        "CAMPAIGN_TYPE": rng.choice(["Brand", "Title"], size=n),
+        "COST": rng.gamma(2.0, 100.0, size=n),
+        "TRIALS": rng.poisson(20, size=n).astype(float),
+        "RATIO": rng.normal(size=n),
+        "HOLIDAY_FLAG": rng.random(n) < 0.1,
+    })
+    df["LOG_COST"] = np.log1p(df["COST"]) + rng.normal(0, 0.5, size=n)
+    df.loc[[3, 30, 300], "COST"] = np.nan
+    df.loc[[5, 50], "RATIO"] = np.inf
+    df.loc[[7, 70], "CHANNEL"] = None
+    return df
+
+
+@pytest.fixture(params=["eager", "lazy"])
+def polars_frame(request, frame):
+    data = pl.from_pandas(frame)
+    return data.lazy() if request.param == "lazy" else data
+
+
+def _sorted(results: pd.DataFrame, keys) -> pd.DataFrame:
+    return results.sort_values(keys).reset_index(drop=True)
+
+
+def test_attributes_come_from_the_schema(frame, polars_frame):
+    expected = get_data_attributes(frame)
+    attributes = get_data_attributes(polars_frame)
+    for kind in ["categorical", "numerical", "boolean"]:
+        assert sorted(attributes[kind]) == sorted(expected[kind])
+
+
+@pytest.mark.parametrize("include_categorical, sparse", [(False, False), (True, False), (True, True)])
+def test_correlations_match_pandas(frame, polars_frame, include_categorical, sparse):
+    numeric = ["CHANNEL", "CAMPAIGN_TYPE", "COST", "TRIALS", "RATIO", "LOG_COST"]
+    kwargs = dict(include_categorical=include_categorical, cat_cols=["CHANNEL", "CAMPAIGN_TYPE"], sparse=sparse)
+    expected = _sorted(compute_correlations(frame[numeric], **kwargs), ["Variable 1", "Variable 2"])
+    result = _sorted(compute_correlations(polars_frame.select(numeric), **kwargs), ["Variable 1", "Variable 2"])
+    assert result[["Variable 1", "Variable 2"]].equals(expected[["Variable 1", "Variable 2"]])
+    np.testing.assert_allclose(result["Correlation"], expected["Correlation"], rtol=1e-9, atol=1e-12)
+    np.testing.assert_allclose(result["p-value"], expected["p-value"], rtol=1e-6, atol=1e-300)
+
+
+@pytest.mark.parametrize("sparse", [False, True])
+def test_vif_matches_pandas(frame, polars_frame, sparse):
+    columns = ["CHANNEL", "CAMPAIGN_TYPE", "COST", "RATIO", "LOG_COST"]
+    expected = _sorted(compute_vif_vectorized(frame[columns], sparse=sparse), "Feature")
+    result = _sorted(compute_vif_vectorized(polars_frame.select(columns), sparse=sparse), "Feature")
+    assert list(result["Feature"]) == list(expected["Feature"])
+    np.testing.assert_allclose(result["VIF"], expected["VIF"], rtol=1e-8)
+
+    expected_trace, expected_kept = prune_vif(frame[columns], threshold=2.0)
+    trace, kept = prune_vif(polars_frame.select(columns), threshold=2.0)
+    assert list(trace["Feature"]) == list(expected_trace["Feature"])
+    assert sorted(kept["Feature"]) == sorted(expected_kept["Feature"])
+
+
+@pytest.mark.parametrize("test_type, stat_label", [("anova", "F-statistic"), ("kruskal", "H-statistic")])
+def test_univariate_tests_match_pandas(frame, polars_frame, test_type, stat_label):
+    args = (["CHANNEL", "CAMPAIGN_TYPE"], ["COST", "TRIALS"], test_type)
+    keys = ["Categorical Variable", "Quantitative Variable"]
+    expected = _sorted(run_univariate_tests(frame, *args), keys)
+    result = _sorted(run_univariate_tests(polars_frame, *args), keys)
+    assert result[keys].equals(expected[keys])
+    np.testing.assert_allclose(result[stat_label], expected[stat_label], rtol=1e-9)
+    np.testing.assert_allclose(result["p-value"], expected["p-value"], rtol=1e-7)
+
+
+def test_one_sample_ttest_matches_pandas(frame, polars_frame):
+    args = (["CHANNEL"], ["TRIALS", "COST"])
+    expected = run_one_sample_ttest(frame, *args, popmean=20)
+    result = run_one_sample_ttest(polars_frame, *args, popmean=20)
+    keys = [c for c in expected.columns if expected[c].dtype == object or pd.api.types.is_string_dtype(expected[c])]
+    expected, result = _sorted(expected, keys), _sorted(result, keys)
+    assert result[keys].equals(expected[keys])
+    numeric = expected.select_dtypes("number").columns
+    np.testing.assert_allclose(result[numeric].to_numpy(float), expected[numeric].to_numpy(float), rtol=1e-8)
@@ -0,0 +1,99 @@
+from itertools import combinations
+
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+from statsmodels.stats.multitest import multipletests
+
+from src.data_analysis.df_posthoc_analysis import adjust_pvalues, compute_group_summaries, run_posthoc_tests
+
+
+@pytest.fixture
+def groups_df():
+    rng = np.random.default_rng(4)
+    group = np.repeat(["a", "b", "c", "d"], [30, 45, 25, 50])
+    shift = pd.Series(group).map({"a": 0.0, "b": 0.4, "c": 1.0, "d": 0.1}).to_numpy()
+    return pd.DataFrame({
+        "GROUP": group,
+        "VALUE": rng.normal(shift, 1.0 + shift),
+        "COUNT": rng.poisson(3 + 2 * shift).astype(float),  # many ties for the rank tests
+    })
+
+
+@pytest.mark.parametrize("method", ["fdr_bh", "holm", "bonferroni"])
+def test_adjust_pvalues_matches_statsmodels(method):
+    p = np.random.default_rng(0).uniform(0, 0.2, 40) ** 2
+    p[[3, 7]] = p[5]  # ties
+    np.testing.assert_allclose(adjust_pvalues(p, method), multipletests(p, method=method)[1])
+
+
+def test_adjust_pvalues_keeps_nans_and_rejects_unknown_methods():
+    p = np.array([0.01, np.nan, 0.04, 0.03])
+    adjusted = adjust_pvalues(p, "holm")
+    assert np.isnan(adjusted[1])
+    np.testing.assert_allclose(adjusted[[0, 2, 3]], multipletests(p[[0, 2, 3]], method="holm")[1])
+    np.testing.assert_array_equal(adjust_pvalues(p, None), p)
+    with pytest.raises(ValueError, match="Unsupported correction"):
+        adjust_pvalues(p, "sidak")
+
+
+def test_pairwise_tests_match_scipy(groups_df):
+    result = run_posthoc_tests(groups_df, ["GROUP"], ["VALUE"], correction=None, n_jobs=1)
+    samples = {g: groups_df.loc[groups_df["GROUP"] == g, "VALUE"].to_numpy() for g in "abcd"}
+    tukey = stats.tukey_hsd(*samples.values())
+
+    for i, j in combinations(range(4), 2):
+        g1, g2 = "abcd"[i], "abcd"[j]
+        rows = result[(result["Group 1"] == g1) & (result["Group 2"] == g2)].set_index("Test")
+        welch = stats.ttest_ind(samples[g2], samples[g1], equal_var=False)
+        assert rows.loc["welch", "Statistic"] == pytest.approx(welch.statistic)
+        assert rows.loc["welch", "p-value"] == pytest.approx(welch.pvalue)
+        assert rows.loc["tukey", "p-value"] == pytest.approx(tukey.pvalue[i, j], abs=1e-6)
+        assert rows.loc["tukey", "Mean Diff"] == pytest.approx(samples[g2].mean() - samples[g1].mean())
+    assert (result["p-adj"] == result["p-value"]).all()
+
+
+def test_dunn_matches_rank_reference(groups_df):
+    result = run_posthoc_tests(groups_df, ["GROUP"], ["COUNT"], tests=["dunn"], correction="holm", n_jobs=1)
+    ranks = stats.rankdata(groups_df["COUNT"])
+    n = len(ranks)
+    _, tie_counts = np.unique(groups_df["COUNT"], return_counts=True)
+    tie_factor = 1 - (tie_counts ** 3 - tie_counts).sum() / (n ** 3 - n)
+    mean_rank = pd.Series(ranks).groupby(groups_df["GROUP"]).mean()
+    size = groups_df["GROUP"].value_counts()
+
+    expected = {}
+    for g1, g2 in combinations("abcd", 2):
+        z = (mean_rank[g2] - mean_rank[g1]) / np.sqrt(tie_factor * n * (n + 1) / 12 * (1 / size[g1] + 1 / size[g2]))
+        expected[(g1, g2)] = 2 * stats.norm.sf(abs(z))
+    got = result.set_index(["Group 1", "Group 2"])["p-value"]
+    for pair, p in expected.items():
+        assert got[pair] == pytest.approx(p)
+    np.testing.assert_allclose(
+        result["p-adj"], multipletests(result["p-value"], method="holm")[1]
+    )
+    assert result["p-adj"].is_monotonic_increasing
+
+
+def test_summaries_can_be_reused(groups_df):
+    summaries = compute_group_summaries(groups_df, ["GROUP"], ["VALUE", "COUNT"])
+    assert len(summaries) == 8
+    assert summaries.groupby("Quantitative Variable")["Count"].sum().eq(150).all()
+
+    direct = run_posthoc_tests(groups_df, ["GROUP"], ["VALUE"], tests=["welch"], n_jobs=1)
+    reused = run_posthoc_tests(summaries=summaries, quantitative_cols=["VALUE"], tests=["welch"], n_jobs=1)
+    pd.testing.assert_frame_equal(direct, reused)
+
+
+def test_single_group_and_invalid_arguments(groups_df):
+    single = groups_df.assign(GROUP="a")
+    empty = run_posthoc_tests(single, ["GROUP"], ["VALUE"], n_jobs=1)
+    assert empty.empty and "p-adj" in empty.columns
+
+    with pytest.raises(ValueError, match="Unsupported tests"):
+        run_posthoc_tests(groups_df, ["GROUP"], ["VALUE"], tests=["scheffe"])
+    with pytest.raises(ValueError, match="Unsupported correction"):
+        run_posthoc_tests(groups_df, ["GROUP"], ["VALUE"], correction="sidak")
+    with pytest.raises(ValueError, match="Pass either summaries"):
+        run_posthoc_tests(groups_df, ["GROUP"])
@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_analysis.df_correlation_analysis import compute_correlations
+from src.data_analysis.df_multicollinearity_analysis import compute_vif_vectorized, prune_vif
+from src.data_analysis.df_sparse_encoding import pairwise_correlation_matrix, sparse_one_hot
+
+
+@pytest.fixture
+def mixed_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(4)
+    n = 500
+    df = pd.DataFrame({
+        "CHANNEL": rng.choice(["tv", "radio", "search", "social"], size=n),
+        "CAMPAIGN_TYPE": pd.Categorical(rng.choice(["brand", "promo", "launch"], size=n)),
+        "COST": rng.gamma(2.0, 50.0, size=n),
+        "FREE_TRIALS": rng.poisson(20, size=n).astype(float),
+    })
+    df.loc[[5, 60], "CHANNEL"] = None
+    return df
+
+
+@pytest.mark.parametrize("drop_first", [True, False])
+def test_sparse_one_hot_matches_get_dummies(mixed_frame, drop_first):
+    cat_cols = ["CHANNEL", "CAMPAIGN_TYPE"]
+    matrix, names = sparse_one_hot(mixed_frame, cat_cols, drop_first=drop_first)
+    expected = pd.get_dummies(mixed_frame[cat_cols], drop_first=drop_first, dtype=float)
+    assert names == list(expected.columns)
+    np.testing.assert_array_equal(matrix.toarray(), expected.to_numpy())
+    # A missing value encodes as an all-zero row within its column's block
+    channel_block = [i for i, name in enumerate(names) if name.startswith("CHANNEL_")]
+    assert matrix[5][:, channel_block].nnz == 0
+
+
+def test_pairwise_correlation_matrix_matches_dense(mixed_frame):
+    indicators, _ = sparse_one_hot(mixed_frame, ["CHANNEL", "CAMPAIGN_TYPE"])
+    dense = mixed_frame[["COST", "FREE_TRIALS"]].to_numpy()
+    corr, n_obs = pairwise_correlation_matrix(dense, indicators)
+    expected = np.corrcoef(np.hstack([dense, indicators.toarray()]), rowvar=False)
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+    assert (n_obs == len(mixed_frame)).all()
+
+
+def test_pairwise_correlation_matrix_with_missing_values():
+    rng = np.random.default_rng(5)
+    dense = rng.normal(size=(100, 3))
+    dense[[1, 2, 3], 0] = np.nan
+    dense[[3, 50], 2] = np.nan
+    corr, n_obs = pairwise_correlation_matrix(dense)
+    expected = pd.DataFrame(dense).corr().to_numpy()
+    np.testing.assert_allclose(corr, expected, atol=1e-12)
+    assert n_obs[0, 2] == 96
+    assert n_obs[1, 1] == 100
+
+
+def test_constant_column_correlation_is_nan():
+    dense = np.column_stack([np.arange(10.0), np.ones(10)])
+    corr, _ = pairwise_correlation_matrix(dense)
+    assert np.isnan(corr[0, 1]) and np.isnan(corr[1, 1])
+
+
+def test_sparse_vif_and_pruning_match_dense(mixed_frame):
+    dense_vif = compute_vif_vectorized(mixed_frame).set_index("Feature")["VIF"]
+    sparse_vif = compute_vif_vectorized(mixed_frame, sparse=True).set_index("Feature")["VIF"]
+    np.testing.assert_allclose(sparse_vif.sort_index(), dense_vif.dropna().sort_index(), rtol=1e-8)
+
+    trace, kept = prune_vif(mixed_frame, threshold=1.01)
+    trace_sparse, kept_sparse = prune_vif(mixed_frame, threshold=1.01, sparse=True)
+    assert list(trace["Feature"]) == list(trace_sparse["Feature"])
+    np.testing.assert_allclose(kept["VIF"], kept_sparse["VIF"], rtol=1e-8)
+
+
+@pytest.mark.parametrize("engine", ["matrix", "pairwise"])
+def test_sparse_correlations_match_dense(mixed_frame, engine):
+    kwargs = dict(include_categorical=True, cat_cols=["CHANNEL", "CAMPAIGN_TYPE"], sort_results=False)
+    dense = compute_correlations(mixed_frame, engine=engine, **kwargs)
+    sparse = compute_correlations(mixed_frame, engine="matrix", sparse=True, **kwargs)
+    keys = ["Variable 1", "Variable 2"]
+    dense, sparse = dense.set_index(keys).sort_index(), sparse.set_index(keys).sort_index()
+    assert list(dense.index) == list(sparse.index)
+    np.testing.assert_allclose(sparse["Correlation"], dense["Correlation"], rtol=1e-8, atol=1e-12)
@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import df_train_test_split
+from src.data_preprocessing.df_train_test_split import (
+    get_split_indices, grouped_split, random_split, split_data, stratified_split, time_series_splits
+)
+
+
+@pytest.fixture
+def campaigns(project, monkeypatch) -> pd.DataFrame:
+    monkeypatch.setattr(df_train_test_split, "_SPLIT_CACHE", {})
+    rng = np.random.default_rng(10)
+    n = 1000
+    return pd.DataFrame({
+        "REPORT_DATE": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 100, size=n), unit="D"),
+        "CHANNEL": rng.choice(["tv", "app", "radio", "search"], size=n, p=[0.5, 0.3, 0.15, 0.05]),
+        "CAMPAIGN_ID": rng.integers(0, 40, size=n),
+        "FREE_TRIALS": rng.gamma(2.0, 20.0, size=n),
+    })
+
+
+def _assert_partition(train, test, n_rows):
+    assert np.array_equal(np.sort(np.concatenate([train, test])), np.arange(n_rows))
+    assert (np.diff(train) > 0).all() and (np.diff(test) > 0).all()
+
+
+def test_random_split_is_seeded_and_sized():
+    train, test = random_split(1000, test_size=0.2, random_state=1)
+    _assert_partition(train, test, 1000)
+    assert len(test) == 200 and train.dtype == np.int32
+    assert np.array_equal(random_split(1000, 0.2, 1)[1], test)
+    assert not np.array_equal(random_split(1000, 0.2, 2)[1], test)
+    assert len(random_split(1000, test_size=150)[1]) == 150
+
+
+def test_stratified_split_keeps_each_stratum_share(campaigns):
+    labels = campaigns["CHANNEL"].to_numpy()
+    train, test = stratified_split(labels, test_size=0.2)
+    _assert_partition(train, test, len(labels))
+    assert len(test) == 200
+    counts = pd.Series(labels).value_counts()
+    test_counts = pd.Series(labels[test]).value_counts()
+    assert (abs(test_counts - 0.2 * counts) <= 1).all()
+
+
+def test_grouped_split_never_shares_a_group(campaigns):
+    groups = campaigns["CAMPAIGN_ID"].to_numpy()
+    train, test = grouped_split(groups, test_size=0.25)
+    _assert_partition(train, test, len(groups))
+    assert not set(groups[train]) & set(groups[test])
+    assert len(test) >= 250
+    with pytest.raises(ValueError, match="two groups"):
+        grouped_split(np.zeros(10), test_size=0.2)
+
+
+def test_time_series_splits_chain_forward(campaigns):
+    dates = campaigns["REPORT_DATE"].to_numpy()
+    folds = time_series_splits(dates, n_splits=4, gap=2)
+    assert len(folds) == 4
+    unique_dates = np.unique(dates)
+    for train, test in folds:
+        assert dates[train].max() < dates[test].min()
+        # `gap` distinct dates between the last train date and the first test date
+        between = (unique_dates > dates[train].max()) & (unique_dates < dates[test].min())
+        assert between.sum() == 2
+    assert all(len(a[0]) < len(b[0]) for a, b in zip(folds, folds[1:]))
+    with pytest.raises(ValueError, match="too few"):
+        time_series_splits(dates[:5], n_splits=10)
+
+
+def test_explicit_test_size_sets_the_time_window(campaigns):
+    default = get_split_indices(campaigns, method="time", n_splits=3, env="test")
+    sized = get_split_indices(campaigns, method="time", n_splits=3, test_size=0.1, env="test")
+    dates = campaigns["REPORT_DATE"].to_numpy()
+    assert [len(np.unique(dates[test])) for _, test in default] == [25, 25, 25]
+    assert [len(np.unique(dates[test])) for _, test in sized] == [10, 10, 10]
+
+
+def test_splits_are_cached_in_memory_and_on_disk(campaigns, tmp_path):
+    folds = get_split_indices(campaigns, method="stratified", env="test", cache_dir=tmp_path)
+    assert get_split_indices(campaigns, method="stratified", env="test", cache_dir=tmp_path) is folds
+    assert len(list(tmp_path.glob("split_*.npz"))) == 1
+
+    df_train_test_split._SPLIT_CACHE.clear()
+    from_disk = get_split_indices(campaigns, method="stratified", env="test", cache_dir=tmp_path)
+    assert all(np.array_equal(a, b) for fold_a, fold_b in zip(folds, from_disk) for a, b in zip(fold_a, fold_b))
+
+    changed = campaigns.assign(CHANNEL=campaigns["CHANNEL"].iloc[::-1].to_numpy())
+    other = get_split_indices(changed, method="stratified", env="test", cache_dir=tmp_path)
+    assert len(list(tmp_path.glob("split_*.npz"))) == 2
+    assert not np.array_equal(other[0][1], folds[0][1])
+
+
+def test_use_cache_false_leaves_the_caches_alone(campaigns, tmp_path):
+    get_split_indices(campaigns, env="test", use_cache=False, cache_dir=tmp_path)
+    assert df_train_test_split._SPLIT_CACHE == {}
+    assert not list(tmp_path.rglob("split_*.npz"))
+
+
+def test_split_data_matches_indices(campaigns, tmp_path):
+    X_train, X_test, y_train, y_test = split_data(
+        campaigns, target="FREE_TRIALS", method="random", env="test", cache_dir=tmp_path
+    )
+    train_idx, test_idx = get_split_indices(campaigns, method="random", env="test", cache_dir=tmp_path)[0]
+    assert "FREE_TRIALS" not in X_train.columns
+    pd.testing.assert_series_equal(y_test, campaigns["FREE_TRIALS"].take(test_idx))
+    assert len(X_train) == len(train_idx) == len(y_train)
+    assert len(X_test) == 200
+
+
+def test_invalid_settings_raise(campaigns, tmp_path):
+    with pytest.raises(ValueError, match="Unsupported split method"):
+        get_split_indices(campaigns, method="kfold", env="test")
+    with pytest.raises(ValueError, match="needs a column"):
+        get_split_indices(campaigns, method="grouped", env="test", cache_dir=tmp_path)
+    with pytest.raises(ValueError, match="empty train or test"):
+        random_split(10, test_size=10)
@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import stats
+
+from src.data_analysis.df_ttest_anova_analysis import run_one_sample_ttest, run_univariate_tests
+
+
+@pytest.fixture
+def grouped_frame() -> pd.DataFrame:
+    rng = np.random.default_rng(1)
+    n = 300
+    df = pd.DataFrame({
+        "channel": rng.choice(["tv", "radio", "search"], size=n),
+        "region": rng.choice(["north", "south"], size=n),
+        "cost": rng.normal(10, 2, size=n),
+        "trials": rng.poisson(5, size=n).astype(float),
+    })
+    df.loc[df["channel"] == "tv", "cost"] += 1.5
+    df.loc[[4, 40, 200], "cost"] = np.nan
+    df.loc[[7, 8], "channel"] = np.nan
+    return df
+
+
+def _by_pair(results: pd.DataFrame) -> pd.DataFrame:
+    return results.set_index(["Categorical Variable", "Quantitative Variable"]).sort_index()
+
+
+@pytest.mark.parametrize("test_type, stat_label", [("anova", "F-statistic"), ("kruskal", "H-statistic")])
+def test_groupby_engine_matches_scipy_loop(grouped_frame, test_type, stat_label):
+    args = (grouped_frame, ["channel", "region"], ["cost", "trials"], test_type)
+    fast = _by_pair(run_univariate_tests(*args))
+    reference = _by_pair(run_univariate_tests(*args, engine="loop"))
+    np.testing.assert_allclose(fast[stat_label], reference[stat_label], rtol=1e-8)
+    np.testing.assert_allclose(fast["p-value"], reference["p-value"], rtol=1e-8)
+
+
+def test_anova_matches_scipy_directly(grouped_frame):
+    results = _by_pair(run_univariate_tests(grouped_frame, ["channel"], ["cost"]))
+    groups = [g["cost"].dropna() for _, g in grouped_frame.dropna(subset=["channel"]).groupby("channel")]
+    expected = stats.f_oneway(*groups)
+    assert results.loc[("channel", "cost"), "F-statistic"] == pytest.approx(expected.statistic, rel=1e-10)
+    assert results.loc[("channel", "cost"), "p-value"] == pytest.approx(expected.pvalue, rel=1e-8)
+
+
+def test_univariate_results_sorted_by_p_value(grouped_frame):
+    results = run_univariate_tests(grouped_frame, ["channel", "region"], ["cost", "trials"])
+    assert results["p-value"].is_monotonic_increasing
+
+
+def test_one_sample_groupby_matches_loop(grouped_frame):
+    popmean = {"cost": 10.0, "trials": 5.0}
+    args = (grouped_frame, ["channel", "region"], ["cost", "trials"], popmean)
+    keys = ["Categorical Variable", "Category", "Quantitative Variable"]
+    fast = run_one_sample_ttest(*args).set_index(keys).sort_index()
+    reference = run_one_sample_ttest(*args, engine="loop").set_index(keys).sort_index()
+    assert list(fast.index) == list(reference.index)
+    np.testing.assert_allclose(fast["T-statistic"], reference["T-statistic"], rtol=1e-8)
+    np.testing.assert_allclose(fast["p-value"], reference["p-value"], rtol=1e-8)
+    assert (fast["Sample Size"] == reference["Sample Size"]).all()
+    assert (fast["Decision"] == reference["Decision"]).all()
+
+
+def test_one_sample_matches_scipy_ttest_1samp(grouped_frame):
+    results = run_one_sample_ttest(grouped_frame, ["region"], ["cost"], popmean=10.0)
+    row = results.set_index("Category").loc["north"]
+    sample = grouped_frame.loc[grouped_frame["region"] == "north", "cost"].dropna()
+    expected = stats.ttest_1samp(sample, 10.0)
+    assert row["T-statistic"] == pytest.approx(expected.statistic, rel=1e-10)
+    assert row["p-value"] == pytest.approx(expected.pvalue, rel=1e-8)
+
+
+def test_unsupported_test_type_and_engine_raise(grouped_frame):
+    with pytest.raises(ValueError, match="test_type"):
+        run_univariate_tests(grouped_frame, ["channel"], ["cost"], test_type="chi2")
+    with pytest.raises(ValueError, match="engine"):
+        run_univariate_tests(grouped_frame, ["channel"], ["cost"], engine="numba")
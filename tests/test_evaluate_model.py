@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+
+from src.scoring.evaluate_model import back_transform, evaluate_models, regression_metrics
+
+
+def _sklearn_metrics(y, pred):
+    return {
+        "MSE": mean_squared_error(y, pred),
+        "RMSE": np.sqrt(mean_squared_error(y, pred)),
+        "MAE": mean_absolute_error(y, pred),
+        "R2": r2_score(y, pred),
+    }
+
+
+@pytest.fixture
+def scored(campaign_features):
+    rng = np.random.default_rng(3)
+    y = campaign_features["LOG_FREE_TRIALS"].to_numpy()
+    predictions = {"good": y + rng.normal(0, 0.2, len(y)), "bad": y + rng.normal(0.3, 0.6, len(y))}
+    return y, predictions, campaign_features[["CHANNEL", "CAMPAIGN_TYPE", "ATL_OR_DR"]]
+
+
+@pytest.mark.parametrize("target_transform", [None, "log1p"])
+def test_regression_metrics_match_sklearn(scored, target_transform):
+    y, predictions, _ = scored
+    metrics = regression_metrics(y, predictions["good"], target_transform)
+    expected = _sklearn_metrics(back_transform(y, target_transform), back_transform(predictions["good"], target_transform))
+    assert metrics == pytest.approx({name.lower(): value for name, value in expected.items()})
+
+
+def test_point_estimates_match_sklearn_per_segment(scored):
+    y, predictions, segments = scored
+    result = evaluate_models(y, predictions, segments, n_bootstrap=0, target_transform="log1p")
+    assert result["CI Lower"].isna().all()
+
+    y_orig = np.expm1(y)
+    for (model, segment, level), group in result.groupby(["Model", "Segment", "Level"]):
+        mask = np.ones(len(y), bool) if segment == "ALL" else (segments[segment] == level).to_numpy()
+        expected = _sklearn_metrics(y_orig[mask], np.expm1(predictions[model][mask]))
+        assert group["N"].iloc[0] == mask.sum()
+        assert dict(zip(group["Metric"], group["Value"])) == pytest.approx(expected)
+
+
+def test_bootstrap_intervals_match_a_resample_loop(scored):
+    y, predictions, segments = scored
+    n_bootstrap = 50
+    result = evaluate_models(y, predictions, segments, segment_columns=["CHANNEL"],
+                             n_bootstrap=n_bootstrap, confidence=0.9, random_state=7)
+
+    index = np.random.default_rng(7).integers(0, len(y), size=(n_bootstrap, len(y)))
+    channel = segments["CHANNEL"].to_numpy()
+    for level in ["ALL", "search"]:
+        samples = []
+        for rows in index:
+            if level != "ALL":
+                rows = rows[channel[rows] == level]
+            samples.append(_sklearn_metrics(y[rows], predictions["bad"][rows]))
+        expected = pd.DataFrame(samples).quantile([0.05, 0.95])
+        got = result[(result["Model"] == "bad") & (result["Level"] == level)].set_index("Metric")
+        for metric in expected.columns:
+            assert got.loc[metric, "CI Lower"] == pytest.approx(expected.loc[0.05, metric])
+            assert got.loc[metric, "CI Upper"] == pytest.approx(expected.loc[0.95, metric])
+
+
+def test_invalid_inputs_raise(scored):
+    y, predictions, _ = scored
+    with pytest.raises(ValueError, match="Unsupported target_transform"):
+        back_transform(y, "log10")
+    with pytest.raises(ValueError, match="expected 400"):
+        evaluate_models(y, {"short": predictions["good"][:-1]}, n_bootstrap=0)
@@ -0,0 +1,115 @@
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.linear_model import LinearRegression
+from sklearn.metrics import check_scoring
+from sklearn.pipeline import Pipeline
+from xgboost import XGBRegressor
+
+from src.modeling.model_training import CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS, build_preprocessor
+from src.scoring import explain_model
+from src.scoring.explain_model import feature_groups, permutation_importance, shap_importance, shap_values
+
+FEATURES = CATEGORICAL_COLUMNS + NUMERICAL_COLUMNS
+
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(explain_model, "_EXPLAIN_CACHE", {})
+
+
+@pytest.fixture
+def data(campaign_features):
+    return campaign_features[FEATURES], campaign_features["LOG_FREE_TRIALS"].to_numpy()
+
+
+def _fit(data, model):
+    X, y = data
+    return Pipeline([("preprocessor", build_preprocessor()), ("model", model)]).fit(X, y)
+
+
+def _xgb():
+    return XGBRegressor(n_estimators=30, max_depth=3, random_state=0, n_jobs=1)
+
+
+def test_feature_groups_map_dummies_to_their_column(data):
+    preprocessor = _fit(data, _xgb())[0]
+    labels = feature_groups(preprocessor)
+    names = preprocessor.get_feature_names_out()
+    assert len(labels) == len(names)
+    assert set(labels) == set(FEATURES)
+    channel = [f"cat__CHANNEL_{level}" for level in sorted(data[0]["CHANNEL"].unique())]
+    assert list(names[labels == "CHANNEL"]) == channel
+
+
+def test_grouped_permutation_matches_shuffling_raw_columns(project, data):
+    X, y = data
+    model = _fit(data, _xgb())
+    columns = ["CHANNEL", "LOG_COST", "MONTH"]
+    result = permutation_importance(model, X, y, columns=columns, n_repeats=3, scoring="r2",
+                                    n_jobs=1, random_state=5, use_cache=False, env="test")
+
+    scorer = check_scoring(model, scoring="r2")
+    baseline = scorer(model, X, y)
+    seeds = np.random.SeedSequence(5).spawn(len(columns))
+    for column, seed in zip(columns, seeds):
+        rng = np.random.default_rng(seed)
+        drops = []
+        for _ in range(3):
+            permuted = X.copy()
+            permuted[column] = X[column].to_numpy()[rng.permutation(len(X))]
+            drops.append(baseline - scorer(model, permuted, y))
+        row = result.set_index("Feature").loc[column]
+        assert row["Importance Mean"] == pytest.approx(np.mean(drops), abs=1e-6)
+        assert row["Importance Std"] == pytest.approx(np.std(drops), abs=1e-6)
+
+    assert result["Feature"].iloc[0] == "LOG_COST"
+    assert list(result["Rank"]) == [1, 2, 3]
+
+
+def test_permutation_results_are_cached_on_disk(project, data, tmp_path, monkeypatch):
+    X, y = data
+    model = _fit(data, _xgb())
+    kwargs = dict(columns=["CHANNEL"], n_repeats=2, scoring="r2", n_jobs=1, cache_dir=tmp_path / "explain", env="test")
+    first = permutation_importance(model, X, y, **kwargs)
+    assert len(list((tmp_path / "explain").glob("permutation_*.parquet"))) == 1
+
+    monkeypatch.setattr(explain_model, "_EXPLAIN_CACHE", {})
+    monkeypatch.setattr(explain_model, "_permutation_scores", None)  # a recompute would fail
+    assert first.equals(permutation_importance(model, X, y, **kwargs))
+
+
+def test_unknown_permutation_column_raises(project, data):
+    X, y = data
+    with pytest.raises(ValueError, match="Unknown feature groups"):
+        permutation_importance(_fit(data, _xgb()), X, y, columns=["BUDGET"], scoring="r2",
+                               n_jobs=1, use_cache=False, env="test")
+
+
+def test_xgboost_shap_values_add_up_to_predictions(project, data):
+    X, _ = data
+    model = _fit(data, _xgb())
+    grouped = shap_values(model, X, use_cache=False, env="test")
+    raw = shap_values(model, X, grouped=False, use_cache=False, env="test")
+
+    assert set(grouped.columns) == set(FEATURES) | {"Expected Value"}
+    np.testing.assert_allclose(grouped.sum(axis=1), model.predict(X), rtol=1e-4, atol=1e-4)
+    channel = [f"cat__CHANNEL_{level}" for level in sorted(X["CHANNEL"].unique())]
+    np.testing.assert_allclose(grouped["CHANNEL"], raw[channel].sum(axis=1), rtol=1e-5, atol=1e-6)
+
+    importance = shap_importance(grouped)
+    assert importance["Feature"].iloc[0] == "LOG_COST"
+    assert importance["Mean Abs SHAP"].is_monotonic_decreasing
+
+
+def test_shap_rejects_non_tree_models(project, data):
+    with pytest.raises(ValueError, match="Unsupported model for TreeSHAP"):
+        shap_values(_fit(data, LinearRegression()), data[0], use_cache=False, env="test")
+
+
+def test_forest_shap_values_add_up_to_predictions(project, data):
+    pytest.importorskip("shap")
+    X, _ = data
+    model = _fit(data, RandomForestRegressor(n_estimators=10, max_depth=4, random_state=0))
+    grouped = shap_values(model, X, use_cache=False, env="test")
+    np.testing.assert_allclose(grouped.sum(axis=1), model.predict(X), rtol=1e-4, atol=1e-4)
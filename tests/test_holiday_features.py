@@ -0,0 +1,89 @@
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing import df_feature_engineer
+from src.data_preprocessing.df_clean import clean_data
+from src.data_preprocessing.df_feature_engineer import (
+    add_holiday_features, build_holiday_calendar, get_holiday_calendar, super_bowl_sundays
+)
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+FLAGS = ["HOLIDAY_FLAG", "LAG_3_HOLIDAY_FLAG", "LEAD_3_HOLIDAY_FLAG"]
+
+
+@pytest.fixture(autouse=True)
+def empty_calendar_cache(monkeypatch):
+    monkeypatch.setattr(df_feature_engineer, "_HOLIDAY_CALENDARS", {})
+
+
+def test_super_bowl_sundays_are_the_second_sunday_of_february():
+    assert super_bowl_sundays(range(2022, 2027)) == [
+        pd.Timestamp("2022-02-13"),
+        pd.Timestamp("2023-02-12"),
+        pd.Timestamp("2024-02-11"),
+        pd.Timestamp("2025-02-09"),
+        pd.Timestamp("2026-02-08"),  # Feb 1 is a Sunday
+    ]
+    assert super_bowl_sundays([2032]) == [pd.Timestamp("2032-02-08")]
+
+
+def test_calendar_windows_match_a_day_by_day_reference():
+    calendar = build_holiday_calendar(2023, 2023)
+    # Windows at the range edges see holidays in the neighbouring years
+    wide = build_holiday_calendar(2022, 2024)
+    holidays = set(wide.index[wide["HOLIDAY_FLAG"]])
+    assert pd.Timestamp("2023-07-04") in holidays
+    assert pd.Timestamp("2023-02-12") in holidays
+
+    days = pd.Timedelta(days=1)
+    for date in calendar.loc["2023-01-01":"2023-12-31"].index:
+        lag = any(date + k * days in holidays for k in range(1, 4))
+        lead = any(date - k * days in holidays for k in range(1, 4))
+        assert calendar.loc[date, "LAG_3_HOLIDAY_FLAG"] == lag, date
+        assert calendar.loc[date, "LEAD_3_HOLIDAY_FLAG"] == lead, date
+
+
+def test_calendar_is_cached_in_memory_and_on_disk(tmp_path, monkeypatch):
+    first = get_holiday_calendar(2023, 2024, cache_dir=tmp_path)
+    assert get_holiday_calendar(2023, 2024, cache_dir=tmp_path) is first
+    assert len(list(tmp_path.glob("holiday_calendar_*.parquet"))) == 1
+
+    monkeypatch.setattr(df_feature_engineer, "_HOLIDAY_CALENDARS", {})
+    from_disk = get_holiday_calendar(2023, 2024, cache_dir=tmp_path)
+    pd.testing.assert_frame_equal(from_disk, first, check_freq=False)
+
+
+def test_extra_holiday_callables_are_keyed_by_their_dates(tmp_path):
+    march = get_holiday_calendar(2023, 2023, extra_holidays=lambda years: [pd.Timestamp("2023-03-15")],
+                                 cache_dir=tmp_path)
+    april = get_holiday_calendar(2023, 2023, extra_holidays=lambda years: [pd.Timestamp("2023-04-18")],
+                                 cache_dir=tmp_path)
+    assert march.loc["2023-03-15", "HOLIDAY_FLAG"] and not march.loc["2023-04-18", "HOLIDAY_FLAG"]
+    assert april.loc["2023-04-18", "HOLIDAY_FLAG"] and not april.loc["2023-03-15", "HOLIDAY_FLAG"]
+    official = get_holiday_calendar(2023, 2023, extra_holidays=None, cache_dir=tmp_path)
+    assert not official.loc["2023-02-12", "HOLIDAY_FLAG"]
+
+
+def test_add_holiday_features_joins_by_date(tmp_path):
+    df = pd.DataFrame({"REPORT_DATE": [
+        pd.Timestamp("2023-07-04"), pd.Timestamp("2023-07-01"), pd.Timestamp("2023-07-06"),
+        pd.Timestamp("2023-07-20 13:00"),
+    ]})
+    flags = add_holiday_features(df, cache_dir=tmp_path)[FLAGS]
+    assert flags.to_numpy().tolist() == [
+        [True, False, False],
+        [False, True, False],
+        [False, False, True],
+        [False, False, False],
+    ]
+
+
+@pytest.mark.skipif(not (DATA_DIR / "raw" / "data.csv").exists(), reason="raw extract not available")
+def test_reproduces_log_data_fe_holiday_flags(tmp_path):
+    cleaned, _ = clean_data(pd.read_csv(DATA_DIR / "raw" / "data.csv", encoding="utf-8-sig"), outlier_columns=None)
+    flags = add_holiday_features(cleaned, cache_dir=tmp_path)[FLAGS]
+    reference = pd.read_csv(DATA_DIR / "processed" / "log_data_fe.csv", usecols=FLAGS)
+    np.testing.assert_array_equal(flags.to_numpy(), reference[FLAGS].to_numpy())
@@ -0,0 +1,130 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_analysis.df_dataAttribute_analysis import get_data_attributes
+from src.data_sourcing import import_export_data
+from src.data_sourcing.import_export_data import CACHE_DIRNAME, _apply_filters, _read_file
+
+
+@pytest.fixture
+def campaign_csv(tmp_path):
+    rng = np.random.default_rng(6)
+    n = 200
+    df = pd.DataFrame({
+        "CHANNEL": rng.choice(["tv", "radio", "search"], size=n),
+        "CAMPAIGN_ID": [f"c{i}" for i in range(n)],
+        "COST": rng.gamma(2.0, 10.0, size=n).round(2),
+        "FREE_TRIALS": rng.poisson(4, size=n).astype(float),
+    })
+    df.loc[[3, 30, 90], "CHANNEL"] = np.nan
+    df.loc[[5, 50], "COST"] = np.nan
+    path = tmp_path / "data.csv"
+    df.to_csv(path, index=False)
+    return path
+
+
+def _cache_path(csv_path):
+    return csv_path.parent / CACHE_DIRNAME / f"{csv_path.name}.parquet"
+
+
+FILTERS = [
+    [("CHANNEL", "==", "tv")],
+    [("CHANNEL", "!=", "tv")],
+    [("CHANNEL", "not in", ["tv", "radio"])],
+    [("CHANNEL", "in", ["search"]), ("COST", ">", 15.0)],
+    [[("CHANNEL", "==", "tv")], [("COST", "<=", 5.0)]],
+    [("COST", "!=", 10.0)],
+]
+
+
+def test_csv_builds_sidecar_and_matches_uncached_read(campaign_csv):
+    uncached = _read_file(campaign_csv, use_cache=False)
+    first = _read_file(campaign_csv)
+    assert _cache_path(campaign_csv).exists()
+    cached = _read_file(campaign_csv)
+    pd.testing.assert_frame_equal(first, uncached)
+    pd.testing.assert_frame_equal(cached, uncached)
+
+
+@pytest.mark.parametrize("filters", FILTERS)
+def test_filters_give_the_same_rows_with_or_without_sidecar(campaign_csv, filters):
+    columns = ["COST", "FREE_TRIALS"]
+    uncached = _read_file(campaign_csv, columns=columns, filters=filters, use_cache=False)
+    cold = _read_file(campaign_csv, columns=columns, filters=filters)
+    warm = _read_file(campaign_csv, columns=columns, filters=filters)
+    pd.testing.assert_frame_equal(cold, uncached)
+    pd.testing.assert_frame_equal(warm, uncached)
+    assert list(warm.columns) == columns
+
+
+def test_not_equal_keeps_missing_rows_like_pandas(campaign_csv):
+    df = _read_file(campaign_csv, filters=[("CHANNEL", "!=", "tv")])
+    raw = pd.read_csv(campaign_csv)
+    assert len(df) == int((raw["CHANNEL"] != "tv").sum())
+    assert df["CHANNEL"].isna().sum() == 3
+
+
+def test_repetitive_strings_load_as_category(campaign_csv):
+    df = _read_file(campaign_csv)
+    assert isinstance(df["CHANNEL"].dtype, pd.CategoricalDtype)
+    assert not isinstance(df["CAMPAIGN_ID"].dtype, pd.CategoricalDtype)
+    attributes = get_data_attributes(df)
+    assert set(attributes["categorical"]) == {"CHANNEL", "CAMPAIGN_ID"}
+    assert set(attributes["numerical"]) == {"COST", "FREE_TRIALS"}
+
+
+def test_touched_csv_is_rehashed_once(campaign_csv, monkeypatch):
+    _read_file(campaign_csv)
+    stat = campaign_csv.stat()
+    os.utime(campaign_csv, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+
+    hashes = []
+    fingerprint = import_export_data._file_fingerprint
+
+    def counting_fingerprint(path, with_hash=True):
+        if with_hash:
+            hashes.append(path)
+        return fingerprint(path, with_hash=with_hash)
+
+    monkeypatch.setattr(import_export_data, "_file_fingerprint", counting_fingerprint)
+    _read_file(campaign_csv)
+    _read_file(campaign_csv)
+    assert len(hashes) == 1
+
+
+def test_changed_csv_rebuilds_sidecar(campaign_csv):
+    before = _read_file(campaign_csv)
+    df = pd.read_csv(campaign_csv)
+    df.loc[0, "FREE_TRIALS"] = 12345.0
+    df.to_csv(campaign_csv, index=False)
+    after = _read_file(campaign_csv)
+    assert after.loc[0, "FREE_TRIALS"] == 12345.0
+    assert before.loc[0, "FREE_TRIALS"] != 12345.0
+
+
+@pytest.mark.parametrize("suffix", [".parquet", ".feather"])
+def test_columnar_formats_round_trip_with_filters(tmp_path, suffix):
+    df = pd.DataFrame({
+        "CHANNEL": pd.Categorical(["tv", "radio", "tv", "search"]),
+        "IS_HOLIDAY": [True, False, False, True],
+        "COST": [1.0, 2.0, 3.0, 4.0],
+    })
+    path = tmp_path / f"data{suffix}"
+    df.to_parquet(path, index=False) if suffix == ".parquet" else df.to_feather(path)
+
+    full = _read_file(path)
+    pd.testing.assert_frame_equal(full, df, check_categorical=False)
+    assert isinstance(full["CHANNEL"].dtype, pd.CategoricalDtype)
+    assert full["IS_HOLIDAY"].dtype == bool
+
+    subset = _read_file(path, columns=["COST"], filters=[("CHANNEL", "==", "tv")])
+    assert list(subset.columns) == ["COST"]
+    assert subset["COST"].tolist() == [1.0, 3.0]
+
+
+def test_unsupported_filter_operator_raises():
+    with pytest.raises(ValueError, match="Unsupported filter operator"):
+        _apply_filters(pd.DataFrame({"a": [1]}), [("a", "~", 1)])
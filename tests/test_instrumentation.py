@@ -0,0 +1,129 @@
+import csv
+import json
+import logging
+import subprocess
+import sys
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from src import instrumentation
+from src.instrumentation import RECORD_FIELDS, disable, enable, instrument, profile_call, profile_next, records, track
+
+
+@pytest.fixture(autouse=True)
+def reset():
+    disable()
+    instrumentation._STATE.profile_names.clear()
+    yield
+    disable()
+    instrumentation._STATE.profile_names.clear()
+
+
+@instrument()
+def double(df):
+    return pd.concat([df, df], ignore_index=True)
+
+
+@instrument(name="fails")
+def fails(df):
+    raise KeyError("missing column")
+
+
+def test_disabled_decorator_records_nothing():
+    df = pd.DataFrame({"a": [1, 2]})
+    assert len(double(df)) == 4
+    enable()
+    assert records() == []
+
+
+def test_records_shapes_and_errors():
+    enable(["memory"])
+    double(pd.DataFrame(np.zeros((3, 2))))
+    with pytest.raises(KeyError):
+        fails(pd.DataFrame(np.zeros((5, 1))))
+
+    first, second = records()
+    assert first["name"] == f"{__name__}.double"
+    assert (first["rows_in"], first["cols_in"], first["rows_out"], first["cols_out"]) == (3, 2, 6, 2)
+    assert first["wall_seconds"] >= 0 and first["error"] is None
+    assert second["name"] == "fails" and second["rows_in"] == 5 and second["error"].startswith("KeyError")
+    assert set(first) == set(RECORD_FIELDS)
+
+
+def test_track_block_and_library_functions():
+    from src.data_analysis.df_correlation_analysis import compute_correlations
+
+    enable()
+    df = pd.DataFrame(np.random.default_rng(0).normal(size=(50, 3)), columns=list("xyz"))
+    with track("block", data=df) as span:
+        span.set_shape(df.iloc[:10])
+    compute_correlations(df)
+
+    by_name = {r["name"]: r for r in records()}
+    assert (by_name["block"]["rows_in"], by_name["block"]["rows_out"]) == (50, 10)
+    assert by_name["src.data_analysis.df_correlation_analysis.compute_correlations"]["rows_in"] == 50
+
+
+def test_file_sinks(tmp_path):
+    enable([tmp_path / "metrics.jsonl", str(tmp_path / "metrics.csv")])
+    double(pd.DataFrame({"a": [1]}))
+    double(pd.DataFrame({"a": [1, 2]}))
+    disable()
+
+    lines = [json.loads(line) for line in (tmp_path / "metrics.jsonl").read_text().splitlines()]
+    assert [r["rows_out"] for r in lines] == [2, 4]
+    with open(tmp_path / "metrics.csv", newline="") as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0]) == RECORD_FIELDS
+    assert [r["rows_in"] for r in rows] == ["1", "2"]
+
+
+def test_bad_sinks(caplog):
+    with pytest.raises(ValueError, match="Unsupported sink"):
+        enable(["metrics.parquet"])
+
+    class Broken:
+        def emit(self, record):
+            raise OSError("disk full")
+
+        def close(self):
+            pass
+
+    enable([Broken()])
+    with caplog.at_level(logging.WARNING):
+        assert len(double(pd.DataFrame({"a": [1]}))) == 2
+    assert "Broken failed: disk full" in caplog.text
+
+
+def test_profile_next_profiles_a_single_call(tmp_path):
+    profile_next(double, output_dir=tmp_path)
+    df = pd.DataFrame({"a": [1]})
+    assert len(double(df)) == 2
+    assert (tmp_path / f"{__name__}.double.prof").exists()
+    assert not instrumentation._STATE.profile_names
+
+    assert profile_call(sum, [1, 2, 3], output=tmp_path / "sum.prof") == 6
+    with pytest.raises(ValueError, match="Unsupported tool"):
+        profile_call(sum, [1], tool="perf")
+
+
+def test_environment_variable_enables_recording(monkeypatch, tmp_path):
+    monkeypatch.setenv(instrumentation.ENV_VARIABLE, "1")
+    instrumentation._enable_from_environment()
+    assert instrumentation.is_enabled()
+
+    disable()
+    monkeypatch.setenv(instrumentation.ENV_VARIABLE, "off")
+    instrumentation._enable_from_environment()
+    assert not instrumentation.is_enabled()
+
+
+def test_importing_the_library_leaves_root_logging_alone():
+    code = ("import logging, src.data_sourcing.import_export_data, src.data_analysis.df_ttest_anova_analysis; "
+            "print(len(logging.getLogger().handlers))")
+    root = Path(__file__).resolve().parents[1]
+    out = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True, check=True)
+    assert out.stdout.strip() == "0"
@@ -0,0 +1,79 @@
+import numpy as np
+import optuna
+import pytest
+from sklearn.model_selection import KFold, cross_val_score
+from xgboost import XGBRegressor
+
+from src.modeling.model_selection import search_models
+from src.modeling.model_training import build_preprocessor, prepare_training_data
+from sklearn.pipeline import Pipeline
+
+SPACE = {"xgb": {"n_estimators": ("int", 5, 20, False), "max_depth": ("int", 1, 3, False)}}
+
+
+@pytest.fixture
+def training_data(project, campaign_features):
+    return prepare_training_data(campaign_features, target="LOG_FREE_TRIALS", env="test")
+
+
+@pytest.fixture
+def storage(tmp_path):
+    optuna.logging.set_verbosity(optuna.logging.WARNING)
+    return f"sqlite:///{tmp_path / 'studies.db'}"
+
+
+def _search(X, y, storage, **kwargs):
+    options = dict(families=["xgb"], search_spaces=SPACE, n_trials=4, pruner="none", cv=3,
+                   n_jobs=1, random_state=0, storage=storage, env="test")
+    options.update(kwargs)
+    return search_models(X, y, **options)
+
+
+def test_trial_scores_match_cross_validation(training_data, storage):
+    X, y = training_data
+    trials, best = _search(X, y, storage)
+    assert len(trials) == 4 and (trials["State"] == "COMPLETE").all()
+    assert trials["Score"].is_monotonic_decreasing
+    assert (trials["Folds Fitted"] == 3).all()
+
+    top = trials.iloc[0]
+    reference = cross_val_score(
+        Pipeline([("preprocessor", build_preprocessor()),
+                  ("model", XGBRegressor(random_state=0, n_jobs=1, **top["Params"]))]),
+        X, y, cv=KFold(3), scoring="neg_mean_squared_error",
+    ).mean()
+    assert top["Score"] == pytest.approx(reference, rel=1e-6)
+    assert best["xgb"].named_steps["model"].get_params()["n_estimators"] == top["Params"]["n_estimators"]
+
+
+def test_rerun_resumes_and_a_changed_setup_starts_fresh(training_data, storage):
+    X, y = training_data
+    _search(X, y, storage, refit=False)
+    resumed, _ = _search(X, y, storage, refit=False)
+    assert len(resumed) == 4
+    assert len(optuna.get_all_study_summaries(storage)) == 1
+
+    extended, _ = _search(X, y, storage, refit=False, n_trials=6)
+    assert len(extended) == 6
+
+    changed, _ = _search(X, np.expm1(y), storage, refit=False)
+    assert len(changed) == 4
+    assert len(optuna.get_all_study_summaries(storage)) == 2
+
+
+def test_pruner_stops_weak_trials_early(training_data, storage):
+    X, y = training_data
+    trials, _ = _search(X, y, storage, n_trials=12, pruner="successive_halving", refit=False)
+    pruned = trials[trials["State"] == "PRUNED"]
+    assert (pruned["Folds Fitted"] < 3).all()
+    assert (trials.loc[trials["State"] == "COMPLETE", "Folds Fitted"] == 3).all()
+
+
+def test_invalid_arguments_raise(training_data, storage):
+    X, y = training_data
+    with pytest.raises(ValueError, match="needs a budget"):
+        search_models(X, y, families=["xgb"], search_spaces=SPACE, storage=None, env="test")
+    with pytest.raises(ValueError, match="No search space"):
+        _search(X, y, storage, families=["rf"])
+    with pytest.raises(ValueError, match="Unsupported pruner"):
+        _search(X, y, storage, pruner="patient")
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.model_selection import GridSearchCV, KFold
+from sklearn.pipeline import Pipeline
+from xgboost import XGBRegressor
+
+from src.modeling.model_training import (
+    CATEGORICAL_COLUMNS, NUMERICAL_COLUMNS, TARGET_DERIVED_COLUMNS,
+    build_preprocessor, prepare_training_data, train_models
+)
+
+GRIDS = {
+    "xgb": {"n_estimators": [10, 20], "max_depth": [2]},
+    "rf": {"model__n_estimators": [10], "model__max_depth": [3, None]},
+}
+
+
+def test_target_derived_columns_are_never_default_inputs(project, campaign_features):
+    assert not set(TARGET_DERIVED_COLUMNS) & set(NUMERICAL_COLUMNS + CATEGORICAL_COLUMNS)
+    X, y = prepare_training_data(campaign_features, target="FREE_TRIALS", env="test")
+    assert list(X.columns) == CATEGORICAL_COLUMNS + NUMERICAL_COLUMNS
+    assert y.name == "FREE_TRIALS"
+
+
+def test_scores_match_grid_search_cv(project, campaign_features, tmp_path):
+    X, y = prepare_training_data(campaign_features, target="FREE_TRIALS", env="test")
+    results, best = train_models(X, y, param_grids=GRIDS, cv=3, n_jobs=1, random_state=0,
+                                 cache_dir=tmp_path / "cache", env="test")
+    assert len(results) == 4 and set(best) == {"xgb", "rf"}
+
+    models = {
+        "xgb": XGBRegressor(random_state=0, n_jobs=1),
+        "rf": RandomForestRegressor(random_state=0, n_jobs=1),
+    }
+    for family, model in models.items():
+        grid = {f"model__{k.split('__')[-1]}": v for k, v in GRIDS[family].items()}
+        # Forests are trained on densified folds (DENSE_INPUT_FAMILIES)
+        preprocessor = build_preprocessor().set_params(sparse_threshold=0 if family == "rf" else 0.3)
+        search = GridSearchCV(Pipeline([("preprocessor", preprocessor), ("model", model)]), grid,
+                              cv=KFold(3), scoring="neg_mean_squared_error").fit(X, y)
+        ours = results[results["Family"] == family]
+        assert ours["Mean Score"].iloc[0] == pytest.approx(search.best_score_, rel=1e-6)
+        assert ours.loc[ours["Rank"] == 1, "Params"].iloc[0] == {
+            k.split("__")[-1]: v for k, v in search.best_params_.items()
+        }
+        np.testing.assert_allclose(best[family].predict(X), search.best_estimator_.predict(X), rtol=1e-5)
+
+
+def test_fitted_folds_are_cached_on_disk(project, campaign_features, tmp_path):
+    X, y = prepare_training_data(campaign_features, target="FREE_TRIALS", env="test")
+    kwargs = dict(param_grids={"xgb": GRIDS["xgb"]}, cv=2, n_jobs=1, cache_dir=tmp_path / "cache", env="test")
+    first, _ = train_models(X, y, refit=False, **kwargs)
+    cached_files = sorted(p for p in (tmp_path / "cache").rglob("output.pkl"))
+    assert len(cached_files) == 2
+    second, _ = train_models(X, y, refit=False, **kwargs)
+    assert sorted(p for p in (tmp_path / "cache").rglob("output.pkl")) == cached_files
+    np.testing.assert_allclose(first["Mean Score"], second["Mean Score"])
+
+
+def test_unknown_family_raises(project, campaign_features):
+    X, y = prepare_training_data(campaign_features, target="FREE_TRIALS", env="test")
+    with pytest.raises(ValueError, match="Unknown model family"):
+        train_models(X, y, param_grids={"svm": {"C": [1.0]}}, n_jobs=1, use_cache=False, env="test")
@@ -0,0 +1,62 @@
+import numpy as np
+import pytest
+from scipy import sparse as sp
+from sklearn.decomposition import PCA, IncrementalPCA, TruncatedSVD
+
+from src.modeling.pca import DimensionalityReducer, select_n_components
+from src.modeling.pipeline import InteractionFeatures
+
+
+@pytest.fixture
+def matrix(campaign_features):
+    return sp.csr_matrix(InteractionFeatures().fit_transform(campaign_features))
+
+
+def _assert_same_up_to_sign(actual, expected, atol=1e-6):
+    signs = np.sign(np.sum(actual * expected, axis=0))
+    np.testing.assert_allclose(actual * signs, expected, atol=atol)
+
+
+@pytest.mark.parametrize("threshold, expected", [(0.5, 1), (0.8, 2), (0.95, 3), (0.96, 4), (0.999, 4)])
+def test_select_n_components(threshold, expected):
+    assert select_n_components(np.array([0.5, 0.3, 0.15, 0.05]), threshold) == expected
+
+
+def test_threshold_not_reached_keeps_everything():
+    assert select_n_components(np.array([0.4, 0.3]), 0.95) == 2
+
+
+@pytest.mark.parametrize("method", ["randomized", "incremental"])
+def test_centered_projection_matches_full_pca(matrix, method):
+    reducer = DimensionalityReducer(method=method, variance_threshold=0.9, batch_size=150).fit(matrix)
+    full = PCA(svd_solver="full").fit(matrix.toarray())
+    assert reducer.n_components_ == select_n_components(full.explained_variance_ratio_, 0.9)
+    np.testing.assert_allclose(reducer.explained_variance_ratio_,
+                               full.explained_variance_ratio_[:reducer.n_components_], rtol=1e-3)
+    _assert_same_up_to_sign(reducer.transform(matrix), full.transform(matrix.toarray())[:, :reducer.n_components_])
+    assert list(reducer.get_feature_names_out()) == [f"PC{i + 1}" for i in range(reducer.n_components_)]
+
+
+def test_auto_uses_truncated_svd_on_sparse_input(matrix):
+    reducer = DimensionalityReducer(n_components=5).fit(matrix)
+    assert reducer.method_ == "truncated"
+    assert not reducer.mean_.any()
+    reference = TruncatedSVD(n_components=5, algorithm="arpack").fit(matrix)
+    # Randomized SVD only approximates the trailing components
+    _assert_same_up_to_sign(reducer.transform(matrix), reference.transform(matrix), atol=1e-3)
+
+
+def test_partial_fit_matches_incremental_pca(matrix):
+    reducer = DimensionalityReducer(n_components=4, method="incremental")
+    reference = IncrementalPCA(n_components=4)
+    for start in range(0, matrix.shape[0], 100):
+        reducer.partial_fit(matrix[start:start + 100])
+        reference.partial_fit(matrix[start:start + 100].toarray())
+    np.testing.assert_allclose(reducer.transform(matrix), reference.transform(matrix.toarray()), atol=1e-8)
+
+
+def test_invalid_methods_raise(matrix):
+    with pytest.raises(ValueError, match="Unsupported method"):
+        DimensionalityReducer(method="nmf").fit(matrix)
+    with pytest.raises(ValueError, match="partial_fit needs method='incremental'"):
+        DimensionalityReducer(method="truncated").partial_fit(matrix)
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+from scipy import sparse as sp
+from sklearn.linear_model import LinearRegression
+
+from src.modeling.model_training import build_preprocessor
+from src.modeling.pipeline import InteractionFeatures, build_pipeline
+
+
+def _reference(features, X, include_reference=True):
+    """Interaction columns computed the slow way: scaled value * level indicator."""
+    scaled = features.preprocessor_.named_transformers_["num"].transform(X[["LOG_COST", "COST"]])
+    log_cost = scaled[:, 0]
+    levels = sorted(X["CHANNEL"].unique())
+    if not include_reference:
+        levels = levels[1:]
+    return pd.DataFrame(
+        {f"LOG_COST_x_CHANNEL_{level}": log_cost * (X["CHANNEL"] == level).to_numpy() for level in levels}
+    )
+
+
+@pytest.fixture
+def X(campaign_features):
+    return campaign_features[["CHANNEL", "CAMPAIGN_TYPE", "LOG_COST", "COST"]]
+
+
+def _features(**kwargs):
+    preprocessor = build_preprocessor(["CHANNEL", "CAMPAIGN_TYPE"], ["LOG_COST", "COST"], drop="first")
+    return InteractionFeatures(preprocessor=preprocessor, **kwargs)
+
+
+@pytest.mark.parametrize("include_reference", [True, False])
+def test_interactions_match_reference(X, include_reference):
+    features = _features(include_reference=include_reference).fit(X)
+    out = features.transform(X)
+    expected = _reference(features, X, include_reference)
+
+    names = list(features.get_feature_names_out())
+    assert names[-features.n_interactions_:] == list(expected.columns)
+    assert out.shape == (len(X), len(names))
+    np.testing.assert_allclose(out[:, -features.n_interactions_:].toarray(), expected.to_numpy())
+    # The base block is the untouched preprocessor output
+    base = sp.csr_matrix(features.preprocessor_.transform(X)).toarray()
+    np.testing.assert_allclose(out[:, :base.shape[1]].toarray(), base)
+
+
+def test_unknown_level_gets_no_interaction(X):
+    preprocessor = build_preprocessor(["CHANNEL"], ["LOG_COST"])
+    features = InteractionFeatures(preprocessor=preprocessor).fit(X)
+    unseen = X.head(3).assign(CHANNEL="podcast")
+    assert features.transform(unseen)[:, -features.n_interactions_:].nnz == 0
+
+
+def test_missing_interaction_column_raises(X):
+    with pytest.raises(ValueError, match="not handled by the preprocessor"):
+        _features(numerical_features=["LOG_SPEND"]).fit(X)
+
+
+def test_pipeline_fits_one_slope_per_channel(X, campaign_features):
+    pipeline = build_pipeline(LinearRegression(), preprocessor=build_preprocessor(
+        ["CHANNEL", "CAMPAIGN_TYPE"], ["LOG_COST", "COST"], drop="first"
+    ))
+    pipeline.fit(X, campaign_features["LOG_FREE_TRIALS"])
+    coefficients = dict(zip(pipeline.named_steps["features"].get_feature_names_out(),
+                            pipeline.named_steps["model"].coef_))
+    assert {f"LOG_COST_x_CHANNEL_{c}" for c in X["CHANNEL"].unique()} <= set(coefficients)
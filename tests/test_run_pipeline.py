@@ -0,0 +1,154 @@
+import os
+from pathlib import Path
+
+import pandas as pd
+import pytest
+
+from src import run_pipeline as rp
+from src.data_sourcing.import_export_data import DataStore
+
+RAW_DATA = Path(__file__).resolve().parents[1] / "data" / "raw" / "data.csv"
+CALLS = []
+
+
+def _run_source(settings, store, env):
+    CALLS.append("source")
+    text = (store.base_path("raw_data") / "input.txt").read_text()
+    path = store.base_path("processed_data") / "source.txt"
+    path.write_text(text.upper())
+    return [path]
+
+
+def _run_report(settings, store, env):
+    CALLS.append("report")
+    text = (store.base_path("processed_data") / "source.txt").read_text()
+    path = store.base_path("processed_data") / "report.txt"
+    path.write_text(f"{len(text)} {settings['report']['suffix']}")
+    return [path]
+
+
+def _run_broken(settings, store, env):
+    CALLS.append("broken")
+    if settings["broken"]["fail"]:
+        raise RuntimeError("boom")
+    return []
+
+
+def _run_after_broken(settings, store, env):
+    CALLS.append("after_broken")
+    return []
+
+
+@pytest.fixture
+def toy_dag(project, monkeypatch):
+    """A small source -> {report, broken -> after_broken} DAG in place of the real stages."""
+    stages = {
+        "source": rp.Stage("source", _run_source, deps=[],
+                           inputs=lambda s, store: [store.base_path("raw_data") / "input.txt"]),
+        "report": rp.Stage("report", _run_report, deps=["source"],
+                           inputs=lambda s, store: [store.base_path("processed_data") / "source.txt"]),
+        "broken": rp.Stage("broken", _run_broken, deps=["source"], inputs=lambda s, store: []),
+        "after_broken": rp.Stage("after_broken", _run_after_broken, deps=["broken"], inputs=lambda s, store: []),
+    }
+    settings = {"source": {}, "report": {"suffix": "chars"}, "broken": {"fail": False}, "after_broken": {}}
+    monkeypatch.setattr(rp, "STAGES", stages)
+    monkeypatch.setattr(rp, "DEFAULT_STAGE_SETTINGS", settings)
+    CALLS.clear()
+
+    store = DataStore("test")
+    store.base_path("raw_data").mkdir(parents=True, exist_ok=True)
+    store.base_path("processed_data").mkdir(parents=True, exist_ok=True)
+    (store.base_path("raw_data") / "input.txt").write_text("campaign data")
+    return settings, store
+
+
+def _statuses(report):
+    return dict(zip(report["Stage"], report["Status"]))
+
+
+def test_unchanged_stages_are_skipped(toy_dag):
+    rp.run_pipeline("test", max_workers=1)
+    assert sorted(CALLS) == ["after_broken", "broken", "report", "source"]
+
+    CALLS.clear()
+    assert set(_statuses(rp.run_pipeline("test")).values()) == {"skipped"}
+    assert CALLS == []
+
+
+def test_changed_input_reruns_only_downstream_stages(toy_dag):
+    _, store = toy_dag
+    rp.run_pipeline("test", stages=["report"])
+    (store.base_path("raw_data") / "input.txt").write_text("more campaign data")
+
+    CALLS.clear()
+    report = rp.run_pipeline("test", stages=["report"])
+    assert _statuses(report) == {"source": "ran", "report": "ran"}
+    assert (store.base_path("processed_data") / "report.txt").read_text() == "18 chars"
+
+
+def test_same_output_after_rerun_keeps_downstream_skipped(toy_dag, monkeypatch):
+    settings, _ = toy_dag
+    rp.run_pipeline("test", stages=["report"])
+    # A settings change reruns source, but it writes identical bytes, so report's key is unchanged
+    monkeypatch.setitem(settings, "source", {"note": "rerun"})
+    assert _statuses(rp.run_pipeline("test", stages=["report"])) == {"source": "ran", "report": "skipped"}
+
+
+def test_edited_or_deleted_output_triggers_rerun(toy_dag):
+    _, store = toy_dag
+    output = store.base_path("processed_data") / "report.txt"
+    rp.run_pipeline("test", stages=["report"])
+
+    stat = output.stat()
+    os.utime(output, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    assert _statuses(rp.run_pipeline("test", stages=["report"]))["report"] == "skipped"
+
+    output.write_text("13 chars, edited")
+    assert _statuses(rp.run_pipeline("test", stages=["report"]))["report"] == "ran"
+
+    output.unlink()
+    assert _statuses(rp.run_pipeline("test", stages=["report"]))["report"] == "ran"
+    assert output.read_text() == "13 chars"
+
+
+def test_changed_settings_rerun_the_stage(toy_dag, monkeypatch):
+    settings, _ = toy_dag
+    rp.run_pipeline("test", stages=["report"])
+    monkeypatch.setitem(settings, "report", {"suffix": "characters"})
+    assert _statuses(rp.run_pipeline("test", stages=["report"])) == {"source": "skipped", "report": "ran"}
+
+
+def test_failed_stage_blocks_dependents_and_is_retried(toy_dag, monkeypatch):
+    settings, store = toy_dag
+    monkeypatch.setitem(settings, "broken", {"fail": True})
+    with pytest.raises(RuntimeError, match="Pipeline stages failed"):
+        rp.run_pipeline("test")
+    assert "after_broken" not in CALLS
+
+    manifest = rp._load_manifest(rp._manifest_path(store))
+    assert "broken" not in manifest and "report" in manifest
+
+    monkeypatch.setitem(settings, "broken", {"fail": False})
+    CALLS.clear()
+    assert _statuses(rp.run_pipeline("test")) == {
+        "source": "skipped", "report": "skipped", "broken": "ran", "after_broken": "ran"
+    }
+
+
+def test_unknown_stage_raises(toy_dag):
+    with pytest.raises(ValueError, match="Unknown stages"):
+        rp.run_pipeline("test", stages=["deploy"])
+
+
+@pytest.mark.skipif(not RAW_DATA.exists(), reason="raw campaign data not available")
+def test_real_clean_and_feature_stages(project):
+    store = DataStore("test")
+    store.base_path("raw_data").mkdir(parents=True)
+    pd.read_csv(RAW_DATA, nrows=500).to_csv(store.base_path("raw_data") / "data.csv", index=False)
+
+    report = rp.run_pipeline("test", stages=["features"])
+    assert _statuses(report) == {"clean": "ran", "features": "ran"}
+    features = store.load("log_data_fe.parquet", data_type="processed_data")
+    assert "LOG_FREE_TRIALS" in features.columns and len(features) > 0
+
+    assert set(_statuses(rp.run_pipeline("test", stages=["features"])).values()) == {"skipped"}
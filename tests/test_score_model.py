@@ -0,0 +1,98 @@
+import os
+
+import numpy as np
+import pytest
+from sklearn.ensemble import RandomForestRegressor
+from sklearn.pipeline import Pipeline
+from xgboost import XGBRegressor
+
+from src.modeling.model_training import build_preprocessor
+from src.modeling.pipeline import build_pipeline
+from src.scoring import score_model
+from src.scoring.score_model import (
+    SCORING_INPUT_COLUMNS,
+    ModelScorer,
+    build_scoring_features,
+    load_model,
+    save_model,
+)
+
+NUMERICAL = ["COST", "LOG_COST"]
+CATEGORICAL = [
+    "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "HOLIDAY_FLAG", "LAG_3_HOLIDAY_FLAG",
+    "LEAD_3_HOLIDAY_FLAG", "SEASON", "MONTH", "CHANNEL_ATL_OR_DR", "CHANNEL_CAMPAIGN_TYPE"
+]
+FEATURES = CATEGORICAL + NUMERICAL
+MODELS = {
+    "xgb": lambda: XGBRegressor(n_estimators=20, max_depth=3, random_state=0, n_jobs=1),
+    "rf": lambda: RandomForestRegressor(n_estimators=10, max_depth=5, random_state=0, n_jobs=1),
+}
+
+
+@pytest.fixture
+def raw(campaign_features):
+    return campaign_features[SCORING_INPUT_COLUMNS]
+
+
+def _fit(raw, target, model):
+    pipeline = Pipeline([("preprocessor", build_preprocessor(CATEGORICAL, NUMERICAL)), ("model", model)])
+    return pipeline.fit(build_scoring_features(raw)[FEATURES], target)
+
+
+@pytest.mark.parametrize("family", sorted(MODELS))
+def test_compiled_scorer_matches_pipeline(raw, campaign_features, family):
+    pipeline = _fit(raw, campaign_features["LOG_FREE_TRIALS"], MODELS[family]())
+    scorer = ModelScorer(pipeline)
+    assert scorer.compiled
+
+    expected = pipeline.predict(build_scoring_features(raw)[FEATURES])
+    np.testing.assert_allclose(scorer.predict(raw), expected, rtol=1e-5)
+
+    for i in range(0, len(raw), 50):
+        record = raw.iloc[i].to_dict()
+        record["REPORT_DATE"] = record["REPORT_DATE"].strftime("%m/%d/%Y")
+        assert scorer.predict_one(record) == pytest.approx(expected[i], rel=1e-5)
+
+
+def test_unknown_level_is_ignored_like_the_encoder(raw, campaign_features):
+    pipeline = _fit(raw, campaign_features["LOG_FREE_TRIALS"], MODELS["xgb"]())
+    unseen = raw.head(5).assign(CHANNEL="podcast")
+    expected = pipeline.predict(build_scoring_features(unseen)[FEATURES])
+    np.testing.assert_allclose(ModelScorer(pipeline).predict(unseen), expected, rtol=1e-5)
+
+
+def test_uncompilable_pipeline_falls_back(raw, campaign_features):
+    features = build_scoring_features(raw)[FEATURES]
+    pipeline = build_pipeline(MODELS["xgb"](), preprocessor=build_preprocessor(CATEGORICAL, NUMERICAL, drop="first"))
+    pipeline.fit(features, campaign_features["LOG_FREE_TRIALS"])
+    scorer = ModelScorer(pipeline)
+    assert not scorer.compiled
+
+    expected = pipeline.predict(features)
+    np.testing.assert_allclose(scorer.predict(raw), expected, rtol=1e-6)
+    assert scorer.predict_one(raw.iloc[0].to_dict()) == pytest.approx(expected[0], rel=1e-6)
+
+
+def test_missing_input_raises(raw, campaign_features):
+    scorer = ModelScorer(_fit(raw, campaign_features["LOG_FREE_TRIALS"], MODELS["xgb"]()))
+    record = raw.iloc[0].to_dict()
+    del record["CAMPAIGN_TYPE"]
+    with pytest.raises(KeyError):
+        scorer.predict_one(record)
+
+
+def test_load_model_is_cached_until_the_file_changes(project, monkeypatch, raw, campaign_features):
+    monkeypatch.setattr(score_model, "_MODEL_CACHE", {})
+    pipeline = _fit(raw, campaign_features["LOG_FREE_TRIALS"], MODELS["xgb"]())
+    path = save_model(pipeline, "xgb.pkl", env="test")
+
+    first = load_model("xgb.pkl", env="test")
+    assert load_model(path, env="test") is first
+
+    save_model(pipeline, "xgb.pkl", env="test")
+    stat = path.stat()
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000))
+    assert load_model("xgb.pkl", env="test") is not first
+
+    with pytest.raises(FileNotFoundError):
+        load_model("missing.pkl", env="test")
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_sourcing.import_export_data import DataStore
+from src.data_sourcing.stream_data import concat_chunks, iter_raw_chunks, normalize_column_name
+
+RAW_CSV = (
+    "﻿REPORT_DATE,ATL_OR_DR,CAMPAIGN_TYPE ,CHANNEL,COST,FREE TRIALS\n"
+    "6/9/2023,DR - Direct Response,Title,paid social,7784.31,86401.15\n"
+    "8/29/2023,DR - Direct Response,Title,app,2474.31,2956.74\n"
+    "1/2/2024,ATL - Above the Line,Brand,tv,100.5,\n"
+    "12/31/2023,DR - Direct Response,Promo,app,0,3\n"
+    "2/29/2024,ATL - Above the Line,Brand,radio,55.25,12.5\n"
+)
+
+
+@pytest.fixture
+def store(project):
+    raw_dir = project / "data" / "raw"
+    raw_dir.mkdir(parents=True)
+    (raw_dir / "data.csv").write_text(RAW_CSV, encoding="utf-8")
+    return DataStore("test")
+
+
+@pytest.mark.parametrize("raw, expected", [
+    ("﻿REPORT_DATE", "REPORT_DATE"),
+    ("CAMPAIGN_TYPE ", "CAMPAIGN_TYPE"),
+    ("FREE TRIALS", "FREE_TRIALS"),
+    ("atl-or  dr", "ATL_OR_DR"),
+])
+def test_normalize_column_name(raw, expected):
+    assert normalize_column_name(raw) == expected
+
+
+def test_chunks_are_typed_and_normalized(store):
+    chunks = list(iter_raw_chunks(store=store, chunksize=2))
+    assert [len(c) for c in chunks] == [2, 2, 1]
+    first = chunks[0]
+    assert list(first.columns) == ["REPORT_DATE", "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "COST", "FREE_TRIALS"]
+    assert isinstance(first["CHANNEL"].dtype, pd.CategoricalDtype)
+    assert first["COST"].dtype == np.float32
+    assert first["FREE_TRIALS"].dtype == np.float32
+    assert first["REPORT_DATE"].iloc[0] == pd.Timestamp(2023, 6, 9)
+
+
+def test_concat_chunks_matches_a_single_read(store):
+    stacked = concat_chunks(iter_raw_chunks(store=store, chunksize=2))
+    whole = next(iter_raw_chunks(store=store, chunksize=100))
+    assert isinstance(stacked["CHANNEL"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(stacked, whole, check_categorical=False)
+    assert np.isnan(stacked.loc[2, "FREE_TRIALS"])
+
+
+def test_concat_chunks_does_not_mutate_inputs(store):
+    chunks = list(iter_raw_chunks(store=store, chunksize=2))
+    before = [chunk["CHANNEL"].cat.categories.tolist() for chunk in chunks]
+    concat_chunks(chunks)
+    assert [chunk["CHANNEL"].cat.categories.tolist() for chunk in chunks] == before
+
+
+def test_known_categories_give_every_chunk_the_same_dtype(store):
+    levels = {"CHANNEL": ["app", "paid social", "radio", "tv"]}
+    chunks = list(iter_raw_chunks(store=store, chunksize=2, categories=levels))
+    dtypes = {chunk["CHANNEL"].dtype for chunk in chunks}
+    assert len(dtypes) == 1
+    assert list(dtypes.pop().categories) == levels["CHANNEL"]
+
+
+def test_column_projection_uses_normalized_names(store):
+    chunk = next(iter_raw_chunks(store=store, columns=["FREE_TRIALS", "CHANNEL"]))
+    assert sorted(chunk.columns) == ["CHANNEL", "FREE_TRIALS"]
+
+
+def test_errors(store):
+    with pytest.raises(KeyError, match="NOT_A_COLUMN"):
+        next(iter_raw_chunks(store=store, columns=["NOT_A_COLUMN"]))
+    with pytest.raises(FileNotFoundError):
+        next(iter_raw_chunks("missing.csv", store=store))
+    assert concat_chunks([]).empty
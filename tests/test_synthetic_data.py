@@ -0,0 +1,48 @@
+import pandas as pd
+import pytest
+
+from src.data_preprocessing.df_clean import clean_data
+from src.data_sourcing.synthetic_data import (
+    CHANNELS,
+    RAW_COLUMNS,
+    generate_campaign_data,
+    write_campaign_csv,
+)
+
+
+def test_raw_format_matches_the_extract_schema():
+    df = generate_campaign_data(1_000, start_date="2023-01-01", end_date="2023-12-31", seed=1)
+    assert list(df.columns) == RAW_COLUMNS
+    dates = pd.to_datetime(df["REPORT_DATE"], format="%m/%d/%Y")
+    assert dates.min() >= pd.Timestamp("2023-01-01") and dates.max() <= pd.Timestamp("2023-12-31")
+    assert (df["COST"] >= 0).all() and (df["FREE TRIALS"] >= 500).all()
+    assert set(df["CHANNEL"]) <= set(CHANNELS)
+
+
+def test_same_seed_gives_same_rows():
+    pd.testing.assert_frame_equal(generate_campaign_data(500, seed=3), generate_campaign_data(500, seed=3))
+    assert not generate_campaign_data(500, seed=3).equals(generate_campaign_data(500, seed=4))
+
+
+def test_cardinality_is_padded_with_synthetic_levels():
+    df = generate_campaign_data(20_000, n_channels=25, n_campaign_types=6, seed=0, raw_format=False)
+    assert list(df.columns) == ["REPORT_DATE", "ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL", "COST", "FREE_TRIALS"]
+    assert (df[["ATL_OR_DR", "CAMPAIGN_TYPE", "CHANNEL"]].dtypes == "category").all()
+    assert df["CHANNEL"].nunique() == 25
+    assert "channel_25" in set(df["CHANNEL"]) and "type_6" in set(df["CAMPAIGN_TYPE"])
+
+
+def test_written_csv_cleans_like_the_extract(tmp_path):
+    raw = generate_campaign_data(300, seed=5)
+    path = write_campaign_csv(raw, tmp_path / "nested" / "data.csv")
+    assert path.read_bytes().startswith(b"\xef\xbb\xbf")
+
+    cleaned, _ = clean_data(pd.read_csv(path, encoding="utf-8-sig"), outlier_columns=None)
+    assert len(cleaned) == 300
+    assert pd.api.types.is_datetime64_any_dtype(cleaned["REPORT_DATE"])
+    assert "FREE_TRIALS" in cleaned.columns
+
+
+def test_invalid_cardinality_raises():
+    with pytest.raises(ValueError, match="at least 1"):
+        generate_campaign_data(10, n_channels=0)
@@ -0,0 +1,70 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from src.data_preprocessing.df_feature_engineer import add_time_series_features, append_time_series_features
+
+
+@pytest.fixture
+def daily() -> pd.DataFrame:
+    rng = np.random.default_rng(9)
+    n = 300
+    df = pd.DataFrame({
+        "REPORT_DATE": pd.Timestamp("2023-01-01") + pd.to_timedelta(rng.integers(0, 60, size=n), unit="D"),
+        "CHANNEL": pd.Categorical(rng.choice(["tv", "app", "radio"], size=n)),
+        "CAMPAIGN_TYPE": pd.Categorical(rng.choice(["Brand", "Title"], size=n)),
+        "COST": rng.gamma(2.0, 100.0, size=n),
+        "FREE_TRIALS": rng.gamma(2.0, 20.0, size=n),
+    })
+    df.loc[[10, 20], "COST"] = np.nan
+    return df
+
+
+def _reference(df, keys, metric, lag, window, min_periods=1):
+    """pandas groupby shift/rolling over a stable date sort."""
+    ordered = df.sort_values("REPORT_DATE", kind="stable")
+    grouped = ordered.groupby(keys, observed=True)[metric]
+    prev = grouped.shift(lag)
+    rolling = grouped.rolling(window, min_periods=min_periods)
+    mean = rolling.mean().reset_index(level=list(range(len(keys))), drop=True)
+    total = rolling.sum().reset_index(level=list(range(len(keys))), drop=True)
+    return prev.reindex(df.index), mean.reindex(df.index), total.reindex(df.index)
+
+
+@pytest.mark.parametrize("keys", [["CHANNEL"], ["CHANNEL", "CAMPAIGN_TYPE"]])
+def test_features_match_pandas_groupby_reference(daily, keys):
+    df = add_time_series_features(daily, group_keys=[keys], lags=(1, 2), windows=(3, 7))
+    suffix = "_BY_" + "_".join(keys)
+    for metric in ["COST", "FREE_TRIALS"]:
+        for lag, window in [(1, 3), (2, 7)]:
+            prev, mean, total = _reference(daily, keys, metric, lag, window)
+            np.testing.assert_allclose(df[f"PREV_{lag}_{metric}{suffix}"], prev)
+            np.testing.assert_allclose(df[f"GROWTH_{lag}_{metric}{suffix}"], (daily[metric] - prev) / prev)
+            np.testing.assert_allclose(df[f"ROLLING_{window}_MEAN_{metric}{suffix}"], mean, rtol=1e-10)
+            np.testing.assert_allclose(df[f"ROLLING_{window}_SUM_{metric}{suffix}"], total, rtol=1e-10)
+
+
+def test_min_periods_and_ungrouped_series(daily):
+    df = add_time_series_features(daily, group_keys=[[]], metrics=["COST"], lags=(), windows=(5,), min_periods=3)
+    _, mean, _ = _reference(daily.assign(ALL=0), ["ALL"], "COST", 1, 5, min_periods=3)
+    np.testing.assert_allclose(df["ROLLING_5_MEAN_COST"], mean, rtol=1e-10)
+    assert df["ROLLING_5_MEAN_COST"].isna().sum() >= 2
+
+
+def test_append_matches_a_full_recompute(daily):
+    daily = daily.sort_values("REPORT_DATE", kind="stable").reset_index(drop=True)
+    cutoff = pd.Timestamp("2023-02-15")
+    history = daily[daily["REPORT_DATE"] < cutoff]
+    new_rows = daily[daily["REPORT_DATE"] >= cutoff]
+    kwargs = dict(group_keys=[["CHANNEL"], ["CHANNEL", "CAMPAIGN_TYPE"]], lags=(1, 2), windows=(3,))
+
+    appended = append_time_series_features(history, new_rows, **kwargs)
+    full = add_time_series_features(daily, **kwargs).loc[new_rows.index]
+    pd.testing.assert_frame_equal(appended, full, check_categorical=False)
+
+
+def test_append_rejects_rows_that_predate_history(daily):
+    history = daily[daily["REPORT_DATE"] >= pd.Timestamp("2023-02-01")]
+    stale = daily[daily["REPORT_DATE"] < pd.Timestamp("2023-01-10")]
+    with pytest.raises(ValueError, match="predate existing history"):
+        append_time_series_features(history, stale)